@@ -0,0 +1,256 @@
+"""
+Near-duplicate campaign detection for Ytili Fraud Detection
+MinHash signatures with LSH banding over campaign descriptions
+"""
+import re
+import zlib
+import asyncio
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Any, Set
+
+import numpy as np
+import structlog
+
+from ..core.supabase import get_supabase_service, Tables
+
+logger = structlog.get_logger()
+
+# Mersenne-style prime just above 2**32 so (a * x + b) stays inside uint64
+_MINHASH_PRIME = np.uint64(4294967311)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class CampaignSimilarityIndex:
+    """
+    Incremental MinHash/LSH index over campaign descriptions.
+
+    Each campaign is reduced to a fixed-size MinHash signature of its word
+    shingles. Signatures are split into bands and every band is hashed into a
+    bucket table, so a lookup only compares against campaigns sharing at least
+    one bucket instead of scanning the whole corpus.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 3,
+        similarity_threshold: float = 0.6,
+        seed: int = 1
+    ):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.similarity_threshold = similarity_threshold
+
+        # Universal hash family h(x) = (a * x + b) mod p
+        rng = np.random.RandomState(seed)
+        self._perm_a = rng.randint(1, 2 ** 31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._perm_b = rng.randint(0, 2 ** 31 - 1, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._owners: Dict[str, Optional[str]] = {}
+
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # Held while loading; add() takes _lock
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    @staticmethod
+    def campaign_text(campaign: Dict[str, Any]) -> str:
+        """Text of a campaign that is compared for copy-paste reuse"""
+        parts = [campaign.get("description") or "", campaign.get("beneficiary_story") or ""]
+        return " ".join(part for part in parts if part)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """Hash word shingles of normalized text to 32-bit integers"""
+        normalized = unicodedata.normalize("NFC", text.lower())
+        words = _WORD_RE.findall(normalized)
+
+        if len(words) < self.shingle_size:
+            grams = [" ".join(words)] if words else []
+        else:
+            grams = [
+                " ".join(words[i:i + self.shingle_size])
+                for i in range(len(words) - self.shingle_size + 1)
+            ]
+
+        hashes = {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """Compute the MinHash signature for a text, None if it has no words"""
+        shingles = self._shingles(text)
+        if shingles.size == 0:
+            return None
+
+        # (num_perm, n_shingles) matrix of permuted hashes, min over shingles
+        permuted = (np.outer(self._perm_a, shingles) + self._perm_b[:, None]) % _MINHASH_PRIME
+        return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, campaign_id: str, owner_id: Optional[str], text: str) -> bool:
+        """Insert or replace a campaign in the index"""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+
+        campaign_id = str(campaign_id)
+        with self._lock:
+            if campaign_id in self._signatures:
+                self._remove_locked(campaign_id)
+
+            for band, key in enumerate(self._band_keys(signature)):
+                self._buckets[band].setdefault(key, set()).add(campaign_id)
+
+            self._signatures[campaign_id] = signature
+            self._owners[campaign_id] = str(owner_id) if owner_id is not None else None
+
+        return True
+
+    def remove(self, campaign_id: str) -> None:
+        """Remove a campaign from the index"""
+        with self._lock:
+            self._remove_locked(str(campaign_id))
+
+    def _remove_locked(self, campaign_id: str) -> None:
+        signature = self._signatures.pop(campaign_id, None)
+        self._owners.pop(campaign_id, None)
+        if signature is None:
+            return
+
+        for band, key in enumerate(self._band_keys(signature)):
+            bucket = self._buckets[band].get(key)
+            if bucket:
+                bucket.discard(campaign_id)
+                if not bucket:
+                    del self._buckets[band][key]
+
+    def query(
+        self,
+        text: str,
+        exclude_owner: Optional[str] = None,
+        exclude_campaign: Optional[str] = None,
+        threshold: Optional[float] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Find indexed campaigns whose estimated Jaccard similarity with text
+        is at least threshold, most similar first
+        """
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        threshold = self.similarity_threshold if threshold is None else threshold
+        exclude_owner = str(exclude_owner) if exclude_owner is not None else None
+        exclude_campaign = str(exclude_campaign) if exclude_campaign is not None else None
+
+        with self._lock:
+            candidates: Set[str] = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket:
+                    candidates.update(bucket)
+
+            matches = []
+            for candidate_id in candidates:
+                if candidate_id == exclude_campaign:
+                    continue
+                owner_id = self._owners.get(candidate_id)
+                if exclude_owner is not None and owner_id == exclude_owner:
+                    continue
+
+                similarity = float(np.mean(self._signatures[candidate_id] == signature))
+                if similarity >= threshold:
+                    matches.append({
+                        "campaign_id": candidate_id,
+                        "owner_id": owner_id,
+                        "similarity": round(similarity, 3)
+                    })
+
+        matches.sort(key=lambda m: m["similarity"], reverse=True)
+        return matches[:limit]
+
+    def load_from_database(self, page_size: int = 1000) -> int:
+        """Build the index from all existing campaigns in Supabase"""
+        supabase = get_supabase_service()
+        offset = 0
+        indexed = 0
+
+        while True:
+            result = supabase.table(Tables.CAMPAIGNS).select(
+                "id, creator_id, description, beneficiary_story"
+            ).order("created_at").range(offset, offset + page_size - 1).execute()
+
+            batch = result.data or []
+            for campaign in batch:
+                if self.add(campaign["id"], campaign.get("creator_id"), self.campaign_text(campaign)):
+                    indexed += 1
+
+            if len(batch) < page_size:
+                break
+            offset += page_size
+
+        self._loaded = True
+        logger.info("Campaign similarity index loaded", campaigns=indexed)
+        return indexed
+
+    def ensure_loaded(self) -> None:
+        """Load the index on first use"""
+        if self._loaded:
+            return
+        # The startup warm-up and the first requests may race to load
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                self.load_from_database()
+            except Exception as e:
+                # Still mark as loaded so new campaigns are indexed incrementally
+                self._loaded = True
+                logger.error(f"Failed to load campaign similarity index: {str(e)}")
+
+    def find_duplicates(self, campaign: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Near-duplicate campaigns created by other owners"""
+        self.ensure_loaded()
+        return self.query(
+            self.campaign_text(campaign),
+            exclude_owner=campaign.get("creator_id") or campaign.get("user_id"),
+            exclude_campaign=campaign.get("id")
+        )
+
+    def index_campaign(self, campaign: Dict[str, Any]) -> bool:
+        """Add a newly created campaign to the index"""
+        self.ensure_loaded()
+        return self.add(
+            campaign["id"],
+            campaign.get("creator_id") or campaign.get("user_id"),
+            self.campaign_text(campaign)
+        )
+
+    async def check_and_index(self, campaign: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Find near-duplicates of a new campaign, then index it, off the event loop"""
+        loop = asyncio.get_running_loop()
+        duplicates = await loop.run_in_executor(None, self.find_duplicates, campaign)
+        await loop.run_in_executor(None, self.index_campaign, campaign)
+        return duplicates
+
+
+# Global campaign similarity index instance
+campaign_similarity_index = CampaignSimilarityIndex()
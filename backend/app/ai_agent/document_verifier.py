@@ -5,6 +5,9 @@ OCR-based verification of medical documents and certificates
 import re
 import json
 import base64
+import asyncio
+import hashlib
+import os
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timezone
 import structlog
@@ -22,6 +25,9 @@ except ImportError:
 
 from ..core.supabase import get_supabase_service
 from ..core.config import settings
+from .ocr_worker_pool import ocr_worker_pool, OCRPoolSaturatedError
+from .ocr_result_cache import ocr_result_cache
+from .image_similarity import image_similarity_index
 
 logger = structlog.get_logger()
 
@@ -93,23 +99,204 @@ class DocumentVerifier:
             "min_extracted_text_length": 50
         }
     
+    @property
+    def rules_version(self) -> str:
+        """Fingerprint of the verification rules; cached results are only reused within a version"""
+        rules = {
+            "document_patterns": self.document_patterns,
+            "legitimate_hospitals": self.legitimate_hospitals,
+            "quality_thresholds": self.quality_thresholds,
+            "ocr": [settings.OCR_NORMALIZE_RESOLUTION, settings.OCR_TARGET_DPI, settings.OCR_CROP_TO_DOCUMENT]
+        }
+        return hashlib.sha256(
+            json.dumps(rules, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:16]
+    
     async def verify_document(
         self,
         document_path: str,
         document_type: str = "medical_certificate",
-        user_id: Optional[int] = None
+        user_id: Optional[int] = None,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Verify a medical document using OCR and pattern matching
         
+        OCR runs in the shared worker pool so the event loop is never blocked.
+        
         Args:
             document_path: Path to the document image
             document_type: Type of document (medical_certificate, hospital_record, etc.)
             user_id: ID of user submitting the document
+            timeout: Maximum seconds to wait for the result (None waits for the job timeout)
             
         Returns:
             Verification result with confidence score
         """
+        job_id = None
+        try:
+            if not HAS_OCR:
+                return {
+                    "success": False,
+                    "error": "OCR libraries not available",
+                    "verification_score": 0
+                }
+            
+            content_hash = await asyncio.get_running_loop().run_in_executor(
+                None, ocr_result_cache.hash_file, document_path
+            )
+            job_id = self.submit_verification(document_path, document_type, user_id, content_hash)
+            job = await ocr_worker_pool.wait(job_id, timeout=timeout)
+            return self.get_job_result(job)
+            
+        except OCRPoolSaturatedError as e:
+            return {
+                "success": False,
+                "error": e.message,
+                "retry_after": e.retry_after,
+                "verification_score": 0,
+                "requires_manual_review": True
+            }
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": "Verification still in progress",
+                "job_id": job_id,
+                "verification_score": 0,
+                "requires_manual_review": True
+            }
+        except Exception as e:
+            logger.error(f"Failed to verify document: {str(e)}")
+            return {
+                "success": False,
+                "error": str(e),
+                "verification_score": 0,
+                "requires_manual_review": True
+            }
+    
+    def submit_verification(
+        self,
+        document_path: str,
+        document_type: str = "medical_certificate",
+        user_id: Optional[int] = None,
+        content_hash: Optional[str] = None,
+        delete_after: bool = False
+    ) -> str:
+        """
+        Queue a document for verification in the OCR worker pool
+        
+        Identical file content verified under the same rules version is
+        answered from the result cache without running OCR again.
+        
+        Args:
+            document_path: Path to the document image
+            document_type: Type of document
+            user_id: ID of user submitting the document
+            content_hash: SHA-256 of the file bytes, computed from the file if omitted
+            delete_after: Remove the document file once the job finished (uploaded copies)
+        
+        Returns:
+            Job ID that can be polled with ocr_worker_pool.get_job
+            
+        Raises:
+            OCRPoolSaturatedError: if the pool is at capacity
+        """
+        if content_hash is None:
+            content_hash = ocr_result_cache.hash_file(document_path)
+        rules_version = self.rules_version
+        
+        async def finalize(job: Dict[str, Any]) -> None:
+            try:
+                await complete(job)
+            finally:
+                if delete_after:
+                    try:
+                        os.remove(document_path)
+                    except OSError as e:
+                        logger.warning(f"Failed to delete verified document: {str(e)}")
+        
+        async def complete(job: Dict[str, Any]) -> None:
+            # Only successful results are cached; timeouts and OCR failures are retried next time
+            if job["status"] == "completed" and not job.get("cached") and (job["result"] or {}).get("success"):
+                try:
+                    ocr_result_cache.put(content_hash, document_type, rules_version, job["result"])
+                except Exception as e:
+                    logger.error(f"Failed to cache verification result: {str(e)}")
+            
+            result = self.get_job_result(job)
+            if not result.get("success"):
+                return
+            
+            # Same document image submitted by another user. The uploaded copy
+            # may be deleted once the job finished, so it is referenced by content
+            try:
+                duplicates = await image_similarity_index.check_document_file(
+                    document_path, content_hash, user_id, image_ref=f"sha256:{content_hash}"
+                )
+            except Exception as e:
+                logger.error(f"Failed to check duplicate documents: {str(e)}")
+                duplicates = []
+            
+            if duplicates:
+                result["duplicate_documents"] = duplicates
+                result["requires_manual_review"] = True
+                result["authenticity_check"]["suspicious_indicators"].append("reused_document_image")
+            
+            # Save verification result
+            if user_id:
+                await self._save_verification_result(user_id, document_path, result)
+            
+            logger.info(
+                "Document verification completed",
+                document_type=document_type,
+                verification_score=result["verification_score"],
+                user_id=user_id,
+                cached=bool(job.get("cached"))
+            )
+        
+        cached_result = ocr_result_cache.get(content_hash, document_type, rules_version)
+        if cached_result is not None:
+            cached_result["cache_hit"] = True
+            cached_result["verification_timestamp"] = datetime.now(timezone.utc).isoformat()
+            return ocr_worker_pool.add_completed_job(
+                document_type, cached_result, owner_id=user_id, on_complete=finalize
+            )
+        
+        return ocr_worker_pool.submit(
+            document_path, document_type, owner_id=user_id, on_complete=finalize
+        )
+    
+    def get_job_result(self, job: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert a finished OCR job record into a verification result"""
+        if not job:
+            return {"success": False, "error": "Verification job not found", "verification_score": 0}
+        
+        if job["status"] == "completed":
+            return job["result"]
+        
+        return {
+            "success": False,
+            "error": job.get("error") or f"Verification job {job['status']}",
+            "job_id": job["job_id"],
+            "verification_score": 0,
+            "requires_manual_review": True
+        }
+    
+    def analyze_document(
+        self,
+        document_path: str,
+        document_type: str = "medical_certificate",
+        ocr_timeout: float = 0
+    ) -> Dict[str, Any]:
+        """
+        Run the CPU-bound verification pipeline (image loading, preprocessing, OCR
+        and text analysis). Executed inside OCR worker processes.
+        
+        Args:
+            document_path: Path to the document image
+            document_type: Type of document
+            ocr_timeout: Seconds before Tesseract is killed (0 disables the limit)
+        """
         try:
             if not HAS_OCR:
                 return {
@@ -119,12 +306,12 @@ class DocumentVerifier:
                 }
             
             # Load and preprocess image
-            image_data = await self._load_and_preprocess_image(document_path)
+            image_data = self._load_and_preprocess_image(document_path)
             if not image_data["success"]:
                 return image_data
             
             # Extract text using OCR
-            ocr_result = await self._extract_text_ocr(image_data["processed_image"])
+            ocr_result = self._extract_text_ocr(image_data["processed_image"], timeout=ocr_timeout)
             if not ocr_result["success"]:
                 return ocr_result
             
@@ -144,7 +331,7 @@ class DocumentVerifier:
             )
             
             # Generate verification result
-            result = {
+            return {
                 "success": True,
                 "verification_score": verification_score,
                 "confidence_level": self._get_confidence_level(verification_score),
@@ -157,21 +344,7 @@ class DocumentVerifier:
                 "requires_manual_review": verification_score < 70
             }
             
-            # Save verification result
-            if user_id:
-                await self._save_verification_result(user_id, document_path, result)
-            
-            logger.info(
-                "Document verification completed",
-                document_type=document_type,
-                verification_score=verification_score,
-                user_id=user_id
-            )
-            
-            return result
-            
         except Exception as e:
-            logger.error(f"Failed to verify document: {str(e)}")
             return {
                 "success": False,
                 "error": str(e),
@@ -179,8 +352,25 @@ class DocumentVerifier:
                 "requires_manual_review": True
             }
     
-    async def _load_and_preprocess_image(self, image_path: str) -> Dict[str, Any]:
-        """Load and preprocess image for OCR"""
+    def _load_and_preprocess_image(
+        self,
+        image_path: str,
+        normalize_resolution: Optional[bool] = None,
+        crop_to_document: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Load and preprocess image for OCR
+        
+        Args:
+            image_path: Path to the document image
+            normalize_resolution: Downsample oversized photos to OCR_TARGET_DPI (defaults to settings)
+            crop_to_document: Crop to the detected page region (defaults to settings)
+        """
+        if normalize_resolution is None:
+            normalize_resolution = settings.OCR_NORMALIZE_RESOLUTION
+        if crop_to_document is None:
+            crop_to_document = settings.OCR_CROP_TO_DOCUMENT
+        
         try:
             # Load image
             image = cv2.imread(image_path)
@@ -198,10 +388,18 @@ class DocumentVerifier:
                     "resolution": (width, height)
                 }
             
+            # Phone photos are often far above the resolution Tesseract needs
+            if normalize_resolution:
+                image = self._normalize_resolution(image, settings.OCR_TARGET_DPI)
+            
             # Preprocess for better OCR
             # Convert to grayscale
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
+            # Drop background around the page before the expensive steps
+            if crop_to_document:
+                gray = self._crop_to_document(gray)
+            
             # Apply noise reduction
             denoised = cv2.medianBlur(gray, 3)
             
@@ -217,12 +415,61 @@ class DocumentVerifier:
                 "success": True,
                 "original_image": original_image,
                 "processed_image": processed_image,
-                "resolution": (width, height)
+                "resolution": (width, height),
+                "processed_resolution": (processed_image.shape[1], processed_image.shape[0])
             }
             
         except Exception as e:
             return {"success": False, "error": f"Image preprocessing failed: {str(e)}"}
     
+    def _normalize_resolution(self, image: np.ndarray, target_dpi: int) -> np.ndarray:
+        """Downsample an image so an A4 page would be scanned at roughly target_dpi"""
+        # Without reliable EXIF DPI, assume the long side spans an A4 page (11.69in)
+        max_long_side = int(11.69 * target_dpi)
+        height, width = image.shape[:2]
+        long_side = max(height, width)
+        
+        if long_side <= max_long_side:
+            return image
+        
+        scale = max_long_side / long_side
+        return cv2.resize(
+            image, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA
+        )
+    
+    def _crop_to_document(self, gray: np.ndarray) -> np.ndarray:
+        """Crop a grayscale photo to the bounding box of the largest page-like contour"""
+        try:
+            height, width = gray.shape[:2]
+            
+            # Find contours on a small copy; the page outline survives downscaling
+            scale = min(1.0, 800 / max(height, width))
+            small = cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+            blurred = cv2.GaussianBlur(small, (5, 5), 0)
+            edges = cv2.Canny(blurred, 50, 150)
+            edges = cv2.dilate(edges, np.ones((5, 5), np.uint8), iterations=2)
+            
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            if not contours:
+                return gray
+            
+            x, y, w, h = cv2.boundingRect(max(contours, key=cv2.contourArea))
+            
+            # Ignore regions that are too small (a stamp, a logo) or the whole frame
+            area_ratio = (w * h) / float(small.shape[0] * small.shape[1])
+            if area_ratio < 0.2 or area_ratio > 0.95:
+                return gray
+            
+            margin = 10
+            x0 = max(0, int(x / scale) - margin)
+            y0 = max(0, int(y / scale) - margin)
+            x1 = min(width, int((x + w) / scale) + margin)
+            y1 = min(height, int((y + h) / scale) + margin)
+            return gray[y0:y1, x0:x1]
+            
+        except Exception:
+            return gray  # Return uncropped image if detection fails
+    
     def _deskew_image(self, image: np.ndarray) -> np.ndarray:
         """Simple deskewing to correct document rotation"""
         try:
@@ -254,21 +501,23 @@ class DocumentVerifier:
         except Exception:
             return image  # Return original if deskewing fails
     
-    async def _extract_text_ocr(self, image: np.ndarray) -> Dict[str, Any]:
+    def _extract_text_ocr(self, image: np.ndarray, timeout: float = 0) -> Dict[str, Any]:
         """Extract text from image using OCR"""
         try:
             # Configure Tesseract for Vietnamese
             config = '--oem 3 --psm 6 -l vie+eng'
             
-            # Extract text with confidence scores
-            data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+            # Single Tesseract pass: words, layout and confidences in one call
+            data = pytesseract.image_to_data(
+                image, config=config, output_type=pytesseract.Output.DICT, timeout=timeout
+            )
             
             # Filter out low-confidence text
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
+            confidences = [float(conf) for conf in data['conf'] if float(conf) > 0]
             avg_confidence = sum(confidences) / len(confidences) if confidences else 0
             
-            # Extract text
-            text = pytesseract.image_to_string(image, config=config)
+            # Rebuild the text from the word boxes
+            text = self._text_from_ocr_data(data)
             
             # Clean extracted text
             cleaned_text = self._clean_extracted_text(text)
@@ -297,6 +546,20 @@ class DocumentVerifier:
         except Exception as e:
             return {"success": False, "error": f"OCR extraction failed: {str(e)}"}
     
+    def _text_from_ocr_data(self, data: Dict[str, List[Any]]) -> str:
+        """Reconstruct page text from pytesseract.image_to_data output"""
+        lines: Dict[Tuple[int, int, int], List[str]] = {}
+        
+        for i, word in enumerate(data['text']):
+            word = (word or "").strip()
+            if not word or float(data['conf'][i]) < 0:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+        
+        # Dicts keep Tesseract's reading order
+        return "\n".join(" ".join(words) for words in lines.values())
+    
     def _clean_extracted_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         # Remove extra whitespace
@@ -4,12 +4,15 @@ Processes urgent medical requests and coordinates rapid response
 """
 import re
 import json
+import asyncio
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 import structlog
 
 from ..models.ai_agent import EmergencyPriority
+from ..core.config import settings
 from ..core.supabase import get_supabase_service
+from ..services.geo_service import geo_service
 
 logger = structlog.get_logger()
 
@@ -347,17 +350,31 @@ class EmergencyHandler:
             }
     
     async def _find_nearby_hospitals(self, user_id: int) -> List[Dict[str, Any]]:
-        """Find hospitals near the user"""
+        """Find hospitals near the user, nearest first"""
         try:
             # Get user location
-            user_result = self.supabase.table("users").select("city, province").eq("id", user_id).execute()
+            user_result = self.supabase.table("users").select("address, city, province").eq("id", user_id).execute()
             
             if not user_result.data:
                 return []
             
             user = user_result.data[0]
+            address = ", ".join(
+                part for part in (user.get("address"), user.get("city"), user.get("province")) if part
+            )
+            
+            # Nearest hospitals from the shared proximity index
+            loop = asyncio.get_running_loop()
+            hospitals = await loop.run_in_executor(
+                None,
+                geo_service.find_nearby_hospitals,
+                address,
+                settings.EMERGENCY_HOSPITAL_RADIUS_KM
+            )
+            if hospitals is not None:
+                return hospitals
             
-            # Find hospitals in the same city/province
+            # Unrecognised address - fall back to hospitals in the same city
             hospitals_result = self.supabase.table("users").select("*").eq("user_type", "hospital").eq("city", user["city"]).execute()
             
             return hospitals_result.data or []
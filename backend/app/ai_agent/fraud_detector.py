@@ -9,6 +9,8 @@ from datetime import datetime, timezone, timedelta
 import structlog
 
 from ..core.supabase import get_supabase_service
+from .campaign_similarity import campaign_similarity_index
+from .image_similarity import image_similarity_index
 
 logger = structlog.get_logger()
 
@@ -91,6 +93,16 @@ class FraudDetector:
             fraud_score += description_analysis["score"]
             fraud_indicators.extend(description_analysis["indicators"])
             
+            # Compare against other owners' campaigns for copy-paste stories
+            duplicate_analysis = self._analyze_duplicate_content(campaign_data)
+            fraud_score += duplicate_analysis["score"]
+            fraud_indicators.extend(duplicate_analysis["indicators"])
+            
+            # Compare images and documents against other owners' uploads
+            image_analysis = await self._analyze_duplicate_images(campaign_data)
+            fraud_score += image_analysis["score"]
+            fraud_indicators.extend(image_analysis["indicators"])
+            
             # Analyze user behavior
             user_analysis = await self._analyze_user_behavior(
                 campaign_data.get("user_id")
@@ -205,6 +217,58 @@ class FraudDetector:
             "indicators": indicators
         }
     
+    def _analyze_duplicate_content(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Check for near-duplicate descriptions used by other campaign owners"""
+        score = 0
+        indicators = []
+        
+        try:
+            duplicates = campaign_similarity_index.find_duplicates(campaign_data)
+        except Exception as e:
+            logger.error(f"Failed to check duplicate campaigns: {str(e)}")
+            return {"score": 0, "indicators": []}
+        
+        if duplicates:
+            top_similarity = duplicates[0]["similarity"]
+            score += 40 if top_similarity >= 0.85 else 25
+            indicators.append({
+                "type": "duplicate_content",
+                "issue": "near_duplicate_description",
+                "similarity": top_similarity,
+                "matching_campaigns": duplicates
+            })
+        
+        return {
+            "score": score,
+            "indicators": indicators
+        }
+    
+    async def _analyze_duplicate_images(self, campaign_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Check for campaign photos and documents reused from other owners"""
+        score = 0
+        indicators = []
+        
+        try:
+            matches = await image_similarity_index.check_campaign_images(campaign_data)
+        except Exception as e:
+            logger.error(f"Failed to check duplicate images: {str(e)}")
+            return {"score": 0, "indicators": []}
+        
+        if matches:
+            reused_images = {m["image_url"] for m in matches}
+            score += min(20 * len(reused_images), 50)
+            indicators.append({
+                "type": "duplicate_content",
+                "issue": "reused_images",
+                "reused_image_count": len(reused_images),
+                "matches": matches
+            })
+        
+        return {
+            "score": score,
+            "indicators": indicators
+        }
+    
     async def _analyze_user_behavior(self, user_id: Optional[int]) -> Dict[str, Any]:
         """Analyze user behavior patterns"""
         score = 0
@@ -432,6 +496,9 @@ class FraudDetector:
         if "financial" in indicator_types:
             recommendations.append("Xem xét lại mục tiêu tài chính")
         
+        if "duplicate_content" in indicator_types:
+            recommendations.append("Đối chiếu với các chiến dịch có nội dung trùng lặp")
+        
         return list(set(recommendations))  # Remove duplicates
     
     async def _save_fraud_analysis(self, campaign_id: Optional[int], analysis: Dict[str, Any]) -> bool:
@@ -0,0 +1,385 @@
+"""
+Perceptual-hash image index for Ytili Fraud Detection
+Finds campaign photos and KYC documents reused across records
+"""
+import io
+import asyncio
+import ipaddress
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+import numpy as np
+import structlog
+from PIL import Image
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service
+
+logger = structlog.get_logger()
+
+IMAGE_HASHES_TABLE = "image_hashes"
+
+MAX_IMAGE_REDIRECTS = 3
+
+_HASH_BITS = 64
+_SIGN_BIT = 1 << 63
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0, :] = np.sqrt(1.0 / n)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def compute_phash(image: Image.Image) -> int:
+    """64-bit DCT perceptual hash"""
+    pixels = np.asarray(
+        image.convert("L").resize((32, 32), Image.Resampling.LANCZOS), dtype=np.float64
+    )
+    dct = _DCT_32 @ pixels @ _DCT_32.T
+    low_freq = dct[:8, :8].flatten()
+    # The DC term only reflects overall brightness
+    median = np.median(low_freq[1:])
+    return _bits_to_int(low_freq > median)
+
+
+def compute_dhash(image: Image.Image) -> int:
+    """64-bit horizontal gradient (difference) hash"""
+    pixels = np.asarray(
+        image.convert("L").resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16
+    )
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def hash_image_bytes(data: bytes) -> Tuple[int, int]:
+    """(pHash, dHash) of an encoded image"""
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft("L", (256, 256))  # Let JPEG decode at reduced size
+        return compute_phash(image), compute_dhash(image)
+
+
+def hash_image_file(path: str) -> Tuple[int, int]:
+    """(pHash, dHash) of an image on disk"""
+    with open(path, "rb") as f:
+        return hash_image_bytes(f.read())
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    """Bits set in each uint64"""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _to_signed(value: int) -> int:
+    """Store unsigned 64-bit hashes in a Postgres BIGINT"""
+    return value - (1 << 64) if value & _SIGN_BIT else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+class ImageSimilarityIndex:
+    """
+    Multi-index hash table over 64-bit perceptual hashes.
+
+    The pHash is split into num_chunks substrings, each with its own lookup
+    table. Two hashes within Hamming distance r must agree on at least one
+    chunk to within r // num_chunks bits (pigeonhole principle), so a query
+    only probes the chunk values in that small radius instead of scanning
+    every stored hash. Candidates are confirmed on both pHash and dHash.
+    """
+
+    def __init__(self, num_chunks: int = 4, max_distance: int = 8):
+        if _HASH_BITS % num_chunks != 0:
+            raise ValueError("num_chunks must divide 64")
+
+        self.num_chunks = num_chunks
+        self.chunk_bits = _HASH_BITS // num_chunks
+        self.max_distance = max_distance
+
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(num_chunks)]
+        self._phashes = np.zeros(1024, dtype=np.uint64)
+        self._dhashes = np.zeros(1024, dtype=np.uint64)
+        self._records: List[Dict[str, Any]] = []
+        self._keys: Dict[Tuple[str, str, str], int] = {}
+
+        self._probe_masks: Dict[int, List[int]] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _chunks(self, value: int) -> List[int]:
+        mask = (1 << self.chunk_bits) - 1
+        return [(value >> (i * self.chunk_bits)) & mask for i in range(self.num_chunks)]
+
+    def _masks_within(self, radius: int) -> List[int]:
+        """All chunk XOR masks with at most radius bits set"""
+        if radius not in self._probe_masks:
+            masks = [0]
+            frontier = [0]
+            for _ in range(radius):
+                frontier = list({
+                    mask | (1 << bit)
+                    for mask in frontier
+                    for bit in range(self.chunk_bits)
+                    if not mask & (1 << bit)
+                })
+                masks.extend(frontier)
+            self._probe_masks[radius] = masks
+        return self._probe_masks[radius]
+
+    def add(
+        self,
+        phash: int,
+        dhash: int,
+        source_type: str,
+        source_id: str,
+        owner_id: Optional[str],
+        image_ref: str
+    ) -> bool:
+        """Insert an image hash; returns False if the same image ref is already indexed"""
+        key = (source_type, str(source_id), image_ref)
+        with self._lock:
+            if key in self._keys:
+                return False
+
+            idx = len(self._records)
+            if idx == len(self._phashes):
+                self._phashes = np.concatenate([self._phashes, np.zeros_like(self._phashes)])
+                self._dhashes = np.concatenate([self._dhashes, np.zeros_like(self._dhashes)])
+            self._phashes[idx] = phash
+            self._dhashes[idx] = dhash
+            self._records.append({
+                "source_type": source_type,
+                "source_id": str(source_id),
+                "owner_id": str(owner_id) if owner_id is not None else None,
+                "image_ref": image_ref
+            })
+            self._keys[key] = idx
+
+            for table, chunk in zip(self._tables, self._chunks(phash)):
+                table.setdefault(chunk, []).append(idx)
+
+        return True
+
+    def query(
+        self,
+        phash: int,
+        dhash: int,
+        max_distance: Optional[int] = None,
+        exclude_owner: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """Indexed images within max_distance bits of both hashes, closest first"""
+        max_distance = self.max_distance if max_distance is None else max_distance
+        exclude_owner = str(exclude_owner) if exclude_owner is not None else None
+        masks = self._masks_within(max_distance // self.num_chunks)
+
+        with self._lock:
+            candidate_lists = []
+            for table, chunk in zip(self._tables, self._chunks(phash)):
+                for mask in masks:
+                    bucket = table.get(chunk ^ mask)
+                    if bucket:
+                        candidate_lists.append(bucket)
+
+            if not candidate_lists:
+                return []
+
+            # Verify all candidates at once on both hashes
+            candidates = np.unique(np.concatenate(candidate_lists))
+            phash_distances = _popcount(self._phashes[candidates] ^ np.uint64(phash))
+            dhash_distances = _popcount(self._dhashes[candidates] ^ np.uint64(dhash))
+            close = (phash_distances <= max_distance) & (dhash_distances <= max_distance)
+
+            matches = []
+            for idx, phash_distance, dhash_distance in zip(
+                candidates[close], phash_distances[close], dhash_distances[close]
+            ):
+                record = self._records[idx]
+                if exclude_owner is not None and record["owner_id"] == exclude_owner:
+                    continue
+
+                matches.append({
+                    **record,
+                    "phash_distance": int(phash_distance),
+                    "dhash_distance": int(dhash_distance)
+                })
+
+        matches.sort(key=lambda m: m["phash_distance"] + m["dhash_distance"])
+        return matches[:limit]
+
+    def load_from_database(self, page_size: int = 1000) -> int:
+        """Build the index from stored image hashes"""
+        supabase = get_supabase_service()
+        offset = 0
+        loaded = 0
+
+        while True:
+            result = supabase.table(IMAGE_HASHES_TABLE).select(
+                "phash, dhash, source_type, source_id, owner_id, image_ref"
+            ).order("id").range(offset, offset + page_size - 1).execute()
+
+            batch = result.data or []
+            for row in batch:
+                if self.add(
+                    _to_unsigned(row["phash"]), _to_unsigned(row["dhash"]),
+                    row["source_type"], row["source_id"], row.get("owner_id"), row["image_ref"]
+                ):
+                    loaded += 1
+
+            if len(batch) < page_size:
+                break
+            offset += page_size
+
+        self._loaded = True
+        logger.info("Image similarity index loaded", images=loaded)
+        return loaded
+
+    def ensure_loaded(self) -> None:
+        """Load the index on first use"""
+        if self._loaded:
+            return
+        try:
+            self.load_from_database()
+        except Exception as e:
+            self._loaded = True
+            logger.error(f"Failed to load image similarity index: {str(e)}")
+
+    def _persist(self, phash: int, dhash: int, source_type: str, source_id: str,
+                 owner_id: Optional[str], image_ref: str) -> None:
+        try:
+            get_supabase_service().table(IMAGE_HASHES_TABLE).insert({
+                "phash": _to_signed(phash),
+                "dhash": _to_signed(dhash),
+                "source_type": source_type,
+                "source_id": str(source_id),
+                "owner_id": str(owner_id) if owner_id is not None else None,
+                "image_ref": image_ref
+            }).execute()
+        except Exception as e:
+            logger.error(f"Failed to persist image hash: {str(e)}")
+
+    async def check_and_index(
+        self,
+        hashes: Tuple[int, int],
+        source_type: str,
+        source_id: Optional[str],
+        owner_id: Optional[str],
+        image_ref: str
+    ) -> List[Dict[str, Any]]:
+        """Find reuses of an image by other owners, then index it"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.ensure_loaded)
+
+        phash, dhash = hashes
+        matches = self.query(phash, dhash, exclude_owner=owner_id)
+
+        if source_id is not None and self.add(phash, dhash, source_type, source_id, owner_id, image_ref):
+            await loop.run_in_executor(
+                None, self._persist, phash, dhash, source_type, source_id, owner_id, image_ref
+            )
+
+        return matches
+
+    async def _check_fetch_url(self, url: str) -> None:
+        """Raise unless url is http(s) on the storage host or a host resolving only to public addresses"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError("only http(s) URLs are fetched")
+
+        if settings.SUPABASE_URL and parts.hostname == urlsplit(settings.SUPABASE_URL).hostname:
+            return
+
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+        )
+        for *_, sockaddr in addresses:
+            address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+            if not address.is_global or address.is_multicast:
+                raise ValueError(f"{parts.hostname} resolves to non-public address {address}")
+
+    async def _fetch_image(self, client: httpx.AsyncClient, url: str) -> bytes:
+        """GET a user-supplied image URL, re-checking the host on every redirect"""
+        for _ in range(MAX_IMAGE_REDIRECTS + 1):
+            await self._check_fetch_url(url)
+            response = await client.get(url)
+            if not response.is_redirect:
+                response.raise_for_status()
+                return response.content
+            url = urljoin(url, response.headers["location"])
+        raise ValueError("too many redirects")
+
+    async def check_campaign_images(
+        self,
+        campaign: Dict[str, Any],
+        timeout: float = 10.0
+    ) -> List[Dict[str, Any]]:
+        """Hash a campaign's images and documents and report reuses from other owners"""
+        urls = list(campaign.get("images") or []) + list(
+            campaign.get("medical_documents") or campaign.get("documents") or []
+        )
+        if not urls:
+            return []
+
+        owner_id = campaign.get("creator_id") or campaign.get("user_id")
+        loop = asyncio.get_running_loop()
+        matches = []
+
+        # URLs are user-supplied: internal hosts are never fetched, redirects are followed by hand
+        async with httpx.AsyncClient(timeout=timeout, follow_redirects=False) as client:
+            for url in urls:
+                try:
+                    content = await self._fetch_image(client, url)
+                    hashes = await loop.run_in_executor(None, hash_image_bytes, content)
+                except Exception as e:
+                    # PDFs, unreachable and internal URLs are skipped
+                    logger.warning(f"Could not hash campaign image {url}: {str(e)}")
+                    continue
+
+                for match in await self.check_and_index(
+                    hashes, "campaign_image", campaign.get("id"), owner_id, url
+                ):
+                    matches.append({**match, "image_url": url})
+
+        return matches
+
+    async def check_document_file(
+        self,
+        document_path: str,
+        source_id: Optional[str],
+        owner_id: Optional[str],
+        image_ref: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Hash an uploaded KYC/medical document and report reuses from other owners
+
+        image_ref is stored with the hashes and must outlive the file at
+        document_path, e.g. the id of the record the upload was saved as.
+        """
+        loop = asyncio.get_running_loop()
+        hashes = await loop.run_in_executor(None, hash_image_file, document_path)
+        return await self.check_and_index(hashes, "document", source_id, owner_id, image_ref)
+
+
+# Global image similarity index instance
+image_similarity_index = ImageSimilarityIndex()
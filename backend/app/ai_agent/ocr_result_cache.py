@@ -0,0 +1,172 @@
+"""
+Content-addressed cache for document verification results
+Identical uploads are served from disk instead of re-running preprocessing and OCR
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Any
+import structlog
+
+from ..core.config import settings
+
+logger = structlog.get_logger()
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / "data" / "ocr_cache"
+
+
+class OCRResultCache:
+    """
+    Bounded on-disk cache of verification results keyed by file content hash.
+
+    Entries live under a directory per verification rules version, so changing
+    the patterns or hospital list makes old results unreachable; they are
+    purged the next time the index is loaded. An in-memory LRU index of
+    entry sizes enforces the entry and byte limits without touching the disk.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = settings.OCR_CACHE_DIR,
+        max_entries: int = settings.OCR_CACHE_MAX_ENTRIES,
+        max_bytes: int = settings.OCR_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._rules_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        """Content hash of an uploaded file"""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+        """Content hash of a file on disk"""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _key(content_hash: str, document_type: str) -> str:
+        return f"{content_hash}_{document_type}"
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / self._rules_version / f"{key}.json"
+
+    def _ensure_index(self, rules_version: str) -> None:
+        """(Re)build the in-memory index for the active rules version"""
+        if self._rules_version == rules_version:
+            return
+
+        self._rules_version = rules_version
+        self._index.clear()
+        self._total_bytes = 0
+
+        version_dir = self.cache_dir / rules_version
+        version_dir.mkdir(parents=True, exist_ok=True)
+
+        # Results computed under other rules are no longer valid
+        for child in self.cache_dir.iterdir():
+            if child.is_dir() and child.name != rules_version:
+                shutil.rmtree(child, ignore_errors=True)
+                logger.info("Purged stale OCR cache", rules_version=child.name)
+
+        entries = sorted(version_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for entry in entries:
+            size = entry.stat().st_size
+            self._index[entry.stem] = size
+            self._total_bytes += size
+
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._index and (len(self._index) > self.max_entries or self._total_bytes > self.max_bytes):
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._entry_path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def contains(self, content_hash: str, document_type: str, rules_version: str) -> bool:
+        """Whether a result is cached, without reading it"""
+        with self._lock:
+            self._ensure_index(rules_version)
+            return self._key(content_hash, document_type) in self._index
+
+    def get(self, content_hash: str, document_type: str, rules_version: str) -> Optional[Dict[str, Any]]:
+        """Cached verification result for identical file content, if any"""
+        key = self._key(content_hash, document_type)
+        with self._lock:
+            self._ensure_index(rules_version)
+            if key not in self._index:
+                self.misses += 1
+                return None
+
+            try:
+                with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                    result = json.load(f)
+            except (OSError, ValueError):
+                self._total_bytes -= self._index.pop(key)
+                self.misses += 1
+                return None
+
+            self._index.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, content_hash: str, document_type: str, rules_version: str, result: Dict[str, Any]) -> None:
+        """Store a successful verification result; failures must be retried, not replayed"""
+        if not result.get("success"):
+            raise ValueError("Only successful verification results are cached")
+
+        key = self._key(content_hash, document_type)
+        payload = json.dumps(result, ensure_ascii=False, default=str).encode("utf-8")
+
+        with self._lock:
+            self._ensure_index(rules_version)
+            path = self._entry_path(key)
+
+            # Write atomically so readers never see a partial entry
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+
+            if key in self._index:
+                self._total_bytes -= self._index.pop(key)
+            self._index[key] = len(payload)
+            self._total_bytes += len(payload)
+            self._evict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "bytes": self._total_bytes,
+            "rules_version": self._rules_version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0
+        }
+
+
+# Global OCR result cache instance
+ocr_result_cache = OCRResultCache()
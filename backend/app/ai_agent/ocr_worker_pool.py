@@ -0,0 +1,286 @@
+"""
+OCR Worker Pool for Ytili Document Verification
+Runs image preprocessing and Tesseract in a bounded process pool off the event loop
+"""
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Optional, Any, Callable, Awaitable
+import structlog
+
+from ..core.config import settings
+
+logger = structlog.get_logger()
+
+
+class OCRPoolSaturatedError(Exception):
+    """Raised when the OCR pool has no free slots for a new job"""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
+
+
+def _verify_in_worker(document_path: str, document_type: str, ocr_timeout: float) -> Dict[str, Any]:
+    """Entry point executed inside the worker process"""
+    from .document_verifier import document_verifier
+    return document_verifier.analyze_document(document_path, document_type, ocr_timeout=ocr_timeout)
+
+
+class OCRWorkerPool:
+    """
+    Bounded process pool with a job table for document OCR.
+
+    At most max_workers documents are processed concurrently and at most
+    max_pending jobs (running + queued) are accepted; further submissions are
+    rejected so callers can back off instead of piling up work.
+
+    Jobs wait in the pool until a worker is free and only then go to the
+    executor, so a job's timeout runs from the moment a worker picks it up,
+    not from submission.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = settings.OCR_WORKER_PROCESSES,
+        max_pending: int = settings.OCR_MAX_PENDING_JOBS,
+        job_timeout: float = settings.OCR_JOB_TIMEOUT,
+        max_finished_jobs: int = 1000,
+        metrics_window: int = 300
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.job_timeout = job_timeout
+        self.max_finished_jobs = max_finished_jobs
+        self.metrics_window = metrics_window
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._done_events: Dict[str, asyncio.Event] = {}
+        self._in_flight = 0
+        self._free_workers: Optional[asyncio.Semaphore] = None  # Created on the running loop
+
+        self._completion_times: deque = deque()
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "rejected": 0
+        }
+        self._total_processing_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            logger.info("OCR worker pool started", workers=self.max_workers, max_pending=self.max_pending)
+        return self._executor
+
+    @property
+    def is_saturated(self) -> bool:
+        return self._in_flight >= self.max_pending
+
+    def submit(
+        self,
+        document_path: str,
+        document_type: str,
+        owner_id: Optional[Any] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> str:
+        """
+        Queue a document for OCR verification and return its job ID
+
+        Raises:
+            OCRPoolSaturatedError: if the pool is already at capacity
+        """
+        if self.is_saturated:
+            self._counters["rejected"] += 1
+            raise OCRPoolSaturatedError(
+                "Document verification is busy, please retry shortly",
+                retry_after=max(1, int(self.job_timeout // 4))
+            )
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "status": "pending",
+            "document_type": document_type,
+            "owner_id": owner_id,
+            "submitted_at": datetime.now(timezone.utc).isoformat(),
+            "started_at": None,
+            "completed_at": None,
+            "duration_seconds": None,
+            "result": None,
+            "error": None
+        }
+        self._jobs[job_id] = job
+        self._done_events[job_id] = asyncio.Event()
+        self._in_flight += 1
+        self._counters["submitted"] += 1
+
+        if self._free_workers is None:
+            self._free_workers = asyncio.Semaphore(self.max_workers)
+        asyncio.get_running_loop().create_task(
+            self._run_job(job, document_path, document_type, on_complete)
+        )
+        return job_id
+
+    async def _run_job(
+        self,
+        job: Dict[str, Any],
+        document_path: str,
+        document_type: str,
+        on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]]
+    ) -> None:
+        """Wait for a free worker, then run the job on it"""
+        try:
+            await self._free_workers.acquire()
+        except asyncio.CancelledError:
+            self._release_slot()
+            raise
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._get_executor().submit(
+                _verify_in_worker, document_path, document_type, self.job_timeout
+            )
+        except Exception:
+            self._free_workers.release()
+            self._release_slot()
+            raise
+
+        # Worker and slot are only released once the worker is really free again,
+        # also when the job timed out here
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release_worker))
+
+        job["status"] = "running"
+        job["started_at"] = datetime.now(timezone.utc).isoformat()
+        await self._track_job(job, asyncio.wrap_future(future), on_complete)
+
+    def add_completed_job(
+        self,
+        document_type: str,
+        result: Dict[str, Any],
+        owner_id: Optional[Any] = None,
+        on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> str:
+        """Register a job whose result is already known (e.g. from the result cache)"""
+        job_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        job = {
+            "job_id": job_id,
+            "status": "completed",
+            "document_type": document_type,
+            "owner_id": owner_id,
+            "submitted_at": now,
+            "completed_at": now,
+            "duration_seconds": 0,
+            "result": result,
+            "error": None,
+            "cached": True
+        }
+        self._jobs[job_id] = job
+        self._evict_finished_jobs()
+
+        if on_complete:
+            asyncio.get_running_loop().create_task(on_complete(job))
+        return job_id
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+
+    def _release_worker(self) -> None:
+        self._free_workers.release()
+        self._release_slot()
+
+    async def _track_job(
+        self,
+        job: Dict[str, Any],
+        future: "asyncio.Future",
+        on_complete: Optional[Callable[[Dict[str, Any]], Awaitable[None]]]
+    ) -> None:
+        started = time.monotonic()
+        try:
+            # Tesseract is killed at job_timeout inside the worker; the extra
+            # margin covers image loading and preprocessing
+            result = await asyncio.wait_for(asyncio.shield(future), timeout=self.job_timeout + 5)
+            job["status"] = "completed"
+            job["result"] = result
+            self._counters["completed"] += 1
+        except asyncio.TimeoutError:
+            job["status"] = "timeout"
+            job["error"] = f"OCR job exceeded {self.job_timeout}s"
+            self._counters["timed_out"] += 1
+        except Exception as e:
+            job["status"] = "failed"
+            job["error"] = str(e)
+            self._counters["failed"] += 1
+
+        elapsed = time.monotonic() - started
+        job["completed_at"] = datetime.now(timezone.utc).isoformat()
+        job["duration_seconds"] = round(elapsed, 3)
+        self._total_processing_seconds += elapsed
+        self._completion_times.append(time.monotonic())
+
+        if on_complete:
+            try:
+                await on_complete(job)
+            except Exception as e:
+                logger.error(f"OCR job completion callback failed: {str(e)}")
+
+        self._done_events.pop(job["job_id"]).set()
+        self._evict_finished_jobs()
+
+        logger.info(
+            "OCR job finished",
+            job_id=job["job_id"],
+            status=job["status"],
+            duration_seconds=job["duration_seconds"]
+        )
+
+    def _evict_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job_id not in self._done_events]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job record by ID"""
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Wait for a job to finish and return its record (None if unknown)"""
+        event = self._done_events.get(job_id)
+        if event is not None:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        return self._jobs.get(job_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Pool utilisation and throughput over the sliding metrics window"""
+        now = time.monotonic()
+        while self._completion_times and now - self._completion_times[0] > self.metrics_window:
+            self._completion_times.popleft()
+
+        finished = self._counters["completed"] + self._counters["failed"] + self._counters["timed_out"]
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "saturated": self.is_saturated,
+            "documents_per_minute": round(len(self._completion_times) * 60 / self.metrics_window, 2),
+            "average_job_seconds": round(self._total_processing_seconds / finished, 3) if finished else 0,
+            **self._counters
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global OCR worker pool instance
+ocr_worker_pool = OCRWorkerPool()
@@ -2,17 +2,24 @@
 AI Agent API endpoints for Ytili platform
 Provides REST API for AI chat, donation advice, and emergency requests
 """
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form, Query
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
+import asyncio
 import json
+import os
+import uuid
 import structlog
 
 from ..ai_agent.chatbot import ytili_chatbot
 from ..ai_agent.donation_advisor import donation_advisor
 from ..ai_agent.emergency_handler import emergency_handler
 from ..ai_agent.openrouter_client import openrouter_client
+from ..ai_agent.document_verifier import document_verifier
+from ..ai_agent.ocr_worker_pool import ocr_worker_pool, OCRPoolSaturatedError
+from ..ai_agent.ocr_result_cache import ocr_result_cache
+from ..core.config import settings
 from ..api.supabase_deps import get_current_user_compat, get_current_user_optional
 from ..models.user import User
 
@@ -362,6 +369,124 @@ async def get_emergency_status(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/documents/verify")
+async def verify_medical_document(
+    document_type: str = Form("medical_certificate"),
+    file: UploadFile = File(...),
+    wait: bool = Query(False, description="Wait for the verification result instead of returning a job ID"),
+    timeout: float = Query(30.0, gt=0, le=120, description="Seconds to wait when wait=true"),
+    current_user = Depends(get_current_user_compat)
+) -> Dict[str, Any]:
+    """
+    Submit a medical document for OCR verification
+    
+    Args:
+        document_type: Type of document (medical_certificate, hospital_record, etc.)
+        file: Uploaded document image
+        wait: Whether to wait for the result
+        timeout: Maximum seconds to wait
+        current_user: Current authenticated user
+        
+    Returns:
+        Job ID and status, or the verification result when wait=true
+    """
+    file_extension = (file.filename or "").split('.')[-1].lower()
+    if file_extension not in settings.ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(settings.ALLOWED_EXTENSIONS)}"
+        )
+    
+    file_content = await file.read()
+    if len(file_content) > settings.MAX_DOCUMENT_SIZE:
+        raise HTTPException(status_code=400, detail="File too large")
+    
+    content_hash = ocr_result_cache.hash_bytes(file_content)
+    
+    # Reject before touching the disk if the OCR pool is saturated and OCR would be needed
+    if ocr_worker_pool.is_saturated and not ocr_result_cache.contains(
+        content_hash, document_type, document_verifier.rules_version
+    ):
+        raise HTTPException(
+            status_code=503,
+            detail="Document verification is busy, please retry shortly",
+            headers={"Retry-After": str(max(1, int(ocr_worker_pool.job_timeout // 4)))}
+        )
+    
+    upload_dir = os.path.join(settings.UPLOAD_FOLDER, "documents")
+    os.makedirs(upload_dir, exist_ok=True)
+    document_path = os.path.join(upload_dir, f"{uuid.uuid4()}.{file_extension}")
+    with open(document_path, "wb") as f:
+        f.write(file_content)
+    
+    try:
+        job_id = document_verifier.submit_verification(
+            document_path, document_type, user_id=current_user.id, content_hash=content_hash,
+            delete_after=True
+        )
+    except OCRPoolSaturatedError as e:
+        os.remove(document_path)
+        raise HTTPException(
+            status_code=503,
+            detail=e.message,
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    
+    if wait:
+        try:
+            job = await ocr_worker_pool.wait(job_id, timeout=timeout)
+            return {
+                "job_id": job_id,
+                "status": job["status"],
+                "result": document_verifier.get_job_result(job)
+            }
+        except asyncio.TimeoutError:
+            pass
+    
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.get("/documents/jobs/{job_id}")
+async def get_document_verification_job(
+    job_id: str,
+    current_user = Depends(get_current_user_compat)
+) -> Dict[str, Any]:
+    """
+    Get status and result of a document verification job
+    
+    Args:
+        job_id: Verification job ID
+        current_user: Current authenticated user
+        
+    Returns:
+        Job status, timing and result once finished
+    """
+    job = ocr_worker_pool.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Verification job not found")
+    
+    if job["owner_id"] != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    response = {k: v for k, v in job.items() if k != "result"}
+    if job["status"] != "pending":
+        response["result"] = document_verifier.get_job_result(job)
+    return response
+
+
+@router.get("/documents/metrics")
+async def get_document_verification_metrics(
+    current_user = Depends(get_current_user_compat)
+) -> Dict[str, Any]:
+    """
+    OCR worker pool utilisation, throughput (documents/minute) and result cache stats
+    """
+    return {
+        **ocr_worker_pool.get_metrics(),
+        "result_cache": ocr_result_cache.get_stats()
+    }
+
+
 @router.get("/health")
 async def ai_health_check() -> Dict[str, Any]:
     """
@@ -6,7 +6,11 @@ from typing import Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 
+from ..core.config import settings
 from ..core.blockchain import blockchain_service
+from ..services.donation_anchor_service import donation_anchor_service
+from ..services.chain_indexer_service import chain_event_indexer
+from ..services.stats_service import stats_service, BLOCKCHAIN_STATS
 from ..core.supabase import get_supabase_service, Tables
 from ..api.supabase_deps import get_current_user_supabase, get_current_admin_user_supabase
 
@@ -61,11 +65,18 @@ async def get_donation_transparency(
                 detail="Access denied"
             )
         
-        # Get transparency score from blockchain
-        transparency_score = await blockchain_service.get_transparency_score(donation_id)
+        # Transparency score and chain verification, from the event index when it runs
+        if settings.CHAIN_INDEXER_ENABLED:
+            transparency = await chain_event_indexer.get_donation_transparency(donation_id)
+        else:
+            transparency = await blockchain_service.get_donation_transparency(donation_id)
+        transparency_score = transparency["transparency_score"]
+        verification_result = transparency["verification"]
         
-        # Verify donation chain
-        verification_result = await blockchain_service.verify_donation_chain(donation_id)
+        # Membership of the donation record in its anchored batch, checked offline
+        anchor = await donation_anchor_service.verify_donation_inclusion(
+            donation_id, donation.get("metadata_hash")
+        )
         
         # Get blockchain transaction hash
         blockchain_tx = supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).select("*").eq(
@@ -75,6 +86,8 @@ async def get_donation_transparency(
         blockchain_hash = None
         if blockchain_tx.data:
             blockchain_hash = blockchain_tx.data[0]["blockchain_hash"]
+        elif anchor["anchored"]:
+            blockchain_hash = anchor["tx_hash"]
         
         return {
             "donationId": donation_id,
@@ -83,8 +96,11 @@ async def get_donation_transparency(
             "totalTransactions": verification_result["total_transactions"] if verification_result else 0,
             "brokenLinks": verification_result["broken_links"] if verification_result else 0,
             "invalidHashes": verification_result["invalid_hashes"] if verification_result else 0,
+            "issues": verification_result["issues"] if verification_result else 0,
             "verifiedAt": verification_result["verified_at"] if verification_result else None,
-            "blockchainHash": blockchain_hash
+            "blockchainHash": blockchain_hash,
+            "indexedBlock": transparency.get("block_number"),
+            "anchor": anchor
         }
         
     except HTTPException as e:
@@ -143,6 +159,7 @@ async def record_donation_blockchain(
             "status": "confirmed",
             "network_id": "ytili_saga"
         }).execute()
+        stats_service.invalidate(BLOCKCHAIN_STATS)
         
         return {
             "success": True,
@@ -170,7 +187,10 @@ async def verify_donation_chain(
         # Verify donation chain
         verification_result = await blockchain_service.verify_donation_chain(donation_id)
         
-        if not verification_result:
+        # The anchored inclusion proof can still be checked when the chain is unreachable
+        anchor = await donation_anchor_service.verify_donation_inclusion(donation_id, check_chain=True)
+        
+        if not verification_result and not anchor["anchored"]:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to verify donation chain"
@@ -179,7 +199,7 @@ async def verify_donation_chain(
         return {
             "success": True,
             "message": "Donation chain verified successfully",
-            "data": verification_result
+            "data": {**(verification_result or {}), "anchor": anchor}
         }
         
     except HTTPException as e:
@@ -191,6 +211,26 @@ async def verify_donation_chain(
         )
 
 
+@router.get("/anchor/{donation_id}/proof")
+async def get_donation_anchor_proof(donation_id: str) -> Dict[str, Any]:
+    """
+    Merkle inclusion proof of a donation record (public).
+    
+    Anyone can recompute the leaf from the donation ID and metadata hash, fold
+    in the proof and compare with the root carried by the anchor transaction.
+    """
+    
+    proof = await donation_anchor_service.get_inclusion_proof(donation_id)
+    
+    if proof is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No anchor record for this donation"
+        )
+    
+    return proof
+
+
 @router.get("/contracts/info")
 async def get_contract_info() -> Dict[str, Any]:
     """Get smart contract information"""
@@ -227,27 +267,13 @@ async def get_blockchain_stats() -> Dict[str, Any]:
     """Get blockchain statistics"""
     
     try:
-        supabase = get_supabase_service()
-        
-        # Get total blockchain transactions
-        blockchain_txs = supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).select(
-            "id", count="exact"
-        ).execute()
-        
-        # Get verified donations
-        verified_donations = supabase.table(Tables.DONATIONS).select(
-            "id", count="exact"
-        ).eq("status", "verified").execute()
-        
-        # Get total donations with blockchain records
-        donations_on_chain = supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).select(
-            "donation_id", count="exact"
-        ).execute()
+        # Transaction, verified donation and on-chain donation counts in one call, or from the cache
+        stats = await stats_service.get_blockchain_stats()
         
         return {
-            "total_blockchain_transactions": blockchain_txs.count or 0,
-            "verified_donations": verified_donations.count or 0,
-            "donations_on_chain": donations_on_chain.count or 0,
+            "total_blockchain_transactions": stats["total_blockchain_transactions"],
+            "verified_donations": stats["verified_donations"],
+            "donations_on_chain": stats["donations_on_chain"],
             "transparency_enabled": True,
             "network_status": "active"
         }
@@ -263,6 +289,20 @@ async def get_blockchain_stats() -> Dict[str, Any]:
         }
 
 
+@router.get("/indexer/status")
+async def get_indexer_status() -> Dict[str, Any]:
+    """Contract event index progress and its lag behind the chain head"""
+    
+    try:
+        return await chain_event_indexer.get_status()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get indexer status: {str(e)}"
+        )
+
+
 @router.get("/user/transactions")
 async def get_user_blockchain_transactions(
     current_user: Dict[str, Any] = Depends(get_current_user_supabase),
@@ -16,7 +16,8 @@ from ..models.user import User
 from ..models.donation import DonationType, DonationStatus, PaymentStatus
 from ..services.donation_service import DonationService
 from ..core.supabase import get_supabase_service, Tables
-from ..core.blockchain import blockchain_service
+from ..services.blockchain_outbox_service import blockchain_outbox_dispatcher
+from ..services.stats_service import stats_service, DONATION_STATS
 
 router = APIRouter()
 
@@ -87,7 +88,7 @@ async def create_donation(
     donation_data: DonationCreate,
     current_user: dict = Depends(get_current_verified_user_supabase)
 ):
-    """Create a new donation - Blockchain-first approach"""
+    """Create a new donation; it is recorded on chain in the background"""
 
     try:
         supabase = get_supabase_service()
@@ -124,52 +125,14 @@ async def create_donation(
         donation_id = str(uuid.uuid4())
         metadata_hash = calculate_metadata_hash(donation_dict)
 
-        # Map donation type to integer for blockchain
-        type_mapping = {
-            'medication': 1,
-            'medical_supply': 2,
-            'food': 3,
-            'cash': 4
-        }
-
-        # STEP 1: Record on blockchain FIRST
-        blockchain_tx = await blockchain_service.record_donation_on_blockchain(
-            donation_id=donation_id,
-            donor_id=current_user['id'],
-            donation_type=type_mapping[donation_dict['donation_type']],
-            title=donation_dict['title'],
-            description=donation_dict.get('description', ''),
-            amount=int((donation_dict.get('amount', 0) or 0) * 100),  # Convert to cents
-            item_name=donation_dict.get('item_name', ''),
-            quantity=donation_dict.get('quantity', 0) or 0,
-            unit=donation_dict.get('unit', ''),
-            metadata_hash=metadata_hash
-        )
-
-        if not blockchain_tx:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to record donation on blockchain. Transaction aborted."
-            )
-
-        # STEP 2: Add blockchain tracking fields to donation data
+        # STEP 1: Insert as pending: the database queues the on-chain record in
+        # blockchain_outbox in the same transaction (migration 014), and the
+        # outbox dispatcher records it and notifies the donor once confirmed
         donation_dict['id'] = donation_id
-        donation_dict['blockchain_status'] = 'confirmed'
-        donation_dict['blockchain_tx_hash'] = blockchain_tx
+        donation_dict['blockchain_status'] = 'pending'
         donation_dict['metadata_hash'] = metadata_hash
-        
-        # Import datetime at module level to avoid local variable error
-        from datetime import datetime
-        
-        # Try to add blockchain_recorded_at, but handle schema mismatch gracefully
-        try:
-            donation_dict['blockchain_recorded_at'] = datetime.utcnow().isoformat()
-        except Exception as e:
-            print(f"Warning: blockchain_recorded_at field may not exist in schema: {e}")
-            # Remove the field if it causes issues
-            donation_dict.pop('blockchain_recorded_at', None)
 
-        # STEP 3: Insert into Supabase database with error handling
+        # STEP 2: Insert into Supabase database with error handling
         try:
             result = supabase.table(Tables.DONATIONS).insert(donation_dict).execute()
         except Exception as db_error:
@@ -196,26 +159,16 @@ async def create_donation(
                 raise db_error
 
         if not result.data:
-            # If database insert fails, we should ideally revert blockchain transaction
-            # For now, we'll log the error and continue
-            print(f"Warning: Database insert failed but blockchain transaction {blockchain_tx} succeeded")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to create donation in database"
             )
 
         donation = result.data[0]
+        stats_service.invalidate(DONATION_STATS, current_user['id'])
 
-        # STEP 4: Record blockchain transaction in tracking table
-        try:
-            supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).insert({
-                "donation_id": donation_id,
-                "blockchain_hash": blockchain_tx,
-                "status": "confirmed",
-                "network_id": "ytili_saga"
-            }).execute()
-        except Exception as e:
-            print(f"Warning: Failed to record blockchain transaction tracking: {e}")
+        # STEP 3: Submit now rather than at the dispatcher's next poll
+        blockchain_outbox_dispatcher.wake()
 
         return {
             "id": donation.get("id"),
@@ -318,35 +271,20 @@ async def get_donation_stats(
     """Get donation statistics for user"""
 
     try:
-        supabase = get_supabase_service()
         user_id = current_user.get("id")
 
-        # Get total donations
-        total_donations = supabase.table(Tables.DONATIONS).select(
-            "id", count="exact"
-        ).eq("donor_id", user_id).execute()
-
-        # Get active donations (pending, matched, delivered)
-        active_donations = supabase.table(Tables.DONATIONS).select(
-            "id", count="exact"
-        ).eq("donor_id", user_id).in_(
-            "status", ["pending", "matched", "delivered"]
-        ).execute()
-
-        # Get completed donations
-        completed_donations = supabase.table(Tables.DONATIONS).select(
-            "id", count="exact"
-        ).eq("donor_id", user_id).eq("status", "completed").execute()
+        # Total, active (pending, matched, delivered) and completed counts in one call, or from the cache
+        stats = await stats_service.get_donation_stats(user_id)
 
         # Calculate total impact (simplified - could be more sophisticated)
-        total_impact = (completed_donations.count or 0) * 3  # Assume each donation helps 3 people on average
+        total_impact = stats["completed_donations"] * 3  # Assume each donation helps 3 people on average
 
         return {
             "success": True,
             "stats": {
-                "total_donations": total_donations.count or 0,
-                "active_donations": active_donations.count or 0,
-                "completed_donations": completed_donations.count or 0,
+                "total_donations": stats["total_donations"],
+                "active_donations": stats["active_donations"],
+                "completed_donations": stats["completed_donations"],
                 "total_impact": total_impact
             }
         }
@@ -508,13 +446,13 @@ async def accept_donation(
         )
     
     # Update donation with recipient and status
-    donation.recipient_id = current_user.id
     await donation_service.update_donation_status(
         donation_id=donation_id,
         status=DonationStatus.MATCHED,
         actor_id=current_user.id,
         actor_type="hospital",
-        description=f"Donation accepted by {current_user.organization_name}"
+        description=f"Donation accepted by {current_user.organization_name}",
+        recipient_id=current_user.id
     )
     
     return {"message": "Donation accepted successfully"}
@@ -10,6 +10,7 @@ from ..core.database import get_db
 from ..api.deps import get_current_admin_user
 from ..models.user import User
 from ..services.fraud_detection_service import FraudDetectionService
+from ..services.fraud_scan_scheduler import fraud_scan_scheduler
 
 router = APIRouter()
 
@@ -37,18 +38,35 @@ class FraudRiskResponse(BaseModel):
 
 @router.get("/scan", response_model=List[dict])
 async def scan_for_suspicious_activity(
+    severity: Optional[str] = Query(None, description="Only findings of this severity"),
     current_user: User = Depends(get_current_admin_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Scan for suspicious activity (admin only)"""
+    """Suspicious activity found by the latest background scan (admin only)"""
     
     fraud_service = FraudDetectionService(db)
     
-    suspicious_activities = await fraud_service.scan_for_suspicious_activity()
+    suspicious_activities = await fraud_service.get_active_activities(severity=severity)
     
     return suspicious_activities
 
 
+@router.post("/scan")
+async def trigger_fraud_scan(
+    full: bool = Query(False, description="Re-check all history instead of changes since the last scan"),
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Start a fraud scan now instead of waiting for the next scheduled one (admin only)"""
+    
+    started = fraud_scan_scheduler.trigger(full)
+    
+    return {
+        "started": started,
+        "message": "Fraud scan started" if started else "A fraud scan is already running",
+        "last_result": fraud_scan_scheduler.last_result
+    }
+
+
 @router.get("/user/{user_id}/risk", response_model=FraudRiskResponse)
 async def get_user_fraud_risk(
     user_id: int,
@@ -73,65 +91,23 @@ async def get_fraud_dashboard(
     
     fraud_service = FraudDetectionService(db)
     
-    # Get suspicious activities
-    suspicious_activities = await fraud_service.scan_for_suspicious_activity()
-    
-    # Count by severity
-    severity_counts = {
-        "high": 0,
-        "medium": 0,
-        "low": 0
-    }
-    
-    for activity in suspicious_activities:
-        severity = activity.get("severity", "low")
-        severity_counts[severity] = severity_counts.get(severity, 0) + 1
-    
-    # Count by type
-    type_counts = {}
-    for activity in suspicious_activities:
-        activity_type = activity.get("type", "unknown")
-        type_counts[activity_type] = type_counts.get(activity_type, 0) + 1
-    
-    # Get high-risk users
-    from sqlalchemy import select, func
-    from ..models.user import User
-    
-    high_risk_users = []
-    
-    # Get users with suspicious activities
-    user_ids = set()
-    for activity in suspicious_activities:
-        if "user_id" in activity:
-            user_ids.add(activity["user_id"])
+    # Served from the latest background scan
+    snapshot = await fraud_service.get_dashboard_snapshot()
     
-    # Get risk scores for these users
-    for user_id in user_ids:
-        risk_assessment = await fraud_service.get_fraud_risk_score(user_id)
-        if risk_assessment["risk_level"] == "high":
-            # Get user details
-            user_result = await db.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = user_result.scalar_one_or_none()
-            
-            if user:
-                high_risk_users.append({
-                    "user_id": user_id,
-                    "email": user.email,
-                    "full_name": user.full_name,
-                    "user_type": user.user_type.value,
-                    "risk_score": risk_assessment["risk_score"],
-                    "risk_factors": risk_assessment["factors"]
-                })
+    if snapshot is None:
+        # No scan has completed yet
+        fraud_scan_scheduler.trigger()
+        return {
+            "total_suspicious_activities": 0,
+            "severity_counts": {"high": 0, "medium": 0, "low": 0},
+            "type_counts": {},
+            "high_risk_users": [],
+            "recent_activities": [],
+            "last_scan_at": None,
+            "scan_in_progress": True
+        }
     
-    return {
-        "total_suspicious_activities": len(suspicious_activities),
-        "severity_counts": severity_counts,
-        "type_counts": type_counts,
-        "high_risk_users": high_risk_users,
-        "recent_activities": suspicious_activities[:10]  # Return 10 most recent
-    }
+    return {**snapshot, "scan_in_progress": fraud_scan_scheduler.is_scanning}
 
 
 @router.post("/analyze-campaign")
@@ -2,12 +2,14 @@
 Fundraising Campaign API endpoints
 """
 from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, BackgroundTasks
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 
 from ..api.supabase_deps import get_current_user_supabase, get_current_verified_user_supabase
 from ..core.supabase import get_supabase_service, Tables
+from ..ai_agent.campaign_similarity import campaign_similarity_index
+from ..ai_agent.fraud_detector import fraud_detector
 
 router = APIRouter()
 
@@ -48,6 +50,7 @@ class DonationToCampaign(BaseModel):
 @router.post("/campaigns")
 async def create_campaign(
     campaign_data: CampaignCreate,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_verified_user_supabase)
 ):
     """Create a new fundraising campaign"""
@@ -88,6 +91,18 @@ async def create_campaign(
         
         campaign = result.data[0]
         
+        # Flag copy-paste stories from other owners, then index this one
+        duplicate_campaigns = await campaign_similarity_index.check_and_index(campaign)
+        
+        background_tasks.add_task(fraud_detector.analyze_campaign, {
+            "id": campaign.get("id"),
+            "user_id": campaign.get("creator_id"),
+            "description": campaign.get("description", ""),
+            "beneficiary_story": campaign.get("beneficiary_story", ""),
+            "goal_amount": campaign.get("target_amount", 0),
+            "documents": campaign.get("medical_documents", [])
+        })
+        
         return {
             "id": campaign.get("id"),
             "title": campaign.get("title"),
@@ -99,7 +114,8 @@ async def create_campaign(
             "created_at": campaign.get("created_at"),
             "end_date": campaign.get("end_date"),
             "creator_id": campaign.get("creator_id"),
-            "urgency_level": campaign.get("urgency_level", "normal")
+            "urgency_level": campaign.get("urgency_level", "normal"),
+            "possible_duplicate_count": len(duplicate_campaigns)
         }
         
     except HTTPException:
@@ -7,10 +7,14 @@ from fastapi import APIRouter, HTTPException, status, Depends, Query
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
 
+from ..core.config import settings
 from ..core.blockchain import blockchain_service
 from ..core.supabase import get_supabase_service, Tables
 from ..api.supabase_deps import get_current_user_supabase
 from ..services.notification_service import notification_service
+from ..services.chain_indexer_service import chain_event_indexer
+from ..services.governance_service import governance_service
+from ..services.stats_service import stats_service, GOVERNANCE_STATS
 import structlog
 
 logger = structlog.get_logger()
@@ -110,6 +114,13 @@ async def create_proposal(
             )
         
         proposal_record = result.data[0]
+        stats_service.invalidate(GOVERNANCE_STATS, user_id)
+        
+        # Snapshot voting power; a failed snapshot is retaken by the first vote
+        try:
+            await governance_service.snapshot_voting_power(proposal_record["id"])
+        except Exception as e:
+            logger.error("Failed to snapshot voting power", proposal_id=proposal_record["id"], error=str(e))
         
         # Send notification to community
         await notification_service.notify_system_message(
@@ -168,15 +179,13 @@ async def get_proposals(
         # Execute query with pagination
         result = query.order("created_at", desc=True).range(offset, offset + limit - 1).execute()
         
+        # On-chain state of the whole page, in one round trip
+        blockchain_data = await _get_proposals_on_chain([
+            proposal["id"] for proposal in result.data or [] if proposal.get("blockchain_hash")
+        ])
+        
         proposals = []
         for proposal in result.data or []:
-            # Get additional blockchain data if needed
-            blockchain_data = None
-            if proposal.get("blockchain_hash"):
-                blockchain_data = await blockchain_service.get_proposal_from_blockchain(
-                    proposal["id"]
-                )
-            
             proposal_response = {
                 "id": proposal["id"],
                 "proposer": proposal.get("proposer", {}).get("full_name", "Unknown"),
@@ -194,6 +203,7 @@ async def get_proposals(
                 "executed": proposal.get("executed", False),
                 "cancelled": proposal.get("cancelled", False),
                 "blockchain_hash": proposal.get("blockchain_hash"),
+                "blockchain_data": blockchain_data.get(proposal["id"]),
                 "created_at": proposal["created_at"],
                 "updated_at": proposal.get("updated_at")
             }
@@ -251,7 +261,7 @@ async def get_proposal(
         # Get blockchain data
         blockchain_data = None
         if proposal.get("blockchain_hash"):
-            blockchain_data = await blockchain_service.get_proposal_from_blockchain(proposal_id)
+            blockchain_data = (await _get_proposals_on_chain([proposal_id]))[proposal_id]
         
         return {
             "success": True,
@@ -339,8 +349,9 @@ async def cast_vote(
                 detail="You have already voted on this proposal"
             )
         
-        # Get user's voting power (YTILI token balance)
-        voting_power = await blockchain_service.get_ytili_balance(user_id)
+        # Get user's voting power (YTILI tokens when the proposal was created)
+        await governance_service.ensure_snapshot(proposal)
+        voting_power = await governance_service.get_voting_power(proposal_id, user_id)
         
         if voting_power <= 0:
             raise HTTPException(
@@ -362,26 +373,20 @@ async def cast_vote(
                 detail="Failed to cast vote on blockchain"
             )
         
-        # Store vote in database
-        vote_data = {
-            "proposal_id": proposal_id,
-            "voter_id": user_id,
-            "vote_type": vote.vote_type,
-            "voting_power": str(voting_power),
-            "blockchain_hash": blockchain_tx,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        vote_result = supabase.table(Tables.GOVERNANCE_VOTES).insert(vote_data).execute()
+        # Store vote and add it to the proposal vote counts in one transaction
+        vote_id = await governance_service.record_vote(
+            proposal_id=proposal_id,
+            voter_id=user_id,
+            vote_type=vote.vote_type,
+            blockchain_hash=blockchain_tx
+        )
         
-        if not vote_result.data:
+        if vote_id is None:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to store vote in database"
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="You have already voted on this proposal"
             )
-        
-        # Update proposal vote counts
-        await _update_proposal_vote_counts(proposal_id)
+        stats_service.invalidate(GOVERNANCE_STATS, user_id)
         
         # Send notification
         vote_type_names = ["For", "Against", "Abstain"]
@@ -401,7 +406,7 @@ async def cast_vote(
         
         return {
             "success": True,
-            "vote_id": vote_result.data[0]["id"],
+            "vote_id": vote_id,
             "blockchain_hash": blockchain_tx,
             "message": "Vote cast successfully"
         }
@@ -416,46 +421,12 @@ async def cast_vote(
         )
 
 
-async def _update_proposal_vote_counts(proposal_id: int):
-    """Update proposal vote counts from database"""
+async def _get_proposals_on_chain(proposal_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+    """On-chain proposal state from the event index when it runs, else read from the chain"""
     
-    try:
-        supabase = get_supabase_service()
-        
-        # Get all votes for this proposal
-        votes_result = supabase.table(Tables.GOVERNANCE_VOTES).select("*").eq(
-            "proposal_id", proposal_id
-        ).execute()
-        
-        votes_for = 0
-        votes_against = 0
-        votes_abstain = 0
-        total_votes = 0
-        
-        for vote in votes_result.data or []:
-            voting_power = int(vote["voting_power"])
-            vote_type = vote["vote_type"]
-            
-            if vote_type == 0:  # For
-                votes_for += voting_power
-            elif vote_type == 1:  # Against
-                votes_against += voting_power
-            elif vote_type == 2:  # Abstain
-                votes_abstain += voting_power
-            
-            total_votes += voting_power
-        
-        # Update proposal
-        supabase.table(Tables.GOVERNANCE_PROPOSALS).update({
-            "votes_for": str(votes_for),
-            "votes_against": str(votes_against),
-            "votes_abstain": str(votes_abstain),
-            "total_votes": str(total_votes),
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", proposal_id).execute()
-        
-    except Exception as e:
-        logger.error("Failed to update proposal vote counts", error=str(e))
+    if settings.CHAIN_INDEXER_ENABLED:
+        return await chain_event_indexer.get_proposals(proposal_ids)
+    return await blockchain_service.get_proposals_from_blockchain(proposal_ids)
 
 
 @router.get("/stats")
@@ -465,46 +436,18 @@ async def get_governance_stats(
     """Get governance statistics"""
     
     try:
-        supabase = get_supabase_service()
-        
-        # Get total proposals
-        total_proposals = supabase.table(Tables.GOVERNANCE_PROPOSALS).select(
-            "id", count="exact"
-        ).execute()
-        
-        # Get active proposals
-        active_proposals = supabase.table(Tables.GOVERNANCE_PROPOSALS).select(
-            "id", count="exact"
-        ).eq("status", "active").execute()
-        
-        # Get executed proposals
-        executed_proposals = supabase.table(Tables.GOVERNANCE_PROPOSALS).select(
-            "id", count="exact"
-        ).eq("status", "executed").execute()
-        
-        # Get total votes
-        total_votes = supabase.table(Tables.GOVERNANCE_VOTES).select(
-            "id", count="exact"
-        ).execute()
-        
-        # Get user's participation
-        user_proposals = supabase.table(Tables.GOVERNANCE_PROPOSALS).select(
-            "id", count="exact"
-        ).eq("proposer_id", current_user["id"]).execute()
-        
-        user_votes = supabase.table(Tables.GOVERNANCE_VOTES).select(
-            "id", count="exact"
-        ).eq("voter_id", current_user["id"]).execute()
+        # Platform-wide and user's own counts in one call, or from the cache
+        stats = await stats_service.get_governance_stats(current_user["id"])
         
         return {
             "success": True,
             "stats": {
-                "total_proposals": total_proposals.count or 0,
-                "active_proposals": active_proposals.count or 0,
-                "executed_proposals": executed_proposals.count or 0,
-                "total_votes": total_votes.count or 0,
-                "user_proposals": user_proposals.count or 0,
-                "user_votes": user_votes.count or 0,
+                "total_proposals": stats["total_proposals"],
+                "active_proposals": stats["active_proposals"],
+                "executed_proposals": stats["executed_proposals"],
+                "total_votes": stats["total_votes"],
+                "user_proposals": stats["user_proposals"],
+                "user_votes": stats["user_votes"],
                 "min_proposal_threshold": "1000 YTILI",
                 "voting_period": "7 days",
                 "quorum_percentage": "10%"
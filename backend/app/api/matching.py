@@ -4,14 +4,16 @@ Donation matching API endpoints
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from ..core.config import settings
 from ..core.database import get_db
 from ..api.deps import get_current_verified_user, get_current_hospital_user
 from ..models.user import User
 from ..models.donation import Donation, DonationStatus
 from ..services.donation_service import DonationService
 from ..services.matching_service import MatchingService
+from ..services.hospital_stats_service import HospitalStatsService
 
 router = APIRouter()
 
@@ -34,6 +36,25 @@ class MatchRequest(BaseModel):
     max_distance_km: Optional[float] = 50.0
 
 
+class BatchAllocationRequest(BaseModel):
+    """Schema for allocating many donations at once"""
+    donation_ids: Optional[List[int]] = None  # Defaults to all of the donor's unmatched verified donations
+    max_distance_km: float = Field(50.0, gt=0)
+    hospital_capacity: int = Field(settings.MATCHING_HOSPITAL_CAPACITY, gt=0)
+
+
+class BatchAllocationItem(BaseModel):
+    """Schema for one accepted allocation"""
+    donation_id: int
+    hospital_id: int
+
+
+class BatchCommitRequest(BaseModel):
+    """Schema for committing a previewed allocation"""
+    allocations: List[BatchAllocationItem]
+    hospital_capacity: int = Field(settings.MATCHING_HOSPITAL_CAPACITY, gt=0)  # The capacity used for the preview
+
+
 @router.post("/find", response_model=List[MatchResponse])
 async def find_matches(
     match_request: MatchRequest,
@@ -81,7 +102,7 @@ async def find_matches(
                 hospital_name=hospital.organization_name or hospital.full_name,
                 score=match["score"],
                 reasons=match["reasons"],
-                distance_km=0.0  # Placeholder - would calculate actual distance
+                distance_km=match["distance_km"]
             )
         )
     
@@ -111,13 +132,13 @@ async def accept_match(
         )
     
     # Update donation with recipient and status
-    donation.recipient_id = current_user.id
     await donation_service.update_donation_status(
         donation_id=donation_id,
         status=DonationStatus.MATCHED,
         actor_id=current_user.id,
         actor_type="hospital",
-        description=f"Donation matched with {current_user.organization_name or current_user.full_name}"
+        description=f"Donation matched with {current_user.organization_name or current_user.full_name}",
+        recipient_id=current_user.id
     )
     
     return {
@@ -175,3 +196,121 @@ async def get_available_donations(
         })
     
     return response
+
+
+@router.post("/batch/preview")
+async def preview_batch_allocation(
+    request: BatchAllocationRequest,
+    current_user: User = Depends(get_current_verified_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Propose hospitals for many of the donor's verified donations at once"""
+    from sqlalchemy import select
+    
+    query = select(Donation).where(
+        Donation.donor_id == current_user.id,
+        Donation.status == DonationStatus.VERIFIED,
+        Donation.recipient_id.is_(None)
+    )
+    if request.donation_ids is not None:
+        query = query.where(Donation.id.in_(request.donation_ids))
+    
+    result = await db.execute(query.order_by(Donation.id).limit(settings.MATCHING_BATCH_MAX_DONATIONS + 1))
+    donations = result.scalars().all()
+    
+    if len(donations) > settings.MATCHING_BATCH_MAX_DONATIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.MATCHING_BATCH_MAX_DONATIONS} donations can be allocated at once"
+        )
+    
+    matching_service = MatchingService(db)
+    return await matching_service.allocate_batch(
+        donations, request.max_distance_km, request.hospital_capacity
+    )
+
+
+@router.post("/batch/commit")
+async def commit_batch_allocation(
+    request: BatchCommitRequest,
+    current_user: User = Depends(get_current_verified_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Match donations to the hospitals chosen in a batch preview"""
+    from sqlalchemy import select
+    
+    donation_service = DonationService(db)
+    matching_service = MatchingService(db)
+    stats_service = HospitalStatsService(db)
+    
+    donation_ids = [item.donation_id for item in request.allocations]
+    result = await db.execute(select(Donation).where(Donation.id.in_(donation_ids)))
+    donations = {donation.id: donation for donation in result.scalars().all()}
+    hospitals = {hospital.id: hospital for hospital in await matching_service._get_eligible_hospitals(None)}
+    
+    committed = []
+    skipped = []
+    for item in request.allocations:
+        donation = donations.get(item.donation_id)
+        hospital = hospitals.get(item.hospital_id)
+        
+        # Donations may have changed since the preview was computed
+        if not donation or donation.donor_id != current_user.id:
+            skipped.append({"donation_id": item.donation_id, "reason": "Donation not found"})
+            continue
+        if donation.status != DonationStatus.VERIFIED or donation.recipient_id is not None:
+            skipped.append({"donation_id": item.donation_id, "reason": "Donation is no longer available"})
+            continue
+        if not hospital:
+            skipped.append({"donation_id": item.donation_id, "reason": "Hospital is not eligible"})
+            continue
+        
+        # Other donors may have filled the hospital since the preview; the row stays
+        # locked until the match below commits, so the check cannot go stale
+        stats = (await stats_service.lock_stats([hospital.id]))[hospital.id]
+        if stats.open_count >= request.hospital_capacity:
+            await db.commit()  # Releases the lock; a rollback would expire the loaded donations
+            skipped.append({"donation_id": item.donation_id, "reason": "Hospital capacity exhausted"})
+            continue
+        
+        hospital_name = hospital.organization_name or hospital.full_name
+        await donation_service.update_donation_status(
+            donation_id=donation.id,
+            status=DonationStatus.MATCHED,
+            actor_id=current_user.id,
+            actor_type="donor",
+            description=f"Donation matched with {hospital_name} (batch allocation)",
+            recipient_id=hospital.id
+        )
+        committed.append({
+            "donation_id": donation.id,
+            "hospital_id": hospital.id,
+            "hospital_name": hospital_name
+        })
+    
+    return {
+        "message": f"{len(committed)} donations matched",
+        "committed": committed,
+        "skipped": skipped
+    }
+
+
+@router.get("/stats")
+async def get_hospital_stats(
+    current_user: User = Depends(get_current_hospital_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Donation statistics of the current hospital"""
+    stats = (await HospitalStatsService(db).get_features([current_user.id]))[current_user.id]
+    
+    return {
+        "hospital_id": current_user.id,
+        "total_donations": stats["total"],
+        "open_donations": stats["open"],
+        "completed_donations": stats["completed"],
+        "completion_rate": round(stats["completed"] / stats["total"], 3) if stats["total"] else 0.0,
+        "received_last_30_days": {
+            donation_type.value: count for donation_type, count in stats["recent_by_type"].items()
+        },
+        "last_received_at": stats["last_received_at"]
+    }
@@ -6,9 +6,12 @@ from typing import Dict, Any, List
 from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 
+from ..core.config import settings
 from ..core.blockchain import blockchain_service
 from ..core.supabase import get_supabase_service, Tables
 from ..api.supabase_deps import get_current_user_supabase
+from ..services.chain_indexer_service import chain_event_indexer
+from ..services.points_ledger_service import points_ledger_service
 
 router = APIRouter()
 
@@ -62,30 +65,17 @@ async def get_token_balance(
         # Get blockchain token balance if user has wallet
         blockchain_balance = 0
         if current_user.get("wallet_address"):
-            blockchain_balance = await blockchain_service.get_user_token_balance(
-                current_user["wallet_address"]
-            ) or 0
+            if settings.CHAIN_INDEXER_ENABLED:
+                blockchain_balance = await chain_event_indexer.get_token_balance(current_user["wallet_address"]) or 0
+            else:
+                blockchain_balance = await blockchain_service.get_user_token_balance(
+                    current_user["wallet_address"]
+                ) or 0
             # Convert from wei to tokens
             blockchain_balance = blockchain_balance / (10**18)
         
-        # Get recent transactions (simplified)
-        recent_transactions = [
-            {
-                "id": "tx1",
-                "type": "earned",
-                "amount": 100,
-                "reason": "Donation reward",
-                "timestamp": "2024-01-15T10:00:00Z",
-                "txHash": "0x123..."
-            },
-            {
-                "id": "tx2", 
-                "type": "redeemed",
-                "amount": 50,
-                "reason": "Medication discount",
-                "timestamp": "2024-01-14T15:30:00Z"
-            }
-        ]
+        # Get recent transactions from the points ledger
+        recent_transactions, _ = await points_ledger_service.get_history(current_user["id"], limit=5)
         
         return {
             "balance": points_data["available_points"] + blockchain_balance,
@@ -183,30 +173,20 @@ async def redeem_tokens(
                 detail="Redemption option not available"
             )
         
-        # Check user balance
-        balance_data = await get_token_balance(current_user)
-        if balance_data["balance"] < option.cost:
+        # Spend the points; the balance check and update are one atomic ledger entry
+        entry = await points_ledger_service.redeem(
+            user_id=current_user["id"],
+            points=option.cost,
+            reason=option.name,
+            reference=option.id
+        )
+        
+        if entry is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Insufficient token balance"
             )
         
-        # Update user points
-        supabase = get_supabase_service()
-        points_result = supabase.table(Tables.USER_POINTS).select("*").eq(
-            "user_id", current_user["id"]
-        ).execute()
-        
-        if points_result.data:
-            current_points = points_result.data[0]
-            new_available = current_points["available_points"] - option.cost
-            new_spent = current_points["lifetime_spent"] + option.cost
-            
-            supabase.table(Tables.USER_POINTS).update({
-                "available_points": new_available,
-                "lifetime_spent": new_spent
-            }).eq("user_id", current_user["id"]).execute()
-        
         # If user has wallet address, also redeem from blockchain
         if current_user.get("wallet_address"):
             try:
@@ -220,15 +200,12 @@ async def redeem_tokens(
                 print(f"Blockchain redemption failed: {blockchain_error}")
                 # Continue with database redemption only
         
-        # Record redemption (simplified)
-        # In a real implementation, you would integrate with actual services
-        
         return {
             "success": True,
             "message": f"Successfully redeemed {option.name}",
             "redeemed_item": option.name,
             "cost": option.cost,
-            "remaining_balance": balance_data["balance"] - option.cost
+            "remaining_balance": entry["balance_after"]
         }
         
     except HTTPException as e:
@@ -253,48 +230,27 @@ async def mint_reward_tokens(
     # For demo purposes, we'll allow it but in production it should be restricted
     
     try:
-        supabase = get_supabase_service()
-        
-        # Update user points in database
-        points_result = supabase.table(Tables.USER_POINTS).select("*").eq(
-            "user_id", user_id
-        ).execute()
-        
-        if points_result.data:
-            current_points = points_result.data[0]
-            new_total = current_points["total_points"] + amount
-            new_available = current_points["available_points"] + amount
-            new_earned = current_points["lifetime_earned"] + amount
-            
-            supabase.table(Tables.USER_POINTS).update({
-                "total_points": new_total,
-                "available_points": new_available,
-                "lifetime_earned": new_earned
-            }).eq("user_id", user_id).execute()
-        
-        # Get user wallet address for blockchain minting
-        user_result = supabase.table(Tables.USERS).select("wallet_address").eq(
-            "id", user_id
-        ).execute()
-        
-        blockchain_tx = None
-        if user_result.data and user_result.data[0].get("wallet_address"):
-            wallet_address = user_result.data[0]["wallet_address"]
-            blockchain_tx = await blockchain_service.mint_reward_tokens(
-                user_address=wallet_address,
-                user_id=user_id,
-                amount=amount * (10**18),  # Convert to wei
-                reason=reason
+        if amount <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Reward amount must be positive"
             )
+
+        # Credit the points atomically; the tokens are minted with the user's next
+        # reward batch once they have a wallet address
+        entry = await points_ledger_service.record_reward(user_id=user_id, points=amount, reason=reason)
         
         return {
             "success": True,
-            "message": "Reward tokens minted successfully",
+            "message": "Reward recorded; tokens are minted with the next reward batch",
             "amount": amount,
             "reason": reason,
-            "blockchain_tx": blockchain_tx
+            "ledger_entry_id": entry["id"],
+            "mint_status": "pending"
         }
         
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -311,48 +267,16 @@ async def get_token_history(
     """Get user's token transaction history"""
     
     try:
-        # In a real implementation, you would fetch from a transactions table
-        # For now, return mock data
-        
-        transactions = [
-            {
-                "id": "tx1",
-                "type": "earned",
-                "amount": 100,
-                "reason": "Donation reward",
-                "timestamp": "2024-01-15T10:00:00Z",
-                "txHash": "0x123...",
-                "status": "confirmed"
-            },
-            {
-                "id": "tx2",
-                "type": "redeemed", 
-                "amount": 50,
-                "reason": "Medication discount",
-                "timestamp": "2024-01-14T15:30:00Z",
-                "status": "completed"
-            },
-            {
-                "id": "tx3",
-                "type": "earned",
-                "amount": 25,
-                "reason": "Referral bonus",
-                "timestamp": "2024-01-13T09:15:00Z",
-                "txHash": "0x456...",
-                "status": "confirmed"
-            }
-        ]
-        
-        # Apply pagination
-        paginated_transactions = transactions[offset:offset + limit]
+        # One page of the points ledger with its total count
+        transactions, total = await points_ledger_service.get_history(current_user["id"], limit, offset)
         
         return {
             "success": True,
-            "data": paginated_transactions,
+            "data": transactions,
             "pagination": {
                 "limit": limit,
                 "offset": offset,
-                "total": len(transactions)
+                "total": total
             }
         }
         
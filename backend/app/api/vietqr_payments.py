@@ -7,7 +7,8 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel, Field
 
 from ..core.vietqr import vietqr_service
-from ..core.blockchain import blockchain_service
+from ..services.blockchain_outbox_service import blockchain_outbox_dispatcher
+from ..services.stats_service import stats_service, DONATION_STATS, BLOCKCHAIN_STATS
 from ..core.supabase import get_supabase_service, Tables
 from ..api.supabase_deps import get_current_user_supabase
 
@@ -106,51 +107,19 @@ async def verify_vietqr_payment(
             if payment_record.data:
                 donation_id = payment_record.data[0]["donation_id"]
                 
-                # Update donation status to verified
-                supabase.table(Tables.DONATIONS).update({
-                    "payment_status": "completed",
-                    "status": "verified"
-                }).eq("id", donation_id).execute()
-                
-                # Record on blockchain
-                try:
-                    blockchain_tx = await blockchain_service.update_donation_status_on_blockchain(
-                        donation_id=donation_id,
-                        new_status=1,  # VERIFIED
-                        actor_id=current_user["id"],
-                        actor_type="donor",
-                        description="VietQR payment verified and donation confirmed"
-                    )
-                    
-                    if blockchain_tx:
-                        # Store blockchain transaction hash
-                        supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).insert({
-                            "donation_id": donation_id,
-                            "blockchain_hash": blockchain_tx,
-                            "status": "confirmed",
-                            "network_id": "ytili_saga"
-                        }).execute()
-                        
-                except Exception as blockchain_error:
-                    print(f"Blockchain recording failed: {blockchain_error}")
-                    # Continue even if blockchain fails
-                
-                # Mint reward tokens for donor
-                try:
-                    if current_user.get("wallet_address"):
-                        reward_tx = await blockchain_service.mint_reward_tokens(
-                            user_address=current_user["wallet_address"],
-                            user_id=current_user["id"],
-                            amount=100 * 10**18,  # 100 YTILI tokens
-                            reason="vietqr_payment_verified"
-                        )
-                        
-                        if reward_tx:
-                            print(f"Reward tokens minted: {reward_tx}")
-                            
-                except Exception as reward_error:
-                    print(f"Reward minting failed: {reward_error}")
-                    # Continue even if reward fails
+                # Mark the donation verified and queue its on-chain status update and
+                # the donor's reward in one transaction; the outbox dispatcher
+                # submits both and notifies the donor once confirmed
+                supabase.rpc("verify_donation_payment", {
+                    "p_donation_id": donation_id,
+                    "p_actor_id": current_user["id"],
+                    "p_description": "VietQR payment verified and donation confirmed",
+                    "p_reward_address": current_user.get("wallet_address"),
+                    "p_reward_amount": str(100 * 10**18)  # 100 YTILI tokens
+                }).execute()
+                stats_service.invalidate(DONATION_STATS, current_user["id"])
+                stats_service.invalidate(BLOCKCHAIN_STATS)
+                blockchain_outbox_dispatcher.wake()
         
         return {
             "success": True,
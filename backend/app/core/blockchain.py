@@ -5,21 +5,89 @@ Handles interaction with Saga blockchain smart contracts
 import json
 import asyncio
 import os
-from typing import Dict, Any, Optional, List
-from web3 import Web3
-from web3.contract import Contract
+from typing import Dict, Any, Optional, List, Awaitable, Callable, Tuple
+import aiohttp
+from hexbytes import HexBytes
+from web3 import AsyncWeb3, AsyncHTTPProvider
+from web3.exceptions import TimeExhausted, TransactionNotFound
 from eth_account import Account
 
 from .config import settings
+from .nonce_manager import NonceManager
+from .receipt_tracker import ReceiptTracker
+from .chain_reader import ChainReader
+
+# Marks anchor transactions; followed by the 32-byte Merkle root and a 4-byte leaf count
+ANCHOR_DATA_PREFIX = b"ytili-anchor"
+
+NONCE_RETRIES = 3
+
+# Called with the hash of each signed version of a transaction before it is sent
+SentCallback = Callable[[str], Awaitable[None]]
+
+# Field order of YtiliGovernance.getProposal
+PROPOSAL_FIELDS = (
+    "id", "proposer", "title", "description", "category", "start_time", "end_time",
+    "votes_for", "votes_against", "votes_abstain", "total_votes", "executed", "cancelled", "status"
+)
+# Token amounts exceed JSON number precision
+PROPOSAL_VOTE_FIELDS = ("votes_for", "votes_against", "votes_abstain", "total_votes")
+
+
+def _is_nonce_error(error: Exception) -> bool:
+    """Node rejected the nonce: already used, or taken by a pending transaction"""
+    message = str(error).lower()
+    return any(reason in message for reason in (
+        "nonce too low", "invalid transaction nonce", "already known", "replacement transaction underpriced"
+    ))
 
 
 class BlockchainService:
-    """Service for interacting with Ytili smart contracts on Saga blockchain"""
+    """
+    Service for interacting with Ytili smart contracts on Saga blockchain
+
+    Built on AsyncWeb3 so RPC round trips and receipt polling never block the
+    event loop. start() gives the provider a pooled HTTP session and keeps
+    the connectivity state fresh in the background, so availability checks
+    cost no RPC. Every chain call is bounded by an explicit timeout, and
+    one receipt tracker confirms all in-flight transactions together.
+    Contract reads go through one batching, block-cached read layer.
+    """
     
-    def __init__(self):
+    def __init__(self, w3: Optional[AsyncWeb3] = None):
+        # w3 lets scripts point the service at another chain, e.g. a local test chain
+        self.chain_id = (
+            int(settings.SAGA_CHAIN_ID.split('_')[1].split('-')[0]) if '_' in settings.SAGA_CHAIN_ID else 2752546100676000
+        )
+        self.call_timeout = settings.BLOCKCHAIN_CALL_TIMEOUT
+        self.receipt_timeout = settings.BLOCKCHAIN_RECEIPT_TIMEOUT
+
+        # None until the first health check: calls are attempted and bounded by their timeouts
+        self._connected: Optional[bool] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+        self.w3 = w3 or AsyncWeb3(AsyncHTTPProvider(
+            settings.SAGA_RPC_URL,
+            request_kwargs={"timeout": aiohttp.ClientTimeout(total=settings.BLOCKCHAIN_RPC_TIMEOUT)}
+        ))
+
+        self.gas_bumps = 0
+        self.receipts = ReceiptTracker(
+            self.w3,
+            confirmations=settings.BLOCKCHAIN_CONFIRMATIONS,
+            batch_size=settings.BLOCKCHAIN_RECEIPT_BATCH_SIZE,
+            call_timeout=self.call_timeout
+        )
+        self.reads = ChainReader(
+            self.w3,
+            cache_ttl=settings.BLOCKCHAIN_READ_CACHE_TTL,
+            batch_size=settings.BLOCKCHAIN_READ_BATCH_SIZE
+        )
+
         try:
-            self.w3 = Web3(Web3.HTTPProvider(settings.SAGA_RPC_URL))
             self.account = Account.from_key(settings.SAGA_PRIVATE_KEY)
+            self.nonces = NonceManager(self.w3, self.account.address)
 
             # Load contract ABIs from compiled artifacts (with fallback)
             self.donation_registry_abi = self._load_contract_abi("DonationRegistry")
@@ -28,6 +96,8 @@ class BlockchainService:
             self.ytili_governance_abi = self._load_contract_abi("YtiliGovernance")
         except Exception as e:
             print(f"Warning: Blockchain initialization failed: {e}")
+            self.account = None
+            self.nonces = None
             # Set fallback ABIs
             self.donation_registry_abi = []
             self.transparency_verifier_abi = []
@@ -62,6 +132,158 @@ class BlockchainService:
             self.ytili_token = None
             self.ytili_governance = None
     
+    async def start(self) -> None:
+        """Share one pooled HTTP session for all RPC calls and start the health check loop"""
+        provider = self.w3.provider
+        if self._session is None and isinstance(provider, AsyncHTTPProvider):
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=settings.BLOCKCHAIN_RPC_POOL_SIZE),
+                timeout=aiohttp.ClientTimeout(total=settings.BLOCKCHAIN_RPC_TIMEOUT)
+            )
+            await provider.cache_async_session(self._session)
+        
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.get_running_loop().create_task(self._check_health_periodically())
+    
+    async def stop(self) -> None:
+        if self._health_task is not None and not self._health_task.done():
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+        self._health_task = None
+        
+        await self.receipts.stop()
+        
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+    
+    async def refresh_connectivity(self) -> bool:
+        """Probe the RPC node once and cache the result"""
+        try:
+            self._connected = await asyncio.wait_for(self.w3.is_connected(), settings.BLOCKCHAIN_RPC_TIMEOUT)
+        except Exception:
+            self._connected = False
+        return self._connected
+    
+    async def _check_health_periodically(self) -> None:
+        while True:
+            was_connected = self._connected
+            if await self.refresh_connectivity() != was_connected:
+                print(f"Blockchain connectivity changed: connected={self._connected}")
+                if self._connected and self.nonces is not None:
+                    # Transactions may have been sent elsewhere in the meantime
+                    self.nonces.reset()
+            await asyncio.sleep(settings.BLOCKCHAIN_HEALTH_INTERVAL)
+    
+    async def _call(self, awaitable: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Await one chain request with an upper bound on its duration"""
+        timeout = timeout or self.call_timeout
+        try:
+            return await asyncio.wait_for(awaitable, timeout)
+        except asyncio.TimeoutError:
+            # Skip the chain until the health check sees the node again
+            self._connected = False
+            raise asyncio.TimeoutError(f"chain call timed out after {timeout}s")
+        except aiohttp.ClientConnectionError:
+            self._connected = False
+            raise
+    
+    def _transaction_params(self, gas: int) -> Dict[str, Any]:
+        return {
+            'from': self.account.address,
+            'gas': gas,
+            'gasPrice': self.w3.to_wei('20', 'gwei'),
+            'chainId': self.chain_id
+        }
+    
+    async def _send_transaction(self, transaction: Dict[str, Any], on_sent: Optional[SentCallback] = None) -> Any:
+        """
+        Sign with the platform key under a locally allocated nonce, send and
+        wait for the receipt within the receipt timeout
+
+        Concurrent callers each get their own nonce, so their transactions are
+        in flight together instead of one per receipt. on_sent receives the
+        hash of every version before it is sent, so a caller can find the
+        transaction again after a timeout instead of sending it twice.
+        """
+        for attempt in range(NONCE_RETRIES):
+            transaction = {**transaction, 'nonce': await self._call(self.nonces.allocate())}
+            try:
+                tx_hash = await self._sign_and_send(transaction, on_sent)
+                break
+            except Exception as e:
+                # An unsent nonce would block every later transaction, and a
+                # rejected one means the local count drifted: take it from the chain
+                await self._call(self.nonces.resync())
+                if not _is_nonce_error(e) or attempt == NONCE_RETRIES - 1:
+                    raise
+        
+        return await self._wait_for_receipt(transaction, tx_hash, on_sent)
+    
+    async def _sign_and_send(self, transaction: Dict[str, Any], on_sent: Optional[SentCallback] = None) -> HexBytes:
+        signed_txn = self.account.sign_transaction(transaction)
+        if on_sent is not None:
+            await on_sent(signed_txn.hash.to_0x_hex())
+        return await self._call(self.w3.eth.send_raw_transaction(signed_txn.raw_transaction))
+    
+    async def _wait_for_receipt(
+        self,
+        transaction: Dict[str, Any],
+        tx_hash: HexBytes,
+        on_sent: Optional[SentCallback] = None
+    ) -> Any:
+        """
+        Wait for the receipt tracker to confirm the transaction, replacing it
+        with a higher gas price (same nonce) each time it has been pending for
+        BLOCKCHAIN_STUCK_AFTER
+        
+        Whichever version gets confirmed is returned.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.receipt_timeout
+        bump_at = loop.time() + settings.BLOCKCHAIN_STUCK_AFTER
+        watched = {tx_hash: self.receipts.watch(tx_hash)}
+        
+        try:
+            while True:
+                now = loop.time()
+                if now >= deadline:
+                    raise TimeExhausted(
+                        f"Transaction {tx_hash.to_0x_hex()} not confirmed after {self.receipt_timeout}s"
+                    )
+                
+                can_bump = len(watched) <= settings.BLOCKCHAIN_MAX_GAS_BUMPS
+                wake_at = min(deadline, bump_at) if can_bump else deadline
+                done, _ = await asyncio.wait(
+                    watched.values(), timeout=max(0, wake_at - now), return_when=asyncio.FIRST_COMPLETED
+                )
+                if done:
+                    return done.pop().result()
+                
+                # A mined version only needs more confirmations, not more gas
+                mined = any(self.receipts.is_mined(sent_hash) for sent_hash in watched)
+                if can_bump and loop.time() >= bump_at:
+                    if not mined:
+                        transaction = {
+                            **transaction,
+                            'gasPrice': int(transaction['gasPrice'] * settings.BLOCKCHAIN_GAS_BUMP_FACTOR)
+                        }
+                        try:
+                            bumped_hash = await self._sign_and_send(transaction, on_sent)
+                            watched[bumped_hash] = self.receipts.watch(bumped_hash)
+                            self.gas_bumps += 1
+                        except Exception as e:
+                            # Usually "nonce too low": an earlier version was just mined
+                            print(f"Gas bump for transaction {tx_hash.to_0x_hex()} not sent: {e}")
+                    bump_at = loop.time() + settings.BLOCKCHAIN_STUCK_AFTER
+        finally:
+            # Replaced versions never confirm; stop polling for them
+            for sent_hash in watched:
+                self.receipts.forget(sent_hash)
+    
     async def record_donation_on_blockchain(
         self,
         donation_id: str,
@@ -83,51 +305,60 @@ class BlockchainService:
             return self._generate_fallback_tx_hash(donation_id)
         
         try:
-            # Build transaction
-            transaction = self.donation_registry.functions.recordDonation(
-                donation_id,
-                donor_id,
-                donation_type,
-                title,
-                description,
-                amount,
-                item_name,
-                quantity,
-                unit,
-                metadata_hash
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-                'gas': 500000,
-                'gasPrice': self.w3.to_wei('20', 'gwei'),
-                'chainId': int(settings.SAGA_CHAIN_ID.split('_')[1].split('-')[0]) if '_' in settings.SAGA_CHAIN_ID else 2752546100676000
-            })
-            
-            # Sign and send transaction
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.SAGA_PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            
-            # Wait for confirmation with timeout
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=30)
-            
-            return receipt.transactionHash.hex()
+            return await self.submit_donation_record(
+                donation_id, donor_id, donation_type, title, description,
+                amount, item_name, quantity, unit, metadata_hash
+            )
             
         except Exception as e:
             print(f"Error recording donation on blockchain: {e}")
             # Return fallback hash instead of None to prevent donation failure
             return self._generate_fallback_tx_hash(donation_id)
     
+    async def submit_donation_record(
+        self,
+        donation_id: str,
+        donor_id: str,
+        donation_type: int,
+        title: str,
+        description: str,
+        amount: int,
+        item_name: str,
+        quantity: int,
+        unit: str,
+        metadata_hash: str,
+        on_sent: Optional[SentCallback] = None
+    ) -> str:
+        """Record a donation and return the confirmed transaction hash; raises if it was not confirmed"""
+        record_call = self.donation_registry.functions.recordDonation(
+            donation_id,
+            donor_id,
+            donation_type,
+            title,
+            description,
+            amount,
+            item_name,
+            quantity,
+            unit,
+            metadata_hash
+        )
+        # Storage cost grows with the text fields, so a fixed limit runs out of gas
+        gas = int(await self._call(record_call.estimate_gas({'from': self.account.address})) * 1.2)
+        transaction = await self._call(record_call.build_transaction(self._transaction_params(gas)))
+        
+        return self._confirmed_hash(await self._send_transaction(transaction, on_sent))
+    
+    def is_available(self) -> bool:
+        """Whether chain writes can be attempted now, without an RPC round trip"""
+        return self._is_blockchain_available()
+    
     def _is_blockchain_available(self) -> bool:
-        """Check if blockchain service is available"""
-        try:
-            return (
-                self.w3 is not None and 
-                self.w3.is_connected() and 
-                self.donation_registry is not None and
-                self.account is not None
-            )
-        except Exception:
-            return False
+        """Check if blockchain service is available, from the cached connectivity state"""
+        return (
+            self._connected is not False and
+            self.donation_registry is not None and
+            self.account is not None
+        )
     
     def _generate_fallback_tx_hash(self, donation_id: str) -> str:
         """Generate a fallback transaction hash for offline mode"""
@@ -154,59 +385,139 @@ class BlockchainService:
             return self._generate_fallback_tx_hash(f"status_{donation_id}_{new_status}")
         
         try:
-            transaction = self.donation_registry.functions.updateDonationStatus(
-                donation_id,
-                new_status,
-                actor_id,
-                actor_type,
-                description
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-                'gas': 300000,
-                'gasPrice': self.w3.to_wei('20', 'gwei'),
-                'chainId': int(settings.SAGA_CHAIN_ID.split('_')[1].split('-')[0]) if '_' in settings.SAGA_CHAIN_ID else 2752546100676000
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.SAGA_PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return receipt.transactionHash.hex()
+            return await self.submit_status_update(donation_id, new_status, actor_id, actor_type, description)
             
         except Exception as e:
             print(f"Error updating donation status on blockchain: {e}")
             return self._generate_fallback_tx_hash(f"status_{donation_id}_{new_status}")
     
+    async def submit_status_update(
+        self,
+        donation_id: str,
+        new_status: int,
+        actor_id: str,
+        actor_type: str,
+        description: str,
+        on_sent: Optional[SentCallback] = None
+    ) -> str:
+        """Update donation status and return the confirmed transaction hash; raises if it was not confirmed"""
+        update_call = self.donation_registry.functions.updateDonationStatus(
+            donation_id,
+            new_status,
+            actor_id,
+            actor_type,
+            description
+        )
+        # Each update also appends a transaction record; it outgrows a fixed 300k limit
+        gas = int(await self._call(update_call.estimate_gas({'from': self.account.address})) * 1.2)
+        transaction = await self._call(update_call.build_transaction(self._transaction_params(gas)))
+        
+        return self._confirmed_hash(await self._send_transaction(transaction, on_sent))
+    
+    async def _read(self, calls: List[Any]) -> List[Any]:
+        """Batched, cached contract reads bounded by the call timeout"""
+        return await self._call(self.reads.read(calls))
+    
+    async def _read_one(self, contract: Any, function_name: str, *args: Any) -> Any:
+        return await self._call(self.reads.read_one(contract, function_name, *args))
+    
+    @staticmethod
+    def _verification(result: Any) -> Dict[str, Any]:
+        return {
+            "is_valid": result[0],
+            "total_transactions": result[1],
+            "broken_links": result[2],
+            "invalid_hashes": result[3],
+            "issues": len(result[4]),
+            "verified_at": result[5]
+        }
+    
     async def verify_donation_chain(self, donation_id: str) -> Optional[Dict[str, Any]]:
         """Verify donation transaction chain"""
         
         try:
-            result = self.transparency_verifier.functions.verifyTransactionChain(
-                donation_id
-            ).call()
-            
-            return {
-                "is_valid": result[0],
-                "total_transactions": result[1],
-                "broken_links": result[2],
-                "invalid_hashes": result[3],
-                "verified_at": result[5]
-            }
+            # Simulated with eth_call: the verification is read, not recorded
+            return self._verification(
+                await self._read_one(self.transparency_verifier, "verifyTransactionChain", donation_id)
+            )
             
         except Exception as e:
             print(f"Error verifying donation chain: {e}")
             return None
     
+    async def get_donation_transparency(self, donation_id: str) -> Dict[str, Any]:
+        """Transparency score and chain verification of a donation in one round trip (None where unavailable)"""
+        
+        try:
+            score, verification = await self._read([
+                (self.transparency_verifier, "getTransparencyScore", [donation_id]),
+                (self.transparency_verifier, "verifyTransactionChain", [donation_id])
+            ])
+            
+        except Exception as e:
+            print(f"Error reading donation transparency: {e}")
+            return {"transparency_score": None, "verification": None}
+        
+        if isinstance(score, Exception):
+            print(f"Error getting transparency score: {score}")
+            score = None
+        if isinstance(verification, Exception):
+            print(f"Error verifying donation chain: {verification}")
+            verification = None
+        
+        return {
+            "transparency_score": score,
+            "verification": self._verification(verification) if verification is not None else None
+        }
+    
+    async def anchor_merkle_root(self, merkle_root: bytes, leaf_count: int) -> Optional[str]:
+        """
+        Anchor the Merkle root of a batch of donation records on chain.
+
+        The root is written as calldata of a zero-value transaction to the
+        platform account, so anchoring costs about as much as a plain transfer
+        and needs no contract. Returns None if the transaction could not be
+        confirmed; the caller keeps the batch for a retry.
+        """
+        try:
+            data = ANCHOR_DATA_PREFIX + merkle_root + leaf_count.to_bytes(4, "big")
+            receipt = await self._send_transaction({
+                **self._transaction_params(21000 + 16 * len(data)),
+                'to': self.account.address,
+                'value': 0,
+                'data': data
+            })
+            
+            if receipt.status != 1:
+                print(f"Anchor transaction {receipt.transactionHash.to_0x_hex()} failed")
+                return None
+            
+            return receipt.transactionHash.to_0x_hex()
+            
+        except Exception as e:
+            print(f"Error anchoring Merkle root on blockchain: {e}")
+            return None
+    
+    async def verify_anchor_transaction(self, tx_hash: str, merkle_root: bytes) -> Optional[bool]:
+        """Check that an anchor transaction carries the given Merkle root (None if the chain is unreachable)"""
+        
+        try:
+            transaction = await self._call(self.w3.eth.get_transaction(tx_hash))
+            data = bytes(transaction["input"])
+            return (
+                data.startswith(ANCHOR_DATA_PREFIX) and
+                data[len(ANCHOR_DATA_PREFIX):len(ANCHOR_DATA_PREFIX) + 32] == merkle_root
+            )
+            
+        except Exception as e:
+            print(f"Error verifying anchor transaction: {e}")
+            return None
+    
     async def get_transparency_score(self, donation_id: str) -> Optional[int]:
         """Get transparency score for a donation"""
         
         try:
-            score = self.transparency_verifier.functions.getTransparencyScore(
-                donation_id
-            ).call()
-            
-            return score
+            return await self._read_one(self.transparency_verifier, "getTransparencyScore", donation_id)
             
         except Exception as e:
             print(f"Error getting transparency score: {e}")
@@ -222,40 +533,136 @@ class BlockchainService:
         """Mint reward tokens for user"""
         
         try:
-            transaction = self.ytili_token.functions.mintReward(
-                user_address,
-                user_id,
-                amount,
-                reason
-            ).build_transaction({
-                'from': self.account.address,
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-                'gas': 200000,
-                'gasPrice': self.w3.to_wei('20', 'gwei'),
-                'chainId': int(settings.SAGA_CHAIN_ID.split('_')[1].split('-')[0]) if '_' in settings.SAGA_CHAIN_ID else 2752546100676000
-            })
-            
-            signed_txn = self.w3.eth.account.sign_transaction(transaction, settings.SAGA_PRIVATE_KEY)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-            receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            return receipt.transactionHash.hex()
+            return await self.submit_reward_mint(user_address, user_id, amount, reason)
             
         except Exception as e:
             print(f"Error minting reward tokens: {e}")
             return None
     
+    async def submit_reward_mint(
+        self,
+        user_address: str,
+        user_id: str,
+        amount: int,
+        reason: str,
+        on_sent: Optional[SentCallback] = None
+    ) -> str:
+        """Mint reward tokens and return the confirmed transaction hash; raises if it was not confirmed"""
+        transaction = await self._call(self.ytili_token.functions.mintReward(
+            user_address,
+            user_id,
+            amount,
+            reason
+        ).build_transaction(self._transaction_params(200000)))
+        
+        return self._confirmed_hash(await self._send_transaction(transaction, on_sent))
+    
+    async def find_sent_transaction(self, tx_hashes: List[str]) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Look up earlier sent versions of a transaction: the receipt of the one
+        that was mined, else the hash of one the node still has pending;
+        (None, None) if none of them reached the chain
+        """
+        pending_hash = None
+        for tx_hash in tx_hashes:
+            try:
+                return await self._call(self.w3.eth.get_transaction_receipt(tx_hash)), None
+            except TransactionNotFound:
+                pass
+            try:
+                await self._call(self.w3.eth.get_transaction(tx_hash))
+                pending_hash = tx_hash
+            except TransactionNotFound:
+                pass
+        return None, pending_hash
+    
+    async def wait_for_sent_transaction(self, tx_hash: str) -> Any:
+        """Receipt of a transaction sent earlier, e.g. by a previous process; raises TimeExhausted"""
+        key = HexBytes(tx_hash)
+        try:
+            return await asyncio.wait_for(self.receipts.watch(key), self.receipt_timeout)
+        except asyncio.TimeoutError:
+            raise TimeExhausted(f"Transaction {tx_hash} not confirmed after {self.receipt_timeout}s")
+        finally:
+            self.receipts.forget(key)
+    
+    async def is_donation_recorded(self, donation_id: str) -> bool:
+        """Whether DonationRegistry already holds the donation; read from the latest block, not the read cache"""
+        donation = await self._call(self.donation_registry.functions.donations(donation_id).call())
+        return bool(donation[-1])  # Donation.exists
+    
+    @staticmethod
+    def _confirmed_hash(receipt: Any) -> str:
+        tx_hash = receipt.transactionHash.to_0x_hex()
+        if receipt.status != 1:
+            raise RuntimeError(f"Transaction {tx_hash} reverted")
+        return tx_hash
+    
     async def get_user_token_balance(self, user_address: str) -> Optional[int]:
         """Get user's token balance"""
         
         try:
-            balance = self.ytili_token.functions.balanceOf(user_address).call()
-            return balance
+            return await self._read_one(self.ytili_token, "balanceOf", user_address)
+            
+        except Exception as e:
+            print(f"Error getting user token balance: {e}")
+            return None
+    
+    async def get_ytili_balance(self, user_id: str) -> Optional[int]:
+        """Tokens credited to a platform user id"""
+        
+        try:
+            return await self._read_one(self.ytili_token, "getTokensByUserId", user_id)
             
         except Exception as e:
             print(f"Error getting user token balance: {e}")
             return None
     
+    async def get_ytili_balances(self, user_ids: List[str]) -> Dict[str, int]:
+        """Tokens credited to many platform user ids, read in batches of the read layer"""
+        if not user_ids:
+            return {}
+        
+        results = await self._read([
+            (self.ytili_token, "getTokensByUserId", [user_id]) for user_id in user_ids
+        ])
+        balances = {}
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                raise result
+            balances[user_id] = result
+        return balances
+    
+    async def get_proposal_from_blockchain(self, proposal_id: int) -> Optional[Dict[str, Any]]:
+        """On-chain state of a governance proposal"""
+        return (await self.get_proposals_from_blockchain([proposal_id])).get(proposal_id)
+    
+    async def get_proposals_from_blockchain(self, proposal_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """On-chain state of many governance proposals, read in one round trip (None where unavailable)"""
+        proposals: Dict[int, Optional[Dict[str, Any]]] = {proposal_id: None for proposal_id in proposal_ids}
+        if not proposal_ids or self.ytili_governance is None or not self.ytili_governance.address:
+            return proposals
+        
+        try:
+            results = await self._read([
+                (self.ytili_governance, "getProposal", [proposal_id]) for proposal_id in proposal_ids
+            ])
+            
+        except Exception as e:
+            print(f"Error getting proposals from blockchain: {e}")
+            return proposals
+        
+        for proposal_id, result in zip(proposal_ids, results):
+            if isinstance(result, Exception):
+                print(f"Error getting proposal {proposal_id} from blockchain: {result}")
+                continue
+            proposal = dict(zip(PROPOSAL_FIELDS, result))
+            for field in PROPOSAL_VOTE_FIELDS:
+                proposal[field] = str(proposal[field])
+            proposals[proposal_id] = proposal
+        
+        return proposals
+    
     def _load_contract_abi(self, contract_name: str) -> List[Dict]:
         """Load contract ABI from compiled artifacts"""
         try:
@@ -316,6 +723,74 @@ class BlockchainService:
                     "outputs": [{"name": "", "type": "uint256"}],
                     "stateMutability": "view",
                     "type": "function"
+                },
+                {
+                    "inputs": [{"name": "userId", "type": "string"}],
+                    "name": "getTokensByUserId",
+                    "outputs": [{"name": "", "type": "uint256"}],
+                    "stateMutability": "view",
+                    "type": "function"
+                }
+            ]
+        elif contract_name == "YtiliGovernance":
+            return [
+                {
+                    "inputs": [{"name": "proposalId", "type": "uint256"}],
+                    "name": "getProposal",
+                    "outputs": [
+                        {"name": "id", "type": "uint256"},
+                        {"name": "proposer", "type": "address"},
+                        {"name": "title", "type": "string"},
+                        {"name": "description", "type": "string"},
+                        {"name": "category", "type": "string"},
+                        {"name": "startTime", "type": "uint256"},
+                        {"name": "endTime", "type": "uint256"},
+                        {"name": "votesFor", "type": "uint256"},
+                        {"name": "votesAgainst", "type": "uint256"},
+                        {"name": "votesAbstain", "type": "uint256"},
+                        {"name": "totalVotes", "type": "uint256"},
+                        {"name": "executed", "type": "bool"},
+                        {"name": "cancelled", "type": "bool"},
+                        {"name": "status", "type": "uint8"}
+                    ],
+                    "stateMutability": "view",
+                    "type": "function"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [
+                        {"indexed": True, "name": "proposalId", "type": "uint256"},
+                        {"indexed": True, "name": "proposer", "type": "address"},
+                        {"indexed": False, "name": "title", "type": "string"},
+                        {"indexed": False, "name": "category", "type": "string"},
+                        {"indexed": False, "name": "startTime", "type": "uint256"},
+                        {"indexed": False, "name": "endTime", "type": "uint256"}
+                    ],
+                    "name": "ProposalCreated",
+                    "type": "event"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [
+                        {"indexed": True, "name": "proposalId", "type": "uint256"},
+                        {"indexed": True, "name": "voter", "type": "address"},
+                        {"indexed": False, "name": "voteType", "type": "uint8"},
+                        {"indexed": False, "name": "weight", "type": "uint256"}
+                    ],
+                    "name": "VoteCast",
+                    "type": "event"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [{"indexed": True, "name": "proposalId", "type": "uint256"}],
+                    "name": "ProposalExecuted",
+                    "type": "event"
+                },
+                {
+                    "anonymous": False,
+                    "inputs": [{"indexed": True, "name": "proposalId", "type": "uint256"}],
+                    "name": "ProposalCancelled",
+                    "type": "event"
                 }
             ]
         return []
@@ -0,0 +1,237 @@
+"""
+Batched, cached contract reads
+Many view calls go out as one JSON-RPC batch and are cached for the block they were read at
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from eth_utils.abi import get_abi_output_types
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3._utils.abi import map_abi_data
+from web3._utils.error_formatters_utils import raise_contract_logic_error_on_revert
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
+from web3.contract.async_contract import AsyncContract
+from web3.exceptions import ContractLogicError
+
+# (contract, view function name, arguments)
+ReadCall = Tuple[AsyncContract, str, Sequence[Any]]
+
+# (contract address, calldata)
+CallKey = Tuple[str, str]
+
+
+class ChainReader:
+    """
+    Read layer for contract view functions.
+
+    read() takes a list of calls and returns their decoded results in order.
+    Calls missing from the cache go out as one JSON-RPC batch of eth_call
+    requests per `batch_size` calls (concurrent single calls if the provider
+    cannot batch), so listing many records costs one round trip instead of
+    one per record.
+
+    Results are cached per block number. The head block number is read in
+    the same batch as the calls and trusted for `cache_ttl` seconds; until
+    then every call runs against that block, so a page of results is one
+    consistent snapshot and repeated reads are served from memory. When the
+    head moves, older results are dropped. Identical calls made concurrently
+    share one request.
+
+    A call that reverts yields its ContractLogicError in place of a result,
+    so one bad id does not fail the whole list. Transport errors and other
+    RPC errors (rate limits, node failures) raise and nothing is cached.
+    """
+
+    def __init__(self, w3: AsyncWeb3, cache_ttl: float = 5, batch_size: int = 100):
+        self.w3 = w3
+        self.cache_ttl = cache_ttl
+        self.batch_size = batch_size
+
+        self.rounds = 0  # read round trips, batched or not
+        self.batching: Optional[bool] = None  # None until the provider was tried
+        self.hits = 0
+        self.misses = 0
+
+        self._block: Optional[int] = None
+        self._block_read_at = 0.0
+        self._cache: Dict[CallKey, Any] = {}  # Results at self._block
+        self._inflight: Dict[CallKey, asyncio.Future] = {}
+        self._output_types: Dict[Tuple[str, str], List[str]] = {}
+
+    def invalidate(self) -> None:
+        """Drop all cached results, e.g. after a write the caller wants to read back"""
+        self._cache.clear()
+        self._block_read_at = 0.0
+
+    async def read(self, calls: Sequence[ReadCall]) -> List[Any]:
+        """Decoded results of the calls in order; a ContractLogicError where a call reverted"""
+        keys = [self._key(contract, function_name, args) for contract, function_name, args in calls]
+        fresh = self._block is not None and time.monotonic() - self._block_read_at < self.cache_ttl
+
+        results: Dict[CallKey, Any] = {}
+        waiting: Dict[CallKey, asyncio.Future] = {}
+        fetch: Dict[CallKey, ReadCall] = {}
+        for key, call in zip(keys, calls):
+            if key in results or key in waiting or key in fetch:
+                continue
+            if fresh and key in self._cache:
+                results[key] = self._cache[key]
+                self.hits += 1
+            elif key in self._inflight:
+                waiting[key] = self._inflight[key]
+            else:
+                fetch[key] = call
+        self.misses += len(fetch)
+
+        if fetch:
+            loop = asyncio.get_running_loop()
+            futures = {key: loop.create_future() for key in fetch}
+            self._inflight.update(futures)
+            try:
+                block, fetched = await self._fetch(list(fetch.items()), None if not fresh else self._block)
+                self._store(block, fetched, refreshed=not fresh)
+                for key, future in futures.items():
+                    future.set_result(fetched[key])
+                results.update(fetched)
+            except BaseException as e:
+                for future in futures.values():
+                    if not future.done():
+                        future.set_exception(e if isinstance(e, Exception) else RuntimeError("Read was cancelled"))
+                        # Retrieved here so an unawaited failure is not reported as lost
+                        future.exception()
+                raise
+            finally:
+                for key, future in futures.items():
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+
+        return [results[key] for key in keys]
+
+    async def read_one(self, contract: AsyncContract, function_name: str, *args: Any) -> Any:
+        """Decoded result of one call; raises if it reverted"""
+        result, = await self.read([(contract, function_name, args)])
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _key(self, contract: AsyncContract, function_name: str, args: Sequence[Any]) -> CallKey:
+        return contract.address, contract.encode_abi(function_name, args=list(args))
+
+    def _store(self, block: int, fetched: Dict[CallKey, Any], refreshed: bool) -> None:
+        if block != self._block:
+            if self._block is not None and block < self._block:
+                # Read from a node behind the cached head: use the results, keep the cache
+                return
+            self._cache.clear()
+            self._block = block
+        if refreshed:
+            self._block_read_at = time.monotonic()
+        self._cache.update(fetched)
+
+    async def _fetch(
+        self,
+        items: List[Tuple[CallKey, ReadCall]],
+        block: Optional[int]
+    ) -> Tuple[int, Dict[CallKey, Any]]:
+        """Results of the calls at block, or at the head (also returned) when block is None"""
+        fetched: Dict[CallKey, Any] = {}
+        for start in range(0, len(items), self.batch_size):
+            chunk = items[start:start + self.batch_size]
+            head, results = await self._fetch_chunk(chunk, block)
+            if block is None:
+                # Pin the remaining chunks to the head of the first one
+                block = head
+            fetched.update(zip((key for key, _ in chunk), results))
+        return block, fetched
+
+    async def _fetch_chunk(
+        self,
+        items: List[Tuple[CallKey, ReadCall]],
+        block: Optional[int]
+    ) -> Tuple[Optional[int], List[Any]]:
+        self.rounds += 1
+        block_identifier = block if block is not None else "latest"
+
+        if self.batching is not False:
+            block_param = hex(block) if block is not None else "latest"
+            requests = [("eth_call", [{"to": to, "data": data}, block_param]) for (to, data), _ in items]
+            if block is None:
+                requests.insert(0, ("eth_blockNumber", []))
+            try:
+                responses = await self.w3.provider.make_batch_request(requests)
+                self.batching = True
+            except NotImplementedError:
+                self.batching = False
+            else:
+                if not isinstance(responses, list):
+                    # A single error response for the whole batch
+                    raise RuntimeError(f"Batch request failed: {responses.get('error')}")
+                if block is None:
+                    head = responses.pop(0)
+                    if head.get("error"):
+                        raise RuntimeError(f"RPC error: {head['error']}")
+                    block = int(head["result"], 16)
+                return block, [
+                    self._decode(call, response)
+                    for (_, call), response in zip(items, responses)
+                ]
+
+        calls = [
+            getattr(contract.functions, function_name)(*args).call(block_identifier=block_identifier)
+            for _, (contract, function_name, args) in items
+        ]
+        if block is None:
+            calls.insert(0, self.w3.eth.block_number)
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception) and not isinstance(result, ContractLogicError):
+                raise result
+        if block is None:
+            block = results.pop(0)
+        return block, results
+
+    @staticmethod
+    def _is_revert(error: Any) -> bool:
+        """Whether an eth_call error is the call reverting rather than the node failing"""
+        if not isinstance(error, dict):
+            return False
+        data = error.get("data")
+        message = str(error.get("message") or "").lower()
+        return (
+            error.get("code") == 3  # Geth and most providers
+            or (isinstance(data, str) and (data.startswith("0x") or data.startswith("Reverted ")))
+            or isinstance(data, dict)  # Hardhat and Ganache nest the revert data
+            or "revert" in message
+        )
+
+    def _decode(self, call: ReadCall, response: Dict[str, Any]) -> Any:
+        if response.get("error"):
+            error = response["error"]
+            if not self._is_revert(error):
+                raise RuntimeError(f"RPC error: {error}")
+            # Same exception (reason, custom error, panic) as ContractFunction.call()
+            try:
+                raise_contract_logic_error_on_revert(response)
+            except ContractLogicError as e:
+                return e
+            return ContractLogicError(error.get("message") or "execution reverted", data=error.get("data"))
+
+        contract, function_name, _ = call
+        output_types = self._output_types.get((contract.address, function_name))
+        if output_types is None:
+            output_types = get_abi_output_types(contract.get_function_by_name(function_name).abi)
+            self._output_types[(contract.address, function_name)] = output_types
+
+        # Normalized like ContractFunction.call(), which checksums addresses
+        # inside tuples and arrays too
+        values = map_abi_data(
+            BASE_RETURN_NORMALIZERS, output_types,
+            self.w3.codec.decode(output_types, HexBytes(response["result"]))
+        )
+        # Same shape as ContractFunction.call(): one output unwrapped, several as a list
+        return values[0] if len(values) == 1 else values
@@ -44,10 +44,39 @@ class Settings:
     # Emergency Response Configuration
     EMERGENCY_RESPONSE_ENABLED: bool = os.getenv("EMERGENCY_RESPONSE_ENABLED", "true").lower() == "true"
     EMERGENCY_PHONE_NUMBER: str = os.getenv("EMERGENCY_PHONE_NUMBER", "115")  # Vietnam emergency number
+    EMERGENCY_HOSPITAL_RADIUS_KM: float = float(os.getenv("EMERGENCY_HOSPITAL_RADIUS_KM", "30"))
+
+    # Geolocation
+    GEO_CACHE_SIZE: int = int(os.getenv("GEO_CACHE_SIZE", "10000"))  # Resolved addresses kept in memory
+    GEO_HOSPITAL_INDEX_TTL: int = int(os.getenv("GEO_HOSPITAL_INDEX_TTL", "600"))  # seconds
+
+    # Batch donation allocation
+    MATCHING_HOSPITAL_CAPACITY: int = int(os.getenv("MATCHING_HOSPITAL_CAPACITY", "20"))  # Open donations per hospital
+    MATCHING_BATCH_MAX_DONATIONS: int = int(os.getenv("MATCHING_BATCH_MAX_DONATIONS", "5000"))
+
+    # Fraud detection
+    FRAUD_CHAIN_AUDIT_CHUNK_SIZE: int = int(os.getenv("FRAUD_CHAIN_AUDIT_CHUNK_SIZE", "1000"))  # Rows per fetch
+    FRAUD_SCAN_ENABLED: bool = os.getenv("FRAUD_SCAN_ENABLED", "true").lower() == "true"  # Periodic background scan
+    FRAUD_SCAN_INTERVAL: int = int(os.getenv("FRAUD_SCAN_INTERVAL", "300"))  # seconds
+    FRAUD_SCAN_OVERLAP: int = int(os.getenv("FRAUD_SCAN_OVERLAP", "60"))  # seconds re-checked before the watermark
+
+    # Full-ledger hash audit (scripts/audit_ledger.py)
+    LEDGER_AUDIT_WORKERS: int = int(os.getenv("LEDGER_AUDIT_WORKERS", str(os.cpu_count() or 1)))  # Hashing processes
+    LEDGER_AUDIT_CHUNK_SIZE: int = int(os.getenv("LEDGER_AUDIT_CHUNK_SIZE", "5000"))  # Transactions per worker task
+    LEDGER_AUDIT_SIGNING_KEY: Optional[str] = os.getenv("LEDGER_AUDIT_SIGNING_KEY") or os.getenv("SAGA_PRIVATE_KEY")
 
     # OCR and Document Processing
     TESSERACT_PATH: Optional[str] = os.getenv("TESSERACT_PATH")  # Path to Tesseract OCR
     MAX_DOCUMENT_SIZE: int = int(os.getenv("MAX_DOCUMENT_SIZE", "10485760"))  # 10MB
+    OCR_WORKER_PROCESSES: int = int(os.getenv("OCR_WORKER_PROCESSES", "2"))
+    OCR_MAX_PENDING_JOBS: int = int(os.getenv("OCR_MAX_PENDING_JOBS", "8"))  # Running + queued before rejecting
+    OCR_JOB_TIMEOUT: float = float(os.getenv("OCR_JOB_TIMEOUT", "60"))  # seconds
+    OCR_NORMALIZE_RESOLUTION: bool = os.getenv("OCR_NORMALIZE_RESOLUTION", "true").lower() == "true"
+    OCR_TARGET_DPI: int = int(os.getenv("OCR_TARGET_DPI", "300"))  # Downsample larger photos to ~A4 at this DPI
+    OCR_CROP_TO_DOCUMENT: bool = os.getenv("OCR_CROP_TO_DOCUMENT", "true").lower() == "true"
+    OCR_CACHE_DIR: Optional[str] = os.getenv("OCR_CACHE_DIR")  # Defaults to backend/data/ocr_cache
+    OCR_CACHE_MAX_ENTRIES: int = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "5000"))
+    OCR_CACHE_MAX_BYTES: int = int(os.getenv("OCR_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # 200MB
 
     # Supabase Configuration
     SUPABASE_URL: str = os.getenv("SUPABASE_URL")
@@ -60,6 +89,18 @@ class Settings:
     SAGA_RPC_URL: str = os.getenv("SAGA_RPC_URL", "https://ytili-2752546100676000-1.jsonrpc.sagarpc.io")
     SAGA_CHAIN_ID: str = os.getenv("SAGA_CHAIN_ID", "ytili_2752546100676000-1")
     SAGA_PRIVATE_KEY: str = os.getenv("SAGA_PRIVATE_KEY")
+    BLOCKCHAIN_RPC_TIMEOUT: float = float(os.getenv("BLOCKCHAIN_RPC_TIMEOUT", "10"))  # seconds per JSON-RPC request
+    BLOCKCHAIN_CALL_TIMEOUT: float = float(os.getenv("BLOCKCHAIN_CALL_TIMEOUT", "20"))  # seconds per chain call, retries included
+    BLOCKCHAIN_RECEIPT_TIMEOUT: float = float(os.getenv("BLOCKCHAIN_RECEIPT_TIMEOUT", "30"))  # seconds to wait for confirmation
+    BLOCKCHAIN_RPC_POOL_SIZE: int = int(os.getenv("BLOCKCHAIN_RPC_POOL_SIZE", "20"))  # Pooled HTTP connections to the node
+    BLOCKCHAIN_HEALTH_INTERVAL: int = int(os.getenv("BLOCKCHAIN_HEALTH_INTERVAL", "15"))  # seconds between connectivity checks
+    BLOCKCHAIN_STUCK_AFTER: float = float(os.getenv("BLOCKCHAIN_STUCK_AFTER", "10"))  # seconds pending before a gas bump
+    BLOCKCHAIN_GAS_BUMP_FACTOR: float = float(os.getenv("BLOCKCHAIN_GAS_BUMP_FACTOR", "1.2"))  # Nodes require at least 1.1
+    BLOCKCHAIN_MAX_GAS_BUMPS: int = int(os.getenv("BLOCKCHAIN_MAX_GAS_BUMPS", "3"))
+    BLOCKCHAIN_CONFIRMATIONS: int = int(os.getenv("BLOCKCHAIN_CONFIRMATIONS", "1"))  # Blocks deep before a transaction counts as confirmed
+    BLOCKCHAIN_RECEIPT_BATCH_SIZE: int = int(os.getenv("BLOCKCHAIN_RECEIPT_BATCH_SIZE", "100"))  # Receipts per JSON-RPC batch request
+    BLOCKCHAIN_READ_CACHE_TTL: float = float(os.getenv("BLOCKCHAIN_READ_CACHE_TTL", "5"))  # seconds contract reads are served for one block
+    BLOCKCHAIN_READ_BATCH_SIZE: int = int(os.getenv("BLOCKCHAIN_READ_BATCH_SIZE", "100"))  # Contract calls per JSON-RPC batch request
 
     # VietQR Configuration
     VIETQR_API_URL: str = os.getenv("VIETQR_API_URL", "https://api.vietqr.io/v2")
@@ -71,7 +112,36 @@ class Settings:
     DONATION_REGISTRY_ADDRESS: str = os.getenv("DONATION_REGISTRY_ADDRESS")
     TRANSPARENCY_VERIFIER_ADDRESS: str = os.getenv("TRANSPARENCY_VERIFIER_ADDRESS")
     YTILI_GOVERNANCE_ADDRESS: str = os.getenv("YTILI_GOVERNANCE_ADDRESS")
-    
+
+    # Merkle-batched anchoring of donation records
+    ANCHOR_BATCHING_ENABLED: bool = os.getenv("ANCHOR_BATCHING_ENABLED", "true").lower() == "true"
+    ANCHOR_BATCH_WINDOW: int = int(os.getenv("ANCHOR_BATCH_WINDOW", "30"))  # seconds between anchor transactions
+    ANCHOR_BATCH_MAX_SIZE: int = int(os.getenv("ANCHOR_BATCH_MAX_SIZE", "1024"))  # Records per anchor; a full batch is sent early
+
+    # Outbox dispatcher for on-chain writes queued by API requests
+    OUTBOX_POLL_INTERVAL: float = float(os.getenv("OUTBOX_POLL_INTERVAL", "2"))  # seconds between polls when idle
+    OUTBOX_BATCH_SIZE: int = int(os.getenv("OUTBOX_BATCH_SIZE", "32"))  # Entries submitted concurrently
+    OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+    OUTBOX_RETRY_BASE_DELAY: float = float(os.getenv("OUTBOX_RETRY_BASE_DELAY", "5"))  # Doubles per attempt
+    OUTBOX_LEASE_SECONDS: int = int(os.getenv("OUTBOX_LEASE_SECONDS", "180"))  # Must outlast the receipt timeout and gas bumps
+
+    # Batched minting of points rewards; one mint per user and interval
+    REWARD_MINT_INTERVAL: int = int(os.getenv("REWARD_MINT_INTERVAL", "600"))  # seconds rewards accumulate before a mint
+    REWARD_MINT_BATCH_SIZE: int = int(os.getenv("REWARD_MINT_BATCH_SIZE", "100"))  # Users minted per round
+
+    # Contract event index; transparency and governance reads are answered from it when enabled
+    CHAIN_INDEXER_ENABLED: bool = os.getenv("CHAIN_INDEXER_ENABLED", "false").lower() == "true"
+    CHAIN_INDEX_START_BLOCK: int = int(os.getenv("CHAIN_INDEX_START_BLOCK", "0"))  # Contract deployment block
+    CHAIN_INDEX_POLL_INTERVAL: float = float(os.getenv("CHAIN_INDEX_POLL_INTERVAL", "5"))  # seconds between polls when caught up
+    CHAIN_INDEX_CHUNK_SIZE: int = int(os.getenv("CHAIN_INDEX_CHUNK_SIZE", "2000"))  # Blocks per eth_getLogs request
+    CHAIN_INDEX_CONFIRMATIONS: int = int(os.getenv("CHAIN_INDEX_CONFIRMATIONS", "2"))  # Blocks behind the head that are indexed
+    CHAIN_INDEX_REORG_DEPTH: int = int(os.getenv("CHAIN_INDEX_REORG_DEPTH", "64"))  # Blocks re-indexed after a reorg
+
+    # Stats endpoint caches; write paths invalidate them, the TTL bounds staleness across workers
+    STATS_CACHE_TTL: float = float(os.getenv("STATS_CACHE_TTL", "30"))  # seconds platform-wide figures are served
+    STATS_USER_CACHE_TTL: float = float(os.getenv("STATS_USER_CACHE_TTL", "10"))  # seconds per-user figures are served
+    STATS_CACHE_MAX_ENTRIES: int = int(os.getenv("STATS_CACHE_MAX_ENTRIES", "10000"))  # Cached per-user figures across scopes
+
     # Security
     ALGORITHM: str = "HS256"
     BCRYPT_ROUNDS: int = 12
@@ -0,0 +1,146 @@
+"""
+Canonical hashing of the donation transaction ledger
+Shared by DonationService when appending links and by the ledger audit when
+recomputing them, so both always agree on what a transaction hash covers
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from eth_account import Account
+from eth_account.messages import encode_defunct
+
+GENESIS_HASH = "0" * 64
+
+
+def compute_transaction_hash(
+    donation_id: Any,
+    transaction_type: str,
+    description: Optional[str],
+    actor_id: Any,
+    actor_type: Optional[str],
+    metadata: Optional[Dict[str, Any]],
+    timestamp: float,
+    previous_hash: str
+) -> str:
+    """SHA-256 of the transaction fields as sorted-key JSON"""
+    transaction_data = {
+        "donation_id": donation_id,
+        "transaction_type": transaction_type,
+        "description": description,
+        "actor_id": actor_id,
+        "actor_type": actor_type,
+        "metadata": metadata or {},
+        "timestamp": timestamp,
+        "previous_hash": previous_hash
+    }
+    return hashlib.sha256(json.dumps(transaction_data, sort_keys=True).encode()).hexdigest()
+
+
+def is_well_formed_hash(transaction_hash: Optional[str]) -> bool:
+    return bool(
+        transaction_hash and
+        len(transaction_hash) == 64 and
+        all(c in '0123456789abcdef' for c in transaction_hash.lower())
+    )
+
+
+def check_transaction_hash(donation_id: Any, link: Any) -> Tuple[bool, bool]:
+    """
+    Check one stored link; returns (valid, recomputed)
+
+    link needs the hashed columns of DonationTransaction. Links written before
+    hashed_at was stored cannot be recomputed and only get a format check.
+    """
+    if link.hashed_at is None:
+        return is_well_formed_hash(link.transaction_hash), False
+
+    expected_hash = compute_transaction_hash(
+        donation_id, link.transaction_type, link.description, link.actor_id,
+        link.actor_type, link.transaction_metadata, link.hashed_at, link.previous_hash
+    )
+    return link.transaction_hash == expected_hash, True
+
+
+class LedgerLink(NamedTuple):
+    """Hashed columns of a transaction row, small enough to send to a worker process"""
+    id: Any
+    transaction_type: str
+    description: Optional[str]
+    actor_id: Any
+    actor_type: Optional[str]
+    transaction_metadata: Optional[Dict[str, Any]]
+    hashed_at: Optional[float]
+    transaction_hash: Optional[str]
+    previous_hash: Optional[str]
+
+
+def audit_chain(donation_id: Any, links: Sequence[LedgerLink]) -> Dict[str, Any]:
+    """Recompute every hash of one chain (ordered by ID) and check its linkage"""
+    invalid_transactions = []
+    chain_broken = False
+    recomputed = 0
+    previous_hash = GENESIS_HASH
+
+    for link in links:
+        valid, was_recomputed = check_transaction_hash(donation_id, link)
+        recomputed += was_recomputed
+        if not valid:
+            invalid_transactions.append({
+                "transaction_id": link.id,
+                "reason": "Hash mismatch" if was_recomputed else "Invalid transaction hash"
+            })
+
+        # The first link must start from the genesis hash, so a chain whose
+        # head was deleted is reported as well
+        if link.previous_hash != previous_hash:
+            chain_broken = True
+            invalid_transactions.append({
+                "transaction_id": link.id,
+                "reason": "Broken chain linkage"
+            })
+        previous_hash = link.transaction_hash
+
+    return {
+        "donation_id": donation_id,
+        "transaction_count": len(links),
+        "recomputed_count": recomputed,
+        "head_transaction_id": links[-1].id if links else None,
+        "head_hash": links[-1].transaction_hash if links else None,
+        "chain_broken": chain_broken,
+        "invalid_transactions": invalid_transactions,
+        "valid": not invalid_transactions
+    }
+
+
+def audit_chains(chains: List[Tuple[Any, List[LedgerLink]]]) -> List[Dict[str, Any]]:
+    """Worker entry point: audit a batch of whole chains"""
+    return [audit_chain(donation_id, links) for donation_id, links in chains]
+
+
+def canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def results_digest(chains: Sequence[Dict[str, Any]]) -> str:
+    """SHA-256 over the per-chain audit results in ledger order, one canonical JSON line each"""
+    digest = hashlib.sha256()
+    for chain in chains:
+        digest.update(canonical_json(chain).encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def sign_report(report: Dict[str, Any], private_key: str) -> Dict[str, str]:
+    """EIP-191 signature of the canonical report JSON, checkable by anyone with the signer address"""
+    account = Account.from_key(private_key)
+    signed = account.sign_message(encode_defunct(text=canonical_json(report)))
+    return {"signer": account.address, "signature": signed.signature.to_0x_hex()}
+
+
+def verify_report_signature(report: Dict[str, Any], signer: str, signature: str) -> bool:
+    try:
+        recovered = Account.recover_message(encode_defunct(text=canonical_json(report)), signature=signature)
+    except Exception:
+        return False
+    return recovered.lower() == signer.lower()
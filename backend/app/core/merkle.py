@@ -0,0 +1,63 @@
+"""
+Merkle trees for batched on-chain anchoring
+Leaves and proofs follow OpenZeppelin's MerkleProof conventions, so a batch
+root can also be checked by a contract with MerkleProof.verify
+"""
+from typing import List, Sequence
+
+from eth_abi import encode
+from eth_utils import keccak
+
+
+def donation_leaf(donation_id: str, metadata_hash: str) -> bytes:
+    """
+    Leaf committing to one donation record: keccak256(keccak256(abi.encode(id, hash))).
+    Hashing twice keeps a leaf from ever being mistaken for an inner node.
+    """
+    return keccak(keccak(encode(["string", "string"], [donation_id, metadata_hash])))
+
+
+def _hash_pair(a: bytes, b: bytes) -> bytes:
+    """Inner node; pairs are sorted so proofs need no left/right flags"""
+    return keccak(a + b) if a < b else keccak(b + a)
+
+
+def build_tree(leaves: Sequence[bytes]) -> List[List[bytes]]:
+    """
+    All levels of the tree, leaves first and the root last.
+    An odd node at the end of a level moves up unchanged.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [_hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels: List[List[bytes]]) -> bytes:
+    return levels[-1][0]
+
+
+def merkle_proof(levels: List[List[bytes]], index: int) -> List[bytes]:
+    """Sibling hashes from the leaf at index up to the root"""
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof: Sequence[bytes], root: bytes) -> bool:
+    """Check that leaf is part of the tree with the given root"""
+    computed = leaf
+    for sibling in proof:
+        computed = _hash_pair(computed, sibling)
+    return computed == root
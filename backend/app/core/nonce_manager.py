@@ -0,0 +1,47 @@
+"""
+Nonce allocation for the platform account
+Hands out nonces locally so many signed transactions can be in flight at once
+"""
+import asyncio
+from typing import Optional
+
+from web3 import AsyncWeb3
+
+
+class NonceManager:
+    """
+    In-process nonce allocator for one sending account.
+
+    The next nonce is read from the pending block on first use and on
+    resync(), then incremented locally under a lock, so concurrent sends
+    neither wait for each other's receipts nor reuse a nonce. Resync when the
+    node rejects a nonce or a signed transaction could not be sent, as the
+    unused nonce would otherwise hold back every later transaction.
+    """
+
+    def __init__(self, w3: AsyncWeb3, address: str):
+        self.w3 = w3
+        self.address = address
+        self.resyncs = 0
+
+        self._next: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def allocate(self) -> int:
+        async with self._lock:
+            if self._next is None:
+                self._next = await self.w3.eth.get_transaction_count(self.address, "pending")
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    async def resync(self) -> int:
+        """Take the next nonce from the chain again"""
+        async with self._lock:
+            self._next = await self.w3.eth.get_transaction_count(self.address, "pending")
+            self.resyncs += 1
+            return self._next
+
+    def reset(self) -> None:
+        """Resync lazily on the next allocation"""
+        self._next = None
@@ -0,0 +1,197 @@
+"""
+Batched confirmation tracking for sent transactions
+One polling loop confirms every in-flight transaction instead of one loop per transaction
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+
+RECEIPT_POLL_INTERVAL = 0.5  # seconds
+
+# Receipt fields returned as hex quantities / hashes by JSON-RPC; logs are left as returned
+RECEIPT_INT_FIELDS = (
+    "blockNumber", "transactionIndex", "status", "gasUsed", "cumulativeGasUsed", "effectiveGasPrice", "type"
+)
+RECEIPT_HASH_FIELDS = ("transactionHash", "blockHash")
+
+ReceiptListener = Callable[[List[AttributeDict], int], Awaitable[None]]
+
+
+def _format_receipt(raw: Dict[str, Any]) -> AttributeDict:
+    receipt = dict(raw)
+    for field in RECEIPT_INT_FIELDS:
+        if isinstance(receipt.get(field), str):
+            receipt[field] = int(receipt[field], 16)
+    for field in RECEIPT_HASH_FIELDS:
+        if receipt.get(field) is not None:
+            receipt[field] = HexBytes(receipt[field])
+    return AttributeDict(receipt)
+
+
+class ReceiptTracker:
+    """
+    Confirmation tracker shared by all pending transactions of a service.
+
+    Callers watch() a transaction hash and await the returned future. A single
+    loop polls eth_blockNumber and, when a block arrived or hashes were added,
+    fetches the receipts of every watched hash with JSON-RPC batch requests
+    (concurrent single requests if the provider cannot batch), so one round
+    trip resolves many transactions. A future resolves with the receipt once
+    its block is `confirmations` deep; a receipt that disappears in a reorg
+    keeps its hash watched. Listeners receive all receipts confirmed in a
+    round together, so they can be stored with one bulk write.
+
+    The loop only runs while hashes are watched. Over HTTP there are no
+    new-block subscriptions, so the cheap block number poll stands in for
+    them and receipts are only requested when they can have changed.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        confirmations: int = 1,
+        batch_size: int = 100,
+        call_timeout: float = 20,
+        poll_interval: float = RECEIPT_POLL_INTERVAL
+    ):
+        self.w3 = w3
+        self.confirmations = max(1, confirmations)
+        self.batch_size = batch_size
+        self.call_timeout = call_timeout
+        self.poll_interval = poll_interval
+
+        self.rounds = 0  # receipt round trips, batched or not
+        self.batching: Optional[bool] = None  # None until the provider was tried
+
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._unchecked: Set[str] = set()
+        self._mined: Set[str] = set()  # Receipt seen, not yet deep enough
+        self._listeners: List[ReceiptListener] = []
+        self._last_block: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def watch(self, tx_hash: HexBytes) -> asyncio.Future:
+        """Future resolving to the receipt of tx_hash once it is confirmed"""
+        key = HexBytes(tx_hash).to_0x_hex()
+        future = self._pending.get(key)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            self._unchecked.add(key)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return future
+
+    def forget(self, tx_hash: HexBytes) -> None:
+        """Stop watching, e.g. a replaced transaction or one that timed out"""
+        key = HexBytes(tx_hash).to_0x_hex()
+        self._unchecked.discard(key)
+        self._mined.discard(key)
+        future = self._pending.pop(key, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    def is_mined(self, tx_hash: HexBytes) -> bool:
+        """Whether the watched transaction is in a block that is not yet deep enough"""
+        return HexBytes(tx_hash).to_0x_hex() in self._mined
+
+    def add_listener(self, listener: ReceiptListener) -> None:
+        """Call listener(receipts, block_number) with the receipts confirmed in each round"""
+        self._listeners.append(listener)
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await self.poll()
+            except Exception as e:
+                # Watched hashes stay pending; callers enforce their own deadlines
+                print(f"Receipt polling failed: {e}")
+            if self._pending:
+                await asyncio.sleep(self.poll_interval)
+
+    async def poll(self) -> List[AttributeDict]:
+        """One tracking round: returns the receipts it confirmed"""
+        block_number = await asyncio.wait_for(self.w3.eth.block_number, self.call_timeout)
+        if block_number == self._last_block and not self._unchecked:
+            return []
+        self._last_block = block_number
+
+        hashes = list(self._pending)
+        self._unchecked.clear()
+        receipts = await self._fetch_receipts(hashes)
+
+        confirmed = []
+        for tx_hash, receipt in zip(hashes, receipts):
+            if receipt is None:
+                self._mined.discard(tx_hash)
+                continue
+            if block_number - receipt.blockNumber + 1 < self.confirmations:
+                self._mined.add(tx_hash)
+                continue
+
+            self._mined.discard(tx_hash)
+            future = self._pending.pop(tx_hash, None)
+            if future is not None and not future.done():
+                future.set_result(receipt)
+            confirmed.append(receipt)
+
+        if confirmed:
+            for listener in self._listeners:
+                try:
+                    await listener(confirmed, block_number)
+                except Exception as e:
+                    print(f"Receipt listener failed: {e}")
+
+        return confirmed
+
+    async def _fetch_receipts(self, hashes: List[str]) -> List[Optional[AttributeDict]]:
+        """Receipts of the given hashes in order, None where not mined yet"""
+        receipts = []
+        for start in range(0, len(hashes), self.batch_size):
+            receipts.extend(await self._fetch_chunk(hashes[start:start + self.batch_size]))
+        return receipts
+
+    async def _fetch_chunk(self, hashes: List[str]) -> List[Optional[AttributeDict]]:
+        self.rounds += 1
+
+        if self.batching is not False:
+            requests = [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in hashes]
+            try:
+                responses = await asyncio.wait_for(self.w3.provider.make_batch_request(requests), self.call_timeout)
+                self.batching = True
+            except NotImplementedError:
+                self.batching = False
+            else:
+                if not isinstance(responses, list):
+                    # A single error response for the whole batch
+                    raise RuntimeError(f"Batch request failed: {responses.get('error')}")
+                # The provider returns them in request order, unformatted
+                for response in responses:
+                    if response.get("error"):
+                        raise RuntimeError(f"RPC error: {response['error']}")
+                return [
+                    _format_receipt(response["result"]) if response.get("result") else None
+                    for response in responses
+                ]
+
+        return await asyncio.gather(*(self._get_receipt(tx_hash) for tx_hash in hashes))
+
+    async def _get_receipt(self, tx_hash: str) -> Optional[AttributeDict]:
+        try:
+            return await asyncio.wait_for(self.w3.eth.get_transaction_receipt(tx_hash), self.call_timeout)
+        except TransactionNotFound:
+            return None
@@ -106,6 +106,7 @@ class Tables:
     """Supabase table names"""
     USERS = "users"
     USER_POINTS = "user_points"
+    POINTS_LEDGER = "points_ledger"
     KYC_DOCUMENTS = "kyc_documents"
     DONATIONS = "donations"
     DONATION_TRANSACTIONS = "donation_transactions"
@@ -116,7 +117,19 @@ class Tables:
     VIETQR_PAYMENTS = "vietqr_payments"
     GOVERNANCE_PROPOSALS = "governance_proposals"
     GOVERNANCE_VOTES = "governance_votes"
+    GOVERNANCE_VOTING_POWER = "governance_voting_power"
     DONATION_STATUS_HISTORY = "donation_status_history"
+    ANCHOR_BATCHES = "anchor_batches"
+    DONATION_ANCHORS = "donation_anchors"
+    LEDGER_AUDIT_REPORTS = "ledger_audit_reports"
+    LEDGER_CHAIN_AUDITS = "ledger_chain_audits"
+    BLOCKCHAIN_OUTBOX = "blockchain_outbox"
+    CHAIN_INDEX_CURSORS = "chain_index_cursors"
+    CHAIN_EVENTS = "chain_events"
+    CHAIN_DONATIONS = "chain_donations"
+    CHAIN_TRANSPARENCY = "chain_transparency"
+    CHAIN_TOKEN_BALANCES = "chain_token_balances"
+    CHAIN_PROPOSALS = "chain_proposals"
 
     # Fundraising tables
     CAMPAIGNS = "campaigns"
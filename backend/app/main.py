@@ -74,10 +74,49 @@ async def startup_event():
     # Initialize blockchain service
     try:
         from .core.blockchain import blockchain_service
+        await blockchain_service.start()
+
+        # Confirmed receipts are stored in blockchain_transactions in bulk
+        from .services.blockchain_transaction_service import blockchain_transaction_recorder
+        blockchain_service.receipts.add_listener(blockchain_transaction_recorder.record)
         logger.info("Blockchain service initialized")
     except Exception as e:
         logger.warning(f"Blockchain service initialization failed: {e}")
 
+    # Warm the duplicate detection indexes off the event loop
+    try:
+        import asyncio
+        from .ai_agent.campaign_similarity import campaign_similarity_index
+        from .ai_agent.image_similarity import image_similarity_index
+        loop = asyncio.get_event_loop()
+        loop.run_in_executor(None, campaign_similarity_index.ensure_loaded)
+        loop.run_in_executor(None, image_similarity_index.ensure_loaded)
+    except Exception as e:
+        logger.warning(f"Similarity index warm-up failed: {e}")
+
+    # Periodic fraud scan feeding the admin dashboard
+    if settings.FRAUD_SCAN_ENABLED:
+        from .services.fraud_scan_scheduler import fraud_scan_scheduler
+        fraud_scan_scheduler.start()
+
+    # Merkle-batched anchoring of new donation records
+    if settings.ANCHOR_BATCHING_ENABLED:
+        from .services.donation_anchor_service import donation_anchor_service
+        donation_anchor_service.start()
+
+    # Background submission of on-chain writes queued by API requests
+    from .services.blockchain_outbox_service import blockchain_outbox_dispatcher
+    blockchain_outbox_dispatcher.start()
+
+    # Periodic per-user minting of points rewards through the outbox
+    from .services.points_ledger_service import points_ledger_service
+    points_ledger_service.start()
+
+    # Local index of contract events answering transparency and governance reads
+    if settings.CHAIN_INDEXER_ENABLED:
+        from .services.chain_indexer_service import chain_event_indexer
+        chain_event_indexer.start()
+
     logger.info("Application startup completed successfully")
 
 
@@ -86,6 +125,27 @@ async def shutdown_event():
     """Application shutdown"""
     logger.info("Shutting down Ytili Backend API")
 
+    from .ai_agent.ocr_worker_pool import ocr_worker_pool
+    ocr_worker_pool.shutdown()
+
+    from .services.fraud_scan_scheduler import fraud_scan_scheduler
+    await fraud_scan_scheduler.stop()
+
+    from .services.points_ledger_service import points_ledger_service
+    await points_ledger_service.stop()
+
+    from .services.blockchain_outbox_service import blockchain_outbox_dispatcher
+    await blockchain_outbox_dispatcher.stop()
+
+    from .services.donation_anchor_service import donation_anchor_service
+    await donation_anchor_service.stop()
+
+    from .services.chain_indexer_service import chain_event_indexer
+    await chain_event_indexer.stop()
+
+    from .core.blockchain import blockchain_service
+    await blockchain_service.stop()
+
 
 # Health check endpoint
 @app.get("/health")
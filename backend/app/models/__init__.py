@@ -4,7 +4,8 @@
 from .user import User, UserType, UserStatus, KYCDocument, UserPoints
 from .donation import (
     Donation, DonationType, DonationStatus, PaymentStatus,
-    DonationTransaction, MedicationCatalog
+    DonationTransaction, MedicationCatalog, HospitalStats, DonationChainHead, ChainAuditState,
+    SuspiciousActivity, FraudScanState, LedgerAuditReport, LedgerChainAudit
 )
 from .ai_agent import (
     AIConversation, ConversationType, ConversationStatus,
@@ -19,7 +20,8 @@ __all__ = [
 
     # Donation models
     "Donation", "DonationType", "DonationStatus", "PaymentStatus",
-    "DonationTransaction", "MedicationCatalog",
+    "DonationTransaction", "MedicationCatalog", "HospitalStats", "DonationChainHead", "ChainAuditState",
+    "SuspiciousActivity", "FraudScanState", "LedgerAuditReport", "LedgerChainAudit",
 
     # AI Agent models
     "AIConversation", "ConversationType", "ConversationStatus",
@@ -2,7 +2,7 @@
 Donation models for Ytili platform
 Handles medication/supply donations and tracking
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Enum, ForeignKey, Numeric, JSON
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, DateTime, Text, Enum, ForeignKey, Numeric, JSON, Float, Uuid, FetchedValue
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -110,8 +110,12 @@ class DonationTransaction(Base):
     """Transaction log for transparency"""
     __tablename__ = "donation_transactions"
     
-    id = Column(Integer, primary_key=True, index=True)
-    donation_id = Column(Integer, ForeignKey("donations.id"), nullable=False)
+    id = Column(Uuid(as_uuid=False), primary_key=True, server_default=FetchedValue())
+    donation_id = Column(Uuid(as_uuid=False), ForeignKey("donations.id"), nullable=False)
+    
+    # Insertion order assigned by the database; ids are random UUIDs, so chains
+    # are walked in this order
+    ledger_seq = Column(BigInteger, server_default=FetchedValue(), nullable=False, index=True)
     
     # Transaction details
     transaction_type = Column(String(50), nullable=False)  # created, verified, shipped, etc.
@@ -127,6 +131,7 @@ class DonationTransaction(Base):
     # Blockchain-style hash for integrity
     transaction_hash = Column(String(64), unique=True, index=True)
     previous_hash = Column(String(64))
+    hashed_at = Column(Float)  # Unix time covered by transaction_hash; NULL for links written before it was stored
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -137,6 +142,172 @@ class DonationTransaction(Base):
         return f"<Transaction {self.transaction_type} for Donation {self.donation_id}>"
 
 
+class DonationChainHead(Base):
+    """Latest link and verification progress of a donation's transaction chain"""
+    __tablename__ = "donation_chain_heads"
+    
+    donation_id = Column(Uuid(as_uuid=False), ForeignKey("donations.id"), primary_key=True)
+    
+    # Maintained by DonationService.create_transaction under a row lock; new
+    # transactions link to head_hash without looking up the previous one
+    head_transaction_id = Column(Uuid(as_uuid=False), ForeignKey("donation_transactions.id"))
+    head_hash = Column(String(64))
+    
+    # Prefix of the chain already verified by the transparency service; only
+    # transactions with a ledger_seq after verified_seq are checked again
+    verified_transaction_id = Column(Uuid(as_uuid=False), ForeignKey("donation_transactions.id"))
+    verified_seq = Column(BigInteger, default=0, nullable=False)
+    verified_hash = Column(String(64))
+    verified_length = Column(Integer, default=0, nullable=False)
+    verified_actor_count = Column(Integer, default=0, nullable=False)
+    invalid_transactions = Column(JSON, default=list)
+    chain_broken = Column(Boolean, default=False)
+    
+    # Transparency score of the verified prefix
+    transparency_score = Column(Float)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<DonationChainHead {self.donation_id} at {self.head_transaction_id}>"
+
+
+class ChainAuditState(Base):
+    """Progress of the incremental transaction hash-chain audit"""
+    __tablename__ = "chain_audit_state"
+    
+    name = Column(String(50), primary_key=True)  # Audit name, e.g. donation_transactions
+    
+    # Broken links found so far, keyed by donation ID; chains not touched
+    # since the last scan keep their findings without being re-walked
+    broken_links = Column(JSON, default=dict)
+    
+    # Database time the last completed scan read the ledger at
+    last_scan_at = Column(DateTime(timezone=True))
+    
+    def __repr__(self):
+        return f"<ChainAuditState {self.name} at {self.last_scan_at}>"
+
+
+class LedgerAuditReport(Base):
+    """Signed summary of a full-ledger hash audit"""
+    __tablename__ = "ledger_audit_reports"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Transactions up to this ledger_seq were audited
+    last_ledger_seq = Column(BigInteger)
+    
+    chain_count = Column(Integer, default=0, nullable=False)
+    transaction_count = Column(Integer, default=0, nullable=False)
+    recomputed_count = Column(Integer, default=0, nullable=False)  # Hashes recomputed; the rest only format-checked
+    invalid_chain_count = Column(Integer, default=0, nullable=False)
+    invalid_transaction_count = Column(Integer, default=0, nullable=False)
+    
+    # Throughput of the run
+    workers = Column(Integer)
+    duration_seconds = Column(Float)
+    transactions_per_second = Column(Float)
+    
+    # SHA-256 of the per-chain results; the signed report commits to them through it
+    results_digest = Column(String(64))
+    report = Column(JSON)  # Exactly the signed payload
+    signer = Column(String(42))  # Address recovered from the signature
+    signature = Column(String(132))
+    
+    started_at = Column(DateTime(timezone=True))
+    completed_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    def __repr__(self):
+        return f"<LedgerAuditReport {self.id} over {self.transaction_count} transactions>"
+
+
+class LedgerChainAudit(Base):
+    """Audit result of one donation's transaction chain from the latest ledger audit"""
+    __tablename__ = "ledger_chain_audits"
+    
+    donation_id = Column(Uuid(as_uuid=False), ForeignKey("donations.id"), primary_key=True)
+    report_id = Column(Integer, ForeignKey("ledger_audit_reports.id"), nullable=False)
+    
+    transaction_count = Column(Integer, default=0, nullable=False)
+    recomputed_count = Column(Integer, default=0, nullable=False)
+    head_transaction_id = Column(Uuid(as_uuid=False))  # Last link covered by the audit
+    head_hash = Column(String(64))
+    chain_broken = Column(Boolean, default=False)
+    invalid_transactions = Column(JSON, default=list)  # [{transaction_id, reason}]
+    valid = Column(Boolean, nullable=False)
+    
+    audited_at = Column(DateTime(timezone=True))
+    
+    def __repr__(self):
+        return f"<LedgerChainAudit {self.donation_id} valid={self.valid}>"
+
+
+class SuspiciousActivity(Base):
+    """Finding of the periodic fraud scan, kept until it is no longer detected"""
+    __tablename__ = "suspicious_activities"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    activity_key = Column(String(100), unique=True, nullable=False)  # type plus subject, e.g. payment_issues:user:5
+    
+    activity_type = Column(String(50), nullable=False, index=True)
+    severity = Column(String(20), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    donation_id = Column(Integer, ForeignKey("donations.id"))
+    transaction_id = Column(Integer)
+    description = Column(Text)
+    details = Column(JSON)  # Full finding as reported by the detector
+    
+    is_active = Column(Boolean, default=True, index=True)
+    first_detected_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_detected_at = Column(DateTime(timezone=True))
+    resolved_at = Column(DateTime(timezone=True))
+    
+    def __repr__(self):
+        return f"<SuspiciousActivity {self.activity_key}>"
+
+
+class FraudScanState(Base):
+    """Watermark and latest dashboard snapshot of the periodic fraud scan"""
+    __tablename__ = "fraud_scan_state"
+    
+    name = Column(String(50), primary_key=True)
+    
+    # Start time of the last completed scan; the next one only re-checks rows changed since
+    watermark = Column(DateTime(timezone=True))
+    
+    dashboard = Column(JSON)  # Severity/type counts and high-risk users at the last scan
+    last_duration_seconds = Column(Numeric(10, 3))
+    last_error = Column(Text)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<FraudScanState {self.name} at {self.watermark}>"
+
+
+class HospitalStats(Base):
+    """Per-hospital donation statistics, maintained incrementally on status changes"""
+    __tablename__ = "hospital_stats"
+    
+    hospital_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    # Donations routed to the hospital, by current status
+    assigned_count = Column(Integer, default=0, nullable=False)  # Any status
+    open_count = Column(Integer, default=0, nullable=False)  # Matched or shipped
+    received_count = Column(Integer, default=0, nullable=False)  # Delivered or completed
+    completed_count = Column(Integer, default=0, nullable=False)
+    
+    # Received donations per type and creation day, pruned to the rolling window
+    # {"medication": {"2024-01-15": 2, ...}, ...}
+    daily_received = Column(JSON, default=dict)
+    last_received_at = Column(DateTime(timezone=True))
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<HospitalStats for User {self.hospital_id}>"
+
+
 class MedicationCatalog(Base):
     """Catalog of approved medications and supplies"""
     __tablename__ = "medication_catalog"
@@ -61,9 +61,9 @@ class User(Base):
     last_login = Column(DateTime(timezone=True))
     
     # Relationships
-    donations = relationship("Donation", back_populates="donor")
-    received_donations = relationship("Donation", back_populates="recipient")
-    kyc_documents = relationship("KYCDocument", back_populates="user")
+    donations = relationship("Donation", foreign_keys="Donation.donor_id", back_populates="donor")
+    received_donations = relationship("Donation", foreign_keys="Donation.recipient_id", back_populates="recipient")
+    kyc_documents = relationship("KYCDocument", foreign_keys="KYCDocument.user_id", back_populates="user")
     points = relationship("UserPoints", back_populates="user", uselist=False)
     
     def __repr__(self):
@@ -93,7 +93,7 @@ class KYCDocument(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    user = relationship("User", back_populates="kyc_documents")
+    user = relationship("User", foreign_keys=[user_id], back_populates="kyc_documents")
     
     def __repr__(self):
         return f"<KYCDocument {self.document_type} for User {self.user_id}>"
@@ -0,0 +1,133 @@
+"""
+Capacitated assignment solver for batch donation allocation
+Min-cost flow over a donation x hospital score matrix
+"""
+from typing import Dict, List
+
+import numpy as np
+
+
+def solve_capacitated_assignment(scores: np.ndarray, capacities: np.ndarray) -> np.ndarray:
+    """
+    Assign each row (donation) to at most one column (hospital) so that the
+    total score is maximal and no column receives more rows than its capacity.
+
+    Infeasible pairs are marked with -inf. Leaving a row unassigned is worth
+    0, modelled as an extra column with unlimited capacity, so rows only stay
+    unassigned when they have no feasible column or lose the competition for
+    scarce capacity to rows that gain more from it.
+
+    Identical rows (same pickup point, type and urgency) are merged into one
+    supply node first, which turns a batch of thousands of donations into a
+    transportation problem over a few dozen groups. It is solved exactly by
+    successive shortest augmenting paths: each Dijkstra search runs in reduced
+    costs, is vectorized over all columns, and may re-route flow already
+    placed when that frees capacity where it is worth more.
+
+    Returns:
+        Array with the assigned column of every row, or -1
+    """
+    num_rows, num_cols = scores.shape
+    assignment = np.full(num_rows, -1, dtype=np.int64)
+    if num_rows == 0 or num_cols == 0:
+        return assignment
+
+    # Only hospitals with capacity that some donation can reach take part
+    capacities = np.maximum(np.asarray(capacities, dtype=np.int64), 0)
+    scores = np.asarray(scores, dtype=np.float64)
+    active = np.flatnonzero((capacities > 0) & np.isfinite(scores).any(axis=0))
+    num_cols = len(active)
+
+    groups, group_of_row, supply = np.unique(
+        scores[:, active], axis=0, return_inverse=True, return_counts=True
+    )
+    group_of_row = group_of_row.reshape(-1)
+    num_groups = len(groups)
+
+    # Column num_cols means "unassigned": cost 0, unlimited capacity
+    unassigned = num_cols
+    capacity = np.append(capacities[active], num_rows)
+    cost = np.empty((num_groups, num_cols + 1))
+    cost[:, :num_cols] = -groups
+    cost[:, unassigned] = 0.0
+
+    load = np.zeros(num_cols + 1, dtype=np.int64)
+    flow: List[Dict[int, int]] = [{} for _ in range(num_cols + 1)]  # column -> {group: units}
+
+    # Potentials keep every reduced cost non-negative and placed flow tight
+    group_potential = cost.min(axis=1)
+    col_potential = np.zeros(num_cols + 1)
+    columns = np.arange(num_cols + 1)
+
+    # Most valuable groups first keeps later searches short
+    for source in np.argsort(cost.min(axis=1)):
+        source = int(source)
+        while supply[source] > 0:
+            dist = np.full(num_cols + 1, np.inf)
+            pred = np.full(num_cols + 1, -1, dtype=np.int64)
+            done = np.zeros(num_cols + 1, dtype=bool)
+            entry = {source: (0.0, -1)}  # group -> (distance, column it was reached through)
+            frontier = [source]
+
+            while True:
+                if frontier:
+                    rows = np.asarray(frontier, dtype=np.int64)
+                    offsets = np.asarray([entry[g][0] for g in frontier]) - group_potential[rows]
+                    reduced = cost[rows] + offsets[:, None] - col_potential
+                    best = reduced.argmin(axis=0)
+                    candidate = reduced[best, columns]
+                    improve = (candidate < dist) & ~done
+                    dist[improve] = candidate[improve]
+                    pred[improve] = rows[best[improve]]
+
+                col = int(np.argmin(np.where(done, np.inf, dist)))
+                reached = dist[col]
+                done[col] = True
+
+                if load[col] < capacity[col]:
+                    break
+
+                # Column is full: continue through the groups placed in it
+                frontier = [g for g in flow[col] if g not in entry]
+                for g in frontier:
+                    entry[g] = (reached, col)
+
+            for g, (group_dist, _) in entry.items():
+                group_potential[g] += reached - group_dist
+            col_potential[done] -= reached - dist[done]
+
+            # Push as many units as the path allows
+            path = []
+            sink = col
+            while True:
+                g = int(pred[col])
+                came_from = entry[g][1]
+                path.append((g, col, came_from))
+                if g == source:
+                    break
+                col = came_from
+
+            units = min(supply[source], capacity[sink] - load[sink])
+            for g, _, came_from in path:
+                if came_from >= 0:
+                    units = min(units, flow[came_from][g])
+
+            for g, to_col, came_from in path:
+                flow[to_col][g] = flow[to_col].get(g, 0) + units
+                if came_from >= 0:
+                    flow[came_from][g] -= units
+                    if flow[came_from][g] == 0:
+                        del flow[came_from][g]
+            load[sink] += units
+            supply[source] -= units
+
+    # Hand the units of each group out to its rows
+    rows_of_group: List[List[int]] = [[] for _ in range(num_groups)]
+    for row, g in enumerate(group_of_row.tolist()):
+        rows_of_group[g].append(row)
+    for col in range(num_cols):
+        for g, units in flow[col].items():
+            for _ in range(units):
+                assignment[rows_of_group[g].pop()] = active[col]
+
+    return assignment
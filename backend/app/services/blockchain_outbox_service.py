@@ -0,0 +1,331 @@
+"""
+Blockchain outbox dispatcher
+Submits the on-chain writes queued by API requests, retries them and notifies donors on confirmation
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+import structlog
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service, Tables
+from ..core.blockchain import blockchain_service, SentCallback
+from ..core.websocket import notification_manager
+from .donation_anchor_service import donation_anchor_service
+from .stats_service import stats_service, BLOCKCHAIN_STATS
+
+logger = structlog.get_logger()
+
+# donations.donation_type -> DonationRegistry donation type
+DONATION_TYPE_CODES = {
+    'medication': 1,
+    'medical_supply': 2,
+    'food': 3,
+    'cash': 4
+}
+
+# Contract function behind each outbox operation, as stored in blockchain_transactions
+OPERATION_FUNCTIONS = {
+    'record_donation': 'recordDonation',
+    'update_status': 'updateDonationStatus',
+    'mint_reward': 'mintReward'
+}
+
+
+class BlockchainOutboxDispatcher:
+    """
+    Delivers the entries of blockchain_outbox.
+
+    Entries are written in the same database transaction as the donation
+    change that needs them (migration 014), so requests return without
+    waiting for the chain and no write is lost if the process stops. Each
+    round leases a batch of due entries and submits them concurrently, with
+    locally allocated nonces keeping them in flight together. A confirmed
+    entry updates the donation and blockchain_transactions and notifies the
+    donor over WebSocket; a failed one is retried with exponential backoff
+    until OUTBOX_MAX_ATTEMPTS.
+
+    The hash of every signed transaction is saved on the entry before it is
+    sent. An entry retried after a timeout, or reclaimed after its lease ran
+    out, first looks those up: a mined transaction is recorded instead of
+    sent again, a pending one is waited for, and only a reverted or dropped
+    one is replaced. A donation DonationRegistry already holds is not
+    recorded again.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = settings.OUTBOX_POLL_INTERVAL,
+        batch_size: int = settings.OUTBOX_BATCH_SIZE,
+        max_attempts: int = settings.OUTBOX_MAX_ATTEMPTS
+    ):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._dispatch_lock = asyncio.Lock()
+
+    def start(self) -> None:
+        """Start the dispatch loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+            logger.info("Blockchain outbox dispatcher started", poll_interval=self.poll_interval, batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        # Undelivered entries stay in blockchain_outbox; leased ones are reclaimed after their lease
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def wake(self) -> None:
+        """Dispatch now instead of at the next poll, e.g. right after a request queued an entry"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def dispatch(self) -> Dict[str, Any]:
+        """Lease and deliver up to one batch of due entries"""
+        async with self._dispatch_lock:
+            try:
+                if not blockchain_service.is_available():
+                    # Leave entries due rather than spend their attempts on an unreachable node
+                    return {"success": True, "dispatched": 0, "blockchain_available": False}
+
+                supabase = get_supabase_service()
+                entries = supabase.rpc("claim_blockchain_outbox", {
+                    "p_limit": self.batch_size,
+                    "p_lease_seconds": settings.OUTBOX_LEASE_SECONDS
+                }).execute().data or []
+
+                if not entries:
+                    return {"success": True, "dispatched": 0}
+
+                outcomes = await asyncio.gather(*(self._deliver(entry) for entry in entries))
+
+                counts = {outcome: outcomes.count(outcome) for outcome in set(outcomes)}
+                logger.info("Blockchain outbox dispatched", dispatched=len(entries), **counts)
+                return {"success": True, "dispatched": len(entries), **counts}
+
+            except Exception as e:
+                logger.error(f"Failed to dispatch blockchain outbox: {str(e)}")
+                return {"success": False, "error": str(e)}
+
+    async def _deliver(self, entry: Dict[str, Any]) -> str:
+        """Submit one entry and record the outcome: confirmed, batched, retrying or failed"""
+        try:
+            delivered, tx_hash = await self._find_delivery(entry)
+            if not delivered:
+                tx_hash = await self._submit(entry)
+        except Exception as e:
+            return await self._record_failure(entry, e)
+
+        try:
+            if not delivered and tx_hash is None:
+                self._finish(entry, "batched")
+                return "batched"
+
+            self._record_confirmation(entry, tx_hash)
+        except Exception as e:
+            # The transaction is on chain; once the lease runs out the entry
+            # finds it by its saved hash and is recorded without resending
+            logger.error(f"Failed to record confirmed outbox entry {entry['id']}: {str(e)}", tx_hash=tx_hash)
+            return "unrecorded"
+
+        await self._notify(entry, "blockchain_confirmed", {"tx_hash": tx_hash})
+        return "confirmed"
+
+    async def _find_delivery(self, entry: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+        """
+        Whether an earlier attempt already delivered the entry, and its transaction hash
+
+        A donation found in DonationRegistry without a mined transaction of
+        this entry, e.g. recorded before the outbox, is delivered with an
+        unknown hash (None).
+        """
+        sent_tx_hashes = entry.get("sent_tx_hashes") or []
+        if sent_tx_hashes:
+            receipt, pending_hash = await blockchain_service.find_sent_transaction(sent_tx_hashes)
+            if receipt is None and pending_hash is not None:
+                receipt = await blockchain_service.wait_for_sent_transaction(pending_hash)
+            # A reverted transaction changed nothing and may be sent again
+            if receipt is not None and receipt.status == 1:
+                return True, receipt.transactionHash.to_0x_hex()
+
+        if (
+            entry["operation"] == "record_donation" and
+            not settings.ANCHOR_BATCHING_ENABLED and
+            await blockchain_service.is_donation_recorded(entry["donation_id"])
+        ):
+            return True, None
+
+        return False, None
+
+    async def _submit(self, entry: Dict[str, Any]) -> Optional[str]:
+        """Send the entry's transaction and return its confirmed hash; None if it was handed to an anchor batch"""
+        on_sent = self._hash_saver(entry)
+
+        if entry["operation"] == "record_donation":
+            return await self._record_donation(entry, on_sent)
+
+        payload = entry["payload"]
+        if entry["operation"] == "update_status":
+            return await blockchain_service.submit_status_update(
+                donation_id=entry["donation_id"],
+                new_status=payload["new_status"],
+                actor_id=payload["actor_id"],
+                actor_type=payload["actor_type"],
+                description=payload["description"],
+                on_sent=on_sent
+            )
+        if entry["operation"] == "mint_reward":
+            return await blockchain_service.submit_reward_mint(
+                user_address=payload["user_address"],
+                user_id=entry["user_id"],
+                amount=int(payload["amount"]),
+                reason=payload["reason"],
+                on_sent=on_sent
+            )
+        raise ValueError(f"Unknown outbox operation: {entry['operation']}")
+
+    @staticmethod
+    def _hash_saver(entry: Dict[str, Any]) -> SentCallback:
+        """Save each signed version's hash on the entry; if that fails the version is not sent"""
+        sent_tx_hashes = list(entry.get("sent_tx_hashes") or [])
+
+        async def save(tx_hash: str) -> None:
+            sent_tx_hashes.append(tx_hash)
+            get_supabase_service().table(Tables.BLOCKCHAIN_OUTBOX).update({
+                "sent_tx_hashes": sent_tx_hashes
+            }).eq("id", entry["id"]).execute()
+
+        return save
+
+    async def _record_donation(self, entry: Dict[str, Any], on_sent: SentCallback) -> Optional[str]:
+        """Record a donation on chain, or hand it to the next anchor batch (returns None)"""
+        supabase = get_supabase_service()
+        donation = supabase.table(Tables.DONATIONS).select("*").eq("id", entry["donation_id"]).execute().data[0]
+
+        if settings.ANCHOR_BATCHING_ENABLED:
+            # The anchor service confirms the donation and notifies the donor
+            queued = supabase.table(Tables.DONATION_ANCHORS).select("id").eq(
+                "donation_id", donation["id"]
+            ).limit(1).execute()
+            if not queued.data:
+                await donation_anchor_service.enqueue(donation["id"], donation["metadata_hash"])
+            return None
+
+        return await blockchain_service.submit_donation_record(
+            donation_id=donation["id"],
+            donor_id=donation["donor_id"],
+            donation_type=DONATION_TYPE_CODES[donation["donation_type"]],
+            title=donation["title"],
+            description=donation.get("description") or "",
+            amount=int(float(donation.get("amount") or 0) * 100),  # Convert to cents
+            item_name=donation.get("item_name") or "",
+            quantity=donation.get("quantity") or 0,
+            unit=donation.get("unit") or "",
+            metadata_hash=donation["metadata_hash"],
+            on_sent=on_sent
+        )
+
+    def _record_confirmation(self, entry: Dict[str, Any], tx_hash: Optional[str]) -> None:
+        """Mark the entry and its donation confirmed; tx_hash is None for a donation recorded outside the outbox"""
+        supabase = get_supabase_service()
+        confirmed_at = datetime.utcnow().isoformat()
+
+        self._finish(entry, "confirmed", tx_hash=tx_hash, confirmed_at=confirmed_at)
+
+        if entry["operation"] == "record_donation":
+            recorded = {"blockchain_status": "confirmed", "blockchain_recorded_at": confirmed_at}
+            if tx_hash is not None:
+                recorded["blockchain_tx_hash"] = tx_hash
+            supabase.table(Tables.DONATIONS).update(recorded).eq("id", entry["donation_id"]).execute()
+
+        if tx_hash is None:
+            return
+
+        # Merges with the row the receipt tracker writes for the same hash
+        supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).upsert({
+            "donation_id": entry["donation_id"],
+            "blockchain_hash": tx_hash,
+            "function_name": OPERATION_FUNCTIONS[entry["operation"]],
+            "function_params": entry["payload"] or None,
+            "status": "confirmed",
+            "network_id": "ytili_saga",
+            "confirmed_at": confirmed_at
+        }, on_conflict="blockchain_hash").execute()
+        stats_service.invalidate(BLOCKCHAIN_STATS)
+
+    async def _record_failure(self, entry: Dict[str, Any], error: Exception) -> str:
+        supabase = get_supabase_service()
+        # attempts was incremented when the entry was leased
+        attempts = entry["attempts"]
+
+        if attempts >= self.max_attempts:
+            self._finish(entry, "failed", last_error=str(error))
+            if entry["operation"] == "record_donation":
+                supabase.table(Tables.DONATIONS).update({"blockchain_status": "failed"}).eq(
+                    "id", entry["donation_id"]
+                ).execute()
+
+            logger.error("Blockchain outbox entry failed", entry_id=entry["id"], operation=entry["operation"],
+                         attempts=attempts, error=str(error))
+            await self._notify(entry, "blockchain_failed", {"error": str(error)})
+            return "failed"
+
+        delay = settings.OUTBOX_RETRY_BASE_DELAY * 2 ** (attempts - 1)
+        supabase.table(Tables.BLOCKCHAIN_OUTBOX).update({
+            "status": "pending",
+            "next_attempt_at": (datetime.utcnow() + timedelta(seconds=delay)).isoformat(),
+            "locked_until": None,
+            "last_error": str(error)
+        }).eq("id", entry["id"]).execute()
+
+        logger.warning("Blockchain outbox entry will be retried", entry_id=entry["id"], operation=entry["operation"],
+                       attempts=attempts, retry_in=delay, error=str(error))
+        return "retrying"
+
+    @staticmethod
+    def _finish(entry: Dict[str, Any], status: str, **fields: Any) -> None:
+        get_supabase_service().table(Tables.BLOCKCHAIN_OUTBOX).update({
+            "status": status,
+            "locked_until": None,
+            **fields
+        }).eq("id", entry["id"]).execute()
+
+    @staticmethod
+    async def _notify(entry: Dict[str, Any], status: str, details: Dict[str, Any]) -> None:
+        if not entry["user_id"] or not entry["donation_id"]:
+            return
+        try:
+            await notification_manager.send_donation_update(
+                user_id=entry["user_id"],
+                donation_id=entry["donation_id"],
+                status=status,
+                details={"operation": entry["operation"], **details}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to notify donor of outbox entry {entry['id']}: {str(e)}")
+
+    async def _run_periodically(self) -> None:
+        while True:
+            result = await self.dispatch()
+            # Keep draining while full batches are due
+            if result.get("dispatched", 0) >= self.batch_size:
+                continue
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+
+# Global blockchain outbox dispatcher instance
+blockchain_outbox_dispatcher = BlockchainOutboxDispatcher()
@@ -0,0 +1,52 @@
+"""
+Blockchain transaction tracking service
+Stores the receipts confirmed by the receipt tracker in blockchain_transactions
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+import structlog
+
+from ..core.supabase import get_supabase_service, Tables
+from .stats_service import stats_service, BLOCKCHAIN_STATS
+
+logger = structlog.get_logger()
+
+
+class BlockchainTransactionRecorder:
+    """
+    Writes confirmed receipts to blockchain_transactions in bulk.
+
+    Registered as a listener of the blockchain service's receipt tracker, it
+    gets every receipt confirmed in one tracking round and upserts them with
+    one request, keyed by blockchain_hash. Services that know what a
+    transaction was for (donation, contract function) upsert the same row,
+    so the two writes merge in either order.
+    """
+
+    @staticmethod
+    def _row(receipt: Any, block_number: int, confirmed_at: str) -> Dict[str, Any]:
+        return {
+            "blockchain_hash": receipt.transactionHash.to_0x_hex(),
+            "block_number": receipt.blockNumber,
+            "transaction_index": receipt.transactionIndex,
+            "gas_used": receipt.gasUsed,
+            "gas_price": receipt.get("effectiveGasPrice"),
+            "status": "confirmed" if receipt.status == 1 else "failed",
+            "confirmations": block_number - receipt.blockNumber + 1,
+            "network_id": "ytili_saga",
+            "confirmed_at": confirmed_at
+        }
+
+    async def record(self, receipts: List[Any], block_number: int) -> None:
+        confirmed_at = datetime.utcnow().isoformat()
+        rows = [self._row(receipt, block_number, confirmed_at) for receipt in receipts]
+
+        supabase = get_supabase_service()
+        supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).upsert(rows, on_conflict="blockchain_hash").execute()
+        stats_service.invalidate(BLOCKCHAIN_STATS)
+
+        logger.info("Recorded confirmed transactions", count=len(rows), block_number=block_number)
+
+
+# Global blockchain transaction recorder instance
+blockchain_transaction_recorder = BlockchainTransactionRecorder()
@@ -0,0 +1,360 @@
+"""
+Contract event indexer
+Tails Ytili contract events into local tables so transparency and governance reads skip the chain
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from hexbytes import HexBytes
+from web3 import Web3
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service, Tables
+from ..core.blockchain import blockchain_service, PROPOSAL_VOTE_FIELDS
+
+logger = structlog.get_logger()
+
+CURSOR_NAME = "ytili_contracts"
+
+# Events folded into the state tables, by blockchain service contract attribute
+INDEXED_EVENTS = {
+    "donation_registry": ("DonationRegistry", (
+        "DonationRecorded", "StatusUpdated", "TransactionRecorded", "DonationMatched"
+    )),
+    "transparency_verifier": ("TransparencyVerifier", (
+        "TransparencyScoreUpdated", "ChainVerified", "BatchVerified"
+    )),
+    "ytili_token": ("YtiliToken", ("Transfer", "RewardEarned", "TokensRedeemed")),
+    "ytili_governance": ("YtiliGovernance", (
+        "ProposalCreated", "VoteCast", "ProposalExecuted", "ProposalCancelled"
+    ))
+}
+
+# Argument naming what an event is about, stored as chain_events.subject
+SUBJECT_ARGS = ("donationId", "proposalId", "merkleRoot")
+
+# YtiliGovernance.ProposalStatus values the index can tell from events
+PROPOSAL_ACTIVE, PROPOSAL_CANCELLED, PROPOSAL_EXECUTED = 1, 4, 5
+
+
+def donation_key(donation_id: str) -> str:
+    """Index key of a donation: keccak256 of its id, the topic the contracts emit for it"""
+    return Web3.keccak(text=donation_id).to_0x_hex()
+
+
+def _json_value(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return HexBytes(value).to_0x_hex()
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        # uint256 values exceed JSON number precision
+        return str(value)
+    return value
+
+
+class ChainEventIndexer:
+    """
+    Materializes contract events into local tables.
+
+    Each round reads the events of the blocks past the persisted cursor with
+    one eth_getLogs request per `chunk_size` blocks, covering all contracts
+    at once; a range the node refuses is split in half. Only blocks
+    `confirmations` behind the head are indexed. The index_chain_events
+    database function stores a chunk's events, folds them into the state
+    tables and moves the cursor in one transaction, so the index never holds
+    half a chunk and a rerun never applies an event twice.
+
+    The cursor keeps the hash of its block. If the chain no longer has that
+    block, the index is rewound `reorg_depth` blocks: the events above are
+    dropped, the state tables rebuilt from the rest, and the range indexed
+    again.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = settings.CHAIN_INDEX_POLL_INTERVAL,
+        chunk_size: int = settings.CHAIN_INDEX_CHUNK_SIZE,
+        confirmations: int = settings.CHAIN_INDEX_CONFIRMATIONS,
+        reorg_depth: int = settings.CHAIN_INDEX_REORG_DEPTH,
+        start_block: int = settings.CHAIN_INDEX_START_BLOCK
+    ):
+        self.poll_interval = poll_interval
+        self.chunk_size = chunk_size
+        self.confirmations = confirmations
+        self.reorg_depth = reorg_depth
+        self.start_block = start_block
+
+        self.head_block: Optional[int] = None
+        self.indexed_block: Optional[int] = None
+        self.last_sync_at: Optional[float] = None
+        self.events_indexed = 0
+        self.rewinds = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._sync_lock = asyncio.Lock()
+        self._events: Optional[Dict[Tuple[str, str], Tuple[str, Any]]] = None
+
+    def start(self) -> None:
+        """Start the indexing loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+            logger.info("Chain indexer started", start_block=self.start_block, chunk_size=self.chunk_size)
+
+    async def stop(self) -> None:
+        # The cursor is persisted per chunk; the next start resumes from it
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def _indexed_events(self) -> Dict[Tuple[str, str], Tuple[str, Any]]:
+        """(address, topic0) -> (contract name, event) for every deployed contract"""
+        if self._events is None:
+            self._events = {}
+            for attribute, (contract_name, event_names) in INDEXED_EVENTS.items():
+                contract = getattr(blockchain_service, attribute, None)
+                if contract is None or not contract.address:
+                    continue
+                for event_name in event_names:
+                    event = getattr(contract.events, event_name, None)
+                    if event is None:
+                        continue
+                    event = event()
+                    self._events[(contract.address, HexBytes(event.topic).to_0x_hex())] = (contract_name, event)
+        return self._events
+
+    async def _chain(self, awaitable: Any) -> Any:
+        return await asyncio.wait_for(awaitable, settings.BLOCKCHAIN_CALL_TIMEOUT)
+
+    async def _block_hash(self, block_number: int) -> str:
+        block = await self._chain(blockchain_service.w3.eth.get_block(block_number))
+        return block["hash"].to_0x_hex()
+
+    async def _get_logs(self, from_block: int, to_block: int) -> List[Any]:
+        events = self._indexed_events()
+        try:
+            return await self._chain(blockchain_service.w3.eth.get_logs({
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": sorted({address for address, _ in events}),
+                "topics": [sorted({topic for _, topic in events})]
+            }))
+        except Exception as e:
+            if from_block == to_block:
+                raise
+            # Nodes cap the range or result size of eth_getLogs
+            logger.info("Splitting eth_getLogs range", from_block=from_block, to_block=to_block, error=str(e))
+            middle = (from_block + to_block) // 2
+            return await self._get_logs(from_block, middle) + await self._get_logs(middle + 1, to_block)
+
+    def _row(self, log: Any) -> Optional[Dict[str, Any]]:
+        indexed = self._indexed_events().get((log["address"], HexBytes(log["topics"][0]).to_0x_hex()))
+        if indexed is None:
+            return None
+        contract_name, event = indexed
+
+        decoded = event.process_log(log)
+        args = {name: _json_value(value) for name, value in decoded["args"].items()}
+        subject = next((args[name] for name in SUBJECT_ARGS if name in args), None)
+
+        return {
+            "contract": contract_name,
+            "event": decoded["event"],
+            "block_number": log["blockNumber"],
+            "block_hash": HexBytes(log["blockHash"]).to_0x_hex(),
+            "transaction_hash": HexBytes(log["transactionHash"]).to_0x_hex(),
+            "log_index": log["logIndex"],
+            "subject": subject,
+            "args": args
+        }
+
+    def _load_cursor(self) -> Tuple[int, Optional[str]]:
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.CHAIN_INDEX_CURSORS).select("block_number, block_hash").eq(
+            "name", CURSOR_NAME
+        ).execute()
+        if not result.data:
+            return self.start_block - 1, None
+        return result.data[0]["block_number"], result.data[0]["block_hash"]
+
+    async def sync(self) -> Dict[str, Any]:
+        """Index every settled block past the cursor"""
+        async with self._sync_lock:
+            try:
+                if not self._indexed_events():
+                    return {"success": False, "error": "No contract addresses configured"}
+
+                supabase = get_supabase_service()
+                head = await self._chain(blockchain_service.w3.eth.block_number)
+                self.head_block = head
+
+                cursor, cursor_hash = self._load_cursor()
+                self.indexed_block = cursor
+
+                if cursor_hash and cursor >= 0 and await self._block_hash(cursor) != cursor_hash:
+                    rewind_to = max(self.start_block - 1, cursor - self.reorg_depth)
+                    supabase.rpc("rewind_chain_index", {
+                        "p_name": CURSOR_NAME,
+                        "p_block": rewind_to,
+                        "p_block_hash": await self._block_hash(rewind_to) if rewind_to >= 0 else None
+                    }).execute()
+                    self.rewinds += 1
+                    logger.warning("Chain reorg detected, index rewound", block_number=cursor, rewound_to=rewind_to)
+                    cursor = self.indexed_block = rewind_to
+
+                target = head - self.confirmations
+                indexed = 0
+                from_block = cursor + 1
+                while from_block <= target:
+                    to_block = min(from_block + self.chunk_size - 1, target)
+
+                    # Taken before the logs: if the chain changes meanwhile, the
+                    # next round sees a different hash and re-indexes the range
+                    to_block_hash = await self._block_hash(to_block)
+                    logs = await self._get_logs(from_block, to_block)
+                    rows = [row for row in (self._row(log) for log in logs) if row is not None]
+
+                    count = supabase.rpc("index_chain_events", {
+                        "p_name": CURSOR_NAME,
+                        "p_from_block": from_block,
+                        "p_to_block": to_block,
+                        "p_to_block_hash": to_block_hash,
+                        "p_head_block": head,
+                        "p_events": rows
+                    }).execute().data
+
+                    if count == -1:
+                        # Another indexer got there first; continue from its cursor
+                        cursor, _ = self._load_cursor()
+                        self.indexed_block = cursor
+                        from_block = cursor + 1
+                        continue
+
+                    indexed += count or 0
+                    self.events_indexed += count or 0
+                    self.indexed_block = to_block
+                    from_block = to_block + 1
+
+                self.last_sync_at = time.time()
+                if indexed:
+                    logger.info("Indexed contract events", events=indexed, block_number=self.indexed_block, head=head)
+
+                return {"success": True, "indexed": indexed, "block_number": self.indexed_block, "head_block": head}
+
+            except Exception as e:
+                logger.error(f"Failed to index contract events: {str(e)}")
+                return {"success": False, "error": str(e)}
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Indexing progress and lag behind the chain head, as last recorded by any indexer"""
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.CHAIN_INDEX_CURSORS).select("*").eq("name", CURSOR_NAME).execute()
+        cursor = result.data[0] if result.data else {}
+
+        block_number = cursor.get("block_number")
+        head_block = cursor.get("head_block")
+        updated_at = cursor.get("updated_at")
+        seconds_since_update = None
+        if updated_at:
+            updated = datetime.fromisoformat(updated_at.replace("Z", "+00:00"))
+            seconds_since_update = round((datetime.now(timezone.utc) - updated).total_seconds(), 1)
+
+        return {
+            "enabled": settings.CHAIN_INDEXER_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "indexed_block": block_number,
+            "head_block": head_block,
+            "lag_blocks": head_block - block_number if head_block is not None and block_number is not None else None,
+            "seconds_since_update": seconds_since_update,
+            "events_indexed": self.events_indexed,
+            "rewinds": self.rewinds
+        }
+
+    async def get_donation_transparency(self, donation_id: str) -> Dict[str, Any]:
+        """Indexed transparency score and last recorded chain verification of a donation"""
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.CHAIN_TRANSPARENCY).select("*").eq(
+            "donation_key", donation_key(donation_id)
+        ).execute()
+        row = result.data[0] if result.data else None
+
+        verification = None
+        if row and row.get("is_valid") is not None:
+            verification = {
+                "is_valid": row["is_valid"],
+                "total_transactions": row["total_transactions"],
+                # ChainVerified carries only the issue count, not the link and hash counts
+                "broken_links": None,
+                "invalid_hashes": None,
+                "issues": row["issues"],
+                "verified_at": row["verified_at"]
+            }
+
+        return {
+            "transparency_score": row["transparency_score"] if row else 0,
+            "verification": verification,
+            "block_number": row["block_number"] if row else None
+        }
+
+    async def get_proposals(self, proposal_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """Indexed state of governance proposals, shaped like the getProposal reads"""
+        proposals: Dict[int, Optional[Dict[str, Any]]] = {proposal_id: None for proposal_id in proposal_ids}
+        if not proposal_ids:
+            return proposals
+
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.CHAIN_PROPOSALS).select("*").in_("proposal_id", proposal_ids).execute()
+
+        now = int(time.time())
+        for row in result.data or []:
+            if row["executed"]:
+                status = PROPOSAL_EXECUTED
+            elif row["cancelled"]:
+                status = PROPOSAL_CANCELLED
+            elif row["end_time"] is not None and now < row["end_time"]:
+                status = PROPOSAL_ACTIVE
+            else:
+                # Succeeded and Failed are decided on chain without an event
+                status = None
+
+            proposals[row["proposal_id"]] = {
+                "id": row["proposal_id"],
+                "proposer": row["proposer"],
+                "title": row["title"],
+                "description": None,  # Not part of ProposalCreated
+                "category": row["category"],
+                "start_time": row["start_time"],
+                "end_time": row["end_time"],
+                **{field: str(int(row[field])) for field in PROPOSAL_VOTE_FIELDS},
+                "executed": row["executed"],
+                "cancelled": row["cancelled"],
+                "status": status,
+                "block_number": row["block_number"]
+            }
+
+        return proposals
+
+    async def get_token_balance(self, address: str) -> Optional[int]:
+        """Indexed token balance of an account, None if it never held tokens"""
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.CHAIN_TOKEN_BALANCES).select("balance").eq(
+            "address", Web3.to_checksum_address(address)
+        ).execute()
+        if not result.data:
+            return None
+        return int(result.data[0]["balance"])
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(self.poll_interval)
+
+
+# Global chain indexer instance
+chain_event_indexer = ChainEventIndexer()
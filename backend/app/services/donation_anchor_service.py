@@ -0,0 +1,323 @@
+"""
+Donation anchoring service
+Batches donation records into Merkle trees and anchors one root per batch on chain
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service, Tables
+from ..core.blockchain import blockchain_service
+from ..core.merkle import donation_leaf, build_tree, merkle_root, merkle_proof, verify_proof
+from ..core.websocket import notification_manager
+from .stats_service import stats_service, BLOCKCHAIN_STATS
+
+logger = structlog.get_logger()
+
+
+def _to_hex(value: bytes) -> str:
+    return "0x" + value.hex()
+
+
+def _from_hex(value: str) -> bytes:
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+class DonationAnchorService:
+    """
+    Anchors donation records in Merkle-batched transactions.
+
+    Records are queued in donation_anchors by the blockchain outbox
+    dispatcher once a donation is created. Every window, or as soon as a full
+    batch is waiting, the queued records become the leaves of a Merkle tree
+    whose root is anchored with one transaction.
+    Each record then stores its inclusion proof, so membership can be checked
+    offline against the batch root without querying the chain.
+
+    A batch claims its records before the transaction is sent and records
+    the transaction hash before the records are updated, so a flush that
+    stops halfway is finished by the next one instead of anchored again.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.ANCHOR_BATCH_WINDOW,
+        max_batch_size: int = settings.ANCHOR_BATCH_MAX_SIZE
+    ):
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+        self._queued = 0
+
+    def start(self) -> None:
+        """Start the batching loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+            logger.info("Donation anchoring started", window=self.window, max_batch_size=self.max_batch_size)
+
+    async def stop(self) -> None:
+        # Queued records stay in donation_anchors and go out with the next start
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def enqueue(self, donation_id: str, metadata_hash: str) -> Dict[str, Any]:
+        """Queue a donation record for the next anchor batch"""
+        leaf = _to_hex(donation_leaf(donation_id, metadata_hash))
+
+        supabase = get_supabase_service()
+        supabase.table(Tables.DONATION_ANCHORS).insert({
+            "donation_id": donation_id,
+            "metadata_hash": metadata_hash,
+            "leaf": leaf,
+            "status": "pending"
+        }).execute()
+
+        self._queued += 1
+        if self._queued >= self.max_batch_size and self._wake is not None:
+            self._wake.set()
+
+        return {"donation_id": donation_id, "leaf": leaf, "status": "pending"}
+
+    async def flush(self) -> Dict[str, Any]:
+        """Anchor up to one batch of queued records, finishing an interrupted batch first"""
+        async with self._flush_lock:
+            try:
+                supabase = get_supabase_service()
+
+                batch, records = self._resume_batch()
+                if batch is None:
+                    batch, records = self._claim_batch()
+                if batch is None:
+                    self._queued = 0
+                    return {"success": True, "anchored": 0}
+
+                levels = build_tree([_from_hex(record["leaf"]) for record in records])
+                root = merkle_root(levels)
+
+                tx_hash = batch.get("tx_hash")
+                if not tx_hash:
+                    tx_hash = await blockchain_service.anchor_merkle_root(root, len(records))
+
+                    if not tx_hash:
+                        # Records go back to the queue and are retried with the next batch
+                        supabase.table(Tables.ANCHOR_BATCHES).update({"status": "failed"}).eq(
+                            "id", batch["id"]
+                        ).execute()
+                        supabase.table(Tables.DONATION_ANCHORS).update({"batch_id": None, "leaf_index": None}).eq(
+                            "batch_id", batch["id"]
+                        ).execute()
+                        logger.warning("Anchor batch not confirmed", batch_id=batch["id"], records=len(records))
+                        return {"success": False, "error": "Anchor transaction was not confirmed", "pending": len(records)}
+
+                    # Recorded before the writes below, so a retry after a failure
+                    # among them finishes this batch instead of anchoring it again
+                    supabase.table(Tables.ANCHOR_BATCHES).update({"tx_hash": tx_hash}).eq(
+                        "id", batch["id"]
+                    ).execute()
+
+                anchored_at = datetime.utcnow().isoformat()
+
+                supabase.table(Tables.DONATION_ANCHORS).upsert([
+                    {
+                        **record,
+                        "batch_id": batch["id"],
+                        "leaf_index": index,
+                        "proof": [_to_hex(node) for node in merkle_proof(levels, index)],
+                        "status": "anchored",
+                        "anchored_at": anchored_at
+                    }
+                    for index, record in enumerate(records)
+                ]).execute()
+
+                donations = supabase.table(Tables.DONATIONS).update({
+                    "blockchain_status": "confirmed",
+                    "blockchain_tx_hash": tx_hash,
+                    "blockchain_recorded_at": anchored_at
+                }).in_("id", [record["donation_id"] for record in records]).execute().data or []
+
+                supabase.table(Tables.BLOCKCHAIN_TRANSACTIONS).upsert({
+                    "blockchain_hash": tx_hash,
+                    "function_name": "anchorMerkleRoot",
+                    "function_params": {"merkle_root": _to_hex(root), "leaf_count": len(records)},
+                    "status": "confirmed",
+                    "network_id": "ytili_saga",
+                    "confirmed_at": anchored_at
+                }, on_conflict="blockchain_hash").execute()
+
+                supabase.table(Tables.ANCHOR_BATCHES).update({
+                    "status": "anchored",
+                    "anchored_at": anchored_at
+                }).eq("id", batch["id"]).execute()
+                stats_service.invalidate(BLOCKCHAIN_STATS)
+
+                self._queued = max(0, self._queued - len(records))
+
+                logger.info("Anchor batch confirmed", batch_id=batch["id"], records=len(records), tx_hash=tx_hash)
+
+                for donation in donations:
+                    try:
+                        await notification_manager.send_donation_update(
+                            user_id=donation["donor_id"],
+                            donation_id=donation["id"],
+                            status="blockchain_confirmed",
+                            details={"operation": "record_donation", "tx_hash": tx_hash, "batch_id": batch["id"]}
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to notify donor of anchored donation {donation['id']}: {str(e)}")
+
+                return {
+                    "success": True,
+                    "anchored": len(records),
+                    "batch_id": batch["id"],
+                    "merkle_root": _to_hex(root),
+                    "tx_hash": tx_hash
+                }
+
+            except Exception as e:
+                logger.error(f"Failed to anchor donation batch: {str(e)}")
+                return {"success": False, "error": str(e)}
+
+    def _resume_batch(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """The oldest batch left submitting by an interrupted flush, with its records in leaf order"""
+        supabase = get_supabase_service()
+
+        result = supabase.table(Tables.ANCHOR_BATCHES).select("id, merkle_root, tx_hash").eq(
+            "status", "submitting"
+        ).order("id").limit(1).execute()
+        if not result.data:
+            return None, []
+
+        batch = result.data[0]
+        records = supabase.table(Tables.DONATION_ANCHORS).select(
+            "id, donation_id, metadata_hash, leaf"
+        ).eq("batch_id", batch["id"]).order("leaf_index").execute().data or []
+        if not records:
+            # Nothing was claimed for it; its records are still queued
+            supabase.table(Tables.ANCHOR_BATCHES).update({"status": "failed"}).eq("id", batch["id"]).execute()
+            return None, []
+
+        logger.info("Resuming anchor batch", batch_id=batch["id"], records=len(records), tx_hash=batch["tx_hash"])
+        return batch, records
+
+    def _claim_batch(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """A new batch of the oldest queued records, which are assigned to it and their leaf index"""
+        supabase = get_supabase_service()
+
+        pending = supabase.table(Tables.DONATION_ANCHORS).select(
+            "id, donation_id, metadata_hash, leaf"
+        ).eq("status", "pending").is_("batch_id", "null").order("created_at").limit(self.max_batch_size).execute()
+        records = pending.data or []
+        if not records:
+            return None, []
+
+        root = merkle_root(build_tree([_from_hex(record["leaf"]) for record in records]))
+        batch = supabase.table(Tables.ANCHOR_BATCHES).insert({
+            "merkle_root": _to_hex(root),
+            "leaf_count": len(records),
+            "status": "submitting"
+        }).execute().data[0]
+
+        supabase.table(Tables.DONATION_ANCHORS).upsert([
+            {**record, "batch_id": batch["id"], "leaf_index": index}
+            for index, record in enumerate(records)
+        ]).execute()
+        return batch, records
+
+    async def get_inclusion_proof(self, donation_id: str) -> Optional[Dict[str, Any]]:
+        """Stored inclusion proof of a donation record, or None if it was never queued"""
+        supabase = get_supabase_service()
+
+        result = supabase.table(Tables.DONATION_ANCHORS).select("*").eq(
+            "donation_id", donation_id
+        ).order("created_at", desc=True).limit(1).execute()
+        if not result.data:
+            return None
+
+        anchor = result.data[0]
+        if anchor["status"] != "anchored":
+            return {"donation_id": donation_id, "leaf": anchor["leaf"], "status": anchor["status"]}
+
+        batch = supabase.table(Tables.ANCHOR_BATCHES).select("*").eq("id", anchor["batch_id"]).execute().data[0]
+
+        return {
+            "donation_id": donation_id,
+            "metadata_hash": anchor["metadata_hash"],
+            "leaf": anchor["leaf"],
+            "leaf_index": anchor["leaf_index"],
+            "proof": anchor["proof"],
+            "batch_id": batch["id"],
+            "merkle_root": batch["merkle_root"],
+            "leaf_count": batch["leaf_count"],
+            "tx_hash": batch["tx_hash"],
+            "anchored_at": batch["anchored_at"],
+            "status": "anchored"
+        }
+
+    async def verify_donation_inclusion(
+        self,
+        donation_id: str,
+        metadata_hash: Optional[str] = None,
+        check_chain: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Check a donation record against its anchored batch root.
+
+        Pass the donation's current metadata_hash to also detect records that
+        changed after anchoring. The proof is checked offline; check_chain
+        additionally confirms that the anchor transaction carries the root.
+        """
+        try:
+            anchor = await self.get_inclusion_proof(donation_id)
+            if anchor is None or anchor["status"] != "anchored":
+                return {
+                    "anchored": False,
+                    "included": False,
+                    "status": anchor["status"] if anchor else "not_queued"
+                }
+
+            leaf = donation_leaf(donation_id, metadata_hash or anchor["metadata_hash"])
+            root = _from_hex(anchor["merkle_root"])
+            included = verify_proof(leaf, [_from_hex(node) for node in anchor["proof"]], root)
+
+            on_chain = None
+            if check_chain:
+                on_chain = await blockchain_service.verify_anchor_transaction(anchor["tx_hash"], root)
+
+            return {
+                "anchored": True,
+                "included": included,
+                "anchor_confirmed_on_chain": on_chain,
+                **{key: anchor[key] for key in ("batch_id", "leaf_index", "merkle_root", "proof", "tx_hash", "anchored_at")}
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to verify donation anchor: {str(e)}")
+            return {"anchored": False, "included": False, "error": str(e)}
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.window)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            result = await self.flush()
+            # Keep draining while full batches are waiting
+            while result.get("success") and result.get("anchored", 0) >= self.max_batch_size:
+                result = await self.flush()
+
+
+# Global donation anchoring service instance
+donation_anchor_service = DonationAnchorService()
@@ -4,15 +4,16 @@ Donation service for business logic
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import selectinload
-import hashlib
-import json
 import time
 
 from ..models.donation import (
-    Donation, DonationTransaction, MedicationCatalog,
+    Donation, DonationTransaction, DonationChainHead, MedicationCatalog,
     DonationType, DonationStatus, PaymentStatus
 )
+from ..core.ledger import compute_transaction_hash, GENESIS_HASH
+from .hospital_stats_service import HospitalStatsService, DonationState
 
 
 class DonationService:
@@ -81,13 +82,39 @@ class DonationService:
         status: DonationStatus,
         actor_id: int,
         actor_type: str,
-        description: str = None
+        description: str = None,
+        recipient_id: Optional[int] = None
     ) -> bool:
-        """Update donation status"""
+        """Update donation status, optionally routing it to a recipient"""
+        result = await self.db.execute(
+            select(
+                Donation.recipient_id,
+                Donation.status,
+                Donation.donation_type,
+                Donation.created_at
+            )
+            .where(Donation.id == donation_id)
+            .with_for_update()
+        )
+        before = result.one_or_none()
+        if before is None:
+            return False
+        before = DonationState(*before)
+        
+        values = {"status": status}
+        if recipient_id is not None:
+            values["recipient_id"] = recipient_id
+        
         result = await self.db.execute(
             update(Donation)
             .where(Donation.id == donation_id)
-            .values(status=status)
+            .values(**values)
+        )
+        
+        # Hospital statistics change in the same transaction as the donation
+        await HospitalStatsService(self.db).apply_change(
+            before,
+            before._replace(status=status, recipient_id=recipient_id or before.recipient_id)
         )
         await self.db.commit()
         
@@ -144,31 +171,41 @@ class DonationService:
         metadata: Dict[str, Any] = None
     ) -> DonationTransaction:
         """Create a transaction record for transparency"""
-        # Get the previous transaction for this donation
+        # The chain head holds the previous hash; locking it keeps concurrent
+        # appends to the same donation from linking to the same predecessor.
+        # The first append creates it; concurrent ones wait for that row.
+        await self.db.execute(
+            insert(DonationChainHead)
+            .values(donation_id=donation_id, verified_seq=0, verified_length=0)
+            .on_conflict_do_nothing(index_elements=[DonationChainHead.donation_id])
+        )
         result = await self.db.execute(
-            select(DonationTransaction)
-            .where(DonationTransaction.donation_id == donation_id)
-            .order_by(DonationTransaction.id.desc())
-            .limit(1)
+            select(DonationChainHead)
+            .where(DonationChainHead.donation_id == donation_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        head = result.scalar_one()
+        
+        if head.head_transaction_id is not None:
+            previous_hash = head.head_hash
+        else:
+            # Chains started before heads were tracked
+            result = await self.db.execute(
+                select(DonationTransaction.transaction_hash)
+                .where(DonationTransaction.donation_id == donation_id)
+                .order_by(DonationTransaction.ledger_seq.desc())
+                .limit(1)
+            )
+            previous_hash = result.scalar_one_or_none() or GENESIS_HASH
+        
+        # Create a hash for this transaction; the timestamp is stored so the
+        # ledger audit can recompute it
+        hashed_at = time.time()
+        transaction_hash = compute_transaction_hash(
+            donation_id, transaction_type, description, actor_id, actor_type,
+            metadata, hashed_at, previous_hash
         )
-        previous_transaction = result.scalar_one_or_none()
-        previous_hash = previous_transaction.transaction_hash if previous_transaction else "0" * 64
-        
-        # Create a hash for this transaction
-        transaction_data = {
-            "donation_id": donation_id,
-            "transaction_type": transaction_type,
-            "description": description,
-            "actor_id": actor_id,
-            "actor_type": actor_type,
-            "metadata": metadata or {},
-            "timestamp": time.time(),
-            "previous_hash": previous_hash
-        }
-        
-        transaction_hash = hashlib.sha256(
-            json.dumps(transaction_data, sort_keys=True).encode()
-        ).hexdigest()
         
         # Create the transaction record
         transaction = DonationTransaction(
@@ -177,12 +214,17 @@ class DonationService:
             description=description,
             actor_id=actor_id,
             actor_type=actor_type,
-            metadata=metadata,
+            transaction_metadata=metadata,
             transaction_hash=transaction_hash,
-            previous_hash=previous_hash
+            previous_hash=previous_hash,
+            hashed_at=hashed_at
         )
         
         self.db.add(transaction)
+        await self.db.flush()
+        
+        head.head_transaction_id = transaction.id
+        head.head_hash = transaction_hash
         await self.db.commit()
         await self.db.refresh(transaction)
         
@@ -1,14 +1,39 @@
 """
 Fraud detection service for Ytili platform
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, func, case
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime, timedelta
+import structlog
 
-from ..models.donation import Donation, DonationTransaction, DonationStatus
+from ..core.config import settings
+from ..models.donation import (
+    Donation, DonationTransaction, DonationStatus, DonationType,
+    ChainAuditState, SuspiciousActivity, FraudScanState
+)
 from ..models.user import User, UserStatus
 
+logger = structlog.get_logger()
+
+CHAIN_AUDIT_NAME = "donation_transactions"
+FRAUD_SCAN_NAME = "platform"
+
+
+def jsonable(value: Any) -> Any:
+    """Finding with datetimes and decimals converted for a JSON column"""
+    if isinstance(value, dict):
+        return {k: jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
 
 class FraudDetectionService:
     """Service for detecting potential fraud in donations"""
@@ -16,43 +41,310 @@ class FraudDetectionService:
     def __init__(self, db: AsyncSession):
         self.db = db
     
-    async def scan_for_suspicious_activity(self) -> List[Dict[str, Any]]:
-        """Scan for suspicious activity across the platform"""
+    async def run_incremental_scan(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Scan for suspicious activity and persist the findings
+        
+        Detectors over a fixed time window (donation rate, status changes) and the
+        hash-chain audit, which keeps its own watermark, run on every scan. The
+        others only re-check donations, payments and KYC documents changed since
+        the previous scan's watermark. Findings are upserted into
+        suspicious_activities, findings that are no longer detected are resolved,
+        and a dashboard snapshot is stored for the admin endpoints. full=True
+        ignores the watermarks and re-checks everything.
+        """
+        from ..models.user import KYCDocument
         
-        suspicious_activities = []
+        started_at = datetime.now()
+        state = await self._get_scan_state()
+        if state is None:
+            return {"success": False, "error": "Another fraud scan is in progress"}
         
-        # Check for suspicious users
-        suspicious_users = await self._detect_suspicious_users()
-        suspicious_activities.extend(suspicious_users)
+        try:
+            since = None
+            if not full and state.watermark is not None:
+                since = state.watermark.replace(tzinfo=None) - timedelta(seconds=settings.FRAUD_SCAN_OVERLAP)
+            
+            # Activity type -> (subject column, IDs re-checked), None when re-checked in full
+            scopes: Dict[str, Optional[Tuple[str, set]]] = {
+                "high_donation_rate": None,
+                "frequent_status_changes": None,
+                "hash_inconsistency": None
+            }
+            findings = []
+            findings.extend(await self._detect_high_donation_rate_users())
+            findings.extend(await self._detect_status_change_issues())
+            findings.extend(await self._detect_hash_inconsistencies(full_scan=full))
+            
+            if since is None:
+                findings.extend(await self._detect_verification_issues())
+                findings.extend(await self._detect_payment_issues())
+                findings.extend(await self._detect_unusual_amounts())
+                findings.extend(await self._detect_near_expiry_donations())
+                scopes.update(dict.fromkeys(
+                    ["verification_issues", "payment_issues", "unusual_amount", "near_expiry"]
+                ))
+            else:
+                changed = await self.db.execute(
+                    select(Donation.id, Donation.donor_id).where(
+                        or_(Donation.created_at >= since, Donation.updated_at >= since)
+                    )
+                )
+                changed = changed.all()
+                donation_ids = {donation_id for donation_id, _ in changed}
+                donor_ids = {donor_id for _, donor_id in changed}
+                
+                kyc_changed = await self.db.execute(
+                    select(KYCDocument.user_id).where(
+                        or_(KYCDocument.created_at >= since, KYCDocument.verified_at >= since)
+                    ).distinct()
+                )
+                kyc_user_ids = set(kyc_changed.scalars().all())
+                
+                findings.extend(await self._detect_verification_issues(kyc_user_ids))
+                findings.extend(await self._detect_payment_issues(donor_ids))
+                findings.extend(await self._detect_unusual_amounts(donation_ids))
+                # Donations also enter the expiry window (or its medium-severity
+                # half) just because time passed
+                findings.extend(await self._detect_near_expiry_donations(
+                    donation_ids, expiring_after=since + timedelta(days=15)
+                ))
+                scopes.update({
+                    "verification_issues": ("user_id", kyc_user_ids),
+                    "payment_issues": ("user_id", donor_ids),
+                    "unusual_amount": ("donation_id", donation_ids),
+                    "near_expiry": ("donation_id", donation_ids)
+                })
+            
+            stored = await self._store_findings(findings, scopes, started_at)
+            
+            state.dashboard = await self._build_dashboard_snapshot()
+            state.watermark = started_at
+            state.last_duration_seconds = round((datetime.now() - started_at).total_seconds(), 3)
+            state.last_error = None
+            await self.db.commit()
+            
+            logger.info(
+                "Fraud scan completed", full=full, findings=len(findings),
+                duration=float(state.last_duration_seconds), **stored
+            )
+            return {"success": True, "findings": len(findings), **stored}
         
-        # Check for suspicious donations
-        suspicious_donations = await self._detect_suspicious_donations()
-        suspicious_activities.extend(suspicious_donations)
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Fraud scan failed: {str(e)}")
+            await self._record_scan_error(str(e))
+            return {"success": False, "error": str(e)}
+    
+    async def _record_scan_error(self, error: str) -> None:
+        """Store a failed scan's error in its own transaction, after the scan's changes were rolled back"""
+        try:
+            await self.db.execute(
+                insert(FraudScanState)
+                .values(name=FRAUD_SCAN_NAME, last_error=error)
+                .on_conflict_do_update(index_elements=[FraudScanState.name], set_={"last_error": error})
+            )
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to record fraud scan error: {str(e)}")
+    
+    async def _get_scan_state(self) -> Optional[FraudScanState]:
+        """Scan state row, locked for the scan; None if another worker holds it"""
+        result = await self.db.execute(
+            select(FraudScanState)
+            .where(FraudScanState.name == FRAUD_SCAN_NAME)
+            .with_for_update(skip_locked=True)
+        )
+        state = result.scalar_one_or_none()
         
-        # Check for suspicious transactions
-        suspicious_transactions = await self._detect_suspicious_transactions()
-        suspicious_activities.extend(suspicious_transactions)
+        if state is None:
+            exists = await self.db.execute(
+                select(FraudScanState.name).where(FraudScanState.name == FRAUD_SCAN_NAME)
+            )
+            if exists.scalar_one_or_none() is not None:
+                return None
+            state = FraudScanState(name=FRAUD_SCAN_NAME)
+            self.db.add(state)
         
-        return suspicious_activities
+        return state
     
-    async def _detect_suspicious_users(self) -> List[Dict[str, Any]]:
-        """Detect suspicious user activity"""
+    @staticmethod
+    def _activity_key(activity: Dict[str, Any]) -> str:
+        if activity.get("transaction_id") is not None:
+            return f"{activity['type']}:transaction:{activity['transaction_id']}"
+        if activity.get("donation_id") is not None:
+            return f"{activity['type']}:donation:{activity['donation_id']}"
+        return f"{activity['type']}:user:{activity['user_id']}"
+    
+    async def _store_findings(
+        self,
+        findings: List[Dict[str, Any]],
+        scopes: Dict[str, Optional[Tuple[str, set]]],
+        detected_at: datetime
+    ) -> Dict[str, int]:
+        """Upsert findings and resolve active ones in a re-checked scope that were not found again"""
+        by_key = {self._activity_key(finding): finding for finding in findings}
         
-        suspicious_users = []
+        result = await self.db.execute(
+            select(SuspiciousActivity).where(
+                or_(
+                    SuspiciousActivity.is_active == True,
+                    SuspiciousActivity.activity_key.in_(list(by_key))
+                )
+            )
+        )
+        existing = {activity.activity_key: activity for activity in result.scalars().all()}
+        
+        created = 0
+        for key, finding in by_key.items():
+            activity = existing.get(key)
+            if activity is None:
+                activity = SuspiciousActivity(activity_key=key, first_detected_at=detected_at)
+                self.db.add(activity)
+                created += 1
+            elif not activity.is_active:
+                activity.first_detected_at = detected_at
+            
+            activity.activity_type = finding["type"]
+            activity.severity = finding["severity"]
+            activity.user_id = finding.get("user_id")
+            activity.donation_id = finding.get("donation_id")
+            activity.transaction_id = finding.get("transaction_id")
+            activity.description = finding.get("description")
+            activity.details = jsonable(finding)
+            activity.is_active = True
+            activity.last_detected_at = detected_at
+            activity.resolved_at = None
+        
+        resolved = 0
+        for key, activity in existing.items():
+            if not activity.is_active or key in by_key or activity.activity_type not in scopes:
+                continue
+            scope = scopes[activity.activity_type]
+            if scope is None or getattr(activity, scope[0]) in scope[1]:
+                activity.is_active = False
+                activity.resolved_at = detected_at
+                resolved += 1
+        
+        await self.db.flush()
+        return {"created": created, "resolved": resolved}
+    
+    async def _build_dashboard_snapshot(self) -> Dict[str, Any]:
+        """Severity/type counts and high-risk users over the active findings"""
+        result = await self.db.execute(
+            select(
+                SuspiciousActivity.severity,
+                SuspiciousActivity.activity_type,
+                func.count(SuspiciousActivity.id)
+            )
+            .where(SuspiciousActivity.is_active == True)
+            .group_by(SuspiciousActivity.severity, SuspiciousActivity.activity_type)
+        )
         
-        # 1. Users with high donation creation rate
-        high_donation_users = await self._detect_high_donation_rate_users()
-        suspicious_users.extend(high_donation_users)
+        severity_counts = {"high": 0, "medium": 0, "low": 0}
+        type_counts: Dict[str, int] = {}
+        total = 0
+        for severity, activity_type, count in result.all():
+            severity_counts[severity] = severity_counts.get(severity, 0) + count
+            type_counts[activity_type] = type_counts.get(activity_type, 0) + count
+            total += count
         
-        # 2. Users with suspicious verification patterns
-        verification_issues = await self._detect_verification_issues()
-        suspicious_users.extend(verification_issues)
+        user_ids = await self.db.execute(
+            select(SuspiciousActivity.user_id)
+            .where(
+                and_(
+                    SuspiciousActivity.is_active == True,
+                    SuspiciousActivity.user_id.isnot(None)
+                )
+            )
+            .distinct()
+        )
+        risk_assessments = await self.get_fraud_risk_scores(user_ids.scalars().all())
+        high_risk_ids = [
+            user_id for user_id, assessment in risk_assessments.items()
+            if assessment["risk_level"] == "high"
+        ]
+        users = await self._get_users(high_risk_ids)
+        
+        high_risk_users = []
+        for user_id in high_risk_ids:
+            user = users.get(user_id)
+            if user:
+                risk_assessment = risk_assessments[user_id]
+                high_risk_users.append({
+                    "user_id": user_id,
+                    "email": user.email,
+                    "full_name": user.full_name,
+                    "user_type": user.user_type.value,
+                    "risk_score": risk_assessment["risk_score"],
+                    "risk_factors": risk_assessment["factors"]
+                })
         
-        # 3. Users with multiple failed payments
-        payment_issues = await self._detect_payment_issues()
-        suspicious_users.extend(payment_issues)
+        return {
+            "total_suspicious_activities": total,
+            "severity_counts": severity_counts,
+            "type_counts": type_counts,
+            "high_risk_users": high_risk_users
+        }
+    
+    async def get_active_activities(
+        self,
+        limit: Optional[int] = None,
+        severity: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Findings of the latest scans that are still active, most recently detected first"""
+        query = select(SuspiciousActivity).where(SuspiciousActivity.is_active == True)
+        if severity:
+            query = query.where(SuspiciousActivity.severity == severity)
+        query = query.order_by(
+            SuspiciousActivity.first_detected_at.desc(), SuspiciousActivity.id.desc()
+        )
+        if limit:
+            query = query.limit(limit)
+        
+        result = await self.db.execute(query)
+        return [
+            {
+                **(activity.details or {}),
+                "detected_at": activity.first_detected_at,
+                "last_detected_at": activity.last_detected_at
+            }
+            for activity in result.scalars().all()
+        ]
+    
+    async def get_dashboard_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Dashboard data of the latest completed scan, or None if there has been none"""
+        result = await self.db.execute(
+            select(FraudScanState).where(FraudScanState.name == FRAUD_SCAN_NAME)
+        )
+        state = result.scalar_one_or_none()
+        if state is None or state.dashboard is None:
+            return None
         
-        return suspicious_users
+        return {
+            **state.dashboard,
+            "recent_activities": await self.get_active_activities(limit=10),
+            "last_scan_at": state.watermark,
+            "last_scan_duration_seconds": float(state.last_duration_seconds or 0),
+            "last_scan_error": state.last_error
+        }
+    
+    async def _get_users(self, user_ids: List[int]) -> Dict[int, User]:
+        """Fetch users by ID in one query"""
+        if not user_ids:
+            return {}
+        result = await self.db.execute(select(User).where(User.id.in_(set(user_ids))))
+        return {user.id: user for user in result.scalars().all()}
+    
+    async def _get_donor_ids(self, donation_ids: List[int]) -> Dict[int, int]:
+        """Donor of each donation, in one query"""
+        if not donation_ids:
+            return {}
+        result = await self.db.execute(
+            select(Donation.id, Donation.donor_id).where(Donation.id.in_(set(donation_ids)))
+        )
+        return dict(result.all())
     
     async def _detect_high_donation_rate_users(self) -> List[Dict[str, Any]]:
         """Detect users creating donations at an unusually high rate"""
@@ -75,13 +367,10 @@ class FraudDetectionService:
         high_rate_users = result.all()
         
         # Format results
+        users = await self._get_users([user_id for user_id, _ in high_rate_users])
         suspicious_activities = []
         for user_id, donation_count in high_rate_users:
-            # Get user details
-            user_result = await self.db.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = user_result.scalar_one_or_none()
+            user = users.get(user_id)
             
             if user:
                 suspicious_activities.append({
@@ -99,8 +388,8 @@ class FraudDetectionService:
         
         return suspicious_activities
     
-    async def _detect_verification_issues(self) -> List[Dict[str, Any]]:
-        """Detect users with suspicious verification patterns"""
+    async def _detect_verification_issues(self, user_ids: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Detect users with suspicious verification patterns (only among user_ids if given)"""
         
         # Define thresholds
         failed_verification_threshold = 3  # More than 3 failed verifications is suspicious
@@ -116,7 +405,8 @@ class FraudDetectionService:
             .where(
                 and_(
                     KYCDocument.is_verified == False,
-                    KYCDocument.rejection_reason.isnot(None)
+                    KYCDocument.rejection_reason.isnot(None),
+                    KYCDocument.user_id.in_(user_ids) if user_ids is not None else True
                 )
             )
             .group_by(KYCDocument.user_id)
@@ -126,13 +416,10 @@ class FraudDetectionService:
         suspicious_users = result.all()
         
         # Format results
+        users = await self._get_users([user_id for user_id, _ in suspicious_users])
         suspicious_activities = []
         for user_id, rejected_count in suspicious_users:
-            # Get user details
-            user_result = await self.db.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = user_result.scalar_one_or_none()
+            user = users.get(user_id)
             
             if user:
                 suspicious_activities.append({
@@ -149,8 +436,8 @@ class FraudDetectionService:
         
         return suspicious_activities
     
-    async def _detect_payment_issues(self) -> List[Dict[str, Any]]:
-        """Detect users with multiple failed payments"""
+    async def _detect_payment_issues(self, user_ids: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Detect users with multiple failed payments (only among user_ids if given)"""
         
         # Define thresholds
         failed_payment_threshold = 3  # More than 3 failed payments is suspicious
@@ -163,7 +450,12 @@ class FraudDetectionService:
                 Donation.donor_id,
                 func.count(Donation.id).label('failed_count')
             )
-            .where(Donation.payment_status == PaymentStatus.FAILED)
+            .where(
+                and_(
+                    Donation.payment_status == PaymentStatus.FAILED,
+                    Donation.donor_id.in_(user_ids) if user_ids is not None else True
+                )
+            )
             .group_by(Donation.donor_id)
             .having(func.count(Donation.id) >= failed_payment_threshold)
         )
@@ -171,13 +463,10 @@ class FraudDetectionService:
         suspicious_users = result.all()
         
         # Format results
+        users = await self._get_users([user_id for user_id, _ in suspicious_users])
         suspicious_activities = []
         for user_id, failed_count in suspicious_users:
-            # Get user details
-            user_result = await self.db.execute(
-                select(User).where(User.id == user_id)
-            )
-            user = user_result.scalar_one_or_none()
+            user = users.get(user_id)
             
             if user:
                 suspicious_activities.append({
@@ -194,27 +483,8 @@ class FraudDetectionService:
         
         return suspicious_activities
     
-    async def _detect_suspicious_donations(self) -> List[Dict[str, Any]]:
-        """Detect suspicious donation patterns"""
-        
-        suspicious_donations = []
-        
-        # 1. Donations with unusual amounts
-        unusual_amounts = await self._detect_unusual_amounts()
-        suspicious_donations.extend(unusual_amounts)
-        
-        # 2. Donations with near-expiry medications
-        near_expiry = await self._detect_near_expiry_donations()
-        suspicious_donations.extend(near_expiry)
-        
-        # 3. Donations with suspicious status changes
-        status_issues = await self._detect_status_change_issues()
-        suspicious_donations.extend(status_issues)
-        
-        return suspicious_donations
-    
-    async def _detect_unusual_amounts(self) -> List[Dict[str, Any]]:
-        """Detect donations with unusual amounts"""
+    async def _detect_unusual_amounts(self, donation_ids: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Detect donations with unusual amounts (only among donation_ids if given)"""
         
         # Define thresholds
         high_amount_threshold = 10000000  # 10 million VND
@@ -224,8 +494,9 @@ class FraudDetectionService:
             select(Donation)
             .where(
                 and_(
-                    Donation.donation_type == "cash",
-                    Donation.amount >= high_amount_threshold
+                    Donation.donation_type == DonationType.CASH,
+                    Donation.amount >= high_amount_threshold,
+                    Donation.id.in_(donation_ids) if donation_ids is not None else True
                 )
             )
         )
@@ -248,8 +519,17 @@ class FraudDetectionService:
         
         return suspicious_activities
     
-    async def _detect_near_expiry_donations(self) -> List[Dict[str, Any]]:
-        """Detect donations with medications close to expiry"""
+    async def _detect_near_expiry_donations(
+        self,
+        donation_ids: Optional[Any] = None,
+        expiring_after: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Detect donations with medications close to expiry
+        
+        When donation_ids is given, only those donations and the ones expiring
+        after expiring_after (newly inside the window) are checked.
+        """
         
         # Define thresholds
         expiry_threshold = datetime.now() + timedelta(days=30)  # Less than 30 days to expiry
@@ -259,9 +539,13 @@ class FraudDetectionService:
             select(Donation)
             .where(
                 and_(
-                    Donation.donation_type.in_(["medication", "food"]),
+                    Donation.donation_type.in_([DonationType.MEDICATION, DonationType.FOOD]),
                     Donation.expiry_date.isnot(None),
-                    Donation.expiry_date <= expiry_threshold
+                    Donation.expiry_date <= expiry_threshold,
+                    or_(
+                        Donation.id.in_(donation_ids),
+                        Donation.expiry_date > expiring_after
+                    ) if donation_ids is not None else True
                 )
             )
         )
@@ -313,20 +597,17 @@ class FraudDetectionService:
         suspicious_donations = result.all()
         
         # Format results
+        donor_ids = await self._get_donor_ids([donation_id for donation_id, _ in suspicious_donations])
         suspicious_activities = []
         for donation_id, change_count in suspicious_donations:
-            # Get donation details
-            donation_result = await self.db.execute(
-                select(Donation).where(Donation.id == donation_id)
-            )
-            donation = donation_result.scalar_one_or_none()
+            donor_id = donor_ids.get(donation_id)
             
-            if donation:
+            if donor_id is not None:
                 suspicious_activities.append({
                     "type": "frequent_status_changes",
                     "severity": "medium",
                     "donation_id": donation_id,
-                    "donor_id": donation.donor_id,
+                    "donor_id": donor_id,
                     "change_count": change_count,
                     "threshold": status_change_threshold,
                     "time_window": "24 hours",
@@ -336,77 +617,186 @@ class FraudDetectionService:
         
         return suspicious_activities
     
-    async def _detect_suspicious_transactions(self) -> List[Dict[str, Any]]:
-        """Detect suspicious transaction patterns"""
-        
-        suspicious_transactions = []
+    async def _detect_hash_inconsistencies(self, full_scan: bool = False) -> List[Dict[str, Any]]:
+        """
+        Detect transactions whose previous_hash does not match the transaction before them
+        
+        Chains are streamed in (donation_id, ledger_seq) order in chunks, keeping
+        only the previous hash of the chain being walked. Only chains with
+        transactions created since FRAUD_SCAN_OVERLAP seconds before the last scan
+        are walked again; findings for the other chains are carried over from the
+        persisted audit state. full_scan re-walks every chain.
+        
+        A transaction only becomes visible when it commits, which can be after a
+        scan that started later than its created_at. The overlap re-walks such
+        chains on the next scan, so no transaction open for less than
+        FRAUD_SCAN_OVERLAP seconds is skipped.
+        """
+        state = await self._get_chain_audit_state()
+        
+        # Database time, so the overlap does not depend on this host's clock
+        scanned_at = (await self.db.execute(select(func.now()))).scalar()
+        
+        query = select(
+            DonationTransaction.donation_id,
+            DonationTransaction.id,
+            DonationTransaction.transaction_hash,
+            DonationTransaction.previous_hash
+        )
         
-        # 1. Transactions with hash inconsistencies
-        hash_issues = await self._detect_hash_inconsistencies()
-        suspicious_transactions.extend(hash_issues)
+        if not full_scan and state.last_scan_at is not None:
+            since = state.last_scan_at - timedelta(seconds=settings.FRAUD_SCAN_OVERLAP)
+            touched = (
+                select(DonationTransaction.donation_id)
+                .where(DonationTransaction.created_at > since)
+                .distinct()
+            )
+            query = query.where(DonationTransaction.donation_id.in_(touched))
+        
+        query = query.order_by(
+            DonationTransaction.donation_id, DonationTransaction.ledger_seq
+        ).execution_options(yield_per=settings.FRAUD_CHAIN_AUDIT_CHUNK_SIZE)
+        
+        broken_links = {} if full_scan else dict(state.broken_links or {})
+        detected_at = datetime.now().isoformat()
+        
+        current_donation_id = None
+        previous_id = previous_hash = None
+        
+        result = await self.db.stream(query)
+        async for donation_id, tx_id, tx_hash, tx_previous_hash in result:
+            if donation_id != current_donation_id:
+                # Start of a chain that is walked again: drop its old findings
+                current_donation_id = donation_id
+                broken_links.pop(str(donation_id), None)
+            elif tx_previous_hash != previous_hash:
+                broken_links.setdefault(str(donation_id), []).append({
+                    "type": "hash_inconsistency",
+                    "severity": "high",
+                    "donation_id": donation_id,
+                    "transaction_id": tx_id,
+                    "previous_transaction_id": previous_id,
+                    "expected_hash": previous_hash,
+                    "actual_hash": tx_previous_hash,
+                    "detected_at": detected_at,
+                    "description": "Transaction hash chain broken - possible tampering"
+                })
+            
+            previous_id, previous_hash = tx_id, tx_hash
         
-        return suspicious_transactions
-    
-    async def _detect_hash_inconsistencies(self) -> List[Dict[str, Any]]:
-        """Detect transactions with hash inconsistencies"""
+        # Committed by the caller together with the rest of the scan
+        state.broken_links = broken_links
+        state.last_scan_at = scanned_at
+        await self.db.flush()
         
-        # This would normally involve complex chain validation
-        # For now, we'll implement a simplified version
+        suspicious_activities = []
+        for findings in broken_links.values():
+            for finding in findings:
+                suspicious_activities.append({
+                    **finding, "detected_at": datetime.fromisoformat(finding["detected_at"])
+                })
+        suspicious_activities.sort(key=lambda a: (a["donation_id"], a["transaction_id"]))
         
-        # Get all transactions
+        return suspicious_activities
+    
+    async def _get_chain_audit_state(self) -> ChainAuditState:
+        """Persisted hash-chain audit progress, locked for the duration of the scan"""
         result = await self.db.execute(
-            select(DonationTransaction)
-            .order_by(DonationTransaction.donation_id, DonationTransaction.id)
+            select(ChainAuditState)
+            .where(ChainAuditState.name == CHAIN_AUDIT_NAME)
+            .with_for_update()
         )
+        state = result.scalar_one_or_none()
         
-        transactions = result.scalars().all()
+        if state is None:
+            state = ChainAuditState(name=CHAIN_AUDIT_NAME, broken_links={})
+            self.db.add(state)
         
-        # Group by donation
-        donation_transactions = {}
-        for tx in transactions:
-            if tx.donation_id not in donation_transactions:
-                donation_transactions[tx.donation_id] = []
-            donation_transactions[tx.donation_id].append(tx)
-        
-        # Check chain integrity for each donation
-        suspicious_activities = []
-        for donation_id, tx_chain in donation_transactions.items():
-            for i in range(1, len(tx_chain)):
-                current_tx = tx_chain[i]
-                previous_tx = tx_chain[i-1]
-                
-                # Check if previous hash matches
-                if current_tx.previous_hash != previous_tx.transaction_hash:
-                    suspicious_activities.append({
-                        "type": "hash_inconsistency",
-                        "severity": "high",
-                        "donation_id": donation_id,
-                        "transaction_id": current_tx.id,
-                        "previous_transaction_id": previous_tx.id,
-                        "expected_hash": previous_tx.transaction_hash,
-                        "actual_hash": current_tx.previous_hash,
-                        "detected_at": datetime.now(),
-                        "description": "Transaction hash chain broken - possible tampering"
-                    })
-        
-        return suspicious_activities
+        return state
     
     async def get_fraud_risk_score(self, user_id: int) -> Dict[str, Any]:
         """Calculate fraud risk score for a user (0-100)"""
+        return (await self.get_fraud_risk_scores([user_id]))[user_id]
+    
+    async def get_fraud_risk_scores(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Calculate fraud risk scores for many users (0-100)
+        
+        Users and their donation, failed payment and rejected KYC counts are
+        read in a single query, whatever the number of users.
+        """
+        from ..models.donation import PaymentStatus
+        from ..models.user import KYCDocument
         
-        # Get user details
-        user_result = await self.db.execute(
-            select(User).where(User.id == user_id)
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return {}
+        
+        donation_counts = (
+            select(
+                Donation.donor_id.label("user_id"),
+                func.count(Donation.id).label("donation_count"),
+                func.sum(
+                    case((Donation.payment_status == PaymentStatus.FAILED, 1), else_=0)
+                ).label("failed_payments")
+            )
+            .where(Donation.donor_id.in_(user_ids))
+            .group_by(Donation.donor_id)
+            .subquery()
+        )
+        rejected_documents = (
+            select(
+                KYCDocument.user_id.label("user_id"),
+                func.count(KYCDocument.id).label("rejected_docs")
+            )
+            .where(
+                and_(
+                    KYCDocument.user_id.in_(user_ids),
+                    KYCDocument.is_verified == False,
+                    KYCDocument.rejection_reason.isnot(None)
+                )
+            )
+            .group_by(KYCDocument.user_id)
+            .subquery()
         )
-        user = user_result.scalar_one_or_none()
         
-        if not user:
-            return {
+        result = await self.db.execute(
+            select(
+                User,
+                donation_counts.c.donation_count,
+                donation_counts.c.failed_payments,
+                rejected_documents.c.rejected_docs
+            )
+            .outerjoin(donation_counts, donation_counts.c.user_id == User.id)
+            .outerjoin(rejected_documents, rejected_documents.c.user_id == User.id)
+            .where(User.id.in_(user_ids))
+        )
+        
+        scores = {
+            user_id: {
                 "user_id": user_id,
                 "risk_score": 0,
                 "risk_level": "unknown",
                 "factors": ["User not found"]
             }
+            for user_id in user_ids
+        }
+        
+        for user, donation_count, failed_payments, rejected_docs in result.all():
+            scores[user.id] = self._score_user_risk(
+                user, donation_count or 0, int(failed_payments or 0), rejected_docs or 0
+            )
+        
+        return scores
+    
+    def _score_user_risk(
+        self,
+        user: User,
+        donation_count: int,
+        failed_payments: int,
+        rejected_docs: int
+    ) -> Dict[str, Any]:
+        """Risk score of one user from their pre-fetched counts"""
         
         # Start with base score
         risk_score = 0
@@ -435,47 +825,16 @@ class FraudDetectionService:
             risk_factors.append("KYC not verified for organization account")
         
         # 3. Donation patterns
-        donation_count_result = await self.db.execute(
-            select(func.count(Donation.id))
-            .where(Donation.donor_id == user_id)
-        )
-        donation_count = donation_count_result.scalar() or 0
-        
         if donation_count == 0:
             risk_score += 5
             risk_factors.append("No donation history")
         
         # 4. Failed payments
-        failed_payments_result = await self.db.execute(
-            select(func.count(Donation.id))
-            .where(
-                and_(
-                    Donation.donor_id == user_id,
-                    Donation.payment_status == "failed"
-                )
-            )
-        )
-        failed_payments = failed_payments_result.scalar() or 0
-        
         if failed_payments > 0:
             risk_score += min(failed_payments * 10, 30)
             risk_factors.append(f"{failed_payments} failed payment(s)")
         
         # 5. Rejected KYC documents
-        from ..models.user import KYCDocument
-        
-        rejected_docs_result = await self.db.execute(
-            select(func.count(KYCDocument.id))
-            .where(
-                and_(
-                    KYCDocument.user_id == user_id,
-                    KYCDocument.is_verified == False,
-                    KYCDocument.rejection_reason.isnot(None)
-                )
-            )
-        )
-        rejected_docs = rejected_docs_result.scalar() or 0
-        
         if rejected_docs > 0:
             risk_score += min(rejected_docs * 15, 45)
             risk_factors.append(f"{rejected_docs} rejected KYC document(s)")
@@ -491,7 +850,7 @@ class FraudDetectionService:
             risk_level = "medium"
         
         return {
-            "user_id": user_id,
+            "user_id": user.id,
             "risk_score": risk_score,
             "risk_level": risk_level,
             "factors": risk_factors
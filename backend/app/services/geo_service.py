@@ -0,0 +1,318 @@
+"""
+Geolocation service
+Resolves Vietnamese addresses offline and answers hospital proximity queries
+"""
+import math
+import re
+import time
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, NamedTuple, Tuple
+import numpy as np
+import structlog
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service
+from .vietnam_gazetteer import PROVINCES, DISTRICTS
+
+logger = structlog.get_logger()
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+
+class GeoPoint(NamedTuple):
+    """Resolved location of an address"""
+    latitude: float
+    longitude: float
+    province: str
+    district: Optional[str] = None
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def pairwise_distance_km(origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+    """
+    Great-circle distances between every origin and destination
+
+    Both arguments are (n, 2) arrays of latitude/longitude; rows with NaN
+    coordinates give NaN distances.
+    """
+    lat1, lon1 = np.radians(origins[:, 0])[:, None], np.radians(origins[:, 1])[:, None]
+    lat2, lon2 = np.radians(destinations[:, 0])[None, :], np.radians(destinations[:, 1])[None, :]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def normalize_address(text: str) -> str:
+    """Lowercase ASCII form of an address with single spaces between words"""
+    text = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    text = "".join(c for c in text if unicodedata.category(c) != "Mn").lower()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+
+class Gazetteer:
+    """
+    Offline province/district lookup for Vietnamese addresses.
+
+    Vietnamese addresses run from street to province, so the alias that ends
+    furthest to the right wins; that keeps street names such as "Hai Bà Trưng"
+    from overriding the city at the end of the address. Resolved addresses
+    are cached.
+    """
+
+    def __init__(self, cache_size: int = settings.GEO_CACHE_SIZE):
+        self._provinces: Dict[str, Tuple[float, float]] = {}
+        self._province_aliases: List[Tuple[str, str]] = []
+        self._districts: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._district_aliases: Dict[str, List[Tuple[str, str]]] = {}
+
+        for name, lat, lon, aliases in PROVINCES:
+            self._provinces[name] = (lat, lon)
+            for alias in {normalize_address(name), *aliases}:
+                self._province_aliases.append((alias, name))
+
+        for province, name, lat, lon, aliases in DISTRICTS:
+            self._districts[(province, name)] = (lat, lon)
+            self._district_aliases.setdefault(province, [])
+            for alias in {normalize_address(name), *aliases}:
+                self._district_aliases[province].append((alias, name))
+
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @staticmethod
+    def _rightmost(text: str, aliases: List[Tuple[str, str]]) -> Optional[str]:
+        """Name whose alias ends last in the text (longest alias on ties)"""
+        best, best_key = None, None
+        padded = f" {text} "
+        for alias, name in aliases:
+            pos = padded.rfind(f" {alias} ")
+            if pos < 0:
+                continue
+            key = (pos + len(alias), len(alias))
+            if best_key is None or key > best_key:
+                best, best_key = name, key
+        return best
+
+    def _resolve(self, address: str) -> Optional[GeoPoint]:
+        text = normalize_address(address or "")
+        if not text:
+            return None
+
+        province = self._rightmost(text, self._province_aliases)
+        if province is None:
+            # A district on its own still pins down the province
+            all_districts = [
+                (alias, f"{p}\0{name}")
+                for p, aliases in self._district_aliases.items()
+                for alias, name in aliases
+            ]
+            match = self._rightmost(text, all_districts)
+            if match is None:
+                return None
+            province, district = match.split("\0")
+        else:
+            district = self._rightmost(text, self._district_aliases.get(province, []))
+
+        if district is not None:
+            lat, lon = self._districts[(province, district)]
+        else:
+            lat, lon = self._provinces[province]
+        return GeoPoint(lat, lon, province, district)
+
+
+class GeoIndex:
+    """
+    Grid-bucket spatial index over points.
+
+    Points are bucketed into cells of cell_deg degrees. A radius query only
+    visits the cells overlapping the query's bounding box, and nearest-first
+    queries grow the radius until enough points are found, so lookups cost
+    the number of nearby points rather than the size of the index.
+    """
+
+    def __init__(self, cell_deg: float = 0.1):
+        self.cell_deg = cell_deg
+        self._cells: Dict[Tuple[int, int], Dict[str, Tuple[float, float, Any]]] = {}
+        self._points: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def add(self, key: str, lat: float, lon: float, item: Any) -> None:
+        """Insert or move a point"""
+        self.remove(key)
+        cell = self._cell(lat, lon)
+        self._cells.setdefault(cell, {})[key] = (lat, lon, item)
+        self._points[key] = cell
+
+    def remove(self, key: str) -> None:
+        cell = self._points.pop(key, None)
+        if cell is not None:
+            bucket = self._cells[cell]
+            del bucket[key]
+            if not bucket:
+                del self._cells[cell]
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, str, Any]]:
+        """(distance_km, key, item) for every point within radius_km, nearest first"""
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+        min_row, min_col = self._cell(lat - dlat, lon - dlon)
+        max_row, max_col = self._cell(lat + dlat, lon + dlon)
+
+        hits = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                for key, (p_lat, p_lon, item) in self._cells.get((row, col), {}).items():
+                    distance = haversine_km(lat, lon, p_lat, p_lon)
+                    if distance <= radius_km:
+                        hits.append((distance, key, item))
+
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        limit: int,
+        max_distance_km: float
+    ) -> List[Tuple[float, str, Any]]:
+        """Up to limit points within max_distance_km, nearest first"""
+        radius = min(self.cell_deg * KM_PER_DEGREE_LAT, max_distance_km)
+        while True:
+            hits = self.within(lat, lon, radius)
+            if len(hits) >= limit or radius >= max_distance_km:
+                return hits[:limit]
+            radius = min(radius * 2, max_distance_km)
+
+
+HOSPITAL_FIELDS = ("id", "organization_name", "full_name", "phone", "address", "city", "province")
+
+
+def hospital_summary(hospital: Any) -> Dict[str, Any]:
+    """Contact and location fields of a hospital given as a model or a Supabase row"""
+    if isinstance(hospital, dict):
+        return {field: hospital.get(field) for field in HOSPITAL_FIELDS}
+    return {field: getattr(hospital, field, None) for field in HOSPITAL_FIELDS}
+
+
+def hospital_address(hospital: Dict[str, Any]) -> str:
+    return ", ".join(p for p in (hospital["address"], hospital["city"], hospital["province"]) if p)
+
+
+class GeoService:
+    """Address resolution and the shared hospital proximity index"""
+
+    def __init__(self, index_ttl: int = settings.GEO_HOSPITAL_INDEX_TTL):
+        self.gazetteer = Gazetteer()
+        self.hospital_index = GeoIndex()
+        self.index_ttl = index_ttl
+
+        self._hospital_addresses: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def resolve(self, address: Optional[str]) -> Optional[GeoPoint]:
+        """Coordinates of an address, or None if no province/district is recognised"""
+        if not address:
+            return None
+        return self.gazetteer.resolve(address)
+
+    def index_hospital(self, hospital_id: Any, address: str, item: Dict[str, Any]) -> Optional[GeoPoint]:
+        """Add or update a hospital; unchanged addresses are not re-resolved"""
+        key = str(hospital_id)
+        with self._lock:
+            if self._hospital_addresses.get(key) == address:
+                return None
+            self._hospital_addresses[key] = address
+
+            point = self.resolve(address)
+            if point is None:
+                self.hospital_index.remove(key)
+                return None
+
+            self.hospital_index.add(key, point.latitude, point.longitude, item)
+            return point
+
+    def index_hospitals(self, hospitals: List[Any]) -> None:
+        """Index hospital models or rows, keyed by their ID"""
+        for hospital in hospitals:
+            summary = hospital_summary(hospital)
+            self.index_hospital(summary["id"], hospital_address(summary), summary)
+
+    def load_hospitals(self, page_size: int = 1000) -> int:
+        """(Re)load all hospital accounts from the database"""
+        supabase = get_supabase_service()
+        offset = 0
+        loaded = 0
+
+        while True:
+            result = supabase.table("users").select("*").eq(
+                "user_type", "hospital"
+            ).order("id").range(offset, offset + page_size - 1).execute()
+
+            batch = result.data or []
+            self.index_hospitals(batch)
+            loaded += len(batch)
+
+            if len(batch) < page_size:
+                break
+            offset += page_size
+
+        self._loaded_at = time.monotonic()
+        logger.info("Hospital geo index loaded", hospitals=loaded, located=len(self.hospital_index))
+        return loaded
+
+    def ensure_hospitals_loaded(self) -> None:
+        """Load the hospital index on first use and refresh it after index_ttl seconds"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.index_ttl:
+            return
+        try:
+            self.load_hospitals()
+        except Exception as e:
+            self._loaded_at = time.monotonic()
+            logger.error(f"Failed to load hospital geo index: {str(e)}")
+
+    def hospitals_within(self, point: GeoPoint, radius_km: float) -> Dict[str, float]:
+        """Distance in km of every indexed hospital within radius_km, keyed by hospital ID"""
+        with self._lock:
+            hits = self.hospital_index.within(point.latitude, point.longitude, radius_km)
+        return {key: round(distance, 2) for distance, key, _ in hits}
+
+    def find_nearby_hospitals(
+        self,
+        address: str,
+        radius_km: float = 50.0,
+        limit: int = 10
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Hospitals nearest to an address within radius_km, nearest first
+
+        Returns None when the address cannot be resolved.
+        """
+        point = self.resolve(address)
+        if point is None:
+            return None
+
+        self.ensure_hospitals_loaded()
+        with self._lock:
+            hits = self.hospital_index.nearest(point.latitude, point.longitude, limit, radius_km)
+
+        return [{**item, "distance_km": round(distance, 2)} for distance, _, item in hits]
+
+
+# Global geolocation service instance
+geo_service = GeoService()
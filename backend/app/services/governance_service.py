@@ -0,0 +1,105 @@
+"""
+Governance voting service
+Snapshots voting power per proposal and records votes with atomic tallies
+"""
+from typing import Any, Dict, Optional
+import structlog
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service, Tables
+from ..core.blockchain import blockchain_service
+
+logger = structlog.get_logger()
+
+
+class GovernanceService:
+    """
+    Voting power and vote tallies of governance proposals.
+
+    When a proposal is created, the token balance of every user is stored in
+    governance_voting_power, either summed in the database from the indexed
+    RewardEarned events or read from the token contract in batched calls.
+    A vote then looks its power up in that snapshot instead of reading the
+    chain, and record_governance_vote inserts it and adds it to the proposal
+    totals in one transaction, so a vote costs the same however many came
+    before it and concurrent votes cannot lose each other's counts.
+    """
+
+    def __init__(self, page_size: int = 1000):
+        self.page_size = page_size
+
+    async def snapshot_voting_power(self, proposal_id: int) -> int:
+        """Store the voting power of all token holders for a proposal; returns the holders stored"""
+        supabase = get_supabase_service()
+
+        if settings.CHAIN_INDEXER_ENABLED:
+            stored = supabase.rpc("snapshot_voting_power", {"p_proposal_id": proposal_id}).execute().data or 0
+        else:
+            powers = await self._read_powers_from_chain()
+            stored = supabase.rpc("snapshot_voting_power", {
+                "p_proposal_id": proposal_id,
+                "p_powers": {user_id: str(power) for user_id, power in powers.items() if power > 0}
+            }).execute().data or 0
+
+        logger.info(
+            "Voting power snapshot taken",
+            proposal_id=proposal_id,
+            holders=stored,
+            source="index" if settings.CHAIN_INDEXER_ENABLED else "chain"
+        )
+        return stored
+
+    async def ensure_snapshot(self, proposal: Dict[str, Any]) -> None:
+        """Take the snapshot of a proposal created before snapshots, or whose snapshot failed"""
+        if not proposal.get("voting_power_snapshot_at"):
+            await self.snapshot_voting_power(proposal["id"])
+
+    async def get_voting_power(self, proposal_id: int, user_id: str) -> int:
+        """Snapshotted voting power of a user on a proposal, 0 if they held no tokens"""
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.GOVERNANCE_VOTING_POWER).select("voting_power").eq(
+            "proposal_id", proposal_id
+        ).eq("user_id", user_id).execute()
+        if not result.data:
+            return 0
+        return int(result.data[0]["voting_power"])
+
+    async def record_vote(
+        self,
+        proposal_id: int,
+        voter_id: str,
+        vote_type: int,
+        blockchain_hash: Optional[str] = None
+    ) -> Optional[int]:
+        """Store a vote and add it to the proposal totals; returns its id, None if the voter already voted"""
+        supabase = get_supabase_service()
+        return supabase.rpc("record_governance_vote", {
+            "p_proposal_id": proposal_id,
+            "p_voter_id": voter_id,
+            "p_vote_type": vote_type,
+            "p_blockchain_hash": blockchain_hash
+        }).execute().data
+
+    async def _read_powers_from_chain(self) -> Dict[str, int]:
+        """Token balance of every user id, read from the token contract a page of users at a time"""
+        supabase = get_supabase_service()
+        powers: Dict[str, int] = {}
+        offset = 0
+
+        while True:
+            result = supabase.table(Tables.USERS).select("id").order("id").range(
+                offset, offset + self.page_size - 1
+            ).execute()
+
+            user_ids = [row["id"] for row in result.data or []]
+            powers.update(await blockchain_service.get_ytili_balances(user_ids))
+
+            if len(user_ids) < self.page_size:
+                break
+            offset += self.page_size
+
+        return powers
+
+
+# Global governance service instance
+governance_service = GovernanceService()
@@ -0,0 +1,223 @@
+"""
+Hospital statistics service
+Keeps per-hospital donation counts up to date as donation statuses change
+"""
+from typing import Dict, List, Optional, Any, NamedTuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert
+from datetime import datetime, timedelta, timezone
+import structlog
+
+from ..models.donation import Donation, DonationType, DonationStatus, HospitalStats
+
+logger = structlog.get_logger()
+
+# Days of received donations kept per type
+RECEIVED_WINDOW_DAYS = 30
+
+OPEN_STATUSES = (DonationStatus.MATCHED, DonationStatus.SHIPPED)
+RECEIVED_STATUSES = (DonationStatus.DELIVERED, DonationStatus.COMPLETED)
+
+
+class DonationState(NamedTuple):
+    """The donation fields hospital statistics depend on"""
+    recipient_id: Optional[int]
+    status: Optional[DonationStatus]
+    donation_type: DonationType
+    created_at: Optional[datetime]
+
+
+def _day(value: Optional[datetime]) -> str:
+    """UTC calendar day used as the rolling window bucket"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date().isoformat()
+
+
+def _window_start(days: int = RECEIVED_WINDOW_DAYS) -> str:
+    """First day inside the window (days ago is already outside)"""
+    return (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+
+
+def _prune(daily_received: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    start = _window_start()
+    pruned = {}
+    for donation_type, days in daily_received.items():
+        kept = {day: count for day, count in days.items() if day >= start and count > 0}
+        if kept:
+            pruned[donation_type] = kept
+    return pruned
+
+
+def _contribution(state: DonationState) -> Dict[str, Any]:
+    """What one donation in this state adds to its recipient's statistics"""
+    return {
+        "assigned_count": 1,
+        "open_count": int(state.status in OPEN_STATUSES),
+        "received_count": int(state.status in RECEIVED_STATUSES),
+        "completed_count": int(state.status == DonationStatus.COMPLETED)
+    }
+
+
+def stats_to_features(stats: Optional[HospitalStats], days: int = RECEIVED_WINDOW_DAYS) -> Dict[str, Any]:
+    """
+    Matching features of a hospital: donations received per type in the
+    last days (by creation day), and assigned/completed/open totals
+    """
+    if stats is None:
+        return {"recent_by_type": {}, "total": 0, "completed": 0, "open": 0, "last_received_at": None}
+
+    start = _window_start(days)
+    recent_by_type = {}
+    for type_value, daily in (stats.daily_received or {}).items():
+        recent_by_type[DonationType(type_value)] = sum(
+            count for day, count in daily.items() if day >= start
+        )
+
+    return {
+        "recent_by_type": recent_by_type,
+        "total": stats.assigned_count,
+        "completed": stats.completed_count,
+        "open": stats.open_count,
+        "last_received_at": stats.last_received_at
+    }
+
+
+class HospitalStatsService:
+    """Service for reading and maintaining hospital statistics"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_stats(self, hospital_ids: List[int]) -> Dict[int, HospitalStats]:
+        """Statistics rows of the given hospitals (hospitals without donations are absent)"""
+        if not hospital_ids:
+            return {}
+        result = await self.db.execute(
+            select(HospitalStats).where(HospitalStats.hospital_id.in_(hospital_ids))
+        )
+        return {stats.hospital_id: stats for stats in result.scalars().all()}
+
+    async def get_features(self, hospital_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Matching features of every given hospital"""
+        stats = await self.get_stats(hospital_ids)
+        return {hospital_id: stats_to_features(stats.get(hospital_id)) for hospital_id in hospital_ids}
+
+    async def lock_stats(self, hospital_ids: List[int]) -> Dict[int, HospitalStats]:
+        """
+        Statistics rows of the given hospitals, created if missing and locked
+        until the caller's transaction ends
+        """
+        hospital_ids = sorted(set(hospital_ids))  # One lock order, so concurrent callers cannot deadlock
+        if not hospital_ids:
+            return {}
+
+        # A plain insert would fail when two transactions create the same row
+        await self.db.execute(
+            insert(HospitalStats)
+            .values([
+                {
+                    "hospital_id": hospital_id, "assigned_count": 0, "open_count": 0,
+                    "received_count": 0, "completed_count": 0, "daily_received": {}
+                }
+                for hospital_id in hospital_ids
+            ])
+            .on_conflict_do_nothing(index_elements=[HospitalStats.hospital_id])
+        )
+        result = await self.db.execute(
+            select(HospitalStats)
+            .where(HospitalStats.hospital_id.in_(hospital_ids))
+            .order_by(HospitalStats.hospital_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        return {stats.hospital_id: stats for stats in result.scalars().all()}
+
+    async def apply_change(self, before: DonationState, after: DonationState) -> None:
+        """
+        Move one donation's contribution from its old recipient/status to the new
+        one. Runs in the caller's transaction; the caller commits.
+        """
+        if before == after:
+            return
+
+        for state, sign in ((before, -1), (after, 1)):
+            if state.recipient_id is None:
+                continue
+
+            stats = (await self.lock_stats([state.recipient_id]))[state.recipient_id]
+
+            for field, value in _contribution(state).items():
+                setattr(stats, field, max(0, (getattr(stats, field) or 0) + sign * value))
+
+            if state.status in RECEIVED_STATUSES:
+                # Reassign the JSON column so the change is detected
+                daily_received = {k: dict(v) for k, v in (stats.daily_received or {}).items()}
+                days = daily_received.setdefault(state.donation_type.value, {})
+                day = _day(state.created_at)
+                days[day] = days.get(day, 0) + sign
+                stats.daily_received = _prune(daily_received)
+
+                if sign > 0 and before.status not in RECEIVED_STATUSES:
+                    stats.last_received_at = datetime.now(timezone.utc)
+
+    async def rebuild(self, batch_size: int = 5000) -> Dict[str, Any]:
+        """Recompute every hospital's statistics from the donations table"""
+        try:
+            start = _window_start()
+            totals: Dict[int, Dict[str, Any]] = {}
+
+            result = await self.db.stream(
+                select(
+                    Donation.recipient_id,
+                    Donation.status,
+                    Donation.donation_type,
+                    Donation.created_at,
+                    Donation.completed_at,
+                    Donation.updated_at
+                )
+                .where(Donation.recipient_id.isnot(None))
+                .execution_options(yield_per=batch_size)
+            )
+
+            donations = 0
+            async for recipient_id, status, donation_type, created_at, completed_at, updated_at in result:
+                donations += 1
+                entry = totals.setdefault(recipient_id, {
+                    "assigned_count": 0, "open_count": 0, "received_count": 0,
+                    "completed_count": 0, "daily_received": {}, "last_received_at": None
+                })
+                state = DonationState(recipient_id, status, donation_type, created_at)
+                for field, value in _contribution(state).items():
+                    entry[field] += value
+
+                if status in RECEIVED_STATUSES:
+                    day = _day(created_at)
+                    if day >= start:
+                        days = entry["daily_received"].setdefault(donation_type.value, {})
+                        days[day] = days.get(day, 0) + 1
+
+                    # The delivery time is not stored; use the latest known timestamp
+                    received_at = completed_at or updated_at or created_at
+                    if received_at is not None and (
+                        entry["last_received_at"] is None or received_at > entry["last_received_at"]
+                    ):
+                        entry["last_received_at"] = received_at
+
+            await self.db.execute(delete(HospitalStats))
+            self.db.add_all([
+                HospitalStats(hospital_id=hospital_id, **entry)
+                for hospital_id, entry in totals.items()
+            ])
+            await self.db.commit()
+
+            logger.info("Hospital statistics rebuilt", hospitals=len(totals), donations=donations)
+            return {"success": True, "hospitals": len(totals), "donations": donations}
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Failed to rebuild hospital statistics: {str(e)}")
+            return {"success": False, "error": str(e)}
@@ -3,7 +3,7 @@ KYC (Know Your Customer) verification service
 """
 import os
 import uuid
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import pytesseract
 from PIL import Image
 import json
@@ -12,6 +12,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..models.user import KYCDocument, User
 from ..core.config import settings
+from ..ai_agent.image_similarity import image_similarity_index
+from ..ai_agent.ocr_result_cache import ocr_result_cache
 
 
 class KYCService:
@@ -48,11 +50,32 @@ class KYCService:
         )
         
         self.db.add(kyc_document)
+        await self.db.flush()
+        
+        # Same document image uploaded by another user
+        duplicates = await self._find_duplicate_images(kyc_document, file_content)
+        if duplicates:
+            kyc_document.extracted_data = json.dumps({**parsed_data, "duplicate_documents": duplicates})
+        
         await self.db.commit()
         await self.db.refresh(kyc_document)
         
         return kyc_document
     
+    async def _find_duplicate_images(self, kyc_document: KYCDocument, file_content: bytes) -> List[Dict[str, Any]]:
+        """Index the document image under its KYC document id and return reuses by other users"""
+        try:
+            return await image_similarity_index.check_document_file(
+                kyc_document.file_path,
+                ocr_result_cache.hash_bytes(file_content),
+                kyc_document.user_id,
+                image_ref=f"kyc_documents/{kyc_document.id}"
+            )
+        except Exception as e:
+            # PDFs and unreadable images are not hashed
+            print(f"Duplicate document check failed: {e}")
+            return []
+    
     async def _save_file(self, file_content: bytes, original_filename: str) -> str:
         """Save uploaded file to disk"""
         # Create uploads directory if it doesn't exist
@@ -0,0 +1,209 @@
+"""
+Ledger audit service
+Recomputes every donation transaction hash across a process pool and keeps a signed report
+"""
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, insert, func
+
+from ..core.config import settings
+from ..core.ledger import LedgerLink, audit_chains, results_digest, sign_report
+from ..models.donation import DonationTransaction, LedgerAuditReport, LedgerChainAudit
+
+logger = structlog.get_logger()
+
+
+class LedgerAuditService:
+    """
+    Full audit of the donation transaction ledger.
+
+    Transactions are streamed in (donation_id, ledger_seq) order and grouped into
+    whole chains; batches of chains are hashed in worker processes while the
+    next rows are read. The per-chain results replace the previous audit in
+    ledger_chain_audits, so single chains can be answered from the report, and
+    the summary is signed with the platform key.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def run_audit(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Audit every chain and store the signed report"""
+        workers = workers or settings.LEDGER_AUDIT_WORKERS
+        chunk_size = chunk_size or settings.LEDGER_AUDIT_CHUNK_SIZE
+
+        signing_key = settings.LEDGER_AUDIT_SIGNING_KEY
+        if not signing_key:
+            return {"success": False, "error": "Set LEDGER_AUDIT_SIGNING_KEY or SAGA_PRIVATE_KEY to sign audit reports"}
+
+        try:
+            started_at = datetime.now()
+            start = time.perf_counter()
+
+            # Transactions added while the audit runs are left for the next one
+            high_water = (await self.db.execute(select(func.max(DonationTransaction.ledger_seq)))).scalar() or 0
+
+            chains = await self._audit_chains(high_water, workers, chunk_size)
+
+            duration = time.perf_counter() - start
+            completed_at = datetime.now()
+
+            transaction_count = sum(chain["transaction_count"] for chain in chains)
+            invalid_chains = [chain for chain in chains if not chain["valid"]]
+
+            report = {
+                "audit": "donation_transactions",
+                "last_ledger_seq": high_water,
+                "chain_count": len(chains),
+                "transaction_count": transaction_count,
+                "recomputed_count": sum(chain["recomputed_count"] for chain in chains),
+                "invalid_chain_count": len(invalid_chains),
+                "invalid_transaction_count": sum(len(chain["invalid_transactions"]) for chain in invalid_chains),
+                "invalid_chains": [chain["donation_id"] for chain in invalid_chains],
+                "results_digest": results_digest(chains),
+                "throughput": {
+                    "workers": workers,
+                    "chunk_size": chunk_size,
+                    "duration_seconds": round(duration, 3),
+                    "transactions_per_second": round(transaction_count / duration, 1) if duration else None,
+                    "chains_per_second": round(len(chains) / duration, 1) if duration else None
+                },
+                "started_at": started_at.isoformat(),
+                "completed_at": completed_at.isoformat()
+            }
+            signature = sign_report(report, signing_key)
+
+            report_id = await self._store_report(report, signature, chains, started_at, completed_at, chunk_size)
+            await self.db.commit()
+
+            logger.info(
+                "Ledger audit completed",
+                report_id=report_id,
+                transactions=transaction_count,
+                chains=len(chains),
+                invalid_chains=len(invalid_chains),
+                duration_seconds=report["throughput"]["duration_seconds"]
+            )
+
+            return {"success": True, "report_id": report_id, "report": report, **signature, "chains": chains}
+
+        except Exception as e:
+            await self.db.rollback()
+            logger.error(f"Ledger audit failed: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    async def _audit_chains(self, high_water: int, workers: int, chunk_size: int) -> List[Dict[str, Any]]:
+        """Stream the ledger and hash whole chains in the process pool, keeping ledger order"""
+        query = select(
+            DonationTransaction.donation_id,
+            DonationTransaction.id,
+            DonationTransaction.transaction_type,
+            DonationTransaction.description,
+            DonationTransaction.actor_id,
+            DonationTransaction.actor_type,
+            DonationTransaction.transaction_metadata,
+            DonationTransaction.hashed_at,
+            DonationTransaction.transaction_hash,
+            DonationTransaction.previous_hash
+        ).where(
+            DonationTransaction.ledger_seq <= high_water
+        ).order_by(
+            DonationTransaction.donation_id, DonationTransaction.ledger_seq
+        ).execution_options(yield_per=chunk_size)
+
+        loop = asyncio.get_running_loop()
+        futures: List[asyncio.Future] = []
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+
+            async def submit(batch: List[Tuple[Any, List[LedgerLink]]]) -> None:
+                # Bound the batches held in memory while workers catch up
+                in_flight = [future for future in futures if not future.done()]
+                if len(in_flight) >= workers * 2:
+                    await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                futures.append(loop.run_in_executor(executor, audit_chains, batch))
+
+            batch: List[Tuple[Any, List[LedgerLink]]] = []
+            batch_size = 0
+            donation_id = None
+            links: List[LedgerLink] = []
+
+            result = await self.db.stream(query)
+            async for row in result:
+                if row.donation_id != donation_id:
+                    if links:
+                        batch.append((donation_id, links))
+                        batch_size += len(links)
+                        if batch_size >= chunk_size:
+                            await submit(batch)
+                            batch, batch_size = [], 0
+                    donation_id, links = row.donation_id, []
+                links.append(LedgerLink(*row[1:]))
+
+            if links:
+                batch.append((donation_id, links))
+            if batch:
+                await submit(batch)
+
+            results = await asyncio.gather(*futures)
+
+        return [chain for batch_result in results for chain in batch_result]
+
+    async def _store_report(
+        self,
+        report: Dict[str, Any],
+        signature: Dict[str, str],
+        chains: List[Dict[str, Any]],
+        started_at: datetime,
+        completed_at: datetime,
+        chunk_size: int
+    ) -> int:
+        """Save the report and replace the per-chain results of the previous audit"""
+        audit_report = LedgerAuditReport(
+            last_ledger_seq=report["last_ledger_seq"],
+            chain_count=report["chain_count"],
+            transaction_count=report["transaction_count"],
+            recomputed_count=report["recomputed_count"],
+            invalid_chain_count=report["invalid_chain_count"],
+            invalid_transaction_count=report["invalid_transaction_count"],
+            workers=report["throughput"]["workers"],
+            duration_seconds=report["throughput"]["duration_seconds"],
+            transactions_per_second=report["throughput"]["transactions_per_second"],
+            results_digest=report["results_digest"],
+            report=report,
+            signer=signature["signer"],
+            signature=signature["signature"],
+            started_at=started_at,
+            completed_at=completed_at
+        )
+        self.db.add(audit_report)
+        await self.db.flush()
+
+        await self.db.execute(delete(LedgerChainAudit))
+        for offset in range(0, len(chains), chunk_size):
+            await self.db.execute(insert(LedgerChainAudit), [
+                {
+                    "donation_id": chain["donation_id"],
+                    "report_id": audit_report.id,
+                    "transaction_count": chain["transaction_count"],
+                    "recomputed_count": chain["recomputed_count"],
+                    "head_transaction_id": chain["head_transaction_id"],
+                    "head_hash": chain["head_hash"],
+                    "chain_broken": chain["chain_broken"],
+                    "invalid_transactions": chain["invalid_transactions"],
+                    "valid": chain["valid"],
+                    "audited_at": completed_at
+                }
+                for chain in chains[offset:offset + chunk_size]
+            ])
+
+        return audit_report.id
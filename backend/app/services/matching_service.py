@@ -2,13 +2,19 @@
 Donation matching service
 Intelligent matching of donations to hospital needs
 """
-from typing import List, Optional, Dict, Any
+import time
+from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_
-from datetime import datetime, timedelta
+from datetime import datetime
 
-from ..models.donation import Donation, DonationType, DonationStatus
-from ..models.user import User, UserType
+from ..core.config import settings
+from ..models.donation import Donation, DonationType
+from ..models.user import User, UserType, UserStatus
+from .allocation_solver import solve_capacitated_assignment
+from .hospital_stats_service import HospitalStatsService
+from .geo_service import geo_service, hospital_summary, hospital_address, pairwise_distance_km
 
 
 class MatchingService:
@@ -27,14 +33,32 @@ class MatchingService:
         # Get hospitals that could receive this donation
         hospitals = await self._get_eligible_hospitals(donation)
         
+        # Keep only hospitals within reach of the pickup address
+        distances = self._get_hospital_distances(donation, hospitals, max_distance_km)
+        if distances is not None:
+            hospitals = [hospital for hospital in hospitals if str(hospital.id) in distances]
+        if not hospitals:
+            return []
+        
+        # One lookup for every hospital's donation history
+        features = await self._get_hospital_features(
+            [hospital.id for hospital in hospitals], donation.donation_type
+        )
+        
         # Score and rank hospitals based on various factors
         scored_hospitals = []
         for hospital in hospitals:
-            score = await self._calculate_match_score(donation, hospital)
+            hospital_features = {
+                **features[hospital.id],
+                "distance_km": distances.get(str(hospital.id)) if distances else None
+            }
             scored_hospitals.append({
                 "hospital": hospital,
-                "score": score,
-                "reasons": await self._get_match_reasons(donation, hospital)
+                "score": self._calculate_match_score(
+                    donation, hospital, hospital_features, max_distance_km
+                ),
+                "reasons": self._get_match_reasons(donation, hospital, hospital_features),
+                "distance_km": hospital_features["distance_km"]
             })
         
         # Sort by score (highest first)
@@ -42,12 +66,150 @@ class MatchingService:
         
         return scored_hospitals[:10]  # Return top 10 matches
     
+    async def allocate_batch(
+        self,
+        donations: List[Donation],
+        max_distance_km: float = 50.0,
+        hospital_capacity: int = settings.MATCHING_HOSPITAL_CAPACITY
+    ) -> Dict[str, Any]:
+        """
+        Allocate many donations to hospitals at once (preview only, nothing is saved)
+        
+        Builds the donation x hospital score matrix with the same scoring as
+        find_matching_recipients and picks the assignment with the highest total
+        score. No hospital gets more than hospital_capacity open (matched or
+        shipped) donations, so near-expiry items win scarce capacity.
+        """
+        started = time.perf_counter()
+        hospitals = await self._get_eligible_hospitals(None)
+        
+        if not donations or not hospitals:
+            return self._batch_result(
+                donations, [], np.full(len(donations), -1), np.zeros(len(donations), dtype=bool),
+                started, max_distance_km
+            )
+        
+        features = await HospitalStatsService(self.db).get_features([hospital.id for hospital in hospitals])
+        hospital_features = [features[hospital.id] for hospital in hospitals]
+        
+        scores, distances = self._build_score_matrix(
+            donations, hospitals, hospital_features, max_distance_km
+        )
+        capacities = np.array([
+            max(0, hospital_capacity - f["open"]) for f in hospital_features
+        ])
+        
+        assignment = solve_capacitated_assignment(scores, capacities)
+        
+        allocations = []
+        for row, col in enumerate(assignment.tolist()):
+            if col < 0:
+                continue
+            donation, hospital = donations[row], hospitals[col]
+            distance_km = None if np.isnan(distances[row, col]) else round(float(distances[row, col]), 2)
+            pair_features = {
+                **hospital_features[col],
+                "recent_similar": hospital_features[col]["recent_by_type"].get(donation.donation_type, 0),
+                "distance_km": distance_km
+            }
+            allocations.append({
+                "donation_id": donation.id,
+                "donation_title": donation.title,
+                "hospital_id": hospital.id,
+                "hospital_name": hospital.organization_name or hospital.full_name,
+                "score": round(float(scores[row, col]), 2),
+                "distance_km": distance_km,
+                "reasons": self._get_match_reasons(donation, hospital, pair_features)
+            })
+        
+        return self._batch_result(
+            donations, allocations, assignment, np.isfinite(scores).any(axis=1),
+            started, max_distance_km
+        )
+    
+    def _batch_result(
+        self,
+        donations: List[Donation],
+        allocations: List[Dict[str, Any]],
+        assignment: np.ndarray,
+        reachable: np.ndarray,
+        started: float,
+        max_distance_km: float
+    ) -> Dict[str, Any]:
+        """Allocation response with the reason each unallocated donation was left out"""
+        unallocated = [
+            {
+                "donation_id": donations[row].id,
+                "reason": "Hospital capacity exhausted" if reachable[row]
+                else f"No eligible hospital within {max_distance_km:g} km"
+            }
+            for row, col in enumerate(assignment.tolist())
+            if col < 0
+        ]
+        
+        return {
+            "allocations": allocations,
+            "unallocated": unallocated,
+            "summary": {
+                "donations": len(donations),
+                "allocated": len(allocations),
+                "unallocated": len(unallocated),
+                "hospitals_used": len({a["hospital_id"] for a in allocations}),
+                "total_score": round(sum(a["score"] for a in allocations), 2),
+                "solve_seconds": round(time.perf_counter() - started, 3)
+            }
+        }
+    
+    def _build_score_matrix(
+        self,
+        donations: List[Donation],
+        hospitals: List[User],
+        hospital_features: List[Dict[str, Any]],
+        max_distance_km: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized _calculate_match_score for every donation x hospital pair
+        
+        Returns the score matrix (-inf where the hospital is out of range) and
+        the distance matrix (NaN where either address cannot be located).
+        """
+        pickups = [geo_service.resolve(donation.pickup_address) for donation in donations]
+        locations = [geo_service.resolve(hospital_address(hospital_summary(h))) for h in hospitals]
+        
+        pickup_coords = np.array([(p.latitude, p.longitude) if p else (np.nan, np.nan) for p in pickups])
+        hospital_coords = np.array([(l.latitude, l.longitude) if l else (np.nan, np.nan) for l in locations])
+        distances = pairwise_distance_km(pickup_coords, hospital_coords)
+        
+        # Base score, donation priority and hospital reputation
+        scores = np.full(distances.shape, 10.0)
+        scores += np.array([self._get_donation_priority_score(d) for d in donations])[:, None]
+        scores += np.array([self._get_hospital_reputation_score(f) for f in hospital_features])[None, :]
+        
+        # Need score depends on the donation type
+        types = list(DonationType)
+        need = np.array([
+            [self._get_hospital_need_score({"recent_similar": f["recent_by_type"].get(t, 0)}) for t in types]
+            for f in hospital_features
+        ])
+        type_index = np.array([types.index(d.donation_type) for d in donations])
+        scores += need[:, type_index].T
+        
+        # Located pickups score proximity and only reach hospitals within range;
+        # unlocated pickups keep every hospital, as find_matching_recipients does
+        located = ~np.isnan(pickup_coords[:, 0])
+        with np.errstate(invalid="ignore"):
+            in_range = distances <= max_distance_km
+            proximity = np.where(in_range, 20.0 * (1.0 - distances / max_distance_km), -np.inf)
+        scores[located] += proximity[located]
+        
+        return scores, distances
+    
     async def _get_eligible_hospitals(self, donation: Donation) -> List[User]:
         """Get hospitals eligible to receive this donation"""
         query = select(User).where(
             and_(
                 User.user_type == UserType.HOSPITAL,
-                User.status.in_(["verified"]),
+                User.status == UserStatus.VERIFIED,
                 User.is_kyc_verified == True
             )
         )
@@ -55,19 +217,60 @@ class MatchingService:
         result = await self.db.execute(query)
         return result.scalars().all()
     
-    async def _calculate_match_score(self, donation: Donation, hospital: User) -> float:
+    def _get_hospital_distances(
+        self,
+        donation: Donation,
+        hospitals: List[User],
+        max_distance_km: float
+    ) -> Optional[Dict[str, float]]:
+        """
+        Distance from the pickup address to each hospital within max_distance_km,
+        or None if the pickup address cannot be located
+        """
+        pickup = geo_service.resolve(donation.pickup_address)
+        if pickup is None:
+            return None
+        
+        geo_service.index_hospitals(hospitals)
+        return geo_service.hospitals_within(pickup, max_distance_km)
+    
+    async def _get_hospital_features(
+        self,
+        hospital_ids: List[int],
+        donation_type: DonationType
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Per-hospital donation aggregates from the hospital statistics table:
+        recent similar donations received, total donations and completed donations
+        """
+        features = await HospitalStatsService(self.db).get_features(hospital_ids)
+        return {
+            hospital_id: {
+                **hospital_features,
+                "recent_similar": hospital_features["recent_by_type"].get(donation_type, 0)
+            }
+            for hospital_id, hospital_features in features.items()
+        }
+    
+    def _calculate_match_score(
+        self,
+        donation: Donation,
+        hospital: User,
+        features: Dict[str, Any],
+        max_distance_km: float = 50.0
+    ) -> float:
         """Calculate match score between donation and hospital"""
         score = 0.0
         
         # Base score for verified hospital
         score += 10.0
         
-        # Location proximity (placeholder - would use actual coordinates)
-        if donation.pickup_address and hospital.address:
-            # Simplified location matching
-            if self._addresses_in_same_city(donation.pickup_address, hospital.address):
-                score += 20.0
-            elif self._addresses_in_same_province(donation.pickup_address, hospital.address):
+        # Location proximity - up to 20 points, falling to 0 at max_distance_km
+        distance_km = features.get("distance_km")
+        if distance_km is not None:
+            score += 20.0 * max(0.0, 1.0 - distance_km / max_distance_km)
+        elif donation.pickup_address and hospital.address:
+            if self._addresses_in_same_province(donation.pickup_address, hospital.address):
                 score += 10.0
         
         # Hospital capacity and needs (placeholder)
@@ -75,7 +278,19 @@ class MatchingService:
         # - Current inventory levels
         # - Historical consumption patterns
         # - Urgent needs requests
-        score += await self._get_hospital_need_score(donation, hospital)
+        score += self._get_hospital_need_score(features)
+        
+        # Donation type preference and expiry urgency
+        score += self._get_donation_priority_score(donation)
+        
+        # Hospital reputation and history
+        score += self._get_hospital_reputation_score(features)
+        
+        return score
+    
+    def _get_donation_priority_score(self, donation: Donation) -> float:
+        """Hospital-independent part of the match score"""
+        score = 0.0
         
         # Donation type preference
         if donation.donation_type == DonationType.MEDICATION:
@@ -95,12 +310,9 @@ class MatchingService:
             else:
                 score += 5.0   # Low urgency
         
-        # Hospital reputation and history
-        score += await self._get_hospital_reputation_score(hospital)
-        
         return score
     
-    async def _get_hospital_need_score(self, donation: Donation, hospital: User) -> float:
+    def _get_hospital_need_score(self, features: Dict[str, int]) -> float:
         """Calculate hospital's need score for this donation"""
         # Placeholder implementation
         # In real system, this would analyze:
@@ -112,45 +324,18 @@ class MatchingService:
         base_need = 10.0
         
         # Check if hospital has received similar donations recently
-        recent_donations = await self._get_recent_donations_to_hospital(
-            hospital.id, donation.donation_type
-        )
+        recent_donations = features["recent_similar"]
         
-        if len(recent_donations) == 0:
+        if recent_donations == 0:
             base_need += 15.0  # High need if no recent donations
-        elif len(recent_donations) < 3:
+        elif recent_donations < 3:
             base_need += 10.0  # Moderate need
         else:
             base_need += 5.0   # Lower need if well-supplied
         
         return base_need
     
-    async def _get_recent_donations_to_hospital(
-        self,
-        hospital_id: int,
-        donation_type: DonationType,
-        days: int = 30
-    ) -> List[Donation]:
-        """Get recent donations to a hospital"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        
-        result = await self.db.execute(
-            select(Donation).where(
-                and_(
-                    Donation.recipient_id == hospital_id,
-                    Donation.donation_type == donation_type,
-                    Donation.created_at >= cutoff_date,
-                    Donation.status.in_([
-                        DonationStatus.COMPLETED,
-                        DonationStatus.DELIVERED
-                    ])
-                )
-            )
-        )
-        
-        return result.scalars().all()
-    
-    async def _get_hospital_reputation_score(self, hospital: User) -> float:
+    def _get_hospital_reputation_score(self, features: Dict[str, int]) -> float:
         """Calculate hospital reputation score"""
         # Placeholder implementation
         # In real system, this would consider:
@@ -162,75 +347,42 @@ class MatchingService:
         base_reputation = 5.0
         
         # Check completion rate of received donations
-        total_donations = await self._count_hospital_donations(hospital.id)
-        completed_donations = await self._count_hospital_completed_donations(hospital.id)
-        
-        if total_donations > 0:
-            completion_rate = completed_donations / total_donations
-            base_reputation += completion_rate * 10.0
+        base_reputation += self._get_hospital_completion_rate(features) * 10.0
         
         return base_reputation
     
-    async def _count_hospital_donations(self, hospital_id: int) -> int:
-        """Count total donations received by hospital"""
-        from sqlalchemy import func
-        
-        result = await self.db.execute(
-            select(func.count(Donation.id)).where(
-                Donation.recipient_id == hospital_id
-            )
-        )
-        
-        return result.scalar() or 0
-    
-    async def _count_hospital_completed_donations(self, hospital_id: int) -> int:
-        """Count completed donations by hospital"""
-        from sqlalchemy import func
-        
-        result = await self.db.execute(
-            select(func.count(Donation.id)).where(
-                and_(
-                    Donation.recipient_id == hospital_id,
-                    Donation.status == DonationStatus.COMPLETED
-                )
-            )
-        )
-        
-        return result.scalar() or 0
-    
-    def _addresses_in_same_city(self, addr1: str, addr2: str) -> bool:
-        """Check if two addresses are in the same city (simplified)"""
-        # Simplified implementation - in real system would use geocoding
-        return "Ho Chi Minh" in addr1 and "Ho Chi Minh" in addr2
-    
     def _addresses_in_same_province(self, addr1: str, addr2: str) -> bool:
-        """Check if two addresses are in the same province (simplified)"""
-        # Simplified implementation
-        provinces = ["Ho Chi Minh", "Hanoi", "Da Nang", "Can Tho"]
-        for province in provinces:
-            if province in addr1 and province in addr2:
-                return True
-        return False
+        """Check if two addresses resolve to the same province"""
+        location1 = geo_service.resolve(addr1)
+        location2 = geo_service.resolve(addr2)
+        return bool(location1 and location2 and location1.province == location2.province)
     
-    async def _get_match_reasons(self, donation: Donation, hospital: User) -> List[str]:
+    def _get_match_reasons(
+        self,
+        donation: Donation,
+        hospital: User,
+        features: Dict[str, Any]
+    ) -> List[str]:
         """Get reasons why this hospital is a good match"""
         reasons = []
         
         # Location-based reasons
-        if donation.pickup_address and hospital.address:
-            if self._addresses_in_same_city(donation.pickup_address, hospital.address):
-                reasons.append("Same city - faster delivery")
-            elif self._addresses_in_same_province(donation.pickup_address, hospital.address):
+        distance_km = features.get("distance_km")
+        if distance_km is not None:
+            if distance_km <= 10:
+                reasons.append(f"Nearby - {distance_km:.1f} km, faster delivery")
+            else:
+                reasons.append(f"Within delivery range - {distance_km:.0f} km")
+        elif donation.pickup_address and hospital.address:
+            if self._addresses_in_same_province(donation.pickup_address, hospital.address):
                 reasons.append("Same province - regional delivery")
         
         # Need-based reasons
-        recent_donations = await self._get_recent_donations_to_hospital(
-            hospital.id, donation.donation_type
-        )
+        recent_donations = features["recent_similar"]
         
-        if len(recent_donations) == 0:
+        if recent_donations == 0:
             reasons.append("High need - no recent similar donations")
-        elif len(recent_donations) < 3:
+        elif recent_donations < 3:
             reasons.append("Moderate need - limited recent donations")
         
         # Urgency reasons
@@ -240,18 +392,15 @@ class MatchingService:
                 reasons.append("Urgent - donation expires soon")
         
         # Hospital quality reasons
-        completion_rate = await self._get_hospital_completion_rate(hospital.id)
+        completion_rate = self._get_hospital_completion_rate(features)
         if completion_rate > 0.8:
             reasons.append("Reliable hospital - high completion rate")
         
         return reasons
     
-    async def _get_hospital_completion_rate(self, hospital_id: int) -> float:
+    def _get_hospital_completion_rate(self, features: Dict[str, int]) -> float:
         """Get hospital's donation completion rate"""
-        total = await self._count_hospital_donations(hospital_id)
-        completed = await self._count_hospital_completed_donations(hospital_id)
-        
-        if total == 0:
+        if features["total"] == 0:
             return 0.0
         
-        return completed / total
+        return features["completed"] / features["total"]
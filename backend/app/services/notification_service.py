@@ -9,6 +9,7 @@ import structlog
 
 from ..core.websocket import notification_manager
 from ..core.supabase import get_supabase_service, Tables
+from .stats_service import stats_service, DONATION_STATS, BLOCKCHAIN_STATS
 
 logger = structlog.get_logger()
 
@@ -338,6 +339,9 @@ class NotificationService:
                 logger.error("Failed to update donation status", donation_id=donation_id)
                 return False
             
+            stats_service.invalidate(DONATION_STATS, user_id)
+            stats_service.invalidate(BLOCKCHAIN_STATS)
+            
             # Create status history entry
             await self.create_status_history_entry(
                 donation_id=donation_id,
@@ -0,0 +1,187 @@
+"""
+Points ledger service
+Records points changes as append-only ledger entries and mints rewards in periodic per-user batches
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service, Tables
+from ..core.blockchain import blockchain_service
+from .blockchain_outbox_service import blockchain_outbox_dispatcher
+
+logger = structlog.get_logger()
+
+
+class PointsLedgerService:
+    """
+    Points balances backed by points_ledger (migration 018).
+
+    Every reward or redemption is one apply_points_entry call, which updates
+    user_points atomically and appends the ledger entry in the same
+    transaction, so concurrent requests cannot lose each other's updates
+    and a redemption cannot overdraw. The ledger is the user's history.
+
+    Rewards that are also minted as YTILI tokens accumulate in the ledger.
+    Every `interval` seconds queue_reward_mints turns each user's unminted
+    rewards into a single mint_reward entry of the blockchain outbox, whose
+    dispatcher submits, confirms and retries it, so a user is sent one mint
+    transaction per interval however many rewards they earned. Rewards whose
+    mint failed after all outbox attempts go out with the next batch once
+    none of the failed mint's transactions can still land.
+    """
+
+    def __init__(
+        self,
+        interval: int = settings.REWARD_MINT_INTERVAL,
+        batch_size: int = settings.REWARD_MINT_BATCH_SIZE
+    ):
+        self.interval = interval
+        self.batch_size = batch_size
+
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the periodic minting loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_periodically())
+            logger.info("Reward minting started", interval=self.interval, batch_size=self.batch_size)
+
+    async def stop(self) -> None:
+        # Unminted rewards stay pending in the ledger and go out with the next start
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def record_reward(
+        self,
+        user_id: str,
+        points: int,
+        reason: str,
+        reference: Optional[str] = None,
+        mint: bool = True
+    ) -> Dict[str, Any]:
+        """Credit points to a user; with mint, the points are also minted as tokens in the next batch"""
+        supabase = get_supabase_service()
+        return supabase.rpc("apply_points_entry", {
+            "p_user_id": user_id,
+            "p_points": points,
+            "p_entry_type": "earned",
+            "p_reason": reason,
+            "p_reference": reference,
+            "p_mint": mint
+        }).execute().data[0]
+
+    async def redeem(self, user_id: str, points: int, reason: str, reference: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Spend points; returns the ledger entry, None if the available points do not cover it"""
+        supabase = get_supabase_service()
+        entries = supabase.rpc("apply_points_entry", {
+            "p_user_id": user_id,
+            "p_points": -points,
+            "p_entry_type": "redeemed",
+            "p_reason": reason,
+            "p_reference": reference
+        }).execute().data
+        return entries[0] if entries else None
+
+    async def get_history(self, user_id: str, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Ledger entries of a user, newest first, with the mint covering each reward; and their total count"""
+        supabase = get_supabase_service()
+        result = supabase.table(Tables.POINTS_LEDGER).select(
+            "*, blockchain_outbox(status, tx_hash)", count="exact"
+        ).eq("user_id", user_id).order("id", desc=True).range(offset, offset + limit - 1).execute()
+
+        return [self._history_item(entry) for entry in result.data or []], result.count or 0
+
+    async def queue_mints(self) -> Dict[str, Any]:
+        """Queue one mint per user with unminted rewards and wake the outbox dispatcher"""
+        try:
+            if not blockchain_service.is_available():
+                # Keep accumulating rather than queue mints the dispatcher cannot send
+                return {"success": True, "queued": 0, "blockchain_available": False}
+
+            await self._settle_failed_mints()
+
+            supabase = get_supabase_service()
+            queued = 0
+            while True:
+                count = supabase.rpc("queue_reward_mints", {"p_limit": self.batch_size}).execute().data or 0
+                queued += count
+                if count < self.batch_size:
+                    break
+
+            if queued:
+                blockchain_outbox_dispatcher.wake()
+                logger.info("Reward mints queued", users=queued)
+            return {"success": True, "queued": queued}
+
+        except Exception as e:
+            logger.error(f"Failed to queue reward mints: {str(e)}")
+            return {"success": False, "error": str(e)}
+
+    async def _settle_failed_mints(self) -> None:
+        """
+        Resolve failed mints that sent transactions: a mined one marks the mint
+        confirmed, a pending one is left for the next round, and if all
+        reverted or are unknown to the node the mint is dropped, so
+        queue_reward_mints sends its rewards again
+        """
+        supabase = get_supabase_service()
+        failed = supabase.table(Tables.BLOCKCHAIN_OUTBOX).select("id, sent_tx_hashes").eq(
+            "operation", "mint_reward"
+        ).eq("status", "failed").neq("sent_tx_hashes", "[]").limit(self.batch_size).execute().data or []
+
+        for mint in failed:
+            receipt, pending_hash = await blockchain_service.find_sent_transaction(mint["sent_tx_hashes"])
+            if receipt is not None and receipt.status == 1:
+                update = {
+                    "status": "confirmed",
+                    "tx_hash": receipt.transactionHash.to_0x_hex(),
+                    "confirmed_at": datetime.utcnow().isoformat()
+                }
+            elif pending_hash is None:
+                update = {"status": "dropped"}
+            else:
+                continue
+            supabase.table(Tables.BLOCKCHAIN_OUTBOX).update(update).eq("id", mint["id"]).eq(
+                "status", "failed"
+            ).execute()
+            logger.info("Failed reward mint settled", outbox_id=mint["id"], **update)
+
+    @staticmethod
+    def _history_item(entry: Dict[str, Any]) -> Dict[str, Any]:
+        mint = entry.get("blockchain_outbox")
+        if entry["mint_pending"]:
+            # Unminted rewards are pending until their batch is queued and confirmed
+            status = mint["status"] if mint else "pending"
+        else:
+            status = "completed"
+
+        item = {
+            "id": str(entry["id"]),
+            "type": entry["entry_type"],
+            "amount": abs(entry["points"]),
+            "reason": entry["reason"],
+            "reference": entry["reference"],
+            "balance": entry["balance_after"],
+            "timestamp": entry["created_at"],
+            "status": status
+        }
+        if mint and mint.get("tx_hash"):
+            item["txHash"] = mint["tx_hash"]
+        return item
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.queue_mints()
+
+
+# Global points ledger service instance
+points_ledger_service = PointsLedgerService()
@@ -0,0 +1,114 @@
+"""
+Statistics service
+Serves the stats endpoints from one database call each, cached for a short TTL
+"""
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..core.supabase import get_supabase_service
+
+GOVERNANCE_STATS = "governance"
+DONATION_STATS = "donations"
+BLOCKCHAIN_STATS = "blockchain"
+
+# (scope, user id or None for the platform-wide figures)
+CacheKey = Tuple[str, Optional[str]]
+
+
+class StatsService:
+    """
+    Aggregates behind the governance, donation and blockchain stats endpoints.
+
+    Each endpoint's figures come from one database function. Platform-wide
+    figures are cached for `global_ttl` seconds and a user's own for
+    `user_ttl`, so repeated page loads are answered from memory. Write paths
+    call invalidate() for what they changed; the TTL bounds how stale other
+    workers' caches can get.
+    """
+
+    def __init__(
+        self,
+        global_ttl: float = settings.STATS_CACHE_TTL,
+        user_ttl: float = settings.STATS_USER_CACHE_TTL,
+        max_entries: int = settings.STATS_CACHE_MAX_ENTRIES
+    ):
+        self.global_ttl = global_ttl
+        self.user_ttl = user_ttl
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._cache: Dict[CacheKey, Tuple[float, Dict[str, Any]]] = {}  # key -> (expires at, figures)
+
+    def invalidate(self, scope: str, user_id: Optional[str] = None) -> None:
+        """Drop a scope's platform-wide figures and the user's own; every user's without user_id"""
+        if user_id is None:
+            for key in [key for key in self._cache if key[0] == scope]:
+                del self._cache[key]
+        else:
+            self._cache.pop((scope, None), None)
+            self._cache.pop((scope, str(user_id)), None)
+
+    async def get_governance_stats(self, user_id: str) -> Dict[str, Any]:
+        """Proposal and vote counts, platform-wide and the user's own"""
+        overall = self._get(GOVERNANCE_STATS)
+        own = self._get(GOVERNANCE_STATS, user_id)
+
+        if overall is None or own is None:
+            supabase = get_supabase_service()
+            result = supabase.rpc("get_governance_stats", {
+                "p_user_id": user_id,
+                "p_include_global": overall is None
+            }).execute().data
+
+            if overall is None:
+                overall = self._put(GOVERNANCE_STATS, None, result["global"])
+            own = self._put(GOVERNANCE_STATS, user_id, result["user"])
+
+        return {**overall, **own}
+
+    async def get_donation_stats(self, user_id: str) -> Dict[str, Any]:
+        """Donation counts of a donor by status group"""
+        stats = self._get(DONATION_STATS, user_id)
+        if stats is None:
+            supabase = get_supabase_service()
+            stats = self._put(DONATION_STATS, user_id, supabase.rpc("get_donation_stats", {
+                "p_donor_id": user_id
+            }).execute().data)
+        return stats
+
+    async def get_blockchain_stats(self) -> Dict[str, Any]:
+        """Platform-wide on-chain record counts"""
+        stats = self._get(BLOCKCHAIN_STATS)
+        if stats is None:
+            supabase = get_supabase_service()
+            stats = self._put(BLOCKCHAIN_STATS, None, supabase.rpc("get_blockchain_stats", {}).execute().data)
+        return stats
+
+    def _get(self, scope: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        key = (scope, str(user_id) if user_id is not None else None)
+        entry = self._cache.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def _put(self, scope: str, user_id: Optional[str], stats: Dict[str, Any]) -> Dict[str, Any]:
+        now = time.monotonic()
+        if user_id is not None and len(self._cache) >= self.max_entries:
+            # Drop expired entries first, then the oldest ones
+            for key in [key for key, (expires_at, _) in self._cache.items() if expires_at <= now]:
+                del self._cache[key]
+            while len(self._cache) >= self.max_entries:
+                del self._cache[next(iter(self._cache))]
+
+        ttl = self.user_ttl if user_id is not None else self.global_ttl
+        self._cache[(scope, str(user_id) if user_id is not None else None)] = (now + ttl, stats)
+        return stats
+
+
+# Global stats service instance
+stats_service = StatsService()
@@ -1,14 +1,14 @@
 """
 Transparency service for blockchain-inspired transaction logging
 """
-import hashlib
-import json
-import time
-from typing import List, Dict, Any, Optional
+from itertools import groupby
+from typing import List, Dict, Any, Optional, Iterable, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, func
+from sqlalchemy.dialects.postgresql import insert
 
-from ..models.donation import DonationTransaction, Donation
+from ..core.ledger import check_transaction_hash
+from ..models.donation import DonationTransaction, DonationChainHead, Donation
 from ..models.user import User
 
 
@@ -24,27 +24,29 @@ class TransparencyService:
         result = await self.db.execute(
             select(DonationTransaction)
             .where(DonationTransaction.donation_id == donation_id)
-            .order_by(DonationTransaction.id.asc())
+            .order_by(DonationTransaction.ledger_seq.asc())
         )
         
         transactions = result.scalars().all()
         
+        # Actor information for the whole chain in one query
+        actors = await self._get_actor_infos(
+            (tx.actor_id, tx.actor_type) for tx in transactions
+        )
+        
         # Format transactions for transparency
         chain = []
         for tx in transactions:
-            # Get actor information
-            actor_info = await self._get_actor_info(tx.actor_id, tx.actor_type)
-            
             chain.append({
                 "id": tx.id,
                 "transaction_type": tx.transaction_type,
                 "description": tx.description,
-                "actor": actor_info,
-                "metadata": tx.metadata,
+                "actor": actors[(tx.actor_id, tx.actor_type)],
+                "metadata": tx.transaction_metadata,
                 "transaction_hash": tx.transaction_hash,
                 "previous_hash": tx.previous_hash,
                 "timestamp": tx.created_at,
-                "verified": await self._verify_transaction_hash(tx)
+                "verified": self._verify_transaction_hash(donation_id, tx)
             })
         
         return chain
@@ -52,46 +54,11 @@ class TransparencyService:
     async def verify_chain_integrity(self, donation_id: int) -> Dict[str, Any]:
         """Verify the integrity of a donation's transaction chain"""
         
-        transactions = await self.get_transaction_chain(donation_id)
-        
-        if not transactions:
-            return {
-                "valid": True,
-                "message": "No transactions to verify",
-                "total_transactions": 0
-            }
+        heads = await self._refresh_chain_heads([donation_id])
+        integrity = self._chain_integrity(heads.get(donation_id))
+        await self.db.commit()
         
-        # Verify each transaction hash
-        invalid_transactions = []
-        broken_chain = False
-        
-        for i, tx in enumerate(transactions):
-            # Verify transaction hash
-            if not tx["verified"]:
-                invalid_transactions.append({
-                    "transaction_id": tx["id"],
-                    "reason": "Invalid transaction hash"
-                })
-            
-            # Verify chain linkage (except for first transaction)
-            if i > 0:
-                expected_previous_hash = transactions[i-1]["transaction_hash"]
-                if tx["previous_hash"] != expected_previous_hash:
-                    broken_chain = True
-                    invalid_transactions.append({
-                        "transaction_id": tx["id"],
-                        "reason": "Broken chain linkage"
-                    })
-        
-        is_valid = len(invalid_transactions) == 0 and not broken_chain
-        
-        return {
-            "valid": is_valid,
-            "total_transactions": len(transactions),
-            "invalid_transactions": invalid_transactions,
-            "chain_broken": broken_chain,
-            "message": "Chain is valid" if is_valid else "Chain integrity compromised"
-        }
+        return integrity
     
     async def get_public_transparency_data(
         self,
@@ -124,9 +91,13 @@ class TransparencyService:
         # Get platform statistics
         stats = await self._get_platform_statistics()
         
+        # Verify the listed chains together; unchanged chains reuse their cached score
+        heads = await self._refresh_chain_heads([donation_data.id for donation_data in donations_data])
+        
         # Format public data (anonymized)
         public_donations = []
         for donation_data in donations_data:
+            head = heads.get(donation_data.id)
             public_donations.append({
                 "donation_id": donation_data.id,
                 "title": donation_data.title,
@@ -134,18 +105,48 @@ class TransparencyService:
                 "status": donation_data.status.value,
                 "created_date": donation_data.created_at.date(),
                 "transaction_count": donation_data.transaction_count,
-                "transparency_score": await self._calculate_transparency_score(donation_data.id)
+                "transparency_score": self._cached_score(head)
             })
         
+        platform_integrity = await self._get_platform_integrity_score()
+        
+        # Keep the verification progress made while serving this request
+        await self.db.commit()
+        
         return {
             "donations": public_donations,
             "statistics": stats,
             "total_donations": len(public_donations),
-            "platform_integrity": await self._get_platform_integrity_score()
+            "platform_integrity": platform_integrity
+        }
+    
+    async def _get_actor_infos(
+        self,
+        actors: Iterable[Tuple[Optional[int], Optional[str]]]
+    ) -> Dict[Tuple[Optional[int], Optional[str]], Dict[str, Any]]:
+        """Get actor information for transparency, keyed by (actor_id, actor_type)"""
+        
+        actors = set(actors)
+        user_ids = {
+            actor_id for actor_id, actor_type in actors
+            if actor_type != "system" and actor_id
+        }
+        
+        users = {}
+        if user_ids:
+            result = await self.db.execute(
+                select(User).where(User.id.in_(user_ids))
+            )
+            users = {user.id: user for user in result.scalars().all()}
+        
+        return {
+            (actor_id, actor_type): self._actor_info(actor_id, actor_type, users.get(actor_id))
+            for actor_id, actor_type in actors
         }
     
-    async def _get_actor_info(self, actor_id: int, actor_type: str) -> Dict[str, Any]:
-        """Get actor information for transparency"""
+    @staticmethod
+    def _actor_info(actor_id: Optional[int], actor_type: Optional[str], user: Optional[User]) -> Dict[str, Any]:
+        """Anonymized description of a transaction actor"""
         
         if actor_type == "system":
             return {
@@ -161,12 +162,6 @@ class TransparencyService:
                 "id": "auto"
             }
         
-        # Get user information
-        result = await self.db.execute(
-            select(User).where(User.id == actor_id)
-        )
-        user = result.scalar_one_or_none()
-        
         if not user:
             return {
                 "type": "unknown",
@@ -182,32 +177,142 @@ class TransparencyService:
             "verified": user.status.value == "verified"
         }
     
-    async def _verify_transaction_hash(self, transaction: DonationTransaction) -> bool:
+    @staticmethod
+    def _verify_transaction_hash(donation_id: int, transaction: Any) -> bool:
         """Verify a transaction's hash integrity"""
         
-        # Reconstruct the transaction data that was hashed
-        transaction_data = {
-            "donation_id": transaction.donation_id,
-            "transaction_type": transaction.transaction_type,
-            "description": transaction.description,
-            "actor_id": transaction.actor_id,
-            "actor_type": transaction.actor_type,
-            "metadata": transaction.metadata or {},
-            "previous_hash": transaction.previous_hash
-        }
+        # Recomputed from the stored fields; links written before the hash
+        # timestamp was stored only get a format check
+        valid, _ = check_transaction_hash(donation_id, transaction)
+        return valid
+    
+    async def _refresh_chain_heads(self, donation_ids: List[int]) -> Dict[int, DonationChainHead]:
+        """
+        Bring the verified prefix of each chain up to date and return the heads
+        
+        Only transactions after a chain's verified prefix are loaded (one query
+        for all chains), their hashes recomputed and checked against the last
+        verified hash. The transparency score is recomputed only for chains
+        that grew. Donations without transactions have no head. The caller
+        commits.
+        """
+        if not donation_ids:
+            return {}
         
-        # Calculate expected hash
-        expected_hash = hashlib.sha256(
-            json.dumps(transaction_data, sort_keys=True).encode()
-        ).hexdigest()
-        
-        # Note: In the actual implementation, we'd need to include timestamp
-        # For now, we'll just check if the hash exists and is properly formatted
-        return (
-            transaction.transaction_hash and 
-            len(transaction.transaction_hash) == 64 and
-            all(c in '0123456789abcdef' for c in transaction.transaction_hash.lower())
+        result = await self.db.execute(
+            select(DonationChainHead).where(DonationChainHead.donation_id.in_(donation_ids))
+        )
+        heads = {head.donation_id: head for head in result.scalars().all()}
+        
+        result = await self.db.execute(
+            select(
+                DonationTransaction.donation_id,
+                DonationTransaction.id,
+                DonationTransaction.ledger_seq,
+                DonationTransaction.transaction_type,
+                DonationTransaction.description,
+                DonationTransaction.transaction_metadata,
+                DonationTransaction.hashed_at,
+                DonationTransaction.transaction_hash,
+                DonationTransaction.previous_hash,
+                DonationTransaction.actor_id,
+                DonationTransaction.actor_type
+            )
+            .outerjoin(DonationChainHead, DonationChainHead.donation_id == DonationTransaction.donation_id)
+            .where(
+                and_(
+                    DonationTransaction.donation_id.in_(donation_ids),
+                    DonationTransaction.ledger_seq > func.coalesce(DonationChainHead.verified_seq, 0)
+                )
+            )
+            .order_by(DonationTransaction.donation_id, DonationTransaction.ledger_seq)
         )
+        new_links = result.all()
+        if not new_links:
+            return heads
+        
+        actors = await self._get_actor_infos((link.actor_id, link.actor_type) for link in new_links)
+        
+        missing = sorted({link.donation_id for link in new_links} - heads.keys())
+        if missing:
+            # Chains started before heads were tracked; the next append looks up
+            # its previous hash and takes over head_hash. Another request may
+            # create the same heads concurrently, so existing rows are kept.
+            await self.db.execute(
+                insert(DonationChainHead)
+                .values([
+                    {
+                        "donation_id": donation_id, "verified_seq": 0, "verified_length": 0,
+                        "verified_actor_count": 0, "invalid_transactions": [], "chain_broken": False
+                    }
+                    for donation_id in missing
+                ])
+                .on_conflict_do_nothing(index_elements=[DonationChainHead.donation_id])
+            )
+            result = await self.db.execute(
+                select(DonationChainHead).where(DonationChainHead.donation_id.in_(missing))
+            )
+            heads.update({head.donation_id: head for head in result.scalars().all()})
+        
+        for donation_id, links in groupby(new_links, key=lambda link: link.donation_id):
+            head = heads[donation_id]
+            
+            invalid_transactions = list(head.invalid_transactions or [])
+            for link in links:
+                if link.ledger_seq <= head.verified_seq:
+                    # Verified by the request that created the head
+                    continue
+                
+                if not self._verify_transaction_hash(donation_id, link):
+                    invalid_transactions.append({
+                        "transaction_id": link.id,
+                        "reason": "Invalid transaction hash"
+                    })
+                
+                # Verify chain linkage (except for first transaction)
+                if head.verified_length > 0 and link.previous_hash != head.verified_hash:
+                    head.chain_broken = True
+                    invalid_transactions.append({
+                        "transaction_id": link.id,
+                        "reason": "Broken chain linkage"
+                    })
+                
+                if actors[(link.actor_id, link.actor_type)].get("verified", False):
+                    head.verified_actor_count += 1
+                
+                head.verified_transaction_id = link.id
+                head.verified_seq = link.ledger_seq
+                head.verified_hash = link.transaction_hash
+                head.verified_length += 1
+            
+            # Reassign the JSON column so the change is detected
+            head.invalid_transactions = invalid_transactions
+            head.transparency_score = self._score_chain(head)
+        
+        await self.db.flush()
+        return heads
+    
+    @staticmethod
+    def _chain_integrity(head: Optional[DonationChainHead]) -> Dict[str, Any]:
+        """Integrity report of a chain from its verified head"""
+        
+        if head is None or not head.verified_length:
+            return {
+                "valid": True,
+                "message": "No transactions to verify",
+                "total_transactions": 0
+            }
+        
+        invalid_transactions = head.invalid_transactions or []
+        is_valid = len(invalid_transactions) == 0 and not head.chain_broken
+        
+        return {
+            "valid": is_valid,
+            "total_transactions": head.verified_length,
+            "invalid_transactions": invalid_transactions,
+            "chain_broken": bool(head.chain_broken),
+            "message": "Chain is valid" if is_valid else "Chain integrity compromised"
+        }
     
     async def _get_platform_statistics(self) -> Dict[str, Any]:
         """Get platform-wide statistics"""
@@ -255,10 +360,22 @@ class TransparencyService:
     async def _calculate_transparency_score(self, donation_id: int) -> float:
         """Calculate transparency score for a donation (0-100)"""
         
-        # Get transaction chain
-        chain = await self.get_transaction_chain(donation_id)
+        heads = await self._refresh_chain_heads([donation_id])
         
-        if not chain:
+        return self._cached_score(heads.get(donation_id))
+    
+    @staticmethod
+    def _cached_score(head: Optional[DonationChainHead]) -> float:
+        if head is None or head.transparency_score is None:
+            return 0.0
+        return float(head.transparency_score)
+    
+    @staticmethod
+    def _score_chain(head: DonationChainHead) -> float:
+        """Transparency score of a chain's verified prefix (0-100)"""
+        
+        transaction_count = head.verified_length
+        if not transaction_count:
             return 0.0
         
         score = 0.0
@@ -267,12 +384,10 @@ class TransparencyService:
         score += 20.0
         
         # Score for chain integrity
-        integrity = await self.verify_chain_integrity(donation_id)
-        if integrity["valid"]:
+        if not head.invalid_transactions and not head.chain_broken:
             score += 30.0
         
         # Score for number of transactions (more = more transparent)
-        transaction_count = len(chain)
         if transaction_count >= 5:
             score += 25.0
         elif transaction_count >= 3:
@@ -281,9 +396,9 @@ class TransparencyService:
             score += 10.0
         
         # Score for having verified actors
-        verified_actors = sum(1 for tx in chain if tx["actor"].get("verified", False))
+        verified_actors = head.verified_actor_count
         if verified_actors > 0:
-            score += min(25.0, (verified_actors / len(chain)) * 25.0)
+            score += min(25.0, (verified_actors / transaction_count) * 25.0)
         
         return min(100.0, score)
     
@@ -303,11 +418,11 @@ class TransparencyService:
             return 100.0
         
         # Check integrity of sample donations
-        valid_chains = 0
-        for donation_id in donation_ids:
-            integrity = await self.verify_chain_integrity(donation_id)
-            if integrity["valid"]:
-                valid_chains += 1
+        heads = await self._refresh_chain_heads(donation_ids)
+        valid_chains = sum(
+            1 for donation_id in donation_ids
+            if self._chain_integrity(heads.get(donation_id))["valid"]
+        )
         
         # Calculate percentage of valid chains
         integrity_percentage = (valid_chains / len(donation_ids)) * 100
@@ -0,0 +1,124 @@
+"""
+Offline gazetteer of Vietnamese provinces and urban districts
+Coordinates are administrative centres (WGS84), accurate to about 1 km
+"""
+
+# (province, latitude, longitude, extra aliases)
+PROVINCES = [
+    ("An Giang", 10.386, 105.435, ["long xuyen"]),
+    ("Bà Rịa - Vũng Tàu", 10.346, 107.084, ["vung tau", "ba ria", "brvt"]),
+    ("Bắc Giang", 21.273, 106.194, []),
+    ("Bắc Kạn", 22.147, 105.834, ["bac can"]),
+    ("Bạc Liêu", 9.294, 105.727, []),
+    ("Bắc Ninh", 21.186, 106.076, []),
+    ("Bến Tre", 10.241, 106.376, []),
+    ("Bình Định", 13.776, 109.224, ["quy nhon"]),
+    ("Bình Dương", 10.980, 106.651, ["thu dau mot"]),
+    ("Bình Phước", 11.535, 106.883, ["dong xoai"]),
+    ("Bình Thuận", 10.928, 108.102, ["phan thiet"]),
+    ("Cà Mau", 9.177, 105.150, []),
+    ("Cần Thơ", 10.046, 105.747, ["can tho city"]),
+    ("Cao Bằng", 22.666, 106.258, []),
+    ("Đà Nẵng", 16.054, 108.202, ["danang"]),
+    ("Đắk Lắk", 12.667, 108.038, ["dak lak", "daklak", "buon ma thuot"]),
+    ("Đắk Nông", 12.004, 107.691, ["dak nong", "gia nghia"]),
+    ("Điện Biên", 21.386, 103.023, ["dien bien phu"]),
+    ("Đồng Nai", 10.945, 106.824, ["bien hoa"]),
+    ("Đồng Tháp", 10.460, 105.633, ["cao lanh"]),
+    ("Gia Lai", 13.983, 108.000, ["pleiku"]),
+    ("Hà Giang", 22.823, 104.984, []),
+    ("Hà Nam", 20.541, 105.914, ["phu ly"]),
+    ("Hà Nội", 21.028, 105.854, ["hanoi", "tp ha noi", "thanh pho ha noi"]),
+    ("Hà Tĩnh", 18.343, 105.906, []),
+    ("Hải Dương", 20.940, 106.333, []),
+    ("Hải Phòng", 20.845, 106.688, ["haiphong"]),
+    ("Hậu Giang", 9.784, 105.470, ["vi thanh"]),
+    ("Hòa Bình", 20.817, 105.338, []),
+    ("Hưng Yên", 20.646, 106.051, []),
+    ("Khánh Hòa", 12.238, 109.197, ["nha trang"]),
+    ("Kiên Giang", 10.012, 105.081, ["rach gia", "phu quoc"]),
+    ("Kon Tum", 14.350, 108.000, []),
+    ("Lai Châu", 22.396, 103.458, []),
+    ("Lâm Đồng", 11.940, 108.458, ["da lat", "dalat"]),
+    ("Lạng Sơn", 21.853, 106.761, []),
+    ("Lào Cai", 22.486, 103.975, ["sa pa", "sapa"]),
+    ("Long An", 10.535, 106.413, ["tan an"]),
+    ("Nam Định", 20.434, 106.177, []),
+    ("Nghệ An", 18.679, 105.681, ["tp vinh", "thanh pho vinh"]),
+    ("Ninh Bình", 20.251, 105.975, []),
+    ("Ninh Thuận", 11.565, 108.988, ["phan rang"]),
+    ("Phú Thọ", 21.322, 105.402, ["viet tri"]),
+    ("Phú Yên", 13.096, 109.301, ["tuy hoa"]),
+    ("Quảng Bình", 17.468, 106.622, ["dong hoi"]),
+    ("Quảng Nam", 15.573, 108.474, ["tam ky", "hoi an"]),
+    ("Quảng Ngãi", 15.120, 108.792, []),
+    ("Quảng Ninh", 20.951, 107.073, ["ha long"]),
+    ("Quảng Trị", 16.816, 107.100, ["dong ha"]),
+    ("Sóc Trăng", 9.603, 105.980, []),
+    ("Sơn La", 21.327, 103.914, []),
+    ("Tây Ninh", 11.310, 106.098, []),
+    ("Thái Bình", 20.446, 106.342, []),
+    ("Thái Nguyên", 21.594, 105.848, []),
+    ("Thanh Hóa", 19.807, 105.776, ["thanh hoa"]),
+    ("Thừa Thiên Huế", 16.463, 107.590, ["hue", "thua thien hue", "tp hue"]),
+    ("Tiền Giang", 10.360, 106.360, ["my tho"]),
+    ("TP Hồ Chí Minh", 10.776, 106.701, [
+        "ho chi minh", "thanh pho ho chi minh", "hcm", "hcmc", "tphcm", "tp hcm",
+        "sai gon", "saigon", "ho chi minh city"
+    ]),
+    ("Trà Vinh", 9.935, 106.345, []),
+    ("Tuyên Quang", 21.824, 105.214, []),
+    ("Vĩnh Long", 10.254, 105.972, []),
+    ("Vĩnh Phúc", 21.309, 105.605, ["vinh yen"]),
+    ("Yên Bái", 21.705, 104.875, []),
+]
+
+# (province, district, latitude, longitude, extra aliases)
+DISTRICTS = [
+    ("TP Hồ Chí Minh", "Quận 1", 10.776, 106.700, ["q1", "q 1", "district 1"]),
+    ("TP Hồ Chí Minh", "Quận 3", 10.784, 106.684, ["q3", "q 3", "district 3"]),
+    ("TP Hồ Chí Minh", "Quận 4", 10.758, 106.705, ["q4", "q 4", "district 4"]),
+    ("TP Hồ Chí Minh", "Quận 5", 10.754, 106.664, ["q5", "q 5", "district 5"]),
+    ("TP Hồ Chí Minh", "Quận 6", 10.748, 106.635, ["q6", "q 6", "district 6"]),
+    ("TP Hồ Chí Minh", "Quận 7", 10.734, 106.722, ["q7", "q 7", "district 7"]),
+    ("TP Hồ Chí Minh", "Quận 8", 10.724, 106.628, ["q8", "q 8", "district 8"]),
+    ("TP Hồ Chí Minh", "Quận 10", 10.773, 106.668, ["q10", "q 10", "district 10"]),
+    ("TP Hồ Chí Minh", "Quận 11", 10.763, 106.643, ["q11", "q 11", "district 11"]),
+    ("TP Hồ Chí Minh", "Quận 12", 10.867, 106.641, ["q12", "q 12", "district 12"]),
+    ("TP Hồ Chí Minh", "Bình Thạnh", 10.811, 106.709, []),
+    ("TP Hồ Chí Minh", "Gò Vấp", 10.838, 106.665, []),
+    ("TP Hồ Chí Minh", "Phú Nhuận", 10.800, 106.680, []),
+    ("TP Hồ Chí Minh", "Tân Bình", 10.802, 106.652, []),
+    ("TP Hồ Chí Minh", "Tân Phú", 10.790, 106.628, []),
+    ("TP Hồ Chí Minh", "Bình Tân", 10.765, 106.603, []),
+    ("TP Hồ Chí Minh", "Thủ Đức", 10.849, 106.772, ["quan 2", "quan 9", "district 2", "district 9"]),
+    ("TP Hồ Chí Minh", "Bình Chánh", 10.688, 106.593, []),
+    ("TP Hồ Chí Minh", "Hóc Môn", 10.889, 106.595, []),
+    ("TP Hồ Chí Minh", "Củ Chi", 10.973, 106.493, []),
+    ("TP Hồ Chí Minh", "Nhà Bè", 10.695, 106.740, []),
+    ("TP Hồ Chí Minh", "Cần Giờ", 10.411, 106.954, []),
+    ("Hà Nội", "Ba Đình", 21.034, 105.814, []),
+    ("Hà Nội", "Hoàn Kiếm", 21.029, 105.852, []),
+    ("Hà Nội", "Hai Bà Trưng", 21.006, 105.857, []),
+    ("Hà Nội", "Đống Đa", 21.018, 105.829, []),
+    ("Hà Nội", "Tây Hồ", 21.070, 105.818, []),
+    ("Hà Nội", "Cầu Giấy", 21.033, 105.790, []),
+    ("Hà Nội", "Thanh Xuân", 20.994, 105.817, []),
+    ("Hà Nội", "Hoàng Mai", 20.974, 105.864, []),
+    ("Hà Nội", "Long Biên", 21.054, 105.889, []),
+    ("Hà Nội", "Hà Đông", 20.971, 105.776, []),
+    ("Hà Nội", "Bắc Từ Liêm", 21.070, 105.760, []),
+    ("Hà Nội", "Nam Từ Liêm", 21.013, 105.765, []),
+    ("Đà Nẵng", "Hải Châu", 16.047, 108.219, []),
+    ("Đà Nẵng", "Thanh Khê", 16.064, 108.188, []),
+    ("Đà Nẵng", "Sơn Trà", 16.083, 108.239, []),
+    ("Đà Nẵng", "Ngũ Hành Sơn", 15.996, 108.257, []),
+    ("Đà Nẵng", "Liên Chiểu", 16.073, 108.150, []),
+    ("Đà Nẵng", "Cẩm Lệ", 16.015, 108.196, []),
+    ("Cần Thơ", "Ninh Kiều", 10.033, 105.770, []),
+    ("Cần Thơ", "Bình Thủy", 10.074, 105.743, []),
+    ("Cần Thơ", "Cái Răng", 9.999, 105.781, []),
+    ("Hải Phòng", "Hồng Bàng", 20.862, 106.681, []),
+    ("Hải Phòng", "Lê Chân", 20.846, 106.672, []),
+    ("Hải Phòng", "Ngô Quyền", 20.853, 106.697, []),
+]
@@ -0,0 +1,18 @@
+-- Migration 007: Create perceptual image hash table for duplicate photo detection
+-- Stores pHash/dHash of campaign images and uploaded documents so the backend
+-- can rebuild its in-memory multi-index hash table on startup
+
+CREATE TABLE IF NOT EXISTS image_hashes (
+    id BIGSERIAL PRIMARY KEY,
+    phash BIGINT NOT NULL, -- 64-bit DCT perceptual hash (stored signed)
+    dhash BIGINT NOT NULL, -- 64-bit difference hash (stored signed)
+    source_type VARCHAR(50) NOT NULL, -- campaign_image, document
+    source_id VARCHAR(100) NOT NULL, -- campaign id or document content hash
+    owner_id VARCHAR(100), -- campaign creator / uploading user
+    image_ref TEXT NOT NULL, -- image URL or stored document path
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (source_type, source_id, image_ref)
+);
+
+CREATE INDEX IF NOT EXISTS idx_image_hashes_owner_id ON image_hashes(owner_id);
+CREATE INDEX IF NOT EXISTS idx_image_hashes_source ON image_hashes(source_type, source_id);
@@ -0,0 +1,19 @@
+-- Migration 008: Create per-hospital donation statistics
+-- Maintained incrementally by the backend whenever a donation's status or
+-- recipient changes, so matching and dashboards read one row per hospital
+-- instead of aggregating the donations table. Rebuild with
+-- backend/scripts/rebuild_hospital_stats.py.
+
+CREATE TABLE IF NOT EXISTS hospital_stats (
+    hospital_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    assigned_count INTEGER NOT NULL DEFAULT 0, -- donations routed to the hospital, any status
+    open_count INTEGER NOT NULL DEFAULT 0, -- matched or shipped
+    received_count INTEGER NOT NULL DEFAULT 0, -- delivered or completed
+    completed_count INTEGER NOT NULL DEFAULT 0,
+    daily_received JSONB NOT NULL DEFAULT '{}', -- {donation_type: {"YYYY-MM-DD": count}}, last 30 days
+    last_received_at TIMESTAMP WITH TIME ZONE,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TRIGGER update_hospital_stats_updated_at BEFORE UPDATE ON hospital_stats
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
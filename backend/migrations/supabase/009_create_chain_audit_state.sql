@@ -0,0 +1,38 @@
+-- Migration 009: Create hash-chain audit progress table
+-- Lets the fraud scan verify only the donation transaction chains that
+-- received new transactions since the previous scan, and gives transactions
+-- an insertion order to walk chains in (their ids are random UUIDs)
+
+CREATE SEQUENCE IF NOT EXISTS donation_transactions_ledger_seq;
+
+ALTER TABLE donation_transactions
+    ADD COLUMN IF NOT EXISTS ledger_seq BIGINT;
+
+-- Existing transactions are numbered in creation order
+UPDATE donation_transactions dt
+SET ledger_seq = numbered.seq
+FROM (
+    SELECT id, row_number() OVER (ORDER BY created_at, id) AS seq
+    FROM donation_transactions
+) numbered
+WHERE dt.id = numbered.id AND dt.ledger_seq IS NULL;
+
+SELECT setval(
+    'donation_transactions_ledger_seq',
+    GREATEST((SELECT MAX(ledger_seq) FROM donation_transactions), 1)
+);
+
+ALTER TABLE donation_transactions
+    ALTER COLUMN ledger_seq SET DEFAULT nextval('donation_transactions_ledger_seq'),
+    ALTER COLUMN ledger_seq SET NOT NULL;
+
+ALTER SEQUENCE donation_transactions_ledger_seq OWNED BY donation_transactions.ledger_seq;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_donation_transactions_ledger_seq ON donation_transactions(ledger_seq);
+CREATE INDEX IF NOT EXISTS idx_donation_transactions_donation_seq ON donation_transactions(donation_id, ledger_seq);
+
+CREATE TABLE IF NOT EXISTS chain_audit_state (
+    name VARCHAR(50) PRIMARY KEY, -- audit name, e.g. donation_transactions
+    broken_links JSONB NOT NULL DEFAULT '{}', -- {donation_id: [finding, ...]} carried over between scans
+    last_scan_at TIMESTAMP WITH TIME ZONE -- database time the last completed scan read the ledger at
+);
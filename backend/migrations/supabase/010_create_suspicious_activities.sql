@@ -0,0 +1,35 @@
+-- Migration 010: Create stored fraud scan findings and scan state
+-- The backend scans in the background and upserts findings here; admin pages
+-- read these tables instead of running every detector per request
+
+CREATE TABLE IF NOT EXISTS suspicious_activities (
+    id BIGSERIAL PRIMARY KEY,
+    activity_key VARCHAR(100) NOT NULL UNIQUE, -- type plus subject, e.g. payment_issues:user:5
+    activity_type VARCHAR(50) NOT NULL,
+    severity VARCHAR(20) NOT NULL, -- low, medium, high
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    donation_id UUID REFERENCES donations(id) ON DELETE CASCADE,
+    transaction_id BIGINT,
+    description TEXT,
+    details JSONB, -- full finding as reported by the detector
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    first_detected_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    last_detected_at TIMESTAMP WITH TIME ZONE,
+    resolved_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_suspicious_activities_active ON suspicious_activities(is_active, severity);
+CREATE INDEX IF NOT EXISTS idx_suspicious_activities_type ON suspicious_activities(activity_type);
+CREATE INDEX IF NOT EXISTS idx_suspicious_activities_user_id ON suspicious_activities(user_id);
+
+CREATE TABLE IF NOT EXISTS fraud_scan_state (
+    name VARCHAR(50) PRIMARY KEY, -- scan name, e.g. platform
+    watermark TIMESTAMP WITH TIME ZONE, -- start of the last completed scan
+    dashboard JSONB, -- severity/type counts and high-risk users at the last scan
+    last_duration_seconds NUMERIC(10, 3),
+    last_error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TRIGGER update_fraud_scan_state_updated_at BEFORE UPDATE ON fraud_scan_state
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
@@ -0,0 +1,23 @@
+-- Migration 011: Create per-donation transaction chain heads
+-- New transactions link to the stored head hash instead of looking up the
+-- previous transaction, and the transparency service re-verifies only the
+-- links added after the verified prefix. Rows for chains created before this
+-- migration are filled in on first verification.
+
+CREATE TABLE IF NOT EXISTS donation_chain_heads (
+    donation_id UUID PRIMARY KEY REFERENCES donations(id) ON DELETE CASCADE,
+    head_transaction_id UUID REFERENCES donation_transactions(id) ON DELETE SET NULL, -- latest transaction appended by the backend
+    head_hash VARCHAR(64),
+    verified_transaction_id UUID REFERENCES donation_transactions(id) ON DELETE SET NULL, -- last transaction of the verified prefix
+    verified_seq BIGINT NOT NULL DEFAULT 0, -- ledger_seq of verified_transaction_id (migration 009)
+    verified_hash VARCHAR(64),
+    verified_length INTEGER NOT NULL DEFAULT 0,
+    verified_actor_count INTEGER NOT NULL DEFAULT 0, -- transactions by verified users
+    invalid_transactions JSONB NOT NULL DEFAULT '[]', -- [{transaction_id, reason}]
+    chain_broken BOOLEAN DEFAULT FALSE,
+    transparency_score DOUBLE PRECISION, -- score of the verified prefix (0-100)
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TRIGGER update_donation_chain_heads_updated_at BEFORE UPDATE ON donation_chain_heads
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
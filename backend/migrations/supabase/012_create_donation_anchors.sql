@@ -0,0 +1,31 @@
+-- Migration 012: Create Merkle-batched donation anchoring tables
+-- New donation records are queued in donation_anchors and anchored on chain
+-- one Merkle root per batch. Each record keeps its inclusion proof so it can
+-- be verified offline against the batch root.
+
+CREATE TABLE IF NOT EXISTS anchor_batches (
+    id BIGSERIAL PRIMARY KEY,
+    merkle_root VARCHAR(66) NOT NULL, -- 0x + 64 chars
+    leaf_count INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'submitting', -- submitting, anchored, failed
+    tx_hash VARCHAR(66), -- anchor transaction carrying the root
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    anchored_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS donation_anchors (
+    id BIGSERIAL PRIMARY KEY,
+    donation_id UUID NOT NULL REFERENCES donations(id) ON DELETE CASCADE,
+    metadata_hash TEXT NOT NULL, -- donation metadata hash committed to by the leaf
+    leaf VARCHAR(66) NOT NULL, -- keccak256(keccak256(abi.encode(donation_id, metadata_hash)))
+    batch_id BIGINT REFERENCES anchor_batches(id),
+    leaf_index INTEGER,
+    proof JSONB, -- sibling hashes from the leaf up to the root
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, anchored
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    anchored_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_donation_anchors_pending ON donation_anchors(status, created_at);
+CREATE INDEX IF NOT EXISTS idx_donation_anchors_donation_id ON donation_anchors(donation_id);
+CREATE INDEX IF NOT EXISTS idx_donation_anchors_batch_id ON donation_anchors(batch_id);
@@ -0,0 +1,42 @@
+-- Migration 013: Store hash timestamps and full-ledger audit results
+-- The hashed timestamp of each donation transaction is kept so its hash can be
+-- recomputed. scripts/audit_ledger.py recomputes every hash, stores a signed
+-- report and replaces the per-chain results that the verify endpoint reads.
+
+ALTER TABLE donation_transactions
+    ADD COLUMN IF NOT EXISTS hashed_at DOUBLE PRECISION; -- Unix time covered by transaction_hash; NULL for older links
+
+CREATE TABLE IF NOT EXISTS ledger_audit_reports (
+    id BIGSERIAL PRIMARY KEY,
+    last_ledger_seq BIGINT, -- transactions up to this ledger_seq (migration 009) were audited
+    chain_count INTEGER NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    recomputed_count INTEGER NOT NULL DEFAULT 0, -- hashes recomputed; the rest only format-checked
+    invalid_chain_count INTEGER NOT NULL DEFAULT 0,
+    invalid_transaction_count INTEGER NOT NULL DEFAULT 0,
+    workers INTEGER,
+    duration_seconds DOUBLE PRECISION,
+    transactions_per_second DOUBLE PRECISION,
+    results_digest VARCHAR(64), -- SHA-256 of the per-chain results
+    report JSONB, -- exactly the signed payload
+    signer VARCHAR(42), -- address of the signing key
+    signature VARCHAR(132), -- EIP-191 signature of the canonical report JSON
+    started_at TIMESTAMP WITH TIME ZONE,
+    completed_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS ledger_chain_audits (
+    donation_id UUID PRIMARY KEY REFERENCES donations(id) ON DELETE CASCADE,
+    report_id BIGINT NOT NULL REFERENCES ledger_audit_reports(id) ON DELETE CASCADE,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    recomputed_count INTEGER NOT NULL DEFAULT 0,
+    head_transaction_id UUID, -- last link covered by the audit
+    head_hash VARCHAR(64),
+    chain_broken BOOLEAN DEFAULT FALSE,
+    invalid_transactions JSONB NOT NULL DEFAULT '[]', -- [{transaction_id, reason}]
+    valid BOOLEAN NOT NULL,
+    audited_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_chain_audits_report_id ON ledger_chain_audits(report_id);
+CREATE INDEX IF NOT EXISTS idx_ledger_chain_audits_invalid ON ledger_chain_audits(valid) WHERE NOT valid;
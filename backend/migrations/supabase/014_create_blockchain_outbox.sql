@@ -0,0 +1,109 @@
+-- Migration 014: Transactional outbox for on-chain writes
+-- API requests no longer wait for the chain. The chain write a request needs
+-- is queued in blockchain_outbox in the same database transaction as the
+-- donation change, and a background dispatcher submits, confirms and retries
+-- it, then updates the donation and notifies the donor.
+
+-- Blockchain tracking columns written by the donations API
+ALTER TABLE donations
+    ADD COLUMN IF NOT EXISTS blockchain_status VARCHAR(20), -- pending, confirmed, failed
+    ADD COLUMN IF NOT EXISTS blockchain_tx_hash VARCHAR(66),
+    ADD COLUMN IF NOT EXISTS blockchain_recorded_at TIMESTAMP WITH TIME ZONE,
+    ADD COLUMN IF NOT EXISTS metadata_hash TEXT;
+
+CREATE TABLE IF NOT EXISTS blockchain_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    donation_id UUID REFERENCES donations(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL, -- notified when the transaction confirms
+    operation VARCHAR(30) NOT NULL, -- record_donation, update_status, mint_reward
+    payload JSONB NOT NULL DEFAULT '{}', -- call arguments not read from the donation row
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- pending, submitting, confirmed, batched, failed, dropped (failed, none of its transactions mined)
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    locked_until TIMESTAMP WITH TIME ZONE, -- a submitting entry past this is reclaimed
+    last_error TEXT,
+    sent_tx_hashes JSONB NOT NULL DEFAULT '[]', -- every signed version, saved before it is sent
+    tx_hash VARCHAR(66), -- the confirmed one
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    confirmed_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_blockchain_outbox_due ON blockchain_outbox(status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_blockchain_outbox_donation_id ON blockchain_outbox(donation_id);
+
+-- Queue the on-chain record of every donation inserted as pending
+CREATE OR REPLACE FUNCTION enqueue_donation_record()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO blockchain_outbox (donation_id, user_id, operation)
+    VALUES (NEW.id, NEW.donor_id, 'record_donation');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_enqueue_donation_record ON donations;
+CREATE TRIGGER trigger_enqueue_donation_record
+    AFTER INSERT ON donations
+    FOR EACH ROW
+    WHEN (NEW.blockchain_status = 'pending')
+    EXECUTE FUNCTION enqueue_donation_record();
+
+-- Mark a donation paid and queue its on-chain status update and donor reward
+-- in one transaction
+CREATE OR REPLACE FUNCTION verify_donation_payment(
+    p_donation_id UUID,
+    p_actor_id UUID,
+    p_description TEXT,
+    p_reward_address TEXT DEFAULT NULL,
+    p_reward_amount TEXT DEFAULT NULL -- token base units; exceeds BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE donations
+    SET payment_status = 'completed', status = 'verified'
+    WHERE id = p_donation_id AND payment_status IS DISTINCT FROM 'completed';
+
+    -- A repeated verification must not update the chain or reward the donor again
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO blockchain_outbox (donation_id, user_id, operation, payload)
+    VALUES (p_donation_id, p_actor_id, 'update_status', jsonb_build_object(
+        'new_status', 1, -- VERIFIED
+        'actor_id', p_actor_id,
+        'actor_type', 'donor',
+        'description', p_description
+    ));
+
+    IF p_reward_address IS NOT NULL THEN
+        INSERT INTO blockchain_outbox (donation_id, user_id, operation, payload)
+        VALUES (p_donation_id, p_actor_id, 'mint_reward', jsonb_build_object(
+            'user_address', p_reward_address,
+            'amount', p_reward_amount,
+            'reason', 'vietqr_payment_verified'
+        ));
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lease due entries to one dispatcher; concurrent dispatchers skip them
+CREATE OR REPLACE FUNCTION claim_blockchain_outbox(p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS SETOF blockchain_outbox AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE blockchain_outbox
+    SET status = 'submitting',
+        attempts = attempts + 1,
+        locked_until = NOW() + make_interval(secs => p_lease_seconds)
+    WHERE id IN (
+        SELECT id FROM blockchain_outbox
+        WHERE (status = 'pending' AND next_attempt_at <= NOW())
+           OR (status = 'submitting' AND locked_until < NOW())
+        ORDER BY id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
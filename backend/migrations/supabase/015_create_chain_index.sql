@@ -0,0 +1,325 @@
+-- Migration 015: Local index of contract events
+-- A background indexer tails the events of the Ytili contracts from a block
+-- cursor and stores them in chain_events. The same transaction folds each
+-- new event into per-donation, per-account and per-proposal state tables, so
+-- transparency and governance endpoints answer from the database instead of
+-- querying the chain.
+
+-- Indexing progress; head_block is the chain head seen by the last run
+CREATE TABLE IF NOT EXISTS chain_index_cursors (
+    name VARCHAR(50) PRIMARY KEY,
+    block_number BIGINT NOT NULL DEFAULT 0, -- last block whose events are applied
+    block_hash VARCHAR(66), -- hash of that block, compared on the next run to detect reorgs
+    head_block BIGINT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS chain_events (
+    id BIGSERIAL PRIMARY KEY,
+    contract VARCHAR(50) NOT NULL,
+    event VARCHAR(50) NOT NULL,
+    block_number BIGINT NOT NULL,
+    block_hash VARCHAR(66) NOT NULL,
+    transaction_hash VARCHAR(66) NOT NULL,
+    log_index INTEGER NOT NULL,
+    subject TEXT, -- donation key, proposal id or Merkle root the event is about
+    args JSONB NOT NULL DEFAULT '{}', -- decoded arguments; integers as strings
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (transaction_hash, log_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chain_events_block_number ON chain_events(block_number);
+CREATE INDEX IF NOT EXISTS idx_chain_events_subject ON chain_events(contract, subject);
+
+-- Donations are keyed by keccak256 of the donation id: the contracts index
+-- donation ids as strings, so events carry only that hash
+CREATE TABLE IF NOT EXISTS chain_donations (
+    donation_key VARCHAR(66) PRIMARY KEY,
+    donor_key VARCHAR(66), -- keccak256 of the donor id
+    donation_type SMALLINT,
+    title TEXT,
+    amount NUMERIC(78, 0),
+    status SMALLINT NOT NULL DEFAULT 0, -- DonationRegistry.DonationStatus
+    recipient_id TEXT,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    recorded_tx VARCHAR(66),
+    recorded_at TIMESTAMP WITH TIME ZONE,
+    block_number BIGINT NOT NULL -- last block that changed the row
+);
+
+CREATE TABLE IF NOT EXISTS chain_transparency (
+    donation_key VARCHAR(66) PRIMARY KEY,
+    transparency_score INTEGER NOT NULL DEFAULT 0,
+    is_valid BOOLEAN, -- last recorded chain verification, NULL if never verified
+    total_transactions INTEGER,
+    issues INTEGER,
+    verified_at TIMESTAMP WITH TIME ZONE,
+    block_number BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chain_token_balances (
+    address VARCHAR(42) PRIMARY KEY, -- checksummed
+    user_id TEXT, -- platform user id from the last reward or redemption
+    balance NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    rewards_earned NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    redeemed NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    block_number BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chain_proposals (
+    proposal_id BIGINT PRIMARY KEY,
+    proposer VARCHAR(42),
+    title TEXT,
+    category VARCHAR(20),
+    start_time BIGINT, -- unix seconds, as returned by getProposal
+    end_time BIGINT,
+    votes_for NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    votes_against NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    votes_abstain NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    total_votes NUMERIC(78, 0) NOT NULL DEFAULT 0,
+    executed BOOLEAN NOT NULL DEFAULT FALSE,
+    cancelled BOOLEAN NOT NULL DEFAULT FALSE,
+    block_number BIGINT NOT NULL
+);
+
+-- Fold one event into the state tables
+CREATE OR REPLACE FUNCTION apply_chain_event(e chain_events)
+RETURNS VOID AS $$
+BEGIN
+    CASE e.event
+    WHEN 'DonationRecorded' THEN
+        INSERT INTO chain_donations (
+            donation_key, donor_key, donation_type, title, amount, recorded_tx, recorded_at, block_number
+        ) VALUES (
+            e.subject, e.args->>'donorId', (e.args->>'donationType')::SMALLINT, e.args->>'title',
+            (e.args->>'amount')::NUMERIC, e.transaction_hash,
+            to_timestamp((e.args->>'timestamp')::BIGINT), e.block_number
+        )
+        ON CONFLICT (donation_key) DO UPDATE SET
+            donor_key = EXCLUDED.donor_key,
+            donation_type = EXCLUDED.donation_type,
+            title = EXCLUDED.title,
+            amount = EXCLUDED.amount,
+            recorded_tx = EXCLUDED.recorded_tx,
+            recorded_at = EXCLUDED.recorded_at,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'StatusUpdated' THEN
+        INSERT INTO chain_donations (donation_key, status, block_number)
+        VALUES (e.subject, (e.args->>'newStatus')::SMALLINT, e.block_number)
+        ON CONFLICT (donation_key) DO UPDATE SET
+            status = EXCLUDED.status,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'TransactionRecorded' THEN
+        INSERT INTO chain_donations (donation_key, transaction_count, block_number)
+        VALUES (e.subject, 1, e.block_number)
+        ON CONFLICT (donation_key) DO UPDATE SET
+            transaction_count = chain_donations.transaction_count + 1,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'DonationMatched' THEN
+        INSERT INTO chain_donations (donation_key, recipient_id, block_number)
+        VALUES (e.subject, e.args->>'recipientId', e.block_number)
+        ON CONFLICT (donation_key) DO UPDATE SET
+            recipient_id = EXCLUDED.recipient_id,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'TransparencyScoreUpdated' THEN
+        INSERT INTO chain_transparency (donation_key, transparency_score, block_number)
+        VALUES (e.subject, (e.args->>'newScore')::INTEGER, e.block_number)
+        ON CONFLICT (donation_key) DO UPDATE SET
+            transparency_score = EXCLUDED.transparency_score,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'ChainVerified' THEN
+        INSERT INTO chain_transparency (
+            donation_key, is_valid, total_transactions, issues, verified_at, block_number
+        ) VALUES (
+            e.subject, (e.args->>'isValid')::BOOLEAN, (e.args->>'totalTransactions')::INTEGER,
+            (e.args->>'issues')::INTEGER, to_timestamp((e.args->>'timestamp')::BIGINT), e.block_number
+        )
+        ON CONFLICT (donation_key) DO UPDATE SET
+            is_valid = EXCLUDED.is_valid,
+            total_transactions = EXCLUDED.total_transactions,
+            issues = EXCLUDED.issues,
+            verified_at = EXCLUDED.verified_at,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'Transfer' THEN
+        -- Mints come from and burns go to the zero address, which is not tracked
+        IF e.args->>'from' <> '0x0000000000000000000000000000000000000000' THEN
+            INSERT INTO chain_token_balances (address, balance, block_number)
+            VALUES (e.args->>'from', -(e.args->>'value')::NUMERIC, e.block_number)
+            ON CONFLICT (address) DO UPDATE SET
+                balance = chain_token_balances.balance + EXCLUDED.balance,
+                block_number = EXCLUDED.block_number;
+        END IF;
+        IF e.args->>'to' <> '0x0000000000000000000000000000000000000000' THEN
+            INSERT INTO chain_token_balances (address, balance, block_number)
+            VALUES (e.args->>'to', (e.args->>'value')::NUMERIC, e.block_number)
+            ON CONFLICT (address) DO UPDATE SET
+                balance = chain_token_balances.balance + EXCLUDED.balance,
+                block_number = EXCLUDED.block_number;
+        END IF;
+
+    WHEN 'RewardEarned' THEN
+        INSERT INTO chain_token_balances (address, user_id, rewards_earned, block_number)
+        VALUES (e.args->>'user', e.args->>'userId', (e.args->>'amount')::NUMERIC, e.block_number)
+        ON CONFLICT (address) DO UPDATE SET
+            user_id = EXCLUDED.user_id,
+            rewards_earned = chain_token_balances.rewards_earned + EXCLUDED.rewards_earned,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'TokensRedeemed' THEN
+        INSERT INTO chain_token_balances (address, user_id, redeemed, block_number)
+        VALUES (e.args->>'user', e.args->>'userId', (e.args->>'amount')::NUMERIC, e.block_number)
+        ON CONFLICT (address) DO UPDATE SET
+            user_id = EXCLUDED.user_id,
+            redeemed = chain_token_balances.redeemed + EXCLUDED.redeemed,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'ProposalCreated' THEN
+        INSERT INTO chain_proposals (proposal_id, proposer, title, category, start_time, end_time, block_number)
+        VALUES (
+            e.subject::BIGINT, e.args->>'proposer', e.args->>'title', e.args->>'category',
+            (e.args->>'startTime')::BIGINT, (e.args->>'endTime')::BIGINT, e.block_number
+        )
+        ON CONFLICT (proposal_id) DO UPDATE SET
+            proposer = EXCLUDED.proposer,
+            title = EXCLUDED.title,
+            category = EXCLUDED.category,
+            start_time = EXCLUDED.start_time,
+            end_time = EXCLUDED.end_time,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'VoteCast' THEN
+        -- voteType: 0 = for, 1 = against, 2 = abstain
+        INSERT INTO chain_proposals (proposal_id, votes_for, votes_against, votes_abstain, total_votes, block_number)
+        VALUES (
+            e.subject::BIGINT,
+            CASE WHEN e.args->>'voteType' = '0' THEN (e.args->>'weight')::NUMERIC ELSE 0 END,
+            CASE WHEN e.args->>'voteType' = '1' THEN (e.args->>'weight')::NUMERIC ELSE 0 END,
+            CASE WHEN e.args->>'voteType' = '2' THEN (e.args->>'weight')::NUMERIC ELSE 0 END,
+            (e.args->>'weight')::NUMERIC,
+            e.block_number
+        )
+        ON CONFLICT (proposal_id) DO UPDATE SET
+            votes_for = chain_proposals.votes_for + EXCLUDED.votes_for,
+            votes_against = chain_proposals.votes_against + EXCLUDED.votes_against,
+            votes_abstain = chain_proposals.votes_abstain + EXCLUDED.votes_abstain,
+            total_votes = chain_proposals.total_votes + EXCLUDED.total_votes,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'ProposalExecuted' THEN
+        INSERT INTO chain_proposals (proposal_id, executed, block_number)
+        VALUES (e.subject::BIGINT, TRUE, e.block_number)
+        ON CONFLICT (proposal_id) DO UPDATE SET
+            executed = TRUE,
+            block_number = EXCLUDED.block_number;
+
+    WHEN 'ProposalCancelled' THEN
+        INSERT INTO chain_proposals (proposal_id, cancelled, block_number)
+        VALUES (e.subject::BIGINT, TRUE, e.block_number)
+        ON CONFLICT (proposal_id) DO UPDATE SET
+            cancelled = TRUE,
+            block_number = EXCLUDED.block_number;
+
+    ELSE
+        -- Stored for the record only, e.g. BatchVerified
+        NULL;
+    END CASE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Store the events of blocks p_from_block..p_to_block, apply them and move
+-- the cursor in one transaction. Returns the number of new events, or -1 if
+-- another indexer already covered the range.
+CREATE OR REPLACE FUNCTION index_chain_events(
+    p_name VARCHAR,
+    p_from_block BIGINT,
+    p_to_block BIGINT,
+    p_to_block_hash TEXT,
+    p_head_block BIGINT,
+    p_events JSONB
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cursor BIGINT;
+    v_ids BIGINT[];
+    v_event chain_events;
+    v_count INTEGER := 0;
+BEGIN
+    INSERT INTO chain_index_cursors (name, block_number)
+    VALUES (p_name, p_from_block - 1)
+    ON CONFLICT (name) DO NOTHING;
+
+    SELECT block_number INTO v_cursor FROM chain_index_cursors WHERE name = p_name FOR UPDATE;
+
+    IF v_cursor >= p_to_block THEN
+        RETURN -1;
+    END IF;
+
+    -- Events already stored by an earlier, interrupted run are not applied twice
+    WITH inserted AS (
+        INSERT INTO chain_events (contract, event, block_number, block_hash, transaction_hash, log_index, subject, args)
+        SELECT contract, event, block_number, block_hash, transaction_hash, log_index, subject, args
+        FROM jsonb_to_recordset(p_events) AS x(
+            contract VARCHAR, event VARCHAR, block_number BIGINT, block_hash VARCHAR,
+            transaction_hash VARCHAR, log_index INTEGER, subject TEXT, args JSONB
+        )
+        ON CONFLICT (transaction_hash, log_index) DO NOTHING
+        RETURNING id
+    )
+    SELECT array_agg(id) INTO v_ids FROM inserted;
+
+    FOR v_event IN
+        SELECT * FROM chain_events WHERE id = ANY(v_ids) ORDER BY block_number, log_index
+    LOOP
+        PERFORM apply_chain_event(v_event);
+        v_count := v_count + 1;
+    END LOOP;
+
+    UPDATE chain_index_cursors
+    SET block_number = p_to_block,
+        block_hash = p_to_block_hash,
+        head_block = p_head_block,
+        updated_at = NOW()
+    WHERE name = p_name;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the events above p_block after a reorg and rebuild the state tables
+-- from the events that remain. p_block_hash is the current hash of p_block,
+-- so a further reorg below it is detected on the next sync.
+CREATE OR REPLACE FUNCTION rewind_chain_index(
+    p_name VARCHAR,
+    p_block BIGINT,
+    p_block_hash VARCHAR DEFAULT NULL
+)
+RETURNS VOID AS $$
+DECLARE
+    v_event chain_events;
+BEGIN
+    PERFORM 1 FROM chain_index_cursors WHERE name = p_name FOR UPDATE;
+
+    DELETE FROM chain_events WHERE block_number > p_block;
+
+    DELETE FROM chain_donations;
+    DELETE FROM chain_transparency;
+    DELETE FROM chain_token_balances;
+    DELETE FROM chain_proposals;
+
+    FOR v_event IN SELECT * FROM chain_events ORDER BY block_number, log_index LOOP
+        PERFORM apply_chain_event(v_event);
+    END LOOP;
+
+    UPDATE chain_index_cursors
+    SET block_hash = CASE WHEN block_number > p_block THEN p_block_hash ELSE block_hash END,
+        block_number = LEAST(block_number, p_block),
+        updated_at = NOW()
+    WHERE name = p_name;
+END;
+$$ LANGUAGE plpgsql;
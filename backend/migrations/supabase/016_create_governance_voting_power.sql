@@ -0,0 +1,118 @@
+-- Migration 016: Voting power snapshots and atomic vote tallies
+-- A vote used to read the voter's token balance from the chain, insert the
+-- vote, then re-read every vote of the proposal to recompute its totals, so
+-- each vote cost more than the last and concurrent votes could overwrite
+-- each other's totals. Voting power is now snapshotted once per proposal,
+-- and record_governance_vote inserts the vote and adds its power to the
+-- proposal counters in one transaction.
+
+-- Set once the proposal's voting power snapshot was taken
+ALTER TABLE governance_proposals
+    ADD COLUMN IF NOT EXISTS voting_power_snapshot_at TIMESTAMP WITH TIME ZONE;
+
+-- One vote per voter and proposal, also under concurrent requests
+CREATE UNIQUE INDEX IF NOT EXISTS idx_governance_votes_proposal_voter
+    ON governance_votes(proposal_id, voter_id);
+
+CREATE TABLE IF NOT EXISTS governance_voting_power (
+    proposal_id BIGINT NOT NULL REFERENCES governance_proposals(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    voting_power NUMERIC(78, 0) NOT NULL, -- token base units; exceeds BIGINT
+    PRIMARY KEY (proposal_id, user_id)
+);
+
+-- RewardEarned is what YtiliToken.getTokensByUserId sums up per user id
+CREATE INDEX IF NOT EXISTS idx_chain_events_reward_user
+    ON chain_events((args->>'userId'))
+    WHERE event = 'RewardEarned';
+
+-- Store the voting power of every token holder for a proposal. p_powers maps
+-- user ids to token base units as read from the token contract; without it
+-- the powers are summed from the indexed RewardEarned events. A repeated
+-- snapshot keeps the powers already stored.
+CREATE OR REPLACE FUNCTION snapshot_voting_power(
+    p_proposal_id BIGINT,
+    p_powers JSONB DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    IF p_powers IS NOT NULL THEN
+        INSERT INTO governance_voting_power (proposal_id, user_id, voting_power)
+        SELECT p_proposal_id, u.id, p.value::NUMERIC
+        FROM jsonb_each_text(p_powers) AS p
+        JOIN users u ON u.id::TEXT = p.key
+        WHERE p.value::NUMERIC > 0
+        ON CONFLICT (proposal_id, user_id) DO NOTHING;
+    ELSE
+        INSERT INTO governance_voting_power (proposal_id, user_id, voting_power)
+        SELECT p_proposal_id, u.id, t.tokens
+        FROM (
+            SELECT args->>'userId' AS user_id, SUM((args->>'amount')::NUMERIC) AS tokens
+            FROM chain_events
+            WHERE event = 'RewardEarned'
+            GROUP BY args->>'userId'
+        ) t
+        JOIN users u ON u.id::TEXT = t.user_id
+        WHERE t.tokens > 0
+        ON CONFLICT (proposal_id, user_id) DO NOTHING;
+    END IF;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+
+    UPDATE governance_proposals
+    SET voting_power_snapshot_at = COALESCE(voting_power_snapshot_at, NOW())
+    WHERE id = p_proposal_id;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Record a vote with the voter's snapshotted power and add it to the
+-- proposal totals. Returns the vote id, or NULL if the voter already voted.
+CREATE OR REPLACE FUNCTION record_governance_vote(
+    p_proposal_id BIGINT,
+    p_voter_id UUID,
+    p_vote_type INTEGER, -- 0 For, 1 Against, 2 Abstain
+    p_blockchain_hash TEXT DEFAULT NULL
+)
+RETURNS BIGINT AS $$
+DECLARE
+    v_power NUMERIC;
+    v_vote_id BIGINT;
+BEGIN
+    SELECT voting_power INTO v_power
+    FROM governance_voting_power
+    WHERE proposal_id = p_proposal_id AND user_id = p_voter_id;
+
+    IF v_power IS NULL OR v_power <= 0 THEN
+        RAISE EXCEPTION 'No voting power on proposal %', p_proposal_id;
+    END IF;
+
+    INSERT INTO governance_votes (proposal_id, voter_id, vote_type, voting_power, blockchain_hash, created_at)
+    VALUES (p_proposal_id, p_voter_id, p_vote_type, v_power, p_blockchain_hash, NOW())
+    ON CONFLICT (proposal_id, voter_id) DO NOTHING
+    RETURNING id INTO v_vote_id;
+
+    IF v_vote_id IS NULL THEN
+        RETURN NULL;
+    END IF;
+
+    -- The row update serialises concurrent votes on the proposal; the vote
+    -- columns hold base units as text
+    UPDATE governance_proposals
+    SET votes_for = CASE WHEN p_vote_type = 0 THEN COALESCE(votes_for::NUMERIC, 0) + v_power ELSE votes_for::NUMERIC END,
+        votes_against = CASE WHEN p_vote_type = 1 THEN COALESCE(votes_against::NUMERIC, 0) + v_power ELSE votes_against::NUMERIC END,
+        votes_abstain = CASE WHEN p_vote_type = 2 THEN COALESCE(votes_abstain::NUMERIC, 0) + v_power ELSE votes_abstain::NUMERIC END,
+        total_votes = COALESCE(total_votes::NUMERIC, 0) + v_power,
+        updated_at = NOW()
+    WHERE id = p_proposal_id AND status = 'active' AND end_time > NOW();
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'Proposal % is not active for voting', p_proposal_id;
+    END IF;
+
+    RETURN v_vote_id;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,53 @@
+-- Migration 017: Single-call statistics
+-- The governance, donation and blockchain stats endpoints ran one count
+-- query per figure, each a separate PostgREST round trip. Each endpoint now
+-- calls one function that computes all of its figures in one statement.
+
+CREATE INDEX IF NOT EXISTS idx_governance_proposals_proposer_id ON governance_proposals(proposer_id);
+CREATE INDEX IF NOT EXISTS idx_governance_votes_voter_id ON governance_votes(voter_id);
+
+-- Platform-wide proposal and vote counts (left out with p_include_global =
+-- false, e.g. when the caller has them cached) and the user's own
+CREATE OR REPLACE FUNCTION get_governance_stats(
+    p_user_id UUID,
+    p_include_global BOOLEAN DEFAULT TRUE
+)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'global', CASE WHEN p_include_global THEN (
+            SELECT jsonb_build_object(
+                'total_proposals', COUNT(*),
+                'active_proposals', COUNT(*) FILTER (WHERE status = 'active'),
+                'executed_proposals', COUNT(*) FILTER (WHERE status = 'executed'),
+                'total_votes', (SELECT COUNT(*) FROM governance_votes)
+            )
+            FROM governance_proposals
+        ) END,
+        'user', jsonb_build_object(
+            'user_proposals', (SELECT COUNT(*) FROM governance_proposals WHERE proposer_id = p_user_id),
+            'user_votes', (SELECT COUNT(*) FROM governance_votes WHERE voter_id = p_user_id)
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Donation counts of a donor by status group
+CREATE OR REPLACE FUNCTION get_donation_stats(p_donor_id UUID)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_donations', COUNT(*),
+        'active_donations', COUNT(*) FILTER (WHERE status IN ('pending', 'matched', 'delivered')),
+        'completed_donations', COUNT(*) FILTER (WHERE status = 'completed')
+    )
+    FROM donations
+    WHERE donor_id = p_donor_id;
+$$ LANGUAGE sql STABLE;
+
+-- Platform-wide on-chain record counts
+CREATE OR REPLACE FUNCTION get_blockchain_stats()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_blockchain_transactions', (SELECT COUNT(*) FROM blockchain_transactions),
+        'verified_donations', (SELECT COUNT(*) FROM donations WHERE status = 'verified'),
+        'donations_on_chain', (SELECT COUNT(DISTINCT donation_id) FROM blockchain_transactions)
+    );
+$$ LANGUAGE sql STABLE;
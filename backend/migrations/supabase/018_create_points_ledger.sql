@@ -0,0 +1,188 @@
+-- Migration 018: Append-only points ledger and batched reward minting
+-- Rewards and redemptions read user_points, computed new totals in the API
+-- and wrote them back, so concurrent requests could lose updates, and every
+-- reward sent its own mint transaction. Every change of a user's points is
+-- now one points_ledger entry written in the same transaction as an atomic
+-- user_points update. Rewards to be minted as YTILI tokens stay pending in
+-- the ledger and are queued as one mint per user by queue_reward_mints.
+
+CREATE TABLE IF NOT EXISTS points_ledger (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    entry_type VARCHAR(20) NOT NULL, -- earned, redeemed
+    points INTEGER NOT NULL, -- change of available_points; negative for redemptions
+    balance_after INTEGER NOT NULL, -- available_points after this entry
+    reason TEXT,
+    reference TEXT, -- redemption option or donation the entry is for
+    mint_pending BOOLEAN NOT NULL DEFAULT FALSE, -- earned points also to be minted as tokens
+    outbox_id BIGINT REFERENCES blockchain_outbox(id) ON DELETE SET NULL, -- batched mint covering this entry
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_points_ledger_user_id ON points_ledger(user_id, id DESC);
+CREATE INDEX IF NOT EXISTS idx_points_ledger_unminted ON points_ledger(user_id)
+    WHERE mint_pending AND outbox_id IS NULL;
+
+-- Entries are never changed or removed; only the mint covering them is set
+CREATE OR REPLACE FUNCTION protect_points_ledger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        RAISE EXCEPTION 'points_ledger entries cannot be deleted';
+    END IF;
+
+    IF (NEW.id, NEW.user_id, NEW.entry_type, NEW.points, NEW.balance_after, NEW.reason, NEW.reference,
+        NEW.mint_pending, NEW.created_at)
+       IS DISTINCT FROM
+       (OLD.id, OLD.user_id, OLD.entry_type, OLD.points, OLD.balance_after, OLD.reason, OLD.reference,
+        OLD.mint_pending, OLD.created_at) THEN
+        RAISE EXCEPTION 'points_ledger entries cannot be changed';
+    END IF;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_protect_points_ledger ON points_ledger;
+CREATE TRIGGER trigger_protect_points_ledger
+    BEFORE UPDATE OR DELETE ON points_ledger
+    FOR EACH ROW
+    EXECUTE FUNCTION protect_points_ledger();
+
+-- Apply a points change to user_points and append its ledger entry in one
+-- transaction. A redemption only applies if the available points cover it;
+-- otherwise no row is returned. Earned entries cannot be negative.
+CREATE OR REPLACE FUNCTION apply_points_entry(
+    p_user_id UUID,
+    p_points INTEGER,
+    p_entry_type TEXT,
+    p_reason TEXT,
+    p_reference TEXT DEFAULT NULL,
+    p_mint BOOLEAN DEFAULT FALSE -- mint the earned points as tokens in the next batch
+)
+RETURNS SETOF points_ledger AS $$
+DECLARE
+    v_balance INTEGER;
+BEGIN
+    IF p_entry_type = 'earned' AND p_points < 0 THEN
+        RAISE EXCEPTION 'earned points cannot be negative: %', p_points;
+    END IF;
+
+    IF p_points >= 0 THEN
+        INSERT INTO user_points (user_id, total_points, available_points, lifetime_earned)
+        VALUES (p_user_id, p_points, p_points, p_points)
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_points = user_points.total_points + EXCLUDED.total_points,
+            available_points = user_points.available_points + EXCLUDED.available_points,
+            lifetime_earned = user_points.lifetime_earned + EXCLUDED.lifetime_earned,
+            updated_at = NOW()
+        RETURNING available_points INTO v_balance;
+    ELSE
+        UPDATE user_points
+        SET available_points = available_points + p_points,
+            lifetime_spent = lifetime_spent - p_points,
+            updated_at = NOW()
+        WHERE user_id = p_user_id AND available_points + p_points >= 0
+        RETURNING available_points INTO v_balance;
+
+        IF NOT FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+    INSERT INTO points_ledger (user_id, entry_type, points, balance_after, reason, reference, mint_pending)
+    VALUES (p_user_id, p_entry_type, p_points, v_balance, p_reason, p_reference, p_mint AND p_points > 0)
+    RETURNING *;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Queue one mint_reward outbox entry per user for all their unminted
+-- rewards (up to p_limit users, wallet required) and link the entries to
+-- it. Entries count as unminted again only if their mint provably never
+-- landed: it failed before any transaction was sent, or
+-- PointsLedgerService found every sent transaction reverted or unknown to
+-- the node and marked the mint dropped. Returns the number of mints queued.
+CREATE OR REPLACE FUNCTION queue_reward_mints(p_limit INTEGER)
+RETURNS INTEGER AS $$
+DECLARE
+    v_user RECORD;
+    v_outbox_id BIGINT;
+    v_count INTEGER := 0;
+BEGIN
+    -- Concurrent callers would queue the same entries twice
+    PERFORM pg_advisory_xact_lock(hashtext('queue_reward_mints'));
+
+    FOR v_user IN
+        SELECT l.user_id, u.wallet_address, SUM(l.points) AS points, array_agg(l.id) AS entry_ids
+        FROM points_ledger l
+        JOIN users u ON u.id = l.user_id
+        LEFT JOIN blockchain_outbox o ON o.id = l.outbox_id
+        WHERE l.mint_pending
+          AND (
+              l.outbox_id IS NULL
+              OR (o.status = 'failed' AND o.sent_tx_hashes = '[]'::JSONB)
+              OR o.status = 'dropped'
+          )
+          AND u.wallet_address IS NOT NULL
+        GROUP BY l.user_id, u.wallet_address
+        ORDER BY MIN(l.id)
+        LIMIT p_limit
+    LOOP
+        INSERT INTO blockchain_outbox (user_id, operation, payload)
+        VALUES (v_user.user_id, 'mint_reward', jsonb_build_object(
+            'user_address', v_user.wallet_address,
+            'amount', (v_user.points::NUMERIC * 1000000000000000000)::TEXT, -- token base units
+            'reason', 'batched_rewards',
+            'entries', cardinality(v_user.entry_ids)
+        ))
+        RETURNING id INTO v_outbox_id;
+
+        UPDATE points_ledger SET outbox_id = v_outbox_id WHERE id = ANY(v_user.entry_ids);
+        v_count := v_count + 1;
+    END LOOP;
+
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- The donor's payment reward becomes a ledger entry minted with their next
+-- batch instead of a mint_reward outbox entry per donation
+CREATE OR REPLACE FUNCTION verify_donation_payment(
+    p_donation_id UUID,
+    p_actor_id UUID,
+    p_description TEXT,
+    p_reward_address TEXT DEFAULT NULL,
+    p_reward_amount TEXT DEFAULT NULL -- token base units; exceeds BIGINT
+)
+RETURNS VOID AS $$
+BEGIN
+    UPDATE donations
+    SET payment_status = 'completed', status = 'verified'
+    WHERE id = p_donation_id AND payment_status IS DISTINCT FROM 'completed';
+
+    -- A repeated verification must not update the chain or reward the donor again
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO blockchain_outbox (donation_id, user_id, operation, payload)
+    VALUES (p_donation_id, p_actor_id, 'update_status', jsonb_build_object(
+        'new_status', 1, -- VERIFIED
+        'actor_id', p_actor_id,
+        'actor_type', 'donor',
+        'description', p_description
+    ));
+
+    IF p_reward_address IS NOT NULL THEN
+        PERFORM apply_points_entry(
+            p_actor_id,
+            (p_reward_amount::NUMERIC / 1000000000000000000)::INTEGER,
+            'earned',
+            'vietqr_payment_verified',
+            p_donation_id::TEXT,
+            TRUE
+        );
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
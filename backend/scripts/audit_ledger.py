@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Donation Ledger Audit
+---------------------
+Recomputes the SHA-256 hash of every donation_transactions row across a
+process pool, checks that each chain links back to the genesis hash, and
+stores a report signed with the platform key (LEDGER_AUDIT_SIGNING_KEY, or
+SAGA_PRIVATE_KEY). /transparency/donation/{id}/verify answers from the
+latest report.
+
+Links written before hash timestamps were stored cannot be recomputed; they
+are only checked for a well-formed hash and counted separately.
+
+Exits with 2 when any chain fails the audit, so it can gate cron alerts.
+
+Run manually or via cron:
+    $ python backend/scripts/audit_ledger.py --workers 8 --output ledger-audit.json
+    $ python backend/scripts/audit_ledger.py --verify ledger-audit.json
+"""
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.core.ledger import results_digest, verify_report_signature  # noqa: E402
+from app.services.ledger_audit_service import LedgerAuditService  # noqa: E402
+
+
+def verify_file(path: str) -> int:
+    """Check the signature and results digest of a report written with --output"""
+    with open(path) as f:
+        signed = json.load(f)
+
+    report = signed["report"]
+    signature_ok = verify_report_signature(report, signed["signer"], signed["signature"])
+    digest_ok = results_digest(signed["chains"]) == report["results_digest"]
+
+    print(f"Signature by {signed['signer']}: {'valid' if signature_ok else 'INVALID'}")
+    print(f"Per-chain results match digest: {'yes' if digest_ok else 'NO'}")
+    return 0 if signature_ok and digest_ok else 1
+
+
+async def main(args) -> int:
+    async with AsyncSessionLocal() as session:
+        result = await LedgerAuditService(session).run_audit(args.workers, args.chunk_size)
+
+    if not result["success"]:
+        print(f"Audit failed: {result['error']}")
+        return 1
+
+    report = result["report"]
+    throughput = report["throughput"]
+    print(f"Audited {report['transaction_count']:,} transactions in {report['chain_count']:,} chains "
+          f"(through ledger_seq {report['last_ledger_seq']})")
+    print(f"  {throughput['duration_seconds']:.2f}s with {throughput['workers']} workers: "
+          f"{throughput['transactions_per_second'] or 0:,.0f} transactions/s, "
+          f"{throughput['chains_per_second'] or 0:,.0f} chains/s")
+    print(f"  {report['recomputed_count']:,} hashes recomputed, "
+          f"{report['transaction_count'] - report['recomputed_count']:,} legacy links format-checked only")
+    print(f"  {report['invalid_chain_count']:,} invalid chains, "
+          f"{report['invalid_transaction_count']:,} findings")
+    print(f"Report {result['report_id']} signed by {result['signer']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "report": report,
+                "signer": result["signer"],
+                "signature": result["signature"],
+                "chains": result["chains"]
+            }, f, indent=2, default=str)
+        print(f"Signed report written to {args.output}")
+
+    return 2 if report["invalid_chain_count"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audit the donation transaction ledger")
+    parser.add_argument("--workers", type=int, help="Hashing processes (default LEDGER_AUDIT_WORKERS)")
+    parser.add_argument("--chunk-size", type=int, help="Transactions per worker task (default LEDGER_AUDIT_CHUNK_SIZE)")
+    parser.add_argument("--output", help="Write the signed report with per-chain results to this JSON file")
+    parser.add_argument("--verify", metavar="FILE", help="Check a report written with --output instead of auditing")
+    args = parser.parse_args()
+
+    if args.verify:
+        sys.exit(verify_file(args.verify))
+    sys.exit(asyncio.run(main(args)))
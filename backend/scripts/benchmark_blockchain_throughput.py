@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Blockchain Throughput Benchmark
+-------------------------------
+Deploys DonationRegistry, TransparencyVerifier and YtiliToken from
+backend/contracts to a local chain, points BlockchainService at them and
+drives each workload at each given concurrency:
+
+    donations  DonationRegistry.recordDonation     (submit_donation_record)
+    status     DonationRegistry.updateDonationStatus (submit_status_update)
+    mints      YtiliToken.mintReward               (submit_reward_mint)
+    anchors    Merkle root anchor transaction      (anchor_merkle_root)
+
+For every round it reports confirmed records per second, submit-to-
+confirmation latency percentiles and gas per record, plus gas bumps, nonce
+resyncs and receipt polls. --output appends the results as one JSON line
+per run, so batching and nonce changes can be compared over time.
+
+The chain is an in-process eth-tester chain that mines every transaction
+on arrival, or a running node given with --rpc-url, e.g. a Hardhat node
+mining on an interval (`npx hardhat node` in contracts/, then
+`evm_setIntervalMining`), where latency includes block time.
+
+eth-tester is not a backend dependency; install it for the in-process chain:
+    $ pip install "eth-tester[py-evm]"
+
+Run manually:
+    $ python backend/scripts/benchmark_blockchain_throughput.py --operations 200 --concurrency 1 16 64
+    $ python backend/scripts/benchmark_blockchain_throughput.py --workloads mints --output bench.jsonl --label nonce-pipelining
+    $ python backend/scripts/benchmark_blockchain_throughput.py --rpc-url http://127.0.0.1:8545
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+from eth_account import Account
+from eth_utils import keccak
+from web3 import AsyncWeb3
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from local_chain import connect, deploy
+
+WORKLOADS = ("donations", "status", "mints", "anchors")
+
+parser = argparse.ArgumentParser(description="Benchmark on-chain write throughput of BlockchainService")
+parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=["donations", "status", "mints"])
+parser.add_argument("--operations", type=int, default=200, help="Transactions per round")
+parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64], help="Concurrent senders, one round each")
+parser.add_argument("--rpc-url", help="JSON-RPC URL of a local node (defaults to an in-process eth-tester chain)")
+parser.add_argument("--private-key", help="Funded account key for --rpc-url (defaults to the first Hardhat account)")
+parser.add_argument("--output", help="Append the results as a JSON line to this file")
+parser.add_argument("--label", default="", help="Stored with --output, e.g. the change being measured")
+args = parser.parse_args()
+
+
+async def deploy_contracts(w3: AsyncWeb3, private_key: str):
+    registry = await deploy(w3, private_key, "DonationRegistry")
+    verifier = await deploy(w3, private_key, "TransparencyVerifier", registry)
+    token = await deploy(w3, private_key, "YtiliToken")
+    return registry, verifier, token
+
+
+w3, PRIVATE_KEY = connect(args.rpc_url, args.private_key)
+CHAIN_ID = asyncio.run(w3.eth.chain_id)
+REGISTRY_ADDRESS, VERIFIER_ADDRESS, TOKEN_ADDRESS = asyncio.run(deploy_contracts(w3, PRIVATE_KEY))
+
+# BlockchainService reads its account, chain and contract addresses from settings
+os.environ["SAGA_PRIVATE_KEY"] = PRIVATE_KEY
+os.environ["SAGA_CHAIN_ID"] = f"local_{CHAIN_ID}-1"
+os.environ["DONATION_REGISTRY_ADDRESS"] = REGISTRY_ADDRESS
+os.environ["TRANSPARENCY_VERIFIER_ADDRESS"] = VERIFIER_ADDRESS
+os.environ["YTILI_TOKEN_ADDRESS"] = TOKEN_ADDRESS
+os.environ.setdefault("BLOCKCHAIN_RECEIPT_TIMEOUT", "120")
+
+from app.core.blockchain import BlockchainService  # noqa: E402
+
+
+class Workload:
+    """Issues operation i of a workload and returns its confirmed transaction hash"""
+
+    def __init__(self, service: BlockchainService):
+        self.service = service
+        self.recorded = []  # Donation ids on chain, targets of status updates
+        self.reward_address = Account.create().address
+
+    async def donations(self, i: int) -> str:
+        donation_id = f"bench-{i:08d}"
+        tx_hash = await self.service.submit_donation_record(
+            donation_id=donation_id, donor_id="bench-donor", donation_type=0,
+            title="Benchmark donation", description="", amount=0, item_name="Paracetamol",
+            quantity=10, unit="boxes", metadata_hash=f"{i:064x}"
+        )
+        self.recorded.append(donation_id)
+        return tx_hash
+
+    async def status(self, i: int) -> str:
+        return await self.service.submit_status_update(
+            donation_id=self.recorded[i % len(self.recorded)], new_status=1,
+            actor_id="bench-actor", actor_type="donor", description="Benchmark status update"
+        )
+
+    async def mints(self, i: int) -> str:
+        return await self.service.submit_reward_mint(self.reward_address, f"bench-user-{i % 100}", 10**18, "benchmark")
+
+    async def anchors(self, i: int) -> str:
+        tx_hash = await self.service.anchor_merkle_root(keccak(i.to_bytes(32, "big")), 1)
+        if tx_hash is None:
+            raise RuntimeError("anchor transaction not confirmed")
+        return tx_hash
+
+
+def percentile(values, p: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[p - 1]
+
+
+async def run_round(operation, concurrency: int, offset: int, gas_by_hash):
+    queue = asyncio.Queue()
+    for i in range(args.operations):
+        queue.put_nowait(offset + i)
+
+    latencies = []
+    hashes = []
+    errors = []
+
+    async def sender() -> None:
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            try:
+                hashes.append(await operation(i))
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(str(e))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    gas = [gas_by_hash[tx_hash] for tx_hash in hashes if tx_hash in gas_by_hash]
+    return {
+        "confirmed": len(hashes),
+        "failed": len(errors),
+        "seconds": round(elapsed, 3),
+        "tx_per_second": round(len(hashes) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50": round(percentile(latencies, 50), 4),
+        "latency_p90": round(percentile(latencies, 90), 4),
+        "latency_p99": round(percentile(latencies, 99), 4),
+        "gas_per_record": round(statistics.mean(gas)) if gas else None,
+        "first_error": errors[0] if errors else None
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+async def main() -> None:
+    service = BlockchainService(w3)
+    workload = Workload(service)
+
+    # Gas of every confirmed transaction, as the receipt tracker sees it
+    gas_by_hash = {}
+
+    async def record_gas(receipts, block_number) -> None:
+        for receipt in receipts:
+            gas_by_hash[receipt.transactionHash.to_0x_hex()] = receipt.gasUsed
+
+    service.receipts.add_listener(record_gas)
+
+    print(f"Chain {CHAIN_ID}, {args.operations:,} transactions per round, "
+          f"registry {REGISTRY_ADDRESS}, token {TOKEN_ADDRESS}")
+
+    if "status" in args.workloads and "donations" not in args.workloads:
+        # Status updates need recorded donations
+        await asyncio.gather(*(workload.donations(i) for i in range(min(args.operations, 64))))
+
+    rounds = []
+    offset = 0
+    for name in args.workloads:
+        for concurrency in args.concurrency:
+            bumps, resyncs, polls = service.gas_bumps, service.nonces.resyncs, service.receipts.rounds
+
+            result = await run_round(getattr(workload, name), concurrency, offset, gas_by_hash)
+            offset += args.operations
+
+            result.update({
+                "workload": name,
+                "concurrency": concurrency,
+                "gas_bumps": service.gas_bumps - bumps,
+                "nonce_resyncs": service.nonces.resyncs - resyncs,
+                "receipt_polls": service.receipts.rounds - polls
+            })
+            rounds.append(result)
+
+            print(f"{name:>9} x{concurrency:<4} {result['tx_per_second']:8.1f} tx/s over {result['seconds']:7.2f}s, "
+                  f"latency p50 {result['latency_p50']:.3f}s p90 {result['latency_p90']:.3f}s "
+                  f"p99 {result['latency_p99']:.3f}s, {result['gas_per_record'] or 0:,} gas/record, "
+                  f"{result['gas_bumps']} gas bumps, {result['nonce_resyncs']} nonce resyncs, "
+                  f"{result['receipt_polls']} receipt polls"
+                  + (f", {result['failed']} failed ({result['first_error']})" if result["failed"] else ""))
+
+    await service.stop()
+
+    if args.output:
+        with open(args.output, "a") as f:
+            f.write(json.dumps({
+                "timestamp": datetime.utcnow().isoformat(),
+                "label": args.label,
+                "commit": git_commit(),
+                "chain": "rpc" if args.rpc_url else "eth-tester",
+                "chain_id": CHAIN_ID,
+                "operations": args.operations,
+                "rounds": rounds
+            }) + "\n")
+        print(f"Results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
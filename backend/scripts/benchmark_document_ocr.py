@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Document OCR Benchmark
+----------------------
+Compares the previous OCR path of DocumentVerifier (full-resolution image,
+image_to_data + image_to_string) with the current one (resolution
+normalization, page cropping, single image_to_data pass) on Vietnamese
+medical certificates.
+
+Accuracy is the similarity between cleaned OCR text and the ground truth.
+
+Samples are read from --samples DIR, where every image `name.jpg|png` has a
+ground-truth `name.txt` next to it. Without --samples, synthetic phone-photo
+style certificates are rendered with --font (needs a font with Vietnamese
+glyphs, e.g. DejaVuSans).
+
+Run manually:
+    $ python backend/scripts/benchmark_document_ocr.py --samples ./certs
+    $ python backend/scripts/benchmark_document_ocr.py --synthetic 10
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+import pytesseract
+from PIL import Image, ImageDraw, ImageFont
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.ai_agent.document_verifier import DocumentVerifier  # noqa: E402
+
+OCR_CONFIG = '--oem 3 --psm 6 -l vie+eng'
+
+CERTIFICATE_TEMPLATE = [
+    "CỘNG HÒA XÃ HỘI CHỦ NGHĨA VIỆT NAM",
+    "Độc lập - Tự do - Hạnh phúc",
+    "GIẤY CHỨNG NHẬN ĐIỀU TRỊ",
+    "Bệnh viện {hospital}",
+    "Họ và tên bệnh nhân: {patient}",
+    "Ngày sinh: {birth}",
+    "Chẩn đoán: {diagnosis} - Mã bệnh: {icd}",
+    "Điều trị nội trú từ ngày {start} đến ngày {end}",
+    "Bác sĩ điều trị: {doctor}",
+    "Giấy phép hành nghề: {license}",
+    "Hà Nội, ngày {day} tháng {month} năm 2025",
+]
+
+HOSPITALS = ["Bạch Mai", "Chợ Rẫy", "Việt Đức", "Nhi Trung Ương", "Tim Hà Nội"]
+PATIENTS = ["Nguyễn Văn An", "Trần Thị Bình", "Lê Hoàng Cường", "Phạm Thu Dung"]
+DIAGNOSES = [("Suy thận mạn giai đoạn cuối", "N18.5"), ("Bạch cầu cấp", "C91.0"),
+             ("Thông liên thất", "Q21.0"), ("Chấn thương sọ não", "S06.9")]
+DOCTORS = ["Nguyễn Minh Tuấn", "Đỗ Thị Hạnh", "Vũ Quang Huy"]
+
+DEFAULT_FONTS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+]
+
+
+def render_certificate(rng: random.Random, font_path: str, path: Path) -> str:
+    """Render a certificate as a high-resolution photo on a desk background"""
+    diagnosis, icd = rng.choice(DIAGNOSES)
+    lines = [line.format(
+        hospital=rng.choice(HOSPITALS), patient=rng.choice(PATIENTS),
+        birth=f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(1950, 2020)}",
+        diagnosis=diagnosis, icd=icd,
+        start=f"{rng.randint(1, 14):02d}/03/2025", end=f"{rng.randint(15, 28):02d}/03/2025",
+        doctor=rng.choice(DOCTORS), license=f"BS{rng.randint(10000, 99999)}",
+        day=rng.randint(1, 28), month=rng.randint(1, 12)
+    ) for line in CERTIFICATE_TEMPLATE]
+
+    page = Image.new("RGB", (3000, 4200), "white")
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.truetype(font_path, 64)
+    for i, line in enumerate(lines):
+        draw.text((200, 250 + i * 150), line, fill="black", font=font)
+
+    page = page.rotate(rng.uniform(-2, 2), expand=True, fillcolor=(90, 70, 50))
+    photo = Image.new("RGB", (page.width + 1000, page.height + 1000), (90, 70, 50))
+    photo.paste(page, (500, 500))
+
+    pixels = np.array(photo).astype(np.int16)
+    pixels += np.random.RandomState(rng.randint(0, 10 ** 6)).normal(0, 8, pixels.shape).astype(np.int16)
+    Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(path, quality=90)
+
+    return "\n".join(lines)
+
+
+def load_samples(samples_dir: Path) -> List[Tuple[Path, str]]:
+    samples = []
+    for image_path in sorted(samples_dir.iterdir()):
+        truth_path = image_path.with_suffix(".txt")
+        if image_path.suffix.lower() in {".jpg", ".jpeg", ".png"} and truth_path.exists():
+            samples.append((image_path, truth_path.read_text(encoding="utf-8")))
+    return samples
+
+
+def accuracy(verifier: DocumentVerifier, text: str, truth: str) -> float:
+    return SequenceMatcher(
+        None, verifier._clean_extracted_text(text).lower(), verifier._clean_extracted_text(truth).lower()
+    ).ratio()
+
+
+def run_previous(verifier: DocumentVerifier, path: Path) -> str:
+    image_data = verifier._load_and_preprocess_image(str(path), normalize_resolution=False, crop_to_document=False)
+    image = image_data["processed_image"]
+    pytesseract.image_to_data(image, config=OCR_CONFIG, output_type=pytesseract.Output.DICT)
+    return pytesseract.image_to_string(image, config=OCR_CONFIG)
+
+
+def run_current(verifier: DocumentVerifier, path: Path) -> str:
+    image_data = verifier._load_and_preprocess_image(str(path), normalize_resolution=True, crop_to_document=True)
+    data = pytesseract.image_to_data(
+        image_data["processed_image"], config=OCR_CONFIG, output_type=pytesseract.Output.DICT
+    )
+    return verifier._text_from_ocr_data(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark DocumentVerifier OCR")
+    parser.add_argument("--samples", type=Path, help="Directory of images with .txt ground truth")
+    parser.add_argument("--synthetic", type=int, default=5, help="Synthetic certificates when --samples is not set")
+    parser.add_argument("--font", help="TTF font with Vietnamese glyphs for synthetic samples")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    verifier = DocumentVerifier()
+
+    if args.samples:
+        samples = load_samples(args.samples)
+    else:
+        font_path = args.font or next((f for f in DEFAULT_FONTS if Path(f).exists()), None)
+        if not font_path:
+            raise SystemExit("No font with Vietnamese glyphs found, pass --font")
+        rng = random.Random(args.seed)
+        tmp_dir = Path(tempfile.mkdtemp(prefix="ytili_ocr_bench_"))
+        samples = []
+        for i in range(args.synthetic):
+            path = tmp_dir / f"certificate_{i}.jpg"
+            samples.append((path, render_certificate(rng, font_path, path)))
+
+    if not samples:
+        raise SystemExit("No samples found")
+
+    results = {"previous": ([], []), "current": ([], [])}
+    for path, truth in samples:
+        height, width = cv2.imread(str(path)).shape[:2]
+        row = [f"{path.name} ({width}x{height})"]
+        for name, runner in (("previous", run_previous), ("current", run_current)):
+            start = time.perf_counter()
+            text = runner(verifier, path)
+            elapsed = time.perf_counter() - start
+            score = accuracy(verifier, text, truth)
+            results[name][0].append(elapsed)
+            results[name][1].append(score)
+            row.append(f"{name}: {elapsed:.2f}s acc={score:.3f}")
+        print("  ".join(row))
+
+    print()
+    for name, (times, scores) in results.items():
+        print(f"{name:>8}: mean {np.mean(times):.2f}s/doc, p95 {np.percentile(times, 95):.2f}s, "
+              f"accuracy {np.mean(scores):.3f}")
+    speedup = np.mean(results["previous"][0]) / np.mean(results["current"][0])
+    print(f"Speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
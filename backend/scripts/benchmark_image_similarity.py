@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Image Similarity Benchmark
+--------------------------
+Measures the perceptual-hash multi-index table at scale: insert throughput,
+lookup latency for near-duplicate and unrelated hashes, and recall against a
+brute-force NumPy Hamming scan over the same hashes.
+
+Hashes are synthetic; near duplicates are produced by flipping a few bits,
+which is how re-compressed or lightly cropped copies of a photo behave.
+
+Run manually:
+    $ python backend/scripts/benchmark_image_similarity.py --images 1000000
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.ai_agent.image_similarity import ImageSimilarityIndex  # noqa: E402
+
+
+def flip_bits(rng: random.Random, value: int, count: int) -> int:
+    for bit in rng.sample(range(64), count):
+        value ^= 1 << bit
+    return value
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark perceptual-hash duplicate lookup")
+    parser.add_argument("--images", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--max-distance", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    index = ImageSimilarityIndex(max_distance=args.max_distance)
+
+    phashes = [rng.getrandbits(64) for _ in range(args.images)]
+    dhashes = [rng.getrandbits(64) for _ in range(args.images)]
+
+    start = time.perf_counter()
+    for i in range(args.images):
+        index.add(phashes[i], dhashes[i], "campaign_image", f"c{i}", f"owner{i}", f"img{i}")
+    build_seconds = time.perf_counter() - start
+    print(f"Indexed {len(index):,} hashes in {build_seconds:.1f}s ({args.images / build_seconds:,.0f}/s)")
+
+    phash_array = np.array(phashes, dtype=np.uint64)
+    latencies, brute_latencies = [], []
+    hits = 0
+    for q in range(args.queries):
+        target = rng.randrange(args.images)
+        near_duplicate = q % 2 == 0
+        if near_duplicate:
+            phash = flip_bits(rng, phashes[target], rng.randint(0, args.max_distance))
+            dhash = flip_bits(rng, dhashes[target], rng.randint(0, args.max_distance))
+        else:
+            phash, dhash = rng.getrandbits(64), rng.getrandbits(64)
+
+        start = time.perf_counter()
+        matches = index.query(phash, dhash)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        if q < 50:
+            start = time.perf_counter()
+            popcount64(phash_array ^ np.uint64(phash)) <= args.max_distance
+            brute_latencies.append((time.perf_counter() - start) * 1000)
+
+        if near_duplicate and any(m["source_id"] == f"c{target}" for m in matches):
+            hits += 1
+
+    latencies = np.array(latencies)
+    print(f"Multi-index lookup: p50={np.percentile(latencies, 50):.3f}ms "
+          f"p95={np.percentile(latencies, 95):.3f}ms p99={np.percentile(latencies, 99):.3f}ms")
+    print(f"Brute-force NumPy scan: p50={np.percentile(brute_latencies, 50):.3f}ms")
+    print(f"Near-duplicate recall (<= {args.max_distance} bits): {hits}/{(args.queries + 1) // 2}")
+
+
+if __name__ == "__main__":
+    main()
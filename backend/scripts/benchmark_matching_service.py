@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Matching Service Benchmark
+--------------------------
+Compares the previous per-hospital scoring of MatchingService (recent,
+total and completed donation queries issued once for the score and again
+for the reasons) with the current batch scorer, which reads every
+hospital's aggregates from the hospital_stats table in one lookup.
+
+Both paths apply the same distance filter, run against the same seeded
+database and must produce the same ranking. By default a throwaway SQLite
+database is used; pass --database-url to run against Postgres (tables must
+not already exist).
+
+Run manually:
+    $ python backend/scripts/benchmark_matching_service.py --hospitals 1000
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+parser = argparse.ArgumentParser(description="Benchmark MatchingService scoring")
+parser.add_argument("--hospitals", type=int, default=1000)
+parser.add_argument("--donations-per-hospital", type=int, default=20)
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--database-url", help="Async SQLAlchemy URL (defaults to a temporary SQLite file)")
+parser.add_argument("--seed", type=int, default=7)
+args = parser.parse_args()
+
+DATABASE_URL = args.database_url or "sqlite+aiosqlite:///" + os.path.join(
+    tempfile.mkdtemp(prefix="ytili_matching_bench_"), "bench.db"
+)
+os.environ.setdefault("DATABASE_URL", DATABASE_URL)
+
+from sqlalchemy import event, func, select, and_  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models import User, UserType, UserStatus, Donation, DonationType, DonationStatus, HospitalStats  # noqa: E402
+from app.services.matching_service import MatchingService  # noqa: E402
+from app.services.hospital_stats_service import HospitalStatsService  # noqa: E402
+
+CITIES = ["Quận 1, TP Hồ Chí Minh", "Quận 7, TP Hồ Chí Minh", "Thủ Đức, TP Hồ Chí Minh",
+          "Bình Dương", "Hà Nội", "Đà Nẵng"]
+
+
+async def seed(session: AsyncSession, rng: random.Random) -> Donation:
+    donor = User(
+        email="donor@bench.local", hashed_password="x", full_name="Bench Donor",
+        user_type=UserType.INDIVIDUAL, status=UserStatus.VERIFIED
+    )
+    session.add(donor)
+
+    hospitals = [
+        User(
+            email=f"hospital{i}@bench.local", hashed_password="x", full_name=f"Hospital {i}",
+            organization_name=f"Hospital {i}", user_type=UserType.HOSPITAL,
+            status=UserStatus.VERIFIED, is_kyc_verified=True,
+            address=f"{i} Nguyen Trai, {rng.choice(CITIES)}"
+        )
+        for i in range(args.hospitals)
+    ]
+    session.add_all(hospitals)
+    await session.flush()
+
+    now = datetime.now()
+    statuses = list(DonationStatus)
+    types = [DonationType.MEDICATION, DonationType.MEDICAL_SUPPLY, DonationType.FOOD]
+    for hospital in hospitals:
+        session.add_all([
+            Donation(
+                donor_id=donor.id, recipient_id=hospital.id, title="Seed donation",
+                donation_type=rng.choice(types), status=rng.choice(statuses),
+                created_at=now - timedelta(days=rng.randint(0, 120))
+            )
+            for _ in range(rng.randint(0, 2 * args.donations_per_hospital))
+        ])
+
+    donation = Donation(
+        donor_id=donor.id, title="Paracetamol 500mg", donation_type=DonationType.MEDICATION,
+        status=DonationStatus.VERIFIED, pickup_address="12 Le Loi, Ho Chi Minh",
+        expiry_date=now + timedelta(days=45)
+    )
+    session.add(donation)
+    await session.commit()
+    return donation
+
+
+async def previous_features(db: AsyncSession, hospital_id: int, donation_type: DonationType) -> Dict[str, int]:
+    """Per-hospital queries as issued by the previous implementation"""
+    cutoff_date = datetime.now() - timedelta(days=30)
+    recent = await db.execute(
+        select(Donation).where(
+            and_(
+                Donation.recipient_id == hospital_id,
+                Donation.donation_type == donation_type,
+                Donation.created_at >= cutoff_date,
+                Donation.status.in_([DonationStatus.COMPLETED, DonationStatus.DELIVERED])
+            )
+        )
+    )
+    total = await db.execute(select(func.count(Donation.id)).where(Donation.recipient_id == hospital_id))
+    completed = await db.execute(
+        select(func.count(Donation.id)).where(
+            and_(Donation.recipient_id == hospital_id, Donation.status == DonationStatus.COMPLETED)
+        )
+    )
+    return {
+        "recent_similar": len(recent.scalars().all()),
+        "total": total.scalar() or 0,
+        "completed": completed.scalar() or 0
+    }
+
+
+async def run_previous(service: MatchingService, donation: Donation) -> List[Dict[str, Any]]:
+    hospitals = await service._get_eligible_hospitals(donation)
+    distances = service._get_hospital_distances(donation, hospitals, 50.0) or {}
+    hospitals = [hospital for hospital in hospitals if str(hospital.id) in distances]
+    scored = []
+    for hospital in hospitals:
+        # The score and the reasons each fetched the same aggregates
+        distance = {"distance_km": distances[str(hospital.id)]}
+        score_features = {**await previous_features(service.db, hospital.id, donation.donation_type), **distance}
+        reason_features = {**await previous_features(service.db, hospital.id, donation.donation_type), **distance}
+        scored.append({
+            "hospital": hospital,
+            "score": service._calculate_match_score(donation, hospital, score_features),
+            "reasons": service._get_match_reasons(donation, hospital, reason_features)
+        })
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return scored[:10]
+
+
+async def run_current(service: MatchingService, donation: Donation) -> List[Dict[str, Any]]:
+    return await service.find_matching_recipients(donation)
+
+
+async def main() -> None:
+    engine = create_async_engine(DATABASE_URL)
+    query_count = {"n": 0}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def count_queries(*_):
+        query_count["n"] += 1
+
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[User.__table__, Donation.__table__, HospitalStats.__table__]
+        )
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        donation = await seed(session, random.Random(args.seed))
+        await HospitalStatsService(session).rebuild()
+        total_donations = (await session.execute(select(func.count(Donation.id)))).scalar()
+    print(f"Seeded {args.hospitals:,} hospitals and {total_donations:,} donations")
+
+    rankings = {}
+    for name, runner in (("previous", run_previous), ("current", run_current)):
+        timings = []
+        for _ in range(args.runs):
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                service = MatchingService(session)
+                query_count["n"] = 0
+                start = time.perf_counter()
+                matches = await runner(service, donation)
+                timings.append(time.perf_counter() - start)
+                queries = query_count["n"]
+        rankings[name] = [(m["hospital"].id, m["score"], m["reasons"]) for m in matches]
+        timings.sort()
+        print(f"{name:>8}: {queries:,} queries, median {timings[len(timings) // 2] * 1000:.1f}ms, "
+              f"min {timings[0] * 1000:.1f}ms")
+
+    print(f"Same ranking: {rankings['previous'] == rankings['current']}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Transaction Pipelining Load Test
+--------------------------------
+Sends anchor transactions through BlockchainService at each given concurrency
+and reports sustained transactions per second, submit-to-receipt latency,
+gas bumps, nonce resyncs and receipt polling round trips. Afterwards checks
+that the account nonce moved by exactly the number of confirmed transactions,
+i.e. no nonce was reused or skipped.
+
+Without --rpc-url the chain is an in-process eth-tester behind a small
+mempool: sent transactions wait in a pending pool and are mined every
+--block-time seconds, a same-nonce replacement needs a 10% higher gas price
+(as in geth), and --min-gas-price-gwei above the service's 20 gwei leaves
+transactions stuck until the service bumps them. --interfere sends
+transactions with the same key behind the service's back before each round,
+so its nonce counter is stale and must resync. With --rpc-url, use a node that
+mines on an interval, e.g. `anvil --block-time 1`.
+
+eth-tester is not a backend dependency; install it for the in-process chain:
+    $ pip install "eth-tester[py-evm]"
+
+Run manually:
+    $ python backend/scripts/load_test_transactions.py --transactions 200 --concurrency 1 16 64
+    $ python backend/scripts/load_test_transactions.py --min-gas-price-gwei 22 --stuck-after 2 --interfere 3
+    $ python backend/scripts/load_test_transactions.py --rpc-url http://127.0.0.1:8545
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+import rlp
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import local_chain
+
+parser = argparse.ArgumentParser(description="Measure sustained transaction throughput of BlockchainService")
+parser.add_argument("--transactions", type=int, default=200, help="Transactions per round")
+parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64], help="Concurrent senders, one round each")
+parser.add_argument("--block-time", type=float, default=1.0, help="Seconds between blocks of the in-process chain")
+parser.add_argument("--min-gas-price-gwei", type=float, default=0, help="In-process chain leaves cheaper transactions pending")
+parser.add_argument("--stuck-after", type=float, default=3.0, help="Seconds pending before the service bumps the gas price")
+parser.add_argument("--interfere", type=int, default=0, help="Transactions sent around the service before each round")
+parser.add_argument("--rpc-url", help="JSON-RPC URL of a local node (defaults to the in-process chain)")
+parser.add_argument("--private-key", help="Funded account key for --rpc-url (defaults to the first Anvil/Hardhat account)")
+args = parser.parse_args()
+
+
+def connect():
+    if args.rpc_url:
+        w3, private_key = local_chain.connect(args.rpc_url, args.private_key)
+        return w3, None, private_key
+
+    class MempoolTesterProvider(local_chain.eth_tester_provider_class()):
+        """eth-tester with a pending pool mined on demand, so transactions can queue and be replaced"""
+
+        def __init__(self, min_gas_price: int):
+            super().__init__()
+            self.min_gas_price = min_gas_price
+            self.pool = {}  # (sender, nonce) -> (gas_price, raw, tx_hash)
+            self.unmined = set()  # Accepted hashes not mined, including replaced ones
+
+        @staticmethod
+        def _response(result=None, error=None):
+            if error:
+                return {"jsonrpc": "2.0", "id": 0, "error": {"code": -32000, "message": error}}
+            return {"jsonrpc": "2.0", "id": 0, "result": result}
+
+        async def make_request(self, method, params):
+            if method == "eth_sendRawTransaction":
+                raw = HexBytes(params[0])
+                sender = Account.recover_transaction(raw)
+                nonce, gas_price = (int.from_bytes(field, "big") for field in rlp.decode(raw)[:2])
+                tx_hash = keccak(raw)
+
+                if nonce < self.ethereum_tester.get_nonce(sender):
+                    return self._response(error="nonce too low")
+                pending = self.pool.get((sender, nonce))
+                if pending and gas_price * 10 < pending[0] * 11:
+                    return self._response(error="replacement transaction underpriced")
+
+                self.pool[(sender, nonce)] = (gas_price, raw, tx_hash)
+                self.unmined.add(tx_hash)
+                return self._response("0x" + tx_hash.hex())
+
+            if method == "eth_getTransactionCount" and params[1] == "pending":
+                sender = to_checksum_address(params[0])
+                nonce = self.ethereum_tester.get_nonce(sender)
+                while (sender, nonce) in self.pool:
+                    nonce += 1
+                return self._response(hex(nonce))
+
+            if method == "eth_getTransactionReceipt" and HexBytes(params[0]) in self.unmined:
+                return self._response(None)
+
+            return await super().make_request(method, params)
+
+        def mine(self) -> int:
+            """Include every executable pending transaction that pays the minimum gas price"""
+            mined = 0
+            for sender in {sender for sender, _ in self.pool}:
+                nonce = self.ethereum_tester.get_nonce(sender)
+                while (sender, nonce) in self.pool and self.pool[(sender, nonce)][0] >= self.min_gas_price:
+                    _, raw, tx_hash = self.pool.pop((sender, nonce))
+                    self.ethereum_tester.send_raw_transaction(raw.to_0x_hex())
+                    self.unmined.discard(tx_hash)
+                    nonce += 1
+                    mined += 1
+            if not mined:
+                # Keep the block time without transactions, so confirmation depths are reached
+                self.ethereum_tester.mine_blocks(1)
+            return mined
+
+    provider = MempoolTesterProvider(int(args.min_gas_price_gwei * 10**9))
+    w3, private_key = local_chain.connect(tester_provider=provider)
+    return w3, provider, private_key
+
+
+w3, MEMPOOL, PRIVATE_KEY = connect()
+CHAIN_ID = asyncio.run(w3.eth.chain_id)
+
+# BlockchainService reads its account, chain and bump policy from settings
+os.environ["SAGA_PRIVATE_KEY"] = PRIVATE_KEY
+os.environ["SAGA_CHAIN_ID"] = f"local_{CHAIN_ID}-1"
+os.environ["BLOCKCHAIN_STUCK_AFTER"] = str(args.stuck_after)
+os.environ.setdefault("BLOCKCHAIN_RECEIPT_TIMEOUT", "120")
+
+from app.core.blockchain import BlockchainService  # noqa: E402
+
+
+async def produce_blocks() -> None:
+    while True:
+        await asyncio.sleep(args.block_time)
+        MEMPOOL.mine()
+
+
+async def interfere(account) -> None:
+    """Use the key outside the service so its local nonce counter goes stale"""
+    for _ in range(args.interfere):
+        signed = account.sign_transaction({
+            "to": account.address, "value": 0, "gas": 21000, "gasPrice": w3.to_wei("30", "gwei"),
+            "nonce": await w3.eth.get_transaction_count(account.address, "pending"), "chainId": CHAIN_ID
+        })
+        await w3.eth.send_raw_transaction(signed.raw_transaction)
+    if MEMPOOL and args.interfere:
+        MEMPOOL.mine()
+
+
+async def run_round(service: BlockchainService, concurrency: int, offset: int):
+    queue = asyncio.Queue()
+    for i in range(args.transactions):
+        queue.put_nowait(offset + i)
+
+    latencies = []
+    failed = 0
+
+    async def sender() -> None:
+        nonlocal failed
+        while not queue.empty():
+            i = queue.get_nowait()
+            start = time.perf_counter()
+            tx_hash = await service.anchor_merkle_root(keccak(i.to_bytes(32, "big")), 1)
+            if tx_hash is None:
+                failed += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, failed
+
+
+async def main() -> None:
+    service = BlockchainService(w3)
+    account = service.account
+    producer = asyncio.get_running_loop().create_task(produce_blocks()) if MEMPOOL else None
+
+    print(f"Chain {CHAIN_ID}, {args.transactions:,} transactions per round"
+          + (f", blocks every {args.block_time}s" if MEMPOOL else "")
+          + (f", min gas price {args.min_gas_price_gwei} gwei" if args.min_gas_price_gwei else ""))
+
+    start_nonce = await w3.eth.get_transaction_count(account.address)
+    confirmed = 0
+    outside = 0
+
+    for round_number, concurrency in enumerate(args.concurrency):
+        await interfere(account)
+        outside += args.interfere
+        bumps, resyncs, receipt_rounds = service.gas_bumps, service.nonces.resyncs, service.receipts.rounds
+
+        elapsed, latencies, failed = await run_round(service, concurrency, round_number * args.transactions)
+        confirmed += len(latencies)
+
+        p50, p95 = (statistics.quantiles(latencies, n=100)[i] for i in (49, 94)) if len(latencies) > 1 else (0, 0)
+        print(f"concurrency {concurrency:>4}: {len(latencies) / elapsed:8.1f} tx/s sustained over {elapsed:6.2f}s, "
+              f"latency p50 {p50:.2f}s p95 {p95:.2f}s, {service.gas_bumps - bumps} gas bumps, "
+              f"{service.nonces.resyncs - resyncs} nonce resyncs, "
+              f"{service.receipts.rounds - receipt_rounds} receipt polls" + (f", {failed} failed" if failed else ""))
+
+    if producer:
+        producer.cancel()
+        MEMPOOL.mine()
+
+    end_nonce = await w3.eth.get_transaction_count(account.address)
+    expected = start_nonce + confirmed + outside
+    print(f"Account nonce {end_nonce} after {confirmed:,} confirmed and {outside} outside transactions: "
+          + ("no nonce reused or skipped" if end_nonce == expected else f"expected {expected}"))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
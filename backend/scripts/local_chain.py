@@ -0,0 +1,67 @@
+"""
+Local chain helpers for the blockchain benchmark scripts
+--------------------------------------------------------
+Connects to a running node given by URL or to an in-process eth-tester
+chain, and deploys contracts from backend/contracts. Imported by
+benchmark_blockchain_throughput.py, benchmark_anchor_throughput.py and
+load_test_transactions.py; not meant to be run on its own.
+
+eth-tester is not a backend dependency; install it for the in-process chain:
+    $ pip install "eth-tester[py-evm]"
+"""
+import sys
+import json
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from eth_account import Account
+from web3 import AsyncWeb3
+
+CONTRACTS_DIR = Path(__file__).resolve().parents[1] / "contracts"
+
+# First account of `anvil` / `npx hardhat node`; only used for a node given by URL
+HARDHAT_DEFAULT_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+
+
+def eth_tester_provider_class() -> type:
+    """AsyncEthereumTesterProvider, exiting with install instructions if eth-tester is missing"""
+    try:
+        from web3.providers.eth_tester import AsyncEthereumTesterProvider
+    except Exception as e:
+        sys.exit(f"eth-tester is not available ({e}); pip install \"eth-tester[py-evm]\" or pass --rpc-url")
+    return AsyncEthereumTesterProvider
+
+
+def connect(
+    rpc_url: Optional[str] = None,
+    private_key: Optional[str] = None,
+    tester_provider: Optional[Any] = None
+) -> Tuple[AsyncWeb3, str]:
+    """
+    Web3 and a funded account key: the node at rpc_url with private_key (the
+    first Hardhat account by default), otherwise tester_provider or a new
+    in-process eth-tester chain with its first account
+    """
+    if rpc_url:
+        return AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(rpc_url)), private_key or HARDHAT_DEFAULT_KEY
+
+    provider = tester_provider or eth_tester_provider_class()()
+    return AsyncWeb3(provider), provider.ethereum_tester.backend.account_keys[0].to_hex()
+
+
+async def deploy(w3: AsyncWeb3, private_key: str, contract_name: str, *constructor_args) -> str:
+    """Deploy a compiled contract from backend/contracts and return its address"""
+    with open(CONTRACTS_DIR / f"{contract_name}.json") as f:
+        artifact = json.load(f)
+
+    account = Account.from_key(private_key)
+    transaction = await w3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"]).constructor(
+        *constructor_args
+    ).build_transaction({
+        "from": account.address,
+        "nonce": await w3.eth.get_transaction_count(account.address, "pending"),
+        "gasPrice": w3.to_wei("20", "gwei")
+    })
+    signed = account.sign_transaction(transaction)
+    receipt = await w3.eth.wait_for_transaction_receipt(await w3.eth.send_raw_transaction(signed.raw_transaction))
+    return receipt.contractAddress
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Rebuild Hospital Statistics
+---------------------------
+Recomputes the hospital_stats table from the donations table. The table is
+kept up to date by DonationService.update_donation_status; run this after
+bulk imports or manual edits to donations. It also drops per-day received
+counts older than the rolling 30-day window (reads already ignore them).
+
+Run manually or via cron:
+    $ python backend/scripts/rebuild_hospital_stats.py
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app.core.database import AsyncSessionLocal  # noqa: E402
+from app.services.hospital_stats_service import HospitalStatsService  # noqa: E402
+
+
+async def main() -> int:
+    async with AsyncSessionLocal() as session:
+        result = await HospitalStatsService(session).rebuild()
+
+    if not result["success"]:
+        print(f"Rebuild failed: {result['error']}")
+        return 1
+
+    print(f"Rebuilt statistics for {result['hospitals']:,} hospitals from {result['donations']:,} donations")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
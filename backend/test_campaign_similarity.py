@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Unit checks for near-duplicate campaign detection (MinHash/LSH index)
+"""
+import sys
+import os
+import unicodedata
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.ai_agent.campaign_similarity import CampaignSimilarityIndex
+
+STORY = (
+    "My daughter was diagnosed with leukemia last spring and needs chemotherapy "
+    "at the national children's hospital in Hanoi. We sold our motorbike to pay "
+    "for the first rounds but cannot afford the remaining treatment."
+)
+
+
+def _index():
+    index = CampaignSimilarityIndex()
+    index._loaded = True  # Checks run without the database
+    return index
+
+
+def test_copied_story_found():
+    """A story copied by another owner is found, with small edits too"""
+    index = _index()
+    index.add("c1", "owner-a", STORY)
+
+    exact = index.query(STORY, exclude_owner="owner-b")
+    assert [match["campaign_id"] for match in exact] == ["c1"]
+    assert exact[0]["similarity"] == 1.0
+
+    edited = STORY.replace("last spring", "in March")
+    assert [match["campaign_id"] for match in index.query(edited)] == ["c1"]
+
+
+def test_own_and_same_campaign_excluded():
+    """An owner reusing their own story, or the campaign itself, is not a duplicate"""
+    index = _index()
+    index.add("c1", "owner-a", STORY)
+
+    assert index.query(STORY, exclude_owner="owner-a") == []
+    assert index.query(STORY, exclude_campaign="c1") == []
+
+
+def test_unrelated_story_not_matched():
+    index = _index()
+    index.add("c1", "owner-a", STORY)
+
+    other = "Flood relief for families in the Mekong delta who lost their rice harvest and homes."
+    assert index.query(other) == []
+
+
+def test_empty_and_short_texts():
+    """Texts without words are not indexed; texts shorter than a shingle still are"""
+    index = _index()
+    assert index.signature("") is None
+    assert index.signature("  ... !!! ") is None
+    assert not index.add("c1", "owner-a", "")
+    assert index.query("") == []
+    assert len(index) == 0
+
+    assert index.add("c2", "owner-a", "Help")
+    assert [match["campaign_id"] for match in index.query("help", exclude_owner="owner-b")] == ["c2"]
+
+
+def test_normalization():
+    """Case and Unicode composition do not hide a copy"""
+    story = "Cứu giúp bé Minh điều trị ung thư máu tại bệnh viện nhi trung ương"
+    index = _index()
+    index.add("c1", "owner-a", story)
+
+    decomposed = unicodedata.normalize("NFD", story.upper())
+    assert index.query(decomposed)[0]["similarity"] == 1.0
+
+
+def test_replace_and_remove():
+    """Re-adding a campaign replaces its text; removed campaigns are not returned"""
+    index = _index()
+    index.add("c1", "owner-a", STORY)
+    index.add("c1", "owner-a", "A completely different appeal for a school roof repair in Lao Cai province")
+    assert len(index) == 1
+    assert index.query(STORY) == []
+
+    index.remove("c1")
+    index.remove("missing")
+    assert len(index) == 0
+    assert index.query("A completely different appeal for a school roof repair in Lao Cai province") == []
+
+
+def test_invalid_banding():
+    """Signatures must split evenly into bands"""
+    try:
+        CampaignSimilarityIndex(num_perm=100, bands=32)
+    except ValueError:
+        return
+    raise AssertionError("num_perm not divisible by bands did not raise")
+
+
+def main():
+    """Run all campaign similarity checks"""
+    print("🔍 Campaign Similarity Checks\n")
+
+    tests = [
+        ("Copied story", test_copied_story_found),
+        ("Own campaigns excluded", test_own_and_same_campaign_excluded),
+        ("Unrelated story", test_unrelated_story_not_matched),
+        ("Empty and short texts", test_empty_and_short_texts),
+        ("Normalization", test_normalization),
+        ("Replace and remove", test_replace_and_remove),
+        ("Invalid banding", test_invalid_banding)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}: {e!r}")
+
+    print(f"\nTotal: {passed}/{len(tests)} checks passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
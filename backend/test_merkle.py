@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit checks for the Merkle trees used by donation anchoring
+"""
+import sys
+import os
+
+# Add the backend directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from app.core.merkle import donation_leaf, build_tree, merkle_root, merkle_proof, verify_proof
+
+
+def _leaves(count):
+    return [donation_leaf(f"donation-{i}", f"hash-{i}") for i in range(count)]
+
+
+def test_proofs_round_trip():
+    """Every leaf of trees with 1 to 33 leaves verifies against the root"""
+    for count in range(1, 34):
+        levels = build_tree(_leaves(count))
+        root = merkle_root(levels)
+        for index, leaf in enumerate(levels[0]):
+            assert verify_proof(leaf, merkle_proof(levels, index), root), (count, index)
+
+
+def test_single_leaf_is_root():
+    """A one-leaf tree has the leaf as its root and an empty proof"""
+    leaf, = _leaves(1)
+    levels = build_tree([leaf])
+    assert merkle_root(levels) == leaf
+    assert merkle_proof(levels, 0) == []
+
+
+def test_wrong_leaf_or_root_rejected():
+    """A changed record, a proof for another leaf or another root does not verify"""
+    leaves = _leaves(7)
+    levels = build_tree(leaves)
+    root = merkle_root(levels)
+
+    changed = donation_leaf("donation-3", "tampered")
+    assert not verify_proof(changed, merkle_proof(levels, 3), root)
+    assert not verify_proof(leaves[3], merkle_proof(levels, 4), root)
+    assert not verify_proof(leaves[3], merkle_proof(levels, 3), merkle_root(build_tree(leaves[:6])))
+
+
+def test_empty_tree_rejected():
+    """A batch without records cannot be built"""
+    try:
+        build_tree([])
+    except ValueError:
+        return
+    raise AssertionError("build_tree([]) did not raise")
+
+
+def main():
+    """Run all Merkle checks"""
+    print("🌳 Merkle Tree Checks\n")
+
+    tests = [
+        ("Proof round trip (1-33 leaves)", test_proofs_round_trip),
+        ("Single leaf", test_single_leaf_is_root),
+        ("Tampered proofs", test_wrong_leaf_or_root_rejected),
+        ("Empty tree", test_empty_tree_rejected)
+    ]
+
+    passed = 0
+    for test_name, test_func in tests:
+        try:
+            test_func()
+            print(f"✅ {test_name}")
+            passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}: {e!r}")
+
+    print(f"\nTotal: {passed}/{len(tests)} checks passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
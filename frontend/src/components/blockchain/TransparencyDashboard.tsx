@@ -18,8 +18,9 @@ interface TransparencyData {
   transparencyScore: number;
   isVerified: boolean;
   totalTransactions: number;
-  brokenLinks: number;
-  invalidHashes: number;
+  brokenLinks: number | null; // null when answered from the event index, which only counts issues
+  invalidHashes: number | null;
+  issues: number;
   verifiedAt: string;
   blockchainHash?: string;
 }
@@ -196,21 +197,23 @@ export const TransparencyDashboard: React.FC<TransparencyDashboardProps> = ({
             
             <div className="text-center">
               <div className="text-2xl font-bold text-green-600">
-                {transparencyData.totalTransactions - transparencyData.brokenLinks}
+                {transparencyData.brokenLinks === null
+                  ? '—'
+                  : transparencyData.totalTransactions - transparencyData.brokenLinks}
               </div>
               <div className="text-sm text-gray-600">Valid Links</div>
             </div>
             
             <div className="text-center">
               <div className="text-2xl font-bold text-red-600">
-                {transparencyData.brokenLinks}
+                {transparencyData.brokenLinks ?? '—'}
               </div>
               <div className="text-sm text-gray-600">Broken Links</div>
             </div>
             
             <div className="text-center">
               <div className="text-2xl font-bold text-orange-600">
-                {transparencyData.invalidHashes}
+                {transparencyData.invalidHashes ?? '—'}
               </div>
               <div className="text-sm text-gray-600">Invalid Hashes</div>
             </div>